@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+線路編碼效能測試：標準函式庫 json vs orjson vs MessagePack
+
+回應內容由模擬器產生（get_all_connections、export_document_graph、get_component_output_data
+的文字與二進位編碼），先測量單純的編碼與解析時間，再經由替身伺服器測量完整的往返時間：
+    python3 benchmarks/bench_codecs.py --components 20000 --points 200000
+
+orjson 與 msgpack 都是選用套件，沒有安裝的編碼會略過。
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "python_bridge"))
+
+from async_client import AsyncGrasshopperClient  # noqa: E402
+from gh_protocol import build_command  # noqa: E402
+from simulator import SimulatedDocument, simulator_handlers  # noqa: E402
+from standin_server import StandinServer  # noqa: E402
+from wire_codec import get_codec  # noqa: E402
+
+CODECS = ("json", "orjson", "msgpack")
+
+
+def build_payloads(components, points):
+    """在模擬文檔上產生各命令的回應（每 3 個組件：兩個滑桿 → Addition）"""
+    document = SimulatedDocument()
+    for _ in range(components // 3):
+        a = document.add("GH_NumberSlider", 0, 0, initial={"min": 0, "max": 10, "value": 3})
+        b = document.add("GH_NumberSlider", 0, 40, initial={"min": 0, "max": 10, "value": 4})
+        addition = document.add("OperatorAdd", 200, 20)
+        document.connect({"sourceId": a.id, "targetId": addition.id, "targetParam": "A"})
+        document.connect({"sourceId": b.id, "targetId": addition.id, "targetParam": "B"})
+    count = document.add("GH_NumberSlider", 0, 0, initial={"min": 0, "max": points, "value": points})
+    series = document.add("Component_Series", 200, 0)
+    document.connect({"sourceId": count.id, "targetId": series.id, "targetParam": "Count"})
+
+    handlers = simulator_handlers(document)
+    run = lambda name, **params: {"success": True, "data": handlers[name](build_command(name, params))}  # noqa: E731
+    return {
+        "get_all_connections": run("get_all_connections"),
+        "export_document_graph": run("export_document_graph"),
+        "output (text)": run("get_component_output_data", componentId=series.id),
+        "output (binary)": run("get_component_output_data", componentId=series.id, encoding="binary"),
+    }
+
+
+def available_codecs():
+    codecs = {}
+    for name in CODECS:
+        try:
+            codecs[name] = get_codec(name)
+        except ValueError as e:
+            print(f"略過 {name}: {e}")
+    return codecs
+
+
+def best_of(repeat, func, *args):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+async def round_trip(server, codec, command, calls):
+    client = AsyncGrasshopperClient(server.host, server.port, max_size=1, timeout=120, codec=codec)
+    await client.request(command)
+    start = time.perf_counter()
+    for _ in range(calls):
+        await client.request(command)
+    elapsed = time.perf_counter() - start
+    await client.aclose()
+    return elapsed / calls
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--components", type=int, default=20000, help="文檔組件數（get_all_connections / export_document_graph）")
+    parser.add_argument("--points", type=int, default=200000, help="輸出資料的項目數")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--calls", type=int, default=5, help="每個往返測試的呼叫次數")
+    args = parser.parse_args()
+
+    codecs = available_codecs()
+    payloads = build_payloads(args.components, args.points)
+
+    print("=" * 70)
+    print(f"編碼與解析（毫秒，{args.components} 個組件，{args.points} 個輸出項目）")
+    print("=" * 70)
+    print(f"{'回應':<24} {'編碼':<8} {'大小 (KB)':>10} {'編碼':>9} {'解析':>9} {'解析加速':>9}")
+    for label, payload in payloads.items():
+        baseline = None
+        for name, codec in codecs.items():
+            data = codec.encode(payload)
+            encode = best_of(args.repeat, codec.encode, payload)
+            decode = best_of(args.repeat, codec.decode, data)
+            baseline = baseline or decode
+            print(f"{label:<24} {name:<8} {len(data) / 1024:>10.0f} {encode * 1e3:>9.1f} {decode * 1e3:>9.1f} "
+                  f"{baseline / decode:>8.1f}x")
+
+    print()
+    print("=" * 70)
+    print("往返時間（毫秒，替身伺服器支援 msgpack 握手，包含插件端編碼）")
+    print("=" * 70)
+    print(f"{'回應':<24} " + " ".join(f"{name:>10}" for name in codecs))
+    handlers = {label: (lambda command, payload=payload: payload["data"]) for label, payload in payloads.items()}
+    with StandinServer(handlers=handlers, codecs=("msgpack", "json")) as server:
+        for label in payloads:
+            command = build_command(label)
+            times = [asyncio.run(round_trip(server, name, command, args.calls)) for name in codecs]
+            print(f"{label:<24} " + " ".join(f"{t * 1e3:>10.1f}" for t in times))
+
+    print("-" * 70)
+    print("替身伺服器以相同的 JSON 實作編碼 json 與 orjson 的回應，往返時間的差異只反映橋接端的解析；")
+    print("GRASSHOPPER_CODEC=msgpack 需要插件支援 negotiate_codec 握手，否則自動使用 JSON")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+回應壓縮效能測試：不壓縮 vs zlib vs zstd
+
+回應內容由模擬器產生（見 bench_codecs.build_payloads）。測量：
+  1. 壓縮率與壓縮 / 解壓縮時間
+  2. 經由替身伺服器（子程序）的往返時間，以及指定頻寬下的估計傳輸時間（本機 loopback 幾乎沒有頻寬限制）
+  3. 橋接端讀取一個回應的記憶體高峰（tracemalloc），確認邊讀邊解壓縮不會同時保留兩份內容
+
+    python3 benchmarks/bench_compression.py --components 20000 --points 200000 --bandwidth 100
+
+zstd 需要 zstandard 套件，沒有安裝時略過。
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "python_bridge"))
+
+from async_client import AsyncGrasshopperClient  # noqa: E402
+from bench_codecs import best_of, build_payloads  # noqa: E402
+from gh_protocol import build_command  # noqa: E402
+from metrics import Metrics  # noqa: E402
+from standin_server import StandinServer  # noqa: E402
+from wire_codec import compression_for, json_codec  # noqa: E402
+
+MODES = ("off", "zlib", "zstd")
+
+
+def _server_process(conn, components, points):
+    """子程序：替身伺服器回傳模擬器產生的回應（伺服器端的編碼與壓縮不計入橋接端的記憶體）"""
+    payloads = build_payloads(components, points)
+    handlers = {label: (lambda command, payload=payload: payload["data"]) for label, payload in payloads.items()}
+    handlers["small"] = lambda command: {"ok": True}
+    with StandinServer(handlers=handlers, compression=("zstd", "zlib")) as server:
+        conn.send((server.host, server.port))
+        conn.recv()
+
+
+async def round_trip(endpoint, mode, command, calls, threshold):
+    """返回 (每次往返秒數, 線上回應位元組數)"""
+    metrics = Metrics()
+    client = AsyncGrasshopperClient(*endpoint, max_size=1, timeout=120, metrics=metrics, compression=mode,
+                                    compress_threshold=threshold)
+    await client.request(command)
+    start = time.perf_counter()
+    for _ in range(calls):
+        await client.request(command)
+    elapsed = time.perf_counter() - start
+    await client.aclose()
+    return elapsed / calls, metrics.snapshot()["commands"][command["type"]]["response_bytes"]["max"]
+
+
+async def memory_peak(endpoint, mode, command, threshold):
+    """讀取一個回應（含解析）的記憶體高峰"""
+    client = AsyncGrasshopperClient(*endpoint, max_size=1, timeout=120, compression=mode,
+                                    compress_threshold=threshold)
+    await client.request(build_command("small"))
+    tracemalloc.start()
+    response = await client.request(command)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    del response
+    await client.aclose()
+    return peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--components", type=int, default=20000)
+    parser.add_argument("--points", type=int, default=200000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--calls", type=int, default=3)
+    parser.add_argument("--threshold", type=int, default=65536, help="壓縮門檻（位元組）")
+    parser.add_argument("--bandwidth", type=float, default=100.0, help="估計傳輸時間使用的頻寬（Mbit/s）")
+    args = parser.parse_args()
+
+    modes = [mode for mode in MODES if mode == "off" or compression_for(mode) is not None]
+    codec = json_codec()
+    payloads = build_payloads(args.components, args.points)
+    encoded = {label: codec.encode(payload) for label, payload in payloads.items()}
+
+    print("=" * 70)
+    print(f"壓縮率與時間（{args.components} 個組件，{args.points} 個輸出項目）")
+    print("=" * 70)
+    print(f"{'回應':<24} {'壓縮':<6} {'大小 (KB)':>10} {'縮小倍數':>9} {'壓縮 ms':>9} {'解壓 ms':>9}")
+    for label, data in encoded.items():
+        print(f"{label:<24} {'off':<6} {len(data) / 1024:>10.0f} {1:>8.1f}x {'-':>9} {'-':>9}")
+        for mode in modes[1:]:
+            compression = compression_for(mode)
+            compressed = compression.compress(data)
+            compress = best_of(args.repeat, compression.compress, data)
+            decompress = best_of(args.repeat, compression.decompress, compressed)
+            print(f"{label:<24} {mode:<6} {len(compressed) / 1024:>10.0f} {len(data) / len(compressed):>8.1f}x "
+                  f"{compress * 1e3:>9.1f} {decompress * 1e3:>9.1f}")
+
+    parent, child = multiprocessing.Pipe()
+    process = multiprocessing.Process(target=_server_process, args=(child, args.components, args.points), daemon=True)
+    process.start()
+    endpoint = parent.recv()
+
+    print()
+    print("=" * 70)
+    print(f"往返時間（毫秒，loopback）與 {args.bandwidth:g} Mbit/s 下的估計傳輸時間")
+    print("=" * 70)
+    print(f"{'回應':<24} " + " ".join(f"{mode + ' 往返':>12} {mode + ' 傳輸':>12}" for mode in modes))
+    for label in payloads:
+        command = build_command(label)
+        cells = []
+        for mode in modes:
+            elapsed, wire_bytes = asyncio.run(round_trip(endpoint, mode, command, args.calls, args.threshold))
+            transfer = wire_bytes * 8 / (args.bandwidth * 1e6)
+            cells.append(f"{elapsed * 1e3:>12.1f} {transfer * 1e3:>12.1f}")
+        print(f"{label:<24} " + " ".join(cells))
+
+    print()
+    print("=" * 70)
+    print("讀取一個回應的記憶體高峰（MB，包含解析後的物件）")
+    print("=" * 70)
+    print(f"{'回應':<24} {'JSON (MB)':>10} " + " ".join(f"{mode:>10}" for mode in modes))
+    for label in payloads:
+        peaks = [asyncio.run(memory_peak(endpoint, mode, build_command(label), args.threshold)) for mode in modes]
+        print(f"{label:<24} {len(encoded[label]) / 1e6:>10.1f} " + " ".join(f"{p / 1e6:>10.1f}" for p in peaks))
+
+    parent.send("stop")
+    process.join(timeout=10)
+
+    print("-" * 70)
+    print("設定 GRASSHOPPER_COMPRESSION=auto（插件需支援 negotiate_codec 握手），達到 GRASSHOPPER_COMPRESS_THRESHOLD 的回應才壓縮")
+
+
+if __name__ == "__main__":
+    main()
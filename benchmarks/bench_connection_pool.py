@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+連接池效能測試：每個命令新建 socket（原做法） vs 連接池重用連接
+
+使用本地替身伺服器，不需要 Rhino：
+    python3 benchmarks/bench_connection_pool.py --calls 2000
+"""
+
+import argparse
+import json
+import os
+import socket
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "python_bridge"))
+
+from connection_pool import ConnectionPool  # noqa: E402
+from gh_protocol import build_command  # noqa: E402
+from standin_server import StandinServer  # noqa: E402
+
+
+def send_with_new_socket(host, port, command):
+    """原版 send_to_grasshopper 的做法：每次建立新連接"""
+    client = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    client.settimeout(10.0)
+    client.connect((host, port))
+    client.sendall((json.dumps(command) + "\n").encode("utf-8"))
+
+    response_data = b""
+    while True:
+        chunk = client.recv(4096)
+        if not chunk:
+            break
+        response_data += chunk
+        if response_data.endswith(b"\n"):
+            break
+
+    client.close()
+    return json.loads(response_data.decode("utf-8-sig").strip())
+
+
+def measure(label, call, calls):
+    """執行 calls 次並回傳每次延遲（毫秒）"""
+    latencies = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        call()
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    latencies.sort()
+    result = {
+        "label": label,
+        "calls": calls,
+        "mean_ms": statistics.mean(latencies),
+        "p50_ms": latencies[len(latencies) // 2],
+        "p99_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))],
+    }
+    print(f"{label:<28} mean {result['mean_ms']:.3f} ms   p50 {result['p50_ms']:.3f} ms   p99 {result['p99_ms']:.3f} ms")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=1000)
+    args = parser.parse_args()
+
+    command = build_command("get_component_details", {"componentId": "00000000-0000-0000-0000-000000000000"})
+
+    print("=" * 70)
+    print("連接池效能測試")
+    print("=" * 70)
+
+    with StandinServer(keep_alive=False) as oneshot:
+        before = measure("new socket per call", lambda: send_with_new_socket(oneshot.host, oneshot.port, command), args.calls)
+
+    with StandinServer(keep_alive=True) as standin:
+        pool = ConnectionPool(standin.host, standin.port)
+        try:
+            after = measure("pooled connection", lambda: pool.request(command), args.calls)
+        finally:
+            pool.close()
+
+    print("-" * 70)
+    print(f"每次呼叫平均延遲降低 {before['mean_ms'] / after['mean_ms']:.1f} 倍")
+
+
+if __name__ == "__main__":
+    main()
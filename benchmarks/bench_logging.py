@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+日誌開銷測試：原本印出完整參數與回應 vs 分級日誌與內容摘要
+
+只測量每次命令的日誌成本（輸出到 /dev/null），不需要 Rhino：
+    python3 benchmarks/bench_logging.py --points 100 10000 200000
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "python_bridge"))
+
+from bridge_logging import CommandLogger, configure_logging  # noqa: E402
+
+
+def build_response(points):
+    """get_component_output_data 的回應：points 個點"""
+    return {
+        "success": True,
+        "data": {"componentId": "c1", "count": points,
+                 "values": [{"type": "Point3d", "value": [i * 0.5, i * 0.25, 0.0]} for i in range(points)]},
+        "error": None,
+    }
+
+
+def legacy(out, command_type, params, response):
+    """原本的寫法"""
+    print(f"Sending command to Grasshopper: {command_type} with params: {params}", file=out)
+    print(f"Response received: {json.dumps(response)}", file=out)
+
+
+def per_call(func, calls):
+    start = time.perf_counter()
+    for _ in range(calls):
+        func()
+    return (time.perf_counter() - start) / calls
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--points", type=int, nargs="+", default=[100, 10000, 200000])
+    parser.add_argument("--calls", type=int, default=20, help="每種情況的呼叫次數")
+    args = parser.parse_args()
+
+    command_type = "get_component_output_data"
+    params = {"componentId": "c1", "outputIndex": 0, "offset": 0, "limit": 1000}
+
+    print("=" * 70)
+    print("日誌開銷測試（每次命令的日誌時間，微秒）")
+    print("=" * 70)
+    print(f"{'點數':>8} {'原本 print':>14} {'DEBUG 摘要':>14} {'INFO 一行':>14} {'INFO 抽樣':>14}")
+
+    with open(os.devnull, "w") as devnull:
+        for points in args.points:
+            response = build_response(points)
+            results = [per_call(lambda: legacy(devnull, command_type, params, response), args.calls)]
+
+            for level, sample_every in (("DEBUG", 1), ("INFO", 1), ("INFO", 20)):
+                configure_logging(level, stream=devnull)
+                log = CommandLogger(logging.getLogger("grasshopper_bridge.bench"), sample_every=sample_every)
+                results.append(per_call(lambda: log.received(command_type, params, response, log.start()), args.calls))
+
+            print(f"{points:>8} " + " ".join(f"{r * 1e6:>14.1f}" for r in results))
+
+    print("-" * 70)
+    print("原本的成本隨回應大小成長；摘要只看前幾個項目，日誌成本與資料量無關")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+統計開銷測試：記錄每個命令各階段延遲與資料量的額外成本
+
+使用本地替身伺服器，不需要 Rhino：
+    python3 benchmarks/bench_metrics.py --calls 5000
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "python_bridge"))
+
+from async_client import AsyncGrasshopperClient  # noqa: E402
+from gh_protocol import build_command  # noqa: E402
+from metrics import Metrics  # noqa: E402
+from standin_server import StandinServer  # noqa: E402
+
+
+async def run(server, calls, metrics):
+    client = AsyncGrasshopperClient(server.host, server.port, max_size=1, metrics=metrics)
+    command = build_command("get_component_details", {"componentId": "slider-1"})
+    await client.request(command)
+    start = time.perf_counter()
+    for _ in range(calls):
+        await client.request(command)
+    elapsed = time.perf_counter() - start
+    await client.aclose()
+    return elapsed / calls
+
+
+def record_cost(calls):
+    """只計算 trace + 各階段標記 + record 的成本（不含網路）"""
+    metrics = Metrics()
+    start = time.perf_counter()
+    for _ in range(calls):
+        trace = metrics.trace("get_component_details")
+        for phase in ("queue", "send", "processing", "receive", "decode"):
+            trace.mark(phase)
+        trace.request_bytes, trace.response_bytes = 80, 400
+        metrics.record(trace, True)
+    return (time.perf_counter() - start) / calls
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print(f"統計開銷測試：{args.calls} 個依序請求（本地替身伺服器）")
+    print("=" * 70)
+
+    with StandinServer() as server:
+        plain = min(asyncio.run(run(server, args.calls, None)) for _ in range(args.repeat))
+        measured = min(asyncio.run(run(server, args.calls, Metrics())) for _ in range(args.repeat))
+
+    recording = min(record_cost(args.calls) for _ in range(args.repeat))
+
+    print(f"不記錄   {plain * 1e6:9.1f} µs / 請求")
+    print(f"記錄     {measured * 1e6:9.1f} µs / 請求")
+    print(f"記錄本身 {recording * 1e6:9.1f} µs / 請求")
+    print("-" * 70)
+    print(f"記錄本身佔本地往返時間的 {recording / plain:.1%}（實際 Grasshopper 的處理時間通常為毫秒等級）")
+
+
+if __name__ == "__main__":
+    main()
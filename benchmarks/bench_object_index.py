@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+文檔物件索引效能測試：線性搜尋（foreach doc.Objects / doc.FindObject） vs GUID 與類型索引
+
+以合成文檔模擬插件的兩種資料結構（DocumentObjectIndex.cs），不需要 Rhino：
+    python3 benchmarks/bench_object_index.py --sizes 100 1000 10000
+
+索引版本的查詢時間不隨畫布上的組件數量增加；線性搜尋則與組件數量成正比。
+"""
+
+import argparse
+import random
+import time
+import uuid
+
+TYPES = ["GH_NumberSlider", "GH_Panel", "GH_BooleanToggle", "Component_Circle",
+         "Component_Addition", "Component_Extrude", "Component_Move", "Component_Series"]
+
+
+class _Object:
+    __slots__ = ("instance_guid", "type_name")
+
+    def __init__(self, instance_guid, type_name):
+        self.instance_guid = instance_guid
+        self.type_name = type_name
+
+
+class _SyntheticDocument:
+    """合成文檔：doc.Objects 列表，加上與插件相同的 GUID → 物件、類型 → GUID 集合索引"""
+
+    def __init__(self, size, seed=7):
+        rng = random.Random(seed)
+        self.objects = [_Object(uuid.UUID(int=rng.getrandbits(128)), rng.choice(TYPES)) for _ in range(size)]
+        self.by_id = {}
+        self.by_type = {}
+        for obj in self.objects:
+            self.add(obj)
+
+    def add(self, obj):
+        self.by_id[obj.instance_guid] = obj
+        self.by_type.setdefault(obj.type_name, set()).add(obj.instance_guid)
+
+    # 原本的處理器
+    def find_linear(self, instance_guid):
+        for obj in self.objects:
+            if obj.instance_guid == instance_guid:
+                return obj
+        return None
+
+    def of_type_linear(self, type_name):
+        return [str(obj.instance_guid) for obj in self.objects if obj.type_name == type_name]
+
+    # 使用索引的處理器
+    def find_indexed(self, instance_guid):
+        return self.by_id.get(instance_guid)
+
+    def of_type_indexed(self, type_name):
+        return [str(i) for i in self.by_type.get(type_name, ())]
+
+
+def per_call(func, args, repeat):
+    """每次呼叫的平均時間（微秒），取 repeat 輪中最好的一輪"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for arg in args:
+            func(arg)
+        best = min(best, (time.perf_counter() - start) / len(args))
+    return best * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--lookups", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("文檔物件索引效能測試（每次查詢的平均時間，微秒）")
+    print("=" * 70)
+    print(f"{'組件數':>8} {'GUID 線性':>12} {'GUID 索引':>12} {'類型 線性':>12} {'類型 索引':>12}")
+
+    # 類型查詢找一個只有少數組件的類型（例如畫布上的幾個 Slider），才看得出掃描成本
+    rare_type = "GH_ScribbleTarget"
+    for size in args.sizes:
+        document = _SyntheticDocument(size)
+        rng = random.Random(size)
+        ids = [rng.choice(document.objects).instance_guid for _ in range(args.lookups)]
+        for _ in range(3):
+            extra = _Object(uuid.uuid4(), rare_type)
+            document.objects.append(extra)
+            document.add(extra)
+        types = [rare_type] * 20
+
+        find_linear = per_call(document.find_linear, ids, args.repeat)
+        find_indexed = per_call(document.find_indexed, ids, args.repeat)
+        type_linear = per_call(document.of_type_linear, types, args.repeat)
+        type_indexed = per_call(document.of_type_indexed, types, args.repeat)
+        assert sorted(document.of_type_indexed(rare_type)) == sorted(document.of_type_linear(rare_type))
+
+        print(f"{size:>8} {find_linear:>12.2f} {find_indexed:>12.2f} {type_linear:>12.2f} {type_indexed:>12.2f}")
+
+    print("-" * 70)
+    print("索引查詢的時間與組件數量無關；線性搜尋隨組件數量成長")
+
+
+if __name__ == "__main__":
+    main()
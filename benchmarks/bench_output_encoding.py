@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+輸出編碼效能測試：ToString 文字（逐項解析 "{x, y, z}"） vs 二進位 float64 陣列
+
+只測量橋接端的解碼（JSON 解析 + 取得數值），不需要 Rhino：
+    python3 benchmarks/bench_output_encoding.py --points 200000
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "python_bridge"))
+
+from output_data import decode_page, pack_values  # noqa: E402
+
+
+def build_pages(count):
+    """產生同一組點的文字與二進位回應（與插件輸出格式相同）"""
+    rng = random.Random(7)
+    values = [rng.uniform(-1000, 1000) for _ in range(count * 3)]
+    text = {"outputName": "Points", "outputType": "Point", "encoding": "text",
+            "data": ["{%r, %r, %r}" % tuple(values[i:i + 3]) for i in range(0, len(values), 3)]}
+    binary = {"outputName": "Points", "outputType": "Point", "encoding": "binary", "kind": "point", "stride": 3,
+              "values": pack_values(values), "branches": [{"path": "{0}", "count": count}], "count": count}
+    return json.dumps(text).encode("utf-8"), json.dumps(binary).encode("utf-8")
+
+
+def measure(line, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        decoded = decode_page(json.loads(line))
+        best = min(best, time.perf_counter() - start)
+    return best, decoded
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--points", type=int, default=200000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    text_line, binary_line = build_pages(args.points)
+
+    print("=" * 70)
+    print(f"輸出編碼效能測試：{args.points} 個點")
+    print("=" * 70)
+
+    text_time, text_values = measure(text_line, args.repeat)
+    print(f"文字     {text_time * 1000:9.1f} ms   回應 {len(text_line) / 1e6:6.1f} MB")
+
+    binary_time, binary_values = measure(binary_line, args.repeat)
+    print(f"二進位   {binary_time * 1000:9.1f} ms   回應 {len(binary_line) / 1e6:6.1f} MB")
+
+    assert text_values.values == binary_values.values
+
+    print("-" * 70)
+    print(f"解碼時間降低 {text_time / binary_time:.1f} 倍，回應大小降低 {len(text_line) / len(binary_line):.1f} 倍")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+管線化效能測試：逐一請求（每個命令等待一次往返） vs 同一條連接上管線化
+
+使用本地替身伺服器，不需要 Rhino：
+    python3 benchmarks/bench_pipelining.py --commands 500 --rtt-ms 1
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "python_bridge"))
+
+from async_client import AsyncGrasshopperClient  # noqa: E402
+from gh_protocol import build_command  # noqa: E402
+from standin_server import StandinServer  # noqa: E402
+
+
+def build_canvas_commands(count):
+    """模擬建立畫布：交錯的新增組件與設定數值命令"""
+    commands = []
+    for i in range(count):
+        if i % 2 == 0:
+            commands.append(build_command("add_component_advanced", {"type": "GH_NumberSlider", "x": i * 10, "y": 0}))
+        else:
+            commands.append(build_command("set_slider_value", {"componentId": f"slider-{i - 1}", "value": i}))
+    return commands
+
+
+async def run(server, commands, pipelined):
+    client = AsyncGrasshopperClient(server.host, server.port, max_size=1, timeout=120)
+    start = time.perf_counter()
+    if pipelined:
+        await client.pipeline(commands)
+    else:
+        for command in commands:
+            await client.request(command)
+    elapsed = time.perf_counter() - start
+    await client.aclose()
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--commands", type=int, default=500)
+    parser.add_argument("--rtt-ms", type=float, default=1.0, help="Simulated network delay per round trip")
+    args = parser.parse_args()
+
+    commands = build_canvas_commands(args.commands)
+
+    print("=" * 70)
+    print(f"管線化效能測試：{args.commands} 個命令，模擬往返 {args.rtt_ms} ms")
+    print("=" * 70)
+
+    with StandinServer(network_delay=args.rtt_ms / 1000.0) as server:
+        sequential = asyncio.run(run(server, commands, pipelined=False))
+        print(f"逐一請求 {sequential * 1000:9.1f} ms")
+
+        pipelined = asyncio.run(run(server, commands, pipelined=True))
+        print(f"管線化   {pipelined * 1000:9.1f} ms")
+
+    print("-" * 70)
+    print(f"往返時間為主的情況下，總時間降低 {sequential / pipelined:.1f} 倍")
+
+
+if __name__ == "__main__":
+    main()
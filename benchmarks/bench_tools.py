@@ -0,0 +1,432 @@
+#!/usr/bin/env python3
+"""
+MCP 工具效能測試：每個工具的延遲分位數、不同並行數的吞吐量、記憶體高水位
+
+在子程序中啟動 Grasshopper 模擬器（python_bridge/simulator.py），依文檔大小建立測試文檔，
+再經由 bridge_enhanced.py 的工具函數（與 MCP 客戶端呼叫的是同一個函數）測量：
+
+- 延遲：依序呼叫 --calls 次的 p50 / p95 / p99（毫秒）
+- 吞吐量：--concurrency 個客戶端同時呼叫時每秒完成的次數，以及該並行數下的 p99
+- 記憶體：橋接程序中每個工具呼叫期間的 tracemalloc 峰值（另外一輪測量，不影響延遲），
+  以及整個程序的 RSS 高水位
+- get_component_output_data 另外依 --output-sizes 測量文字與二進位編碼
+
+結果以 JSON 寫出（--json），指定 --baseline 時與先前的結果比較，
+任何工具的 p95、吞吐量或記憶體退步超過 --tolerance 時以結束碼 1 結束（CI 用）。
+
+需要 mcp 套件（與橋接相同）：
+    python3 benchmarks/bench_tools.py --sizes 10 1000 10000 --concurrency 1 8 64 --json results.json
+    python3 benchmarks/bench_tools.py --quick --baseline results.json
+"""
+
+import argparse
+import asyncio
+import gc
+import json
+import multiprocessing
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+BRIDGE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "python_bridge")
+sys.path.insert(0, BRIDGE_DIR)
+
+from simulator import GrasshopperSimulator  # noqa: E402
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+RESULT_VERSION = 1
+
+# 修改文檔的工具：每個工具測量前把文檔還原
+MUTATING_TOOLS = frozenset({
+    "add_component", "add_component_advanced", "connect_components", "connect_many", "batch_execute",
+    "create_pattern", "delete_component", "delete_components", "load_document",
+})
+
+# 不測量的工具（清空文檔後其他工具沒有意義）
+SKIPPED_TOOLS = ("clear_document",)
+
+
+# ============================================================================
+# 模擬器子程序
+# ============================================================================
+
+def _populate(document, size: int, output_sizes: List[int]) -> Dict[str, Any]:
+    """
+    建立 size 個組件的測試文檔：每 4 個組件為一組（兩個滑桿 → Addition → Panel），
+    不足一組的部分為 Toggle；另外每個輸出大小一個「Count 滑桿 → Series」
+    """
+    ids: Dict[str, Any] = {"sliders": [], "additions": [], "panels": [], "toggles": [], "outputs": {}}
+    for _ in range(size // 4):
+        a = document.add("GH_NumberSlider", 0, 0, initial={"min": 0, "max": 10, "value": 3})
+        b = document.add("GH_NumberSlider", 0, 40, initial={"min": 0, "max": 10, "value": 4})
+        addition = document.add("OperatorAdd", 200, 20)
+        panel = document.add("GH_Panel", 400, 20)
+        document.connect({"sourceId": a.id, "targetId": addition.id, "targetParam": "A"})
+        document.connect({"sourceId": b.id, "targetId": addition.id, "targetParam": "B"})
+        document.connect({"sourceId": addition.id, "targetId": panel.id})
+        ids["sliders"] += [a.id, b.id]
+        ids["additions"].append(addition.id)
+        ids["panels"].append(panel.id)
+    for _ in range(size - 4 * (size // 4)):
+        ids["toggles"].append(document.add("GH_BooleanToggle", 0, 0).id)
+    if not ids["toggles"]:
+        ids["toggles"].append(document.add("GH_BooleanToggle", 0, 0).id)
+
+    for count in output_sizes:
+        slider = document.add("GH_NumberSlider", 0, 0, initial={"min": 0, "max": count, "value": count})
+        series = document.add("Component_Series", 200, 0)
+        document.connect({"sourceId": slider.id, "targetId": series.id, "targetParam": "Count"})
+        ids["outputs"][str(count)] = series.id
+
+    ids["components"] = len(document.components)
+    return ids
+
+
+def _simulator_process(conn, solve_latency: float) -> None:
+    """子程序：模擬器在背景執行緒中服務，主執行緒處理父程序的要求"""
+    snapshot = os.path.join(tempfile.mkdtemp(prefix="bench_tools_"), "document.json")
+    with GrasshopperSimulator(solve_latency=solve_latency) as sim:
+        conn.send((sim.host, sim.port))
+        while True:
+            request, args = conn.recv()
+            if request == "stop":
+                break
+            with sim.editing() as document:
+                if request == "populate":
+                    document.reset()
+                    reply: Any = _populate(document, *args)
+                    with open(snapshot, "w", encoding="utf-8") as f:
+                        json.dump(document.snapshot(), f)
+                    reply["snapshot"] = snapshot
+                elif request == "restore":
+                    document.load(snapshot)
+                    reply = None
+                elif request == "spares":
+                    reply = [document.add("GH_BooleanToggle", 0, 0).id for _ in range(args[0])]
+                else:
+                    reply = None
+            conn.send(reply)
+
+
+class SimulatorProcess:
+    """在子程序中執行的模擬器（記憶體與 CPU 與橋接分開計算）"""
+
+    def __init__(self, solve_latency: float = 0.0):
+        self._conn, child = multiprocessing.Pipe()
+        self._process = multiprocessing.Process(target=_simulator_process, args=(child, solve_latency), daemon=True)
+        self._process.start()
+        self.host, self.port = self._conn.recv()
+
+    def call(self, request: str, *args: Any) -> Any:
+        self._conn.send((request, args))
+        return self._conn.recv()
+
+    def stop(self) -> None:
+        self._conn.send(("stop", ()))
+        self._process.join(timeout=10)
+
+
+# ============================================================================
+# 工具情境
+# ============================================================================
+
+ToolCall = Callable[[int], Awaitable[Any]]
+
+
+def tool_scenarios(gh, ids: Dict[str, Any], spares: Callable[[int], List[str]], workdir: str) -> Dict[str, ToolCall]:
+    """工具名稱 → 第 i 次呼叫；每個情境只使用測試文檔中的組件"""
+    sliders, additions, panels, toggles = ids["sliders"] or ids["toggles"], ids["additions"], ids["panels"], ids["toggles"]
+    targets = additions or toggles
+
+    def pick(items: List[str], i: int) -> str:
+        return items[i % len(items)]
+
+    def deleting(count: int) -> ToolCall:
+        pool: List[str] = []
+
+        def call(i: int) -> Awaitable[Any]:
+            if len(pool) < count:
+                pool.extend(spares(max(count, 64)))
+            taken = [pool.pop() for _ in range(count)]
+            return gh.delete_component(taken[0]) if count == 1 else gh.delete_components(taken)
+        return call
+
+    scenarios: Dict[str, ToolCall] = {
+        "get_document_info": lambda i: gh.get_document_info(),
+        "get_component_details": lambda i: gh.get_component_details(pick(targets, i)),
+        "get_components_details": lambda i: gh.get_components_details(targets[:20]),
+        "get_all_connections": lambda i: gh.get_all_connections(),
+        "find_components_by_type": lambda i: gh.find_components_by_type("slider"),
+        "export_document_graph": lambda i: gh.export_document_graph(),
+        "get_changes_since": lambda i: gh.get_changes_since(0),
+        "get_available_patterns": lambda i: gh.get_available_patterns(""),
+        "set_slider_value": lambda i: gh.set_slider_value(pick(sliders, i), i % 10),
+        "batch_set_sliders": lambda i: gh.batch_set_sliders({s: i % 10 for s in sliders[:10]}),
+        "set_toggle_state": lambda i: gh.set_toggle_state(pick(toggles, i), bool(i % 2)),
+        "begin_edit_session": lambda i: gh.begin_edit_session(),
+        "commit_edit_session": lambda i: gh.commit_edit_session(),
+        "add_component": lambda i: gh.add_component("slider", i, 0),
+        "add_component_advanced": lambda i: gh.add_component_advanced("slider", i, 0, {"min": 0, "max": 10, "value": 5}),
+        "connect_components": lambda i: gh.connect_components(pick(toggles, i), pick(targets, i)),
+        "connect_many": lambda i: gh.connect_many([{"sourceId": pick(toggles, i + k), "targetId": pick(targets, i + k)}
+                                                   for k in range(10)]),
+        "batch_execute": lambda i: gh.batch_execute([
+            {"type": "add_component_advanced", "parameters": {"type": "slider", "x": 0, "y": i}},
+            {"type": "add_component_advanced", "parameters": {"type": "circle", "x": 200, "y": i}},
+            {"type": "connect_components", "parameters": {"sourceId": "$0.componentId", "targetId": "$1.componentId",
+                                                          "targetParam": "Radius"}},
+        ]),
+        "create_pattern": lambda i: gh.create_pattern("circle"),
+        "delete_component": deleting(1),
+        "delete_components": deleting(10),
+        "save_document": lambda i: gh.save_document(os.path.join(workdir, "saved.json")),
+        "load_document": lambda i: gh.load_document(ids["snapshot"]),
+    }
+    if panels:
+        scenarios["set_panel_text"] = lambda i: gh.set_panel_text(pick(panels, i), f"note {i}")
+
+    for count, series in ids["outputs"].items():
+        for encoding in ("text", "binary"):
+            scenarios[f"get_component_output_data[{encoding},{count}]"] = (
+                lambda i, series=series, encoding=encoding: gh.get_component_output_data(series, encoding=encoding))
+    return scenarios
+
+
+# ============================================================================
+# 測量
+# ============================================================================
+
+def percentile(samples: List[float], q: float) -> Optional[float]:
+    """最近排名法的分位數（samples 已排序）"""
+    if not samples:
+        return None
+    rank = max(0, min(len(samples) - 1, int(round(q * len(samples) + 0.5)) - 1))
+    return samples[rank]
+
+
+def latency_summary(samples: List[float]) -> Dict[str, Any]:
+    ordered = sorted(samples)
+    ms = lambda value: None if value is None else round(value * 1000, 4)  # noqa: E731
+    return {
+        "count": len(ordered),
+        "mean": ms(sum(ordered) / len(ordered)) if ordered else None,
+        "p50": ms(percentile(ordered, 0.50)),
+        "p95": ms(percentile(ordered, 0.95)),
+        "p99": ms(percentile(ordered, 0.99)),
+        "max": ms(ordered[-1]) if ordered else None,
+    }
+
+
+def _failed(result: Any) -> bool:
+    return isinstance(result, dict) and result.get("success") is False
+
+
+async def run_calls(call: ToolCall, calls: int, concurrency: int) -> Dict[str, Any]:
+    """concurrency 個客戶端共同完成 calls 次呼叫"""
+    samples: List[float] = []
+    errors = 0
+    next_index = iter(range(calls))
+
+    async def client() -> None:
+        nonlocal errors
+        for i in next_index:
+            start = time.perf_counter()
+            result = await call(i)
+            samples.append(time.perf_counter() - start)
+            errors += _failed(result)
+
+    start = time.perf_counter()
+    await asyncio.gather(*[client() for _ in range(concurrency)])
+    elapsed = time.perf_counter() - start
+    return {"samples": samples, "errors": errors, "throughput": calls / elapsed if elapsed > 0 else None}
+
+
+async def measure_memory(call: ToolCall, calls: int) -> int:
+    """tracemalloc 峰值（位元組）：呼叫期間橋接程序額外配置的記憶體"""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        baseline = tracemalloc.get_traced_memory()[0]
+        for i in range(calls):
+            await call(i)
+        return tracemalloc.get_traced_memory()[1] - baseline
+    finally:
+        tracemalloc.stop()
+
+
+def rss_high_water() -> Optional[int]:
+    """整個程序的 RSS 高水位（位元組）"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+async def benchmark_size(gh, sim: SimulatorProcess, size: int, args, workdir: str) -> List[Dict[str, Any]]:
+    ids = sim.call("populate", size, args.output_sizes)
+    scenarios = tool_scenarios(gh, ids, lambda count: sim.call("spares", count), workdir)
+    results = []
+
+    for tool, call in scenarios.items():
+        if args.tools and not any(tool.startswith(name) for name in args.tools):
+            continue
+        if tool.split("[")[0] in MUTATING_TOOLS:
+            sim.call("restore")
+
+        await run_calls(call, min(args.warmup, args.calls), 1)
+        sequential = await run_calls(call, args.calls, 1)
+        entry: Dict[str, Any] = {
+            "documentSize": size,
+            "components": ids["components"],
+            "tool": tool,
+            "latency": latency_summary(sequential["samples"]),
+            "errors": sequential["errors"],
+            "throughput": {},
+            "tailLatency": {},
+        }
+        for concurrency in args.concurrency:
+            run = sequential if concurrency == 1 else await run_calls(call, max(args.calls, concurrency), concurrency)
+            entry["throughput"][str(concurrency)] = round(run["throughput"], 2) if run["throughput"] else None
+            entry["tailLatency"][str(concurrency)] = latency_summary(run["samples"])["p99"]
+            entry["errors"] += run["errors"] if run is not sequential else 0
+
+        entry["memoryPeakBytes"] = await measure_memory(call, args.memory_calls)
+        results.append(entry)
+        print(f"{size:>6} {tool:<42} {entry['latency']['p50']:>9.2f} {entry['latency']['p95']:>9.2f} "
+              f"{entry['latency']['p99']:>9.2f} " + " ".join(f"{entry['throughput'][str(c)] or 0:>9.0f}" for c in args.concurrency)
+              + f" {entry['memoryPeakBytes'] / 1024:>9.0f}" + (f"  ({entry['errors']} errors)" if entry["errors"] else ""))
+    return results
+
+
+async def run_suite(args) -> Dict[str, Any]:
+    sim = SimulatorProcess(args.solve_latency)
+
+    # bridge_enhanced 在匯入時讀取設定：先指向模擬器
+    os.environ["GRASSHOPPER_HOSTS"] = f"{sim.host}:{sim.port}"
+    os.environ["GRASSHOPPER_DOCUMENT_CACHE"] = "1" if args.document_cache else "0"
+    os.environ.setdefault("GRASSHOPPER_LOG_LEVEL", "WARNING")
+    if args.pool_size:
+        os.environ["GRASSHOPPER_POOL_SIZE"] = str(args.pool_size)
+    import bridge_enhanced as gh
+    from bridge_logging import configure_logging
+    configure_logging()
+
+    print("=" * 70)
+    print(f"MCP 工具效能測試：每個工具 {args.calls} 次呼叫，並行數 {args.concurrency}")
+    print("=" * 70)
+    print(f"{'組件數':>6} {'工具':<42} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} "
+          + " ".join(f"{f'{c} 並行/s':>9}" for c in args.concurrency) + f" {'峰值 KiB':>9}")
+
+    results: List[Dict[str, Any]] = []
+    try:
+        with tempfile.TemporaryDirectory(prefix="bench_tools_") as workdir:
+            for size in args.sizes:
+                results += await benchmark_size(gh, sim, size, args, workdir)
+    finally:
+        await gh.grasshopper_client.aclose()
+        sim.stop()
+
+    return {
+        "version": RESULT_VERSION,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+        },
+        "config": {
+            "sizes": args.sizes,
+            "outputSizes": args.output_sizes,
+            "concurrency": args.concurrency,
+            "calls": args.calls,
+            "solveLatency": args.solve_latency,
+            "documentCache": args.document_cache,
+            "poolSize": gh.POOL_MAX_SIZE,
+            "skipped": list(SKIPPED_TOOLS),
+        },
+        "rssHighWaterBytes": rss_high_water(),
+        "results": results,
+    }
+
+
+# ============================================================================
+# 與基準比較
+# ============================================================================
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """退步超過 tolerance（比例）的項目；只比較兩次都有測量的工具與並行數"""
+    previous = {(r["documentSize"], r["tool"]): r for r in baseline.get("results", [])}
+    regressions = []
+    for result in current["results"]:
+        before = previous.get((result["documentSize"], result["tool"]))
+        if before is None:
+            continue
+        label = f"{result['tool']} @ {result['documentSize']}"
+
+        old, new = before["latency"].get("p95"), result["latency"].get("p95")
+        if old and new and new > old * (1 + tolerance):
+            regressions.append(f"{label}: p95 {old:.2f} → {new:.2f} ms")
+
+        for concurrency, new_rate in result["throughput"].items():
+            old_rate = before.get("throughput", {}).get(concurrency)
+            if old_rate and new_rate and new_rate < old_rate * (1 - tolerance):
+                regressions.append(f"{label}: throughput at {concurrency} clients {old_rate:.0f} → {new_rate:.0f}/s")
+
+        old_peak, new_peak = before.get("memoryPeakBytes"), result.get("memoryPeakBytes")
+        if old_peak and new_peak and new_peak > old_peak * (1 + tolerance):
+            regressions.append(f"{label}: memory peak {old_peak / 1024:.0f} → {new_peak / 1024:.0f} KiB")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 1000, 10000], help="文檔的組件數")
+    parser.add_argument("--output-sizes", type=int, nargs="+", default=[100, 10000, 100000], help="輸出資料的項目數")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 64], help="同時呼叫的客戶端數")
+    parser.add_argument("--calls", type=int, default=100, help="每個工具、每個並行數的呼叫次數")
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument("--memory-calls", type=int, default=3, help="測量記憶體峰值的呼叫次數")
+    parser.add_argument("--tools", nargs="+", help="只測量這些工具（名稱前綴）")
+    parser.add_argument("--solve-latency", type=float, default=0.0, help="模擬器每次求解的時間（秒）")
+    parser.add_argument("--pool-size", type=int, help="橋接的連接池大小（預設使用 GRASSHOPPER_POOL_SIZE）")
+    parser.add_argument("--document-cache", action="store_true", help="啟用橋接的文檔模型快取（預設停用，測量插件往返）")
+    parser.add_argument("--quick", action="store_true", help="小規模設定（CI 冒煙測試）")
+    parser.add_argument("--json", dest="json_path", help="結果寫入此 JSON 檔案")
+    parser.add_argument("--baseline", help="與此 JSON 結果比較，退步時結束碼為 1")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="允許的退步比例（預設 0.25）")
+    args = parser.parse_args()
+
+    if args.quick:
+        args.sizes, args.output_sizes, args.concurrency, args.calls = [10, 1000], [100, 10000], [1, 8], 30
+
+    report = asyncio.run(run_suite(args))
+    print("-" * 70)
+    if report["rssHighWaterBytes"]:
+        print(f"橋接程序 RSS 高水位：{report['rssHighWaterBytes'] / 1024 / 1024:.1f} MiB")
+
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"結果已寫入 {args.json_path}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = compare(report, json.load(f), args.tolerance)
+        if regressions:
+            print(f"與 {args.baseline} 相比退步超過 {args.tolerance:.0%}：")
+            for line in regressions:
+                print(f"  - {line}")
+            sys.exit(1)
+        print(f"與 {args.baseline} 相比沒有超過 {args.tolerance:.0%} 的退步")
+
+
+if __name__ == "__main__":
+    main()
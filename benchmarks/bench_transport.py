@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+傳輸層測試：TCP loopback vs Unix domain socket
+
+兩種傳輸使用同一個替身伺服器與同一個非同步客戶端，只有連接方式不同；
+分別測量重用連接（連接池）與每次呼叫建立新連接（原版行為）在小型與大型回應下的往返時間：
+    python3 benchmarks/bench_transport.py --sizes 100 65536 4194304
+"""
+
+import argparse
+import asyncio
+import os
+import socket
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "python_bridge"))
+
+from async_client import AsyncGrasshopperClient, AsyncGrasshopperConnection  # noqa: E402
+from gh_protocol import build_command  # noqa: E402
+from standin_server import StandinServer  # noqa: E402
+
+
+def payload_handler(command):
+    """回傳約 size 位元組的輸出資料（與 get_component_output_data 相同的點字串）"""
+    size = command["parameters"]["size"]
+    item = "{1.234567, 2.345678, 3.456789}"
+    return {"data": [item] * max(1, size // (len(item) + 3))}
+
+
+async def pooled(server, command, calls):
+    client = AsyncGrasshopperClient(server.host, server.port, max_size=1, timeout=60)
+    await client.request(command)
+    start = time.perf_counter()
+    for _ in range(calls):
+        await client.request(command)
+    elapsed = time.perf_counter() - start
+    await client.aclose()
+    return elapsed / calls
+
+
+async def per_call(server, command, calls):
+    start = time.perf_counter()
+    for _ in range(calls):
+        conn = await AsyncGrasshopperConnection.open(server.host, server.port)
+        await conn.request(command)
+        conn.close()
+    return (time.perf_counter() - start) / calls
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 65536, 4194304], help="回應大小（位元組）")
+    parser.add_argument("--calls", type=int, default=2000, help="小型回應的呼叫次數（大型回應依比例減少）")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    if not hasattr(socket, "AF_UNIX"):
+        sys.exit("Unix domain sockets are not available on this platform")
+
+    print("=" * 70)
+    print("傳輸層測試：TCP loopback vs Unix domain socket（每次往返，微秒）")
+    print("=" * 70)
+    print(f"{'回應大小':>10} {'模式':<8} {'TCP':>12} {'Unix':>12} {'Unix / TCP':>12}")
+
+    with tempfile.TemporaryDirectory(prefix="bench_transport_") as workdir:
+        handlers = {"payload": payload_handler}
+        with StandinServer(handlers=handlers) as tcp, \
+                StandinServer(handlers=handlers, unix_path=os.path.join(workdir, "gh.sock")) as unix:
+            for size in args.sizes:
+                command = build_command("payload", {"size": size})
+                calls = max(10, min(args.calls, args.calls * 4096 // max(size, 1)))
+                for label, measure in (("重用連接", pooled), ("每次連接", per_call)):
+                    results = [min(asyncio.run(measure(server, command, calls)) for _ in range(args.repeat))
+                               for server in (tcp, unix)]
+                    print(f"{size:>10} {label:<8} {results[0] * 1e6:>12.1f} {results[1] * 1e6:>12.1f} "
+                          f"{results[1] / results[0]:>12.2f}")
+
+    print("-" * 70)
+    print("設定 GRASSHOPPER_HOSTS=unix:<路徑> 使用 Unix domain socket（插件與橋接在同一台機器上）")
+
+
+if __name__ == "__main__":
+    main()
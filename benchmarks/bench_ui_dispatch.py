@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+UI 執行緒交接延遲測試：舊版處理器的 Thread.Sleep(10) 輪詢 vs 完成通知（UiThreadDispatcher）
+
+替身伺服器把每個命令排到單一模擬 UI 執行緒執行，不需要 Rhino：
+    python3 benchmarks/bench_ui_dispatch.py --calls 300 --work-ms 0.5
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "python_bridge"))
+
+from connection_pool import ConnectionPool  # noqa: E402
+from gh_protocol import build_command  # noqa: E402
+from standin_server import StandinServer  # noqa: E402
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def measure(mode, calls, work_ms):
+    with StandinServer(ui_handoff=mode, latency=work_ms / 1000.0) as server:
+        pool = ConnectionPool(server.host, server.port, max_size=1)
+        pool.request(build_command("warmup"))
+        samples = []
+        for i in range(calls):
+            start = time.perf_counter()
+            pool.request(build_command("get_component_details", {"componentId": f"component-{i}"}))
+            samples.append((time.perf_counter() - start) * 1000)
+        pool.close()
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=300)
+    parser.add_argument("--work-ms", type=float, default=0.5, help="Simulated UI-thread work per command")
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print(f"UI 執行緒交接延遲測試：{args.calls} 次呼叫，每次 UI 工作 {args.work_ms} ms")
+    print("=" * 70)
+
+    results = {}
+    for mode, label in (("polling", "Thread.Sleep(10) 輪詢"), ("signaled", "完成通知")):
+        samples = measure(mode, args.calls, args.work_ms)
+        results[mode] = samples
+        print(f"{label:<22} p50 {percentile(samples, 0.5):7.2f} ms   p99 {percentile(samples, 0.99):7.2f} ms"
+              f"   平均 {statistics.mean(samples):7.2f} ms")
+
+    print("-" * 70)
+    p50 = percentile(results["polling"], 0.5) / percentile(results["signaled"], 0.5)
+    p99 = percentile(results["polling"], 0.99) / percentile(results["signaled"], 0.99)
+    print(f"p50 降低 {p50:.1f} 倍，p99 降低 {p99:.1f} 倍")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,12 +2,14 @@ using System;
 using System.Collections.Generic;
 using GrasshopperMCP.Models;
 using Grasshopper.Kernel;
+using Grasshopper.Kernel.Data;
 using Grasshopper.Kernel.Parameters;
 using Grasshopper.Kernel.Special;
+using Grasshopper.Kernel.Types;
 using Rhino;
 using Grasshopper;
 using System.Linq;
-using System.Threading;
+using GH_MCP.Commands;
 
 namespace GrasshopperMCP.Commands
 {
@@ -34,68 +36,52 @@ namespace GrasshopperMCP.Commands
             string customName = command.GetParameterOrDefault<string>("name", null);
             int? width = command.GetParameterOrDefault<int?>("width", null);
             int? height = command.GetParameterOrDefault<int?>("height", null);
+            bool recompute = command.GetParameterOrDefault<bool>("recompute", true);
 
-            object result = null;
-            Exception exception = null;
-
-            RhinoApp.InvokeOnUiThread(new Action(() =>
+            return UiThreadDispatcher.Invoke<object>("AddComponentAdvanced", () =>
             {
-                try
-                {
-                    var doc = Grasshopper.Instances.ActiveCanvas?.Document;
-                    if (doc == null)
-                        throw new InvalidOperationException("No active Grasshopper document");
+                var doc = Grasshopper.Instances.ActiveCanvas?.Document;
+                if (doc == null)
+                    throw new InvalidOperationException("No active Grasshopper document");
 
-                    IGH_DocumentObject component = CreateComponentByType(type);
+                IGH_DocumentObject component = CreateComponentByType(type);
 
-                    if (component != null)
-                    {
-                        // 確保有屬性
-                        if (component.Attributes == null)
-                            component.CreateAttributes();
+                if (component != null)
+                {
+                    // 確保有屬性
+                    if (component.Attributes == null)
+                        component.CreateAttributes();
 
-                        // 設置位置
-                        component.Attributes.Pivot = new System.Drawing.PointF((float)x, (float)y);
+                    // 設置位置
+                    component.Attributes.Pivot = new System.Drawing.PointF((float)x, (float)y);
 
-                        // 設置自訂名稱
-                        if (!string.IsNullOrEmpty(customName))
-                            component.NickName = customName;
+                    // 設置自訂名稱
+                    if (!string.IsNullOrEmpty(customName))
+                        component.NickName = customName;
 
-                        // 設置初始參數
-                        if (initialParams != null)
-                        {
-                            SetInitialParameters(component, initialParams);
-                        }
+                    // 設置初始參數
+                    if (initialParams != null)
+                    {
+                        SetInitialParameters(component, initialParams);
+                    }
 
-                        // TODO: 設置寬高（需要特殊處理不同組件類型）
+                    // TODO: 設置寬高（需要特殊處理不同組件類型）
 
-                        // 添加到文檔
-                        doc.AddObject(component, false);
-                        doc.NewSolution(false);
+                    // 添加到文檔
+                    doc.AddObject(component, false);
+                    RequestSolution(doc, null, recompute);
 
-                        result = new
-                        {
-                            componentId = component.InstanceGuid.ToString(),
-                            type = component.GetType().Name,
-                            name = component.NickName,
-                            position = new { x = component.Attributes.Pivot.X, y = component.Attributes.Pivot.Y }
-                        };
-                    }
-                }
-                catch (Exception ex)
-                {
-                    exception = ex;
-                    RhinoApp.WriteLine($"Error in AddComponentAdvanced: {ex.Message}");
+                    return new
+                    {
+                        componentId = component.InstanceGuid.ToString(),
+                        type = component.GetType().Name,
+                        name = component.NickName,
+                        position = new { x = component.Attributes.Pivot.X, y = component.Attributes.Pivot.Y }
+                    };
                 }
-            }));
-
-            while (result == null && exception == null)
-                Thread.Sleep(10);
-
-            if (exception != null)
-                throw exception;
 
-            return result;
+                throw new ArgumentException($"Unknown component type: {type}");
+            });
         }
 
         /// <summary>
@@ -106,137 +92,56 @@ namespace GrasshopperMCP.Commands
         {
             string componentId = command.GetParameter<string>("componentId");
 
-            object result = null;
-            Exception exception = null;
-
-            RhinoApp.InvokeOnUiThread(new Action(() =>
+            return UiThreadDispatcher.Invoke<object>("GetComponentDetails", () =>
             {
-                try
-                {
-                    var doc = Grasshopper.Instances.ActiveCanvas?.Document;
-                    if (doc == null)
-                        throw new InvalidOperationException("No active Grasshopper document");
-
-                    Guid id;
-                    if (!Guid.TryParse(componentId, out id))
-                        throw new ArgumentException("Invalid component ID format");
-
-                    IGH_DocumentObject component = doc.FindObject(id, true);
-                    if (component == null)
-                        throw new ArgumentException($"Component {componentId} not found");
+                var doc = Grasshopper.Instances.ActiveCanvas?.Document;
+                if (doc == null)
+                    throw new InvalidOperationException("No active Grasshopper document");
 
-                    var details = new Dictionary<string, object>
-                    {
-                        ["id"] = component.InstanceGuid.ToString(),
-                        ["type"] = component.GetType().Name,
-                        ["name"] = component.NickName,
-                        ["description"] = component.Description,
-                        ["position"] = new Dictionary<string, object>
-                        {
-                            ["x"] = component.Attributes.Pivot.X,
-                            ["y"] = component.Attributes.Pivot.Y
-                        },
-                        ["size"] = new Dictionary<string, object>
-                        {
-                            ["width"] = component.Attributes.Bounds.Width,
-                            ["height"] = component.Attributes.Bounds.Height
-                        }
-                    };
+                return DescribeComponent(FindComponent(doc, componentId));
+            });
+        }
 
-                    // Slider 特殊參數
-                    if (component is GH_NumberSlider slider)
-                    {
-                        details["parameters"] = new Dictionary<string, object>
-                        {
-                            ["min"] = (double)slider.Slider.Minimum,
-                            ["max"] = (double)slider.Slider.Maximum,
-                            ["value"] = (double)slider.Slider.Value
-                        };
-                    }
+        /// <summary>
+        /// 一次獲取多個組件的詳細資訊（一次 UI 執行緒往返）
+        /// 每個 ID 各自返回 success / data 或 error，找不到的組件不影響其他組件
+        /// 命令: get_components_details
+        /// </summary>
+        public static object GetComponentsDetails(Command command)
+        {
+            var componentIds = ToIdList(command.GetParameter<object>("componentIds"));
 
-                    // Panel 特殊參數
-                    if (component is GH_Panel panel)
-                    {
-                        details["parameters"] = new Dictionary<string, object>
-                        {
-                            ["text"] = panel.UserText
-                        };
-                    }
+            return UiThreadDispatcher.Invoke<object>("GetComponentsDetails", () =>
+            {
+                var doc = Grasshopper.Instances.ActiveCanvas?.Document;
+                if (doc == null)
+                    throw new InvalidOperationException("No active Grasshopper document");
 
-                    // Toggle 特殊參數
-                    if (component is GH_BooleanToggle toggle)
+                var results = new List<Dictionary<string, object>>();
+                foreach (var componentId in componentIds)
+                {
+                    try
                     {
-                        details["parameters"] = new Dictionary<string, object>
+                        results.Add(new Dictionary<string, object>
                         {
-                            ["value"] = toggle.Value
-                        };
+                            ["componentId"] = componentId,
+                            ["success"] = true,
+                            ["data"] = DescribeComponent(FindComponent(doc, componentId))
+                        });
                     }
-
-                    // 輸入輸出參數
-                    if (component is IGH_Component ghComponent)
+                    catch (ArgumentException ex)
                     {
-                        var inputs = new List<Dictionary<string, object>>();
-                        foreach (var param in ghComponent.Params.Input)
-                        {
-                            inputs.Add(new Dictionary<string, object>
-                            {
-                                ["name"] = param.Name,
-                                ["nickname"] = param.NickName,
-                                ["type"] = param.TypeName,
-                                ["optional"] = param.Optional
-                            });
-                        }
-                        details["inputs"] = inputs;
-
-                        var outputs = new List<Dictionary<string, object>>();
-                        foreach (var param in ghComponent.Params.Output)
-                        {
-                            outputs.Add(new Dictionary<string, object>
-                            {
-                                ["name"] = param.Name,
-                                ["nickname"] = param.NickName,
-                                ["type"] = param.TypeName
-                            });
-                        }
-                        details["outputs"] = outputs;
+                        results.Add(ItemError(componentId, ex));
                     }
-
-                    // 連接資訊
-                    var connections = new Dictionary<string, object>();
-                    if (component is IGH_Param param)
-                    {
-                        var sources = new List<string>();
-                        foreach (var source in param.Sources)
-                        {
-                            sources.Add(source.InstanceGuid.ToString());
-                        }
-                        connections["sources"] = sources;
-
-                        var recipients = new List<string>();
-                        foreach (var recipient in param.Recipients)
-                        {
-                            recipients.Add(recipient.InstanceGuid.ToString());
-                        }
-                        connections["recipients"] = recipients;
-                    }
-                    details["connections"] = connections;
-
-                    result = details;
                 }
-                catch (Exception ex)
-                {
-                    exception = ex;
-                    RhinoApp.WriteLine($"Error in GetComponentDetails: {ex.Message}");
-                }
-            }));
-
-            while (result == null && exception == null)
-                Thread.Sleep(10);
-
-            if (exception != null)
-                throw exception;
 
-            return result;
+                return new
+                {
+                    count = results.Count,
+                    failed = results.Count(r => !(bool)r["success"]),
+                    results = results
+                };
+            });
         }
 
         /// <summary>
@@ -247,49 +152,32 @@ namespace GrasshopperMCP.Commands
         {
             string componentId = command.GetParameter<string>("componentId");
             double value = command.GetParameter<double>("value");
+            bool recompute = command.GetParameterOrDefault<bool>("recompute", true);
 
-            object result = null;
-            Exception exception = null;
-
-            RhinoApp.InvokeOnUiThread(new Action(() =>
+            return UiThreadDispatcher.Invoke<object>("SetSliderValue", () =>
             {
-                try
-                {
-                    var doc = Grasshopper.Instances.ActiveCanvas?.Document;
-                    if (doc == null)
-                        throw new InvalidOperationException("No active Grasshopper document");
+                var doc = Grasshopper.Instances.ActiveCanvas?.Document;
+                if (doc == null)
+                    throw new InvalidOperationException("No active Grasshopper document");
 
-                    Guid id;
-                    if (!Guid.TryParse(componentId, out id))
-                        throw new ArgumentException("Invalid component ID format");
+                Guid id;
+                if (!Guid.TryParse(componentId, out id))
+                    throw new ArgumentException("Invalid component ID format");
 
-                    IGH_DocumentObject component = doc.FindObject(id, true);
-                    if (!(component is GH_NumberSlider slider))
-                        throw new ArgumentException("Component is not a Number Slider");
+                IGH_DocumentObject component = DocumentObjectIndex.Find(doc, id);
+                if (!(component is GH_NumberSlider slider))
+                    throw new ArgumentException("Component is not a Number Slider");
 
-                    slider.SetSliderValue((decimal)value);
-                    slider.ExpireSolution(true);
+                // SetSliderValue 會自行過期並排程求解，直接寫入數值才能延後計算
+                slider.Slider.Value = (decimal)value;
+                RequestSolution(doc, slider, recompute);
 
-                    result = new
-                    {
-                        componentId = component.InstanceGuid.ToString(),
-                        value = (double)slider.Slider.Value
-                    };
-                }
-                catch (Exception ex)
+                return new
                 {
-                    exception = ex;
-                    RhinoApp.WriteLine($"Error in SetSliderValue: {ex.Message}");
-                }
-            }));
-
-            while (result == null && exception == null)
-                Thread.Sleep(10);
-
-            if (exception != null)
-                throw exception;
-
-            return result;
+                    componentId = component.InstanceGuid.ToString(),
+                    value = (double)slider.Slider.Value
+                };
+            });
         }
 
         /// <summary>
@@ -299,92 +187,208 @@ namespace GrasshopperMCP.Commands
         public static object DeleteComponent(Command command)
         {
             string componentId = command.GetParameter<string>("componentId");
+            bool recompute = command.GetParameterOrDefault<bool>("recompute", true);
 
-            object result = null;
-            Exception exception = null;
-
-            RhinoApp.InvokeOnUiThread(new Action(() =>
+            return UiThreadDispatcher.Invoke<object>("DeleteComponent", () =>
             {
-                try
-                {
-                    var doc = Grasshopper.Instances.ActiveCanvas?.Document;
-                    if (doc == null)
-                        throw new InvalidOperationException("No active Grasshopper document");
+                var doc = Grasshopper.Instances.ActiveCanvas?.Document;
+                if (doc == null)
+                    throw new InvalidOperationException("No active Grasshopper document");
 
-                    Guid id;
-                    if (!Guid.TryParse(componentId, out id))
-                        throw new ArgumentException("Invalid component ID format");
+                Guid id;
+                if (!Guid.TryParse(componentId, out id))
+                    throw new ArgumentException("Invalid component ID format");
 
-                    IGH_DocumentObject component = doc.FindObject(id, true);
-                    if (component == null)
-                        throw new ArgumentException("Component not found");
+                IGH_DocumentObject component = DocumentObjectIndex.Find(doc, id);
+                if (component == null)
+                    throw new ArgumentException("Component not found");
 
-                    doc.RemoveObject(component, false);
-                    doc.NewSolution(false);
+                doc.RemoveObject(component, false);
+                RequestSolution(doc, null, recompute);
 
-                    result = new { success = true, componentId = componentId };
-                }
-                catch (Exception ex)
+                return new { success = true, componentId = componentId };
+            });
+        }
+
+        /// <summary>
+        /// 一次刪除多個組件：先解析所有 ID，再一起移除，最後最多重新計算一次
+        /// 命令: delete_components
+        /// </summary>
+        public static object DeleteComponents(Command command)
+        {
+            var componentIds = ToIdList(command.GetParameter<object>("componentIds"));
+            bool recompute = command.GetParameterOrDefault<bool>("recompute", true);
+
+            return UiThreadDispatcher.Invoke<object>("DeleteComponents", () =>
+            {
+                var doc = Grasshopper.Instances.ActiveCanvas?.Document;
+                if (doc == null)
+                    throw new InvalidOperationException("No active Grasshopper document");
+
+                var results = new List<Dictionary<string, object>>();
+                var toRemove = new List<IGH_DocumentObject>();
+                var seen = new HashSet<Guid>();
+
+                foreach (var componentId in componentIds)
                 {
-                    exception = ex;
-                    RhinoApp.WriteLine($"Error in DeleteComponent: {ex.Message}");
-                }
-            }));
+                    try
+                    {
+                        var component = FindComponent(doc, componentId);
+                        // 組件內的參數與重複的 ID 不單獨刪除
+                        var top = component.Attributes?.GetTopLevel?.DocObject ?? component;
+                        if (seen.Add(top.InstanceGuid))
+                            toRemove.Add(top);
 
-            while (result == null && exception == null)
-                Thread.Sleep(10);
+                        results.Add(new Dictionary<string, object>
+                        {
+                            ["componentId"] = componentId,
+                            ["success"] = true
+                        });
+                    }
+                    catch (ArgumentException ex)
+                    {
+                        results.Add(ItemError(componentId, ex));
+                    }
+                }
 
-            if (exception != null)
-                throw exception;
+                if (toRemove.Count > 0)
+                {
+                    doc.RemoveObjects(toRemove, false);
+                    RequestSolution(doc, null, recompute);
+                }
 
-            return result;
+                return new
+                {
+                    deleted = toRemove.Count,
+                    failed = results.Count(r => !(bool)r["success"]),
+                    results = results
+                };
+            });
         }
 
         /// <summary>
-        /// 按類型搜尋組件
-        /// 命令: find_components_by_type
+        /// 一次建立多條連線；每條連線的格式與 connect_components 的參數相同
+        /// （sourceId、targetId，以及可選的 sourceParam / sourceParamIndex、targetParam / targetParamIndex）
+        /// 命令: connect_many
         /// </summary>
-        public static object FindComponentsByType(Command command)
+        public static object ConnectMany(Command command)
         {
-            string componentType = command.GetParameter<string>("componentType");
+            var connections = GrasshopperCommandRegistry_Enhanced.ToList(command.GetParameter<object>("connections"));
+            if (connections == null)
+                throw new ArgumentException("connections must be a list");
 
-            object result = null;
-            Exception exception = null;
+            bool recompute = command.GetParameterOrDefault<bool>("recompute", true);
 
-            RhinoApp.InvokeOnUiThread(new Action(() =>
+            return UiThreadDispatcher.Invoke<object>("ConnectMany", () =>
             {
-                try
-                {
-                    var doc = Grasshopper.Instances.ActiveCanvas?.Document;
-                    if (doc == null)
-                        throw new InvalidOperationException("No active Grasshopper document");
+                var doc = Grasshopper.Instances.ActiveCanvas?.Document;
+                if (doc == null)
+                    throw new InvalidOperationException("No active Grasshopper document");
 
-                    var componentIds = new List<string>();
+                var results = new List<Dictionary<string, object>>();
+                int connected = 0;
 
-                    foreach (var obj in doc.Objects)
+                for (int i = 0; i < connections.Count; i++)
+                {
+                    var connection = connections[i] as Dictionary<string, object>;
+                    try
                     {
-                        if (obj.GetType().Name == componentType)
+                        if (connection == null)
+                            throw new ArgumentException($"Connection {i} must be an object");
+
+                        var sourceParam = ResolveParam(doc, connection, "source", output: true);
+                        var targetParam = ResolveParam(doc, connection, "target", output: false);
+
+                        if (!targetParam.Sources.Contains(sourceParam))
                         {
-                            componentIds.Add(obj.InstanceGuid.ToString());
+                            targetParam.AddSource(sourceParam);
+                            targetParam.ExpireSolution(false);
+                            connected++;
                         }
-                    }
 
-                    result = componentIds;
+                        results.Add(new Dictionary<string, object>
+                        {
+                            ["index"] = i,
+                            ["success"] = true,
+                            ["sourceParam"] = sourceParam.Name,
+                            ["targetParam"] = targetParam.Name
+                        });
+                    }
+                    catch (ArgumentException ex)
+                    {
+                        results.Add(new Dictionary<string, object>
+                        {
+                            ["index"] = i,
+                            ["success"] = false,
+                            ["error"] = ex.Message
+                        });
+                    }
                 }
-                catch (Exception ex)
+
+                if (connected > 0)
+                    RequestSolution(doc, null, recompute);
+
+                return new
+                {
+                    connected = connected,
+                    failed = results.Count(r => !(bool)r["success"]),
+                    results = results
+                };
+            });
+        }
+
+        /// <summary>
+        /// 建立一條連線（參數與 connect_components 相同），透過 RequestSolution 求解
+        /// batch 中的 connect_components 步驟使用此處理器，暫停求解期間只標記過期
+        /// </summary>
+        public static object ConnectComponentsDeferred(Command command)
+        {
+            var connection = command.Parameters ?? new Dictionary<string, object>();
+
+            return UiThreadDispatcher.Invoke<object>("ConnectComponentsDeferred", () =>
+            {
+                var doc = Grasshopper.Instances.ActiveCanvas?.Document;
+                if (doc == null)
+                    throw new InvalidOperationException("No active Grasshopper document");
+
+                var sourceParam = ResolveParam(doc, connection, "source", output: true);
+                var targetParam = ResolveParam(doc, connection, "target", output: false);
+
+                if (!targetParam.Sources.Contains(sourceParam))
                 {
-                    exception = ex;
-                    RhinoApp.WriteLine($"Error in FindComponentsByType: {ex.Message}");
+                    targetParam.AddSource(sourceParam);
+                    RequestSolution(doc, targetParam);
                 }
-            }));
 
-            while (result == null && exception == null)
-                Thread.Sleep(10);
+                return new
+                {
+                    sourceId = (sourceParam.Attributes?.GetTopLevel?.DocObject ?? sourceParam).InstanceGuid.ToString(),
+                    targetId = (targetParam.Attributes?.GetTopLevel?.DocObject ?? targetParam).InstanceGuid.ToString(),
+                    sourceParam = sourceParam.Name,
+                    targetParam = targetParam.Name,
+                    isConnected = true
+                };
+            });
+        }
 
-            if (exception != null)
-                throw exception;
+        /// <summary>
+        /// 按類型搜尋組件
+        /// 命令: find_components_by_type
+        /// </summary>
+        public static object FindComponentsByType(Command command)
+        {
+            string componentType = command.GetParameter<string>("componentType");
 
-            return result;
+            return UiThreadDispatcher.Invoke<object>("FindComponentsByType", () =>
+            {
+                var doc = Grasshopper.Instances.ActiveCanvas?.Document;
+                if (doc == null)
+                    throw new InvalidOperationException("No active Grasshopper document");
+
+                return DocumentObjectIndex.OfType(doc, componentType)
+                    .Select(id => id.ToString())
+                    .ToList();
+            });
         }
 
         /// <summary>
@@ -399,57 +403,43 @@ namespace GrasshopperMCP.Commands
             if (sliderValues == null)
                 throw new ArgumentException("sliderValues must be a dictionary");
 
-            object result = null;
-            Exception exception = null;
+            bool recompute = command.GetParameterOrDefault<bool>("recompute", true);
 
-            RhinoApp.InvokeOnUiThread(new Action(() =>
+            return UiThreadDispatcher.Invoke<object>("BatchSetSliders", () =>
             {
-                try
-                {
-                    var doc = Grasshopper.Instances.ActiveCanvas?.Document;
-                    if (doc == null)
-                        throw new InvalidOperationException("No active Grasshopper document");
+                var doc = Grasshopper.Instances.ActiveCanvas?.Document;
+                if (doc == null)
+                    throw new InvalidOperationException("No active Grasshopper document");
 
-                    var results = new List<Dictionary<string, object>>();
+                var results = new List<Dictionary<string, object>>();
+
+                foreach (var kvp in sliderValues)
+                {
+                    Guid id;
+                    if (!Guid.TryParse(kvp.Key, out id))
+                        continue;
 
-                    foreach (var kvp in sliderValues)
+                    IGH_DocumentObject component = DocumentObjectIndex.Find(doc, id);
+                    if (component is GH_NumberSlider slider)
                     {
-                        Guid id;
-                        if (!Guid.TryParse(kvp.Key, out id))
-                            continue;
+                        double value = Convert.ToDouble(kvp.Value);
+                        // 每個滑桿只標記過期，全部設定後才計算一次
+                        slider.Slider.Value = (decimal)value;
+                        RequestSolution(doc, slider, false);
 
-                        IGH_DocumentObject component = doc.FindObject(id, true);
-                        if (component is GH_NumberSlider slider)
+                        results.Add(new Dictionary<string, object>
                         {
-                            double value = Convert.ToDouble(kvp.Value);
-                            slider.SetSliderValue((decimal)value);
-
-                            results.Add(new Dictionary<string, object>
-                            {
-                                ["componentId"] = kvp.Key,
-                                ["value"] = value,
-                                ["success"] = true
-                            });
-                        }
+                            ["componentId"] = kvp.Key,
+                            ["value"] = value,
+                            ["success"] = true
+                        });
                     }
-
-                    doc.NewSolution(false);
-                    result = results;
                 }
-                catch (Exception ex)
-                {
-                    exception = ex;
-                    RhinoApp.WriteLine($"Error in BatchSetSliders: {ex.Message}");
-                }
-            }));
-
-            while (result == null && exception == null)
-                Thread.Sleep(10);
 
-            if (exception != null)
-                throw exception;
-
-            return result;
+                if (recompute)
+                    FlushSolution(doc);
+                return results;
+            });
         }
 
         /// <summary>
@@ -460,45 +450,27 @@ namespace GrasshopperMCP.Commands
         {
             string componentId = command.GetParameter<string>("componentId");
             string text = command.GetParameter<string>("text");
+            bool recompute = command.GetParameterOrDefault<bool>("recompute", true);
 
-            object result = null;
-            Exception exception = null;
-
-            RhinoApp.InvokeOnUiThread(new Action(() =>
+            return UiThreadDispatcher.Invoke<object>("SetPanelText", () =>
             {
-                try
-                {
-                    var doc = Grasshopper.Instances.ActiveCanvas?.Document;
-                    if (doc == null)
-                        throw new InvalidOperationException("No active Grasshopper document");
+                var doc = Grasshopper.Instances.ActiveCanvas?.Document;
+                if (doc == null)
+                    throw new InvalidOperationException("No active Grasshopper document");
 
-                    Guid id;
-                    if (!Guid.TryParse(componentId, out id))
-                        throw new ArgumentException("Invalid component ID format");
+                Guid id;
+                if (!Guid.TryParse(componentId, out id))
+                    throw new ArgumentException("Invalid component ID format");
 
-                    IGH_DocumentObject component = doc.FindObject(id, true);
-                    if (!(component is GH_Panel panel))
-                        throw new ArgumentException("Component is not a Panel");
+                IGH_DocumentObject component = DocumentObjectIndex.Find(doc, id);
+                if (!(component is GH_Panel panel))
+                    throw new ArgumentException("Component is not a Panel");
 
-                    panel.UserText = text;
-                    panel.ExpireSolution(true);
+                panel.UserText = text;
+                RequestSolution(doc, panel, recompute);
 
-                    result = new { componentId = componentId, text = text };
-                }
-                catch (Exception ex)
-                {
-                    exception = ex;
-                    RhinoApp.WriteLine($"Error in SetPanelText: {ex.Message}");
-                }
-            }));
-
-            while (result == null && exception == null)
-                Thread.Sleep(10);
-
-            if (exception != null)
-                throw exception;
-
-            return result;
+                return new { componentId = componentId, text = text };
+            });
         }
 
         /// <summary>
@@ -509,187 +481,868 @@ namespace GrasshopperMCP.Commands
         {
             string componentId = command.GetParameter<string>("componentId");
             bool state = command.GetParameter<bool>("state");
+            bool recompute = command.GetParameterOrDefault<bool>("recompute", true);
+
+            return UiThreadDispatcher.Invoke<object>("SetToggleState", () =>
+            {
+                var doc = Grasshopper.Instances.ActiveCanvas?.Document;
+                if (doc == null)
+                    throw new InvalidOperationException("No active Grasshopper document");
+
+                Guid id;
+                if (!Guid.TryParse(componentId, out id))
+                    throw new ArgumentException("Invalid component ID format");
+
+                IGH_DocumentObject component = DocumentObjectIndex.Find(doc, id);
+                if (!(component is GH_BooleanToggle toggle))
+                    throw new ArgumentException("Component is not a Boolean Toggle");
 
-            object result = null;
-            Exception exception = null;
+                toggle.Value = state;
+                RequestSolution(doc, toggle, recompute);
+
+                return new { componentId = componentId, state = state };
+            });
+        }
+
+        /// <summary>
+        /// 獲取組件輸出數據
+        /// 命令: get_component_output_data
+        /// 可選 offset / limit 分頁讀取大型輸出，回應中的 nextOffset 為 null 表示已讀完
+        /// encoding = "binary" 時，點 / 向量 / 平面 / 數值以 little-endian float64 陣列（base64）返回
+        /// </summary>
+        public static object GetComponentOutputData(Command command)
+        {
+            string componentId = command.GetParameter<string>("componentId");
+            int outputIndex = command.GetParameterOrDefault<int>("outputIndex", 0);
+            int offset = Math.Max(0, command.GetParameterOrDefault<int>("offset", 0));
+            int limit = command.GetParameterOrDefault<int>("limit", -1);
+            bool binary = string.Equals(command.GetParameterOrDefault<string>("encoding", "text"), "binary", StringComparison.OrdinalIgnoreCase);
 
-            RhinoApp.InvokeOnUiThread(new Action(() =>
+            return UiThreadDispatcher.Invoke<object>("GetComponentOutputData", () =>
             {
-                try
+                var doc = Grasshopper.Instances.ActiveCanvas?.Document;
+                if (doc == null)
+                    throw new InvalidOperationException("No active Grasshopper document");
+
+                Guid id;
+                if (!Guid.TryParse(componentId, out id))
+                    throw new ArgumentException("Invalid component ID format");
+
+                IGH_DocumentObject component = DocumentObjectIndex.Find(doc, id);
+                if (component == null)
+                    throw new ArgumentException("Component not found");
+
+                // 特殊處理 Slider
+                if (component is GH_NumberSlider slider)
                 {
-                    var doc = Grasshopper.Instances.ActiveCanvas?.Document;
-                    if (doc == null)
-                        throw new InvalidOperationException("No active Grasshopper document");
+                    bool included = offset == 0 && limit != 0;
+                    if (binary)
+                    {
+                        var goo = included ? new List<IGH_Goo> { new GH_Number((double)slider.CurrentValue) } : new List<IGH_Goo>();
+                        var branches = new List<object>();
+                        if (included)
+                            branches.Add(new { path = new GH_Path(0).ToString(), count = 1 });
+                        return EncodeOutputBinary("Number", "double", goo, branches, offset, 1)
+                            ?? throw new InvalidOperationException("Slider value could not be encoded");
+                    }
 
-                    Guid id;
-                    if (!Guid.TryParse(componentId, out id))
-                        throw new ArgumentException("Invalid component ID format");
+                    var values = included
+                        ? new object[] { (double)slider.CurrentValue }
+                        : new object[0];
+                    return new
+                    {
+                        outputName = "Number",
+                        outputType = "double",
+                        // 數值本身（不是 ToString 文字）
+                        encoding = "json",
+                        data = values,
+                        offset = offset,
+                        count = values.Length,
+                        totalCount = 1,
+                        nextOffset = (int?)null
+                    };
+                }
 
-                    IGH_DocumentObject component = doc.FindObject(id, true);
-                    if (!(component is GH_BooleanToggle toggle))
-                        throw new ArgumentException("Component is not a Boolean Toggle");
+                // 處理一般組件
+                if (component is IGH_Component ghComponent)
+                {
+                    if (outputIndex < 0 || outputIndex >= ghComponent.Params.Output.Count)
+                        throw new ArgumentException("Invalid output index");
+
+                    var outputParam = ghComponent.Params.Output[outputIndex];
+                    var counts = GetBranchCounts(doc, outputParam);
+                    int totalCount = counts.Total;
+                    var branches = binary ? new List<object>() : null;
+                    var items = SelectOutputItems(outputParam.VolatileData, counts.Counts, offset, limit, branches);
 
-                    toggle.Value = state;
-                    toggle.ExpireSolution(true);
+                    if (binary)
+                    {
+                        // 無法以數值陣列表示的類型（曲線、文字等）退回文字編碼
+                        var encoded = EncodeOutputBinary(outputParam.Name, outputParam.TypeName, items, branches, offset, totalCount);
+                        if (encoded != null)
+                            return encoded;
+                    }
+
+                    // 只對這一頁的項目呼叫 ToString
+                    var dataList = new List<object>(items.Count);
+                    foreach (var item in items)
+                    {
+                        dataList.Add(item.ToString());
+                    }
 
-                    result = new { componentId = componentId, state = state };
+                    int end = offset + dataList.Count;
+                    return new
+                    {
+                        outputName = outputParam.Name,
+                        outputType = outputParam.TypeName,
+                        encoding = "text",
+                        data = dataList,
+                        offset = offset,
+                        count = dataList.Count,
+                        totalCount = totalCount,
+                        nextOffset = end < totalCount ? (int?)end : null
+                    };
                 }
-                catch (Exception ex)
+                else
                 {
-                    exception = ex;
-                    RhinoApp.WriteLine($"Error in SetToggleState: {ex.Message}");
+                    throw new ArgumentException("Component does not have outputs");
                 }
-            }));
+            });
+        }
 
-            while (result == null && exception == null)
-                Thread.Sleep(10);
+        /// <summary>
+        /// 依 offset / limit 選取輸出樹中的非空項目（順序與 AllData(true) 相同）
+        /// limit 小於 0 表示讀到最後；offset 之前的整個分支依 branchCounts 略過，取滿 limit 即停止
+        /// branches 不為 null 時，記錄選取項目所在的路徑與數量（依序、連續）
+        /// </summary>
+        private static List<IGH_Goo> SelectOutputItems(IGH_Structure tree, int[] branchCounts, int offset, int limit, List<object> branches = null)
+        {
+            var items = new List<IGH_Goo>(limit >= 0 ? Math.Min(limit, 4096) : 16);
+            int skip = offset;
 
-            if (exception != null)
-                throw exception;
+            for (int b = 0; b < tree.PathCount && (limit < 0 || items.Count < limit); b++)
+            {
+                if (skip >= branchCounts[b])
+                {
+                    skip -= branchCounts[b];
+                    continue;
+                }
+
+                int selected = 0;
+                foreach (var entry in tree.get_Branch(b))
+                {
+                    var goo = entry as IGH_Goo;
+                    if (goo == null)
+                        continue;
+
+                    if (skip > 0)
+                    {
+                        skip--;
+                        continue;
+                    }
 
-            return result;
+                    if (limit >= 0 && items.Count >= limit)
+                        break;
+
+                    items.Add(goo);
+                    selected++;
+                }
+
+                if (branches != null && selected > 0)
+                    branches.Add(new { path = tree.get_Path(b).ToString(), count = selected });
+            }
+
+            return items;
+        }
+
+        // 輸出參數 → 各分支的非空項目數；分頁讀取時每頁不必重新計數整棵樹，每次求解結束時清除
+        private static readonly Dictionary<Guid, BranchCounts> _branchCounts = new Dictionary<Guid, BranchCounts>();
+        private static GH_Document _branchCountsDocument;
+
+        private sealed class BranchCounts
+        {
+            public int PathCount;
+            public int DataCount;
+            public int[] Counts;
+            public int Total;
         }
 
         /// <summary>
-        /// 獲取組件輸出數據
-        /// 命令: get_component_output_data
+        /// 取得輸出樹各分支的非空項目數（同一次求解內快取）
+        /// 樹的路徑數或項目數與快取不同時（例如延後求解時資料已被清除）重新計數
         /// </summary>
-        public static object GetComponentOutputData(Command command)
+        private static BranchCounts GetBranchCounts(GH_Document doc, IGH_Param param)
         {
-            string componentId = command.GetParameter<string>("componentId");
-            int outputIndex = command.GetParameterOrDefault<int>("outputIndex", 0);
+            if (_branchCountsDocument != doc)
+            {
+                if (_branchCountsDocument != null)
+                    _branchCountsDocument.SolutionEnd -= OnSolutionEnd;
+                _branchCounts.Clear();
+                _branchCountsDocument = doc;
+                doc.SolutionEnd += OnSolutionEnd;
+            }
 
-            object result = null;
-            Exception exception = null;
+            var tree = param.VolatileData;
+            if (_branchCounts.TryGetValue(param.InstanceGuid, out var cached) &&
+                cached.PathCount == tree.PathCount && cached.DataCount == tree.DataCount)
+                return cached;
 
-            RhinoApp.InvokeOnUiThread(new Action(() =>
+            var counts = new BranchCounts { PathCount = tree.PathCount, DataCount = tree.DataCount, Counts = new int[tree.PathCount] };
+            for (int b = 0; b < tree.PathCount; b++)
             {
-                try
+                int count = 0;
+                foreach (var entry in tree.get_Branch(b))
                 {
-                    var doc = Grasshopper.Instances.ActiveCanvas?.Document;
-                    if (doc == null)
-                        throw new InvalidOperationException("No active Grasshopper document");
+                    if (entry is IGH_Goo)
+                        count++;
+                }
+                counts.Counts[b] = count;
+                counts.Total += count;
+            }
 
-                    Guid id;
-                    if (!Guid.TryParse(componentId, out id))
-                        throw new ArgumentException("Invalid component ID format");
+            _branchCounts[param.InstanceGuid] = counts;
+            return counts;
+        }
 
-                    IGH_DocumentObject component = doc.FindObject(id, true);
-                    if (component == null)
-                        throw new ArgumentException("Component not found");
+        private static void OnSolutionEnd(object sender, GH_SolutionEventArgs e)
+        {
+            _branchCounts.Clear();
+        }
 
-                    // 特殊處理 Slider
-                    if (component is GH_NumberSlider slider)
+        /// <summary>
+        /// 將輸出項目編碼為 little-endian float64 陣列（base64）
+        /// 每個項目的數值個數 (stride)：number 1、point / vector 3、plane 9（原點、X 軸、Y 軸）
+        /// 類型混合或無法表示時返回 null
+        /// </summary>
+        private static object EncodeOutputBinary(string outputName, string outputType, List<IGH_Goo> items, List<object> branches, int offset, int totalCount)
+        {
+            string kind = items.Count > 0 ? BinaryKind(items[0]) : "number";
+            if (kind == null)
+                return null;
+
+            int stride = kind == "number" ? 1 : kind == "plane" ? 9 : 3;
+            var values = new double[items.Count * stride];
+            int k = 0;
+
+            foreach (var item in items)
+            {
+                if (BinaryKind(item) != kind)
+                    return null;
+
+                switch (item)
+                {
+                    case GH_Number number:
+                        values[k++] = number.Value;
+                        break;
+                    case GH_Integer integer:
+                        values[k++] = integer.Value;
+                        break;
+                    case GH_Point point:
+                        values[k++] = point.Value.X;
+                        values[k++] = point.Value.Y;
+                        values[k++] = point.Value.Z;
+                        break;
+                    case GH_Vector vector:
+                        values[k++] = vector.Value.X;
+                        values[k++] = vector.Value.Y;
+                        values[k++] = vector.Value.Z;
+                        break;
+                    case GH_Plane plane:
+                        var p = plane.Value;
+                        values[k++] = p.Origin.X;
+                        values[k++] = p.Origin.Y;
+                        values[k++] = p.Origin.Z;
+                        values[k++] = p.XAxis.X;
+                        values[k++] = p.XAxis.Y;
+                        values[k++] = p.XAxis.Z;
+                        values[k++] = p.YAxis.X;
+                        values[k++] = p.YAxis.Y;
+                        values[k++] = p.YAxis.Z;
+                        break;
+                }
+            }
+
+            var bytes = new byte[values.Length * sizeof(double)];
+            Buffer.BlockCopy(values, 0, bytes, 0, bytes.Length);
+            if (!BitConverter.IsLittleEndian)
+            {
+                for (int i = 0; i < bytes.Length; i += sizeof(double))
+                    Array.Reverse(bytes, i, sizeof(double));
+            }
+
+            int end = offset + items.Count;
+            return new
+            {
+                outputName = outputName,
+                outputType = outputType,
+                encoding = "binary",
+                kind = kind,
+                stride = stride,
+                values = Convert.ToBase64String(bytes),
+                branches = branches,
+                offset = offset,
+                count = items.Count,
+                totalCount = totalCount,
+                nextOffset = end < totalCount ? (int?)end : null
+            };
+        }
+
+        private static string BinaryKind(IGH_Goo item)
+        {
+            if (item is GH_Number || item is GH_Integer) return "number";
+            if (item is GH_Point) return "point";
+            if (item is GH_Vector) return "vector";
+            if (item is GH_Plane) return "plane";
+            return null;
+        }
+
+        /// <summary>
+        /// 獲取所有連接（連到組件輸入參數的連線；不包含連到 Panel 等獨立參數的連線）
+        /// 命令: get_all_connections
+        /// </summary>
+        public static object GetAllConnections(Command command)
+        {
+            return UiThreadDispatcher.Invoke<object>("GetAllConnections", () =>
+            {
+                var doc = Grasshopper.Instances.ActiveCanvas?.Document;
+                if (doc == null)
+                    throw new InvalidOperationException("No active Grasshopper document");
+
+                var connections = new List<Dictionary<string, object>>();
+
+                foreach (var obj in doc.Objects)
+                {
+                    if (obj is IGH_Component component)
                     {
-                        result = new
-                        {
-                            outputName = "Number",
-                            outputType = "double",
-                            data = new object[] { (double)slider.CurrentValue }
-                        };
-                        return;
+                        foreach (var inputParam in component.Params.Input)
+                            AddWires(connections, obj, inputParam);
                     }
+                }
 
-                    // 處理一般組件
-                    if (component is IGH_Component ghComponent)
-                    {
-                        if (outputIndex < 0 || outputIndex >= ghComponent.Params.Output.Count)
-                            throw new ArgumentException("Invalid output index");
+                return connections;
+            });
+        }
 
-                        var outputParam = ghComponent.Params.Output[outputIndex];
-                        var dataList = new List<object>();
+        /// <summary>
+        /// 可以在 export_document_graph 中選擇的欄位（id 永遠包含）
+        /// </summary>
+        public static readonly string[] GraphFields = { "type", "name", "position", "parameters", "inputs", "outputs", "wires" };
 
-                        foreach (var item in outputParam.VolatileData.AllData(true))
-                        {
-                            dataList.Add(item.ToString());
-                        }
+        /// <summary>
+        /// 一次匯出整個文檔的組件與連線（取代 get_document_info + 逐一 get_component_details + get_all_connections）
+        /// 只走訪 doc.Objects 一次；fields 可選擇要包含的欄位，省略時全部包含
+        /// 命令: export_document_graph
+        /// </summary>
+        public static object ExportDocumentGraph(Command command)
+        {
+            var fields = ParseGraphFields(command.GetParameterOrDefault<object>("fields", null));
+
+            return UiThreadDispatcher.Invoke<object>("ExportDocumentGraph", () =>
+            {
+                var doc = Grasshopper.Instances.ActiveCanvas?.Document;
+                if (doc == null)
+                    throw new InvalidOperationException("No active Grasshopper document");
 
-                        result = new
+                DocumentChangeTracker.Attach(doc);
+
+                var components = new List<Dictionary<string, object>>();
+                var wires = new List<Dictionary<string, object>>();
+
+                foreach (var obj in doc.Objects)
+                {
+                    var entry = new Dictionary<string, object>
+                    {
+                        ["id"] = obj.InstanceGuid.ToString()
+                    };
+
+                    if (fields.Contains("type"))
+                        entry["type"] = obj.GetType().Name;
+                    if (fields.Contains("name"))
+                        entry["name"] = obj.NickName;
+                    if (fields.Contains("position"))
+                    {
+                        entry["position"] = new Dictionary<string, object>
                         {
-                            outputName = outputParam.Name,
-                            outputType = outputParam.TypeName,
-                            data = dataList
+                            ["x"] = obj.Attributes.Pivot.X,
+                            ["y"] = obj.Attributes.Pivot.Y
                         };
                     }
-                    else
+                    if (fields.Contains("parameters"))
                     {
-                        throw new ArgumentException("Component does not have outputs");
+                        var parameters = DescribeParameters(obj);
+                        if (parameters != null)
+                            entry["parameters"] = parameters;
                     }
+
+                    var ghComponent = obj as IGH_Component;
+                    if (ghComponent != null && fields.Contains("inputs"))
+                        entry["inputs"] = DescribeInputs(ghComponent);
+                    if (ghComponent != null && fields.Contains("outputs"))
+                        entry["outputs"] = DescribeOutputs(ghComponent);
+
+                    if (fields.Contains("wires"))
+                        AddTargetWires(wires, obj);
+
+                    components.Add(entry);
                 }
-                catch (Exception ex)
+
+                var graph = new Dictionary<string, object>
+                {
+                    ["documentId"] = DocumentChangeTracker.DocumentId.ToString(),
+                    ["revision"] = DocumentChangeTracker.Revision,
+                    ["fields"] = GraphFields.Where(fields.Contains).ToList(),
+                    ["components"] = components
+                };
+                if (fields.Contains("wires"))
+                    graph["wires"] = wires;
+
+                return graph;
+            });
+        }
+
+        // ======== 求解控制 ========
+
+        // 以下欄位只在 UI 執行緒上存取
+        private static int _deferSolutionDepth = 0;
+        private static bool _editSessionActive = false;
+        private static bool _solutionPending = false;
+
+        /// <summary>
+        /// 目前是否暫停求解（批次執行中或編輯階段中）
+        /// </summary>
+        public static bool IsSolutionDeferred => _deferSolutionDepth > 0 || _editSessionActive;
+
+        /// <summary>
+        /// 開始編輯階段：之後的修改只標記過期，直到 commit_edit_session 才計算一次
+        /// 命令: begin_edit_session
+        /// </summary>
+        public static object BeginEditSession(Command command)
+        {
+            return UiThreadDispatcher.Invoke<object>("BeginEditSession", () =>
+            {
+                bool alreadyActive = _editSessionActive;
+                _editSessionActive = true;
+
+                return new { active = true, alreadyActive = alreadyActive };
+            });
+        }
+
+        /// <summary>
+        /// 結束編輯階段；有待計算的修改時執行一次 NewSolution
+        /// 沒有進行中的編輯階段時，也會計算先前以 recompute=false 延後的修改
+        /// 命令: commit_edit_session
+        /// </summary>
+        public static object CommitEditSession(Command command)
+        {
+            return UiThreadDispatcher.Invoke<object>("CommitEditSession", () =>
+            {
+                var doc = Grasshopper.Instances.ActiveCanvas?.Document;
+                if (doc == null)
+                    throw new InvalidOperationException("No active Grasshopper document");
+
+                bool wasActive = _editSessionActive;
+                _editSessionActive = false;
+
+                bool solved = false;
+                if (_deferSolutionDepth == 0 && _solutionPending)
                 {
-                    exception = ex;
-                    RhinoApp.WriteLine($"Error in GetComponentOutputData: {ex.Message}");
+                    _solutionPending = false;
+                    doc.NewSolution(false);
+                    solved = true;
                 }
-            }));
 
-            while (result == null && exception == null)
-                Thread.Sleep(10);
+                return new { active = false, wasActive = wasActive, solved = solved };
+            });
+        }
 
-            if (exception != null)
-                throw exception;
+        /// <summary>
+        /// 開始暫停求解：之後的修改只標記過期，直到對應的 EndDeferSolution 才計算一次
+        /// 必須在 UI 執行緒上呼叫
+        /// </summary>
+        public static void BeginDeferSolution()
+        {
+            _deferSolutionDepth++;
+        }
 
-            return result;
+        /// <summary>
+        /// 結束暫停求解；最外層結束時（且不在編輯階段中）若有待計算的修改，執行一次 NewSolution
+        /// 必須在 UI 執行緒上呼叫
+        /// </summary>
+        public static bool EndDeferSolution(GH_Document doc)
+        {
+            if (_deferSolutionDepth == 0)
+                return false;
+
+            _deferSolutionDepth--;
+            return FlushSolution(doc);
         }
 
         /// <summary>
-        /// 獲取所有連接
-        /// 命令: get_all_connections
+        /// 不在暫停求解或編輯階段中、且有待計算的修改時，執行一次 NewSolution
+        /// 必須在 UI 執行緒上呼叫
         /// </summary>
-        public static object GetAllConnections(Command command)
+        private static bool FlushSolution(GH_Document doc)
         {
-            object result = null;
-            Exception exception = null;
+            if (IsSolutionDeferred || !_solutionPending)
+                return false;
 
-            RhinoApp.InvokeOnUiThread(new Action(() =>
+            _solutionPending = false;
+            doc?.NewSolution(false);
+            return true;
+        }
+
+        /// <summary>
+        /// 修改後要求重新計算：暫停求解或 recompute=false 時只標記過期，否則立即計算
+        /// </summary>
+        private static void RequestSolution(GH_Document doc, IGH_DocumentObject changed = null, bool recompute = true)
+        {
+            // 新增 / 刪除由文檔事件記錄；直接修改數值時在這裡記錄
+            if (changed != null)
+                DocumentChangeTracker.MarkChanged(doc, changed);
+
+            if (IsSolutionDeferred || !recompute)
             {
-                try
+                changed?.ExpireSolution(false);
+                _solutionPending = true;
+                return;
+            }
+
+            // 這次計算也會包含先前延後的修改
+            _solutionPending = false;
+            if (changed != null)
+                changed.ExpireSolution(true);
+            else
+                doc.NewSolution(false);
+        }
+
+        // ======== 文檔狀態 ========
+
+        /// <summary>
+        /// 獲取文檔修訂號（O(1)，不掃描文檔）
+        /// 第一次呼叫時開始追蹤目前的文檔；切換文檔後 documentId 會改變
+        /// 命令: get_document_revision
+        /// </summary>
+        public static object GetDocumentRevision(Command command)
+        {
+            return UiThreadDispatcher.Invoke<object>("GetDocumentRevision", () =>
+            {
+                var doc = Grasshopper.Instances.ActiveCanvas?.Document;
+                if (doc == null)
+                    throw new InvalidOperationException("No active Grasshopper document");
+
+                DocumentChangeTracker.Attach(doc);
+
+                return new
                 {
-                    var doc = Grasshopper.Instances.ActiveCanvas?.Document;
-                    if (doc == null)
-                        throw new InvalidOperationException("No active Grasshopper document");
+                    documentId = DocumentChangeTracker.DocumentId.ToString(),
+                    revision = DocumentChangeTracker.Revision
+                };
+            });
+        }
+
+        /// <summary>
+        /// 獲取指定修訂號之後的文檔變更（增量）
+        /// reset 為 true 時紀錄不足以補齊（文檔已切換或紀錄已被丟棄），客戶端需重新載入
+        /// 命令: get_changes_since
+        /// </summary>
+        public static object GetChangesSince(Command command)
+        {
+            long since = command.GetParameterOrDefault<long>("revision", 0);
+            string documentId = command.GetParameterOrDefault<string>("documentId", null);
+
+            return UiThreadDispatcher.Invoke<object>("GetChangesSince", () =>
+            {
+                var doc = Grasshopper.Instances.ActiveCanvas?.Document;
+                if (doc == null)
+                    throw new InvalidOperationException("No active Grasshopper document");
 
-                    var connections = new List<Dictionary<string, object>>();
+                DocumentChangeTracker.Attach(doc);
 
-                    foreach (var obj in doc.Objects)
+                var currentId = DocumentChangeTracker.DocumentId.ToString();
+                var changes = string.IsNullOrEmpty(documentId) || documentId == currentId
+                    ? DocumentChangeTracker.GetChangesSince(since)
+                    : null;
+
+                return new
+                {
+                    documentId = currentId,
+                    revision = DocumentChangeTracker.Revision,
+                    reset = changes == null,
+                    changes = (object)changes?.Select(c => new
                     {
-                        if (obj is IGH_Component component)
-                        {
-                            foreach (var inputParam in component.Params.Input)
-                            {
-                                foreach (var source in inputParam.Sources)
-                                {
-                                    connections.Add(new Dictionary<string, object>
-                                    {
-                                        ["sourceId"] = source.Attributes.GetTopLevel.DocObject.InstanceGuid.ToString(),
-                                        ["sourceParam"] = source.Name,
-                                        ["targetId"] = obj.InstanceGuid.ToString(),
-                                        ["targetParam"] = inputParam.Name
-                                    });
-                                }
-                            }
-                        }
-                    }
+                        revision = c.Revision,
+                        change = c.Change,
+                        id = c.Id,
+                        type = c.Type
+                    }).ToList() ?? new object[0]
+                };
+            });
+        }
+
+        // ======== 輔助方法 ========
+
+        /// <summary>
+        /// 依 ID 字串尋找文檔物件；格式錯誤或找不到時拋出 ArgumentException
+        /// </summary>
+        private static IGH_DocumentObject FindComponent(GH_Document doc, string componentId)
+        {
+            Guid id;
+            if (!Guid.TryParse(componentId, out id))
+                throw new ArgumentException("Invalid component ID format");
 
-                    result = connections;
+            IGH_DocumentObject component = DocumentObjectIndex.Find(doc, id);
+            if (component == null)
+                throw new ArgumentException($"Component {componentId} not found");
+
+            return component;
+        }
+
+        /// <summary>
+        /// get_component_details 的返回內容
+        /// </summary>
+        private static Dictionary<string, object> DescribeComponent(IGH_DocumentObject component)
+        {
+            var details = new Dictionary<string, object>
+            {
+                ["id"] = component.InstanceGuid.ToString(),
+                ["type"] = component.GetType().Name,
+                ["name"] = component.NickName,
+                ["description"] = component.Description,
+                ["position"] = new Dictionary<string, object>
+                {
+                    ["x"] = component.Attributes.Pivot.X,
+                    ["y"] = component.Attributes.Pivot.Y
+                },
+                ["size"] = new Dictionary<string, object>
+                {
+                    ["width"] = component.Attributes.Bounds.Width,
+                    ["height"] = component.Attributes.Bounds.Height
                 }
-                catch (Exception ex)
+            };
+
+            var parameters = DescribeParameters(component);
+            if (parameters != null)
+                details["parameters"] = parameters;
+
+            // 輸入輸出參數
+            if (component is IGH_Component ghComponent)
+            {
+                details["inputs"] = DescribeInputs(ghComponent);
+                details["outputs"] = DescribeOutputs(ghComponent);
+            }
+
+            // 連接資訊
+            var connections = new Dictionary<string, object>();
+            if (component is IGH_Param param)
+            {
+                var sources = new List<string>();
+                foreach (var source in param.Sources)
                 {
-                    exception = ex;
-                    RhinoApp.WriteLine($"Error in GetAllConnections: {ex.Message}");
+                    sources.Add(source.InstanceGuid.ToString());
                 }
-            }));
+                connections["sources"] = sources;
+
+                var recipients = new List<string>();
+                foreach (var recipient in param.Recipients)
+                {
+                    recipients.Add(recipient.InstanceGuid.ToString());
+                }
+                connections["recipients"] = recipients;
+            }
+            details["connections"] = connections;
+
+            return details;
+        }
+
+        /// <summary>
+        /// 解析連線一端的參數：獨立參數（Slider、Panel 等）就是自己；
+        /// 一般組件依 {end}Param（名稱或暱稱）或 {end}ParamIndex（預設 0）選擇輸出 / 輸入
+        /// </summary>
+        private static IGH_Param ResolveParam(GH_Document doc, Dictionary<string, object> connection, string end, bool output)
+        {
+            object idValue;
+            if (!connection.TryGetValue(end + "Id", out idValue) || idValue == null)
+                throw new ArgumentException($"Missing {end}Id");
+
+            var obj = FindComponent(doc, idValue.ToString());
+            if (obj is IGH_Param standalone)
+                return standalone;
 
-            while (result == null && exception == null)
-                Thread.Sleep(10);
+            if (!(obj is IGH_Component component))
+                throw new ArgumentException($"{obj.GetType().Name} cannot be connected");
 
-            if (exception != null)
-                throw exception;
+            var candidates = output ? component.Params.Output : component.Params.Input;
 
-            return result;
+            object nameValue;
+            if (connection.TryGetValue(end + "Param", out nameValue) && nameValue != null)
+            {
+                string name = nameValue.ToString();
+                var match = candidates.FirstOrDefault(p =>
+                    string.Equals(p.Name, name, StringComparison.OrdinalIgnoreCase) ||
+                    string.Equals(p.NickName, name, StringComparison.OrdinalIgnoreCase));
+                if (match == null)
+                    throw new ArgumentException($"{(output ? "Output" : "Input")} '{name}' not found on {component.NickName}");
+                return match;
+            }
+
+            object indexValue;
+            int index = connection.TryGetValue(end + "ParamIndex", out indexValue) && indexValue != null
+                ? Convert.ToInt32(indexValue)
+                : 0;
+            if (index < 0 || index >= candidates.Count)
+                throw new ArgumentException($"{(output ? "Output" : "Input")} index {index} out of range on {component.NickName}");
+            return candidates[index];
         }
 
-        // ======== 輔助方法 ========
+        /// <summary>
+        /// 批次命令中單一項目的失敗結果
+        /// </summary>
+        private static Dictionary<string, object> ItemError(string componentId, Exception ex)
+        {
+            return new Dictionary<string, object>
+            {
+                ["componentId"] = componentId,
+                ["success"] = false,
+                ["error"] = ex.Message
+            };
+        }
+
+        /// <summary>
+        /// 解析 ID 列表參數
+        /// </summary>
+        private static List<string> ToIdList(object value)
+        {
+            var items = GrasshopperCommandRegistry_Enhanced.ToList(value);
+            if (items == null)
+                throw new ArgumentException("componentIds must be a list of component IDs");
+            return items.Select(item => item?.ToString()).ToList();
+        }
+
+        /// <summary>
+        /// Slider / Panel / Toggle 的參數值；其他組件返回 null
+        /// </summary>
+        private static Dictionary<string, object> DescribeParameters(IGH_DocumentObject component)
+        {
+            // Slider 特殊參數
+            if (component is GH_NumberSlider slider)
+            {
+                return new Dictionary<string, object>
+                {
+                    ["min"] = (double)slider.Slider.Minimum,
+                    ["max"] = (double)slider.Slider.Maximum,
+                    ["value"] = (double)slider.Slider.Value
+                };
+            }
+
+            // Panel 特殊參數
+            if (component is GH_Panel panel)
+            {
+                return new Dictionary<string, object>
+                {
+                    ["text"] = panel.UserText
+                };
+            }
+
+            // Toggle 特殊參數
+            if (component is GH_BooleanToggle toggle)
+            {
+                return new Dictionary<string, object>
+                {
+                    ["value"] = toggle.Value
+                };
+            }
+
+            return null;
+        }
+
+        private static List<Dictionary<string, object>> DescribeInputs(IGH_Component component)
+        {
+            var inputs = new List<Dictionary<string, object>>();
+            foreach (var param in component.Params.Input)
+            {
+                inputs.Add(new Dictionary<string, object>
+                {
+                    ["name"] = param.Name,
+                    ["nickname"] = param.NickName,
+                    ["type"] = param.TypeName,
+                    ["optional"] = param.Optional
+                });
+            }
+            return inputs;
+        }
+
+        private static List<Dictionary<string, object>> DescribeOutputs(IGH_Component component)
+        {
+            var outputs = new List<Dictionary<string, object>>();
+            foreach (var param in component.Params.Output)
+            {
+                outputs.Add(new Dictionary<string, object>
+                {
+                    ["name"] = param.Name,
+                    ["nickname"] = param.NickName,
+                    ["type"] = param.TypeName
+                });
+            }
+            return outputs;
+        }
+
+        /// <summary>
+        /// 加入以 obj 為接收端的所有連線：組件的每個輸入參數，或獨立參數（Panel、Slider 等）本身
+        /// </summary>
+        private static void AddTargetWires(List<Dictionary<string, object>> wires, IGH_DocumentObject obj)
+        {
+            if (obj is IGH_Component component)
+            {
+                foreach (var inputParam in component.Params.Input)
+                    AddWires(wires, obj, inputParam);
+            }
+            else if (obj is IGH_Param param)
+            {
+                AddWires(wires, obj, param);
+            }
+        }
+
+        /// <summary>
+        /// 加入接收端參數的所有連線（格式與 get_all_connections 相同）
+        /// </summary>
+        private static void AddWires(List<Dictionary<string, object>> wires, IGH_DocumentObject target, IGH_Param targetParam)
+        {
+            foreach (var source in targetParam.Sources)
+            {
+                wires.Add(new Dictionary<string, object>
+                {
+                    ["sourceId"] = source.Attributes.GetTopLevel.DocObject.InstanceGuid.ToString(),
+                    ["sourceParam"] = source.Name,
+                    ["targetId"] = target.InstanceGuid.ToString(),
+                    ["targetParam"] = targetParam.Name
+                });
+            }
+        }
+
+        /// <summary>
+        /// 解析 fields 參數（列表或以逗號分隔的字串）；省略時返回全部欄位
+        /// </summary>
+        private static HashSet<string> ParseGraphFields(object value)
+        {
+            IEnumerable<string> names;
+            if (value == null)
+                names = GraphFields;
+            else if (value is string text)
+                names = text.Split(new[] { ',' }, StringSplitOptions.RemoveEmptyEntries).Select(f => f.Trim());
+            else if (value is System.Collections.IEnumerable items)
+                names = items.Cast<object>().Select(f => f?.ToString());
+            else
+                throw new ArgumentException("fields must be a list of field names");
+
+            var fields = new HashSet<string>();
+            foreach (var name in names)
+            {
+                if (!GraphFields.Contains(name))
+                    throw new ArgumentException($"Unknown field: {name}. Valid fields: {string.Join(", ", GraphFields)}");
+                fields.Add(name);
+            }
+            return fields;
+        }
 
         private static IGH_DocumentObject CreateComponentByType(string type)
         {
@@ -0,0 +1,203 @@
+using System;
+using System.Collections.Generic;
+using System.Threading;
+using Grasshopper.Kernel;
+
+namespace GrasshopperMCP.Commands
+{
+    /// <summary>
+    /// 一筆文檔變更紀錄
+    /// Change: added / removed / changed / wired；Id 為頂層組件 GUID（無法判斷時為 null）
+    /// </summary>
+    public class DocumentChange
+    {
+        public long Revision { get; set; }
+        public string Change { get; set; }
+        public string Id { get; set; }
+        public string Type { get; set; }
+    }
+
+    /// <summary>
+    /// 文檔修訂號追蹤 - 文檔內容改變時遞增，讓客戶端判斷快取是否仍然有效
+    /// 同時保留最近的變更紀錄（journal），供 get_changes_since 只返回增量
+    /// 事件在 UI 執行緒上觸發；Revision 可以在任何執行緒讀取
+    /// </summary>
+    public static class DocumentChangeTracker
+    {
+        /// <summary>
+        /// 保留的變更紀錄上限；超過時丟棄較舊的一半
+        /// </summary>
+        public const int JournalCapacity = 10000;
+
+        // 以下欄位只在 UI 執行緒上存取
+        private static GH_Document _document;
+        private static Guid _documentId = Guid.Empty;
+        private static readonly List<DocumentChange> _journal = new List<DocumentChange>();
+        // 紀錄涵蓋 (_journalStart, Revision]；更早的修訂號只能要求客戶端重新載入
+        private static long _journalStart = 0;
+
+        private static long _revision = 0;
+
+        /// <summary>
+        /// 目前的修訂號（單調遞增，切換文檔時也會遞增）
+        /// </summary>
+        public static long Revision => Interlocked.Read(ref _revision);
+
+        /// <summary>
+        /// 目前追蹤的文檔 ID（尚未追蹤時為 Guid.Empty）
+        /// </summary>
+        public static Guid DocumentId => _documentId;
+
+        /// <summary>
+        /// 開始追蹤指定文檔；已在追蹤則不做任何事
+        /// 必須在 UI 執行緒上呼叫
+        /// </summary>
+        public static void Attach(GH_Document doc)
+        {
+            if (ReferenceEquals(doc, _document))
+                return;
+
+            Detach();
+
+            _document = doc;
+            _documentId = doc?.DocumentID ?? Guid.Empty;
+            if (doc != null)
+            {
+                doc.ObjectsAdded += OnObjectsAdded;
+                doc.ObjectsDeleted += OnObjectsDeleted;
+                doc.UndoStateChanged += OnUndoStateChanged;
+
+                foreach (var obj in doc.Objects)
+                    Watch(obj);
+            }
+
+            _journal.Clear();
+            _journalStart = Interlocked.Increment(ref _revision);
+        }
+
+        /// <summary>
+        /// 標記組件已修改（命令處理器直接修改數值時使用，這類修改不一定觸發文檔事件）
+        /// 必須在 UI 執行緒上呼叫
+        /// </summary>
+        public static void MarkChanged(GH_Document doc, IGH_DocumentObject changed)
+        {
+            if (doc != null && ReferenceEquals(doc, _document))
+                Record("changed", changed);
+        }
+
+        /// <summary>
+        /// 返回 since 之後的變更；since 早於保留的紀錄、或晚於目前修訂號時返回 null（客戶端需重新載入）
+        /// 必須在 UI 執行緒上呼叫
+        /// </summary>
+        public static List<DocumentChange> GetChangesSince(long since)
+        {
+            if (since < _journalStart || since > Revision)
+                return null;
+
+            // 紀錄依修訂號遞增，二分搜尋第一筆 > since 的紀錄
+            int lo = 0, hi = _journal.Count;
+            while (lo < hi)
+            {
+                int mid = (lo + hi) / 2;
+                if (_journal[mid].Revision <= since)
+                    lo = mid + 1;
+                else
+                    hi = mid;
+            }
+
+            return _journal.GetRange(lo, _journal.Count - lo);
+        }
+
+        private static void Record(string change, IGH_DocumentObject obj)
+        {
+            // 組件內的輸入輸出參數歸到所屬的組件
+            var top = obj?.Attributes?.GetTopLevel?.DocObject ?? obj;
+
+            _journal.Add(new DocumentChange
+            {
+                Revision = Interlocked.Increment(ref _revision),
+                Change = change,
+                Id = top?.InstanceGuid.ToString(),
+                Type = top?.GetType().Name
+            });
+
+            if (_journal.Count > JournalCapacity)
+            {
+                int drop = _journal.Count - JournalCapacity / 2;
+                _journalStart = _journal[drop - 1].Revision;
+                _journal.RemoveRange(0, drop);
+            }
+        }
+
+        private static void Detach()
+        {
+            if (_document == null)
+                return;
+
+            _document.ObjectsAdded -= OnObjectsAdded;
+            _document.ObjectsDeleted -= OnObjectsDeleted;
+            _document.UndoStateChanged -= OnUndoStateChanged;
+
+            foreach (var obj in _document.Objects)
+                Unwatch(obj);
+
+            _document = null;
+            _documentId = Guid.Empty;
+            _journal.Clear();
+        }
+
+        // 組件本身與其輸入輸出參數的變更（名稱、連線等）
+        private static void Watch(IGH_DocumentObject obj)
+        {
+            obj.ObjectChanged += OnObjectChanged;
+            if (obj is IGH_Component component)
+            {
+                foreach (var param in component.Params.Input)
+                    param.ObjectChanged += OnObjectChanged;
+                foreach (var param in component.Params.Output)
+                    param.ObjectChanged += OnObjectChanged;
+            }
+        }
+
+        private static void Unwatch(IGH_DocumentObject obj)
+        {
+            obj.ObjectChanged -= OnObjectChanged;
+            if (obj is IGH_Component component)
+            {
+                foreach (var param in component.Params.Input)
+                    param.ObjectChanged -= OnObjectChanged;
+                foreach (var param in component.Params.Output)
+                    param.ObjectChanged -= OnObjectChanged;
+            }
+        }
+
+        private static void OnObjectsAdded(object sender, GH_DocObjectEventArgs e)
+        {
+            foreach (var obj in e.Objects)
+            {
+                Watch(obj);
+                Record("added", obj);
+            }
+        }
+
+        private static void OnObjectsDeleted(object sender, GH_DocObjectEventArgs e)
+        {
+            foreach (var obj in e.Objects)
+            {
+                Unwatch(obj);
+                Record("removed", obj);
+            }
+        }
+
+        private static void OnObjectChanged(IGH_DocumentObject sender, GH_ObjectChangedEventArgs e)
+        {
+            Record(e.Type == GH_ObjectEventType.Sources ? "wired" : "changed", sender);
+        }
+
+        // 使用者在畫布上的操作（移動、拖動 Slider 等）都會留下復原紀錄，但無法得知是哪個組件
+        private static void OnUndoStateChanged(object sender, GH_DocUndoEventArgs e)
+        {
+            Record("changed", null);
+        }
+    }
+}
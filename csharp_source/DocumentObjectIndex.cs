@@ -0,0 +1,128 @@
+using System;
+using System.Collections.Generic;
+using Grasshopper.Kernel;
+
+namespace GrasshopperMCP.Commands
+{
+    /// <summary>
+    /// 文檔物件索引 - GUID → 物件、類型名稱 → GUID 集合
+    /// 取代每次請求都 foreach doc.Objects（FindComponentsByType）或 doc.FindObject 的線性搜尋
+    /// 以文檔的 ObjectsAdded / ObjectsDeleted 事件保持最新；切換文檔時重新建立
+    /// 只索引頂層物件（與 doc.FindObject(id, true) 相同）；所有方法都必須在 UI 執行緒上呼叫
+    /// </summary>
+    public static class DocumentObjectIndex
+    {
+        private static GH_Document _document;
+        private static readonly Dictionary<Guid, IGH_DocumentObject> _byId = new Dictionary<Guid, IGH_DocumentObject>();
+        private static readonly Dictionary<string, HashSet<Guid>> _byType = new Dictionary<string, HashSet<Guid>>();
+
+        /// <summary>
+        /// 依 GUID 尋找頂層物件；找不到時返回 null
+        /// </summary>
+        public static IGH_DocumentObject Find(GH_Document doc, Guid id)
+        {
+            Attach(doc);
+
+            IGH_DocumentObject obj;
+            return _byId.TryGetValue(id, out obj) ? obj : null;
+        }
+
+        /// <summary>
+        /// 指定類型名稱（GetType().Name）的所有物件 GUID
+        /// </summary>
+        public static IEnumerable<Guid> OfType(GH_Document doc, string typeName)
+        {
+            Attach(doc);
+
+            HashSet<Guid> ids;
+            return _byType.TryGetValue(typeName, out ids) ? (IEnumerable<Guid>)ids : new Guid[0];
+        }
+
+        /// <summary>
+        /// 所有頂層物件
+        /// </summary>
+        public static IEnumerable<IGH_DocumentObject> Objects(GH_Document doc)
+        {
+            Attach(doc);
+            return _byId.Values;
+        }
+
+        /// <summary>
+        /// 目前索引的物件數量
+        /// </summary>
+        public static int Count => _byId.Count;
+
+        /// <summary>
+        /// 開始索引指定文檔；已在索引則不做任何事
+        /// </summary>
+        public static void Attach(GH_Document doc)
+        {
+            if (ReferenceEquals(doc, _document))
+                return;
+
+            Detach();
+
+            _document = doc;
+            if (doc == null)
+                return;
+
+            doc.ObjectsAdded += OnObjectsAdded;
+            doc.ObjectsDeleted += OnObjectsDeleted;
+
+            foreach (var obj in doc.Objects)
+                Add(obj);
+        }
+
+        private static void Detach()
+        {
+            if (_document != null)
+            {
+                _document.ObjectsAdded -= OnObjectsAdded;
+                _document.ObjectsDeleted -= OnObjectsDeleted;
+                _document = null;
+            }
+
+            _byId.Clear();
+            _byType.Clear();
+        }
+
+        private static void Add(IGH_DocumentObject obj)
+        {
+            _byId[obj.InstanceGuid] = obj;
+
+            var typeName = obj.GetType().Name;
+            HashSet<Guid> ids;
+            if (!_byType.TryGetValue(typeName, out ids))
+            {
+                ids = new HashSet<Guid>();
+                _byType[typeName] = ids;
+            }
+            ids.Add(obj.InstanceGuid);
+        }
+
+        private static void Remove(IGH_DocumentObject obj)
+        {
+            _byId.Remove(obj.InstanceGuid);
+
+            HashSet<Guid> ids;
+            if (_byType.TryGetValue(obj.GetType().Name, out ids))
+            {
+                ids.Remove(obj.InstanceGuid);
+                if (ids.Count == 0)
+                    _byType.Remove(obj.GetType().Name);
+            }
+        }
+
+        private static void OnObjectsAdded(object sender, GH_DocObjectEventArgs e)
+        {
+            foreach (var obj in e.Objects)
+                Add(obj);
+        }
+
+        private static void OnObjectsDeleted(object sender, GH_DocObjectEventArgs e)
+        {
+            foreach (var obj in e.Objects)
+                Remove(obj);
+        }
+    }
+}
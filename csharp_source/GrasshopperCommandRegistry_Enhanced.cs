@@ -6,6 +6,8 @@ using GrasshopperMCP.Commands;
 using Grasshopper.Kernel;
 using Rhino;
 using System.Linq;
+using System.Text.RegularExpressions;
+using Newtonsoft.Json.Linq;
 
 namespace GH_MCP.Commands
 {
@@ -17,6 +19,12 @@ namespace GH_MCP.Commands
     {
         private static readonly Dictionary<string, Func<Command, object>> CommandHandlers = new Dictionary<string, Func<Command, object>>();
 
+        // 批次中改用的處理器：原版的 connect_components 每條連線都會自行求解，批次中改走可延後求解的連線
+        private static readonly Dictionary<string, Func<Command, object>> BatchHandlers = new Dictionary<string, Func<Command, object>>
+        {
+            ["connect_components"] = ComponentCommandHandler_Enhanced.ConnectComponentsDeferred
+        };
+
         /// <summary>
         /// 初始化命令註冊表（增強版）
         /// </summary>
@@ -30,6 +38,7 @@ namespace GH_MCP.Commands
 
             // === 新增：增強命令 ===
             RegisterEnhancedComponentCommands();
+            RegisterBatchCommands();
 
             RhinoApp.WriteLine("GH_MCP Enhanced: Command registry initialized with enhanced features.");
         }
@@ -65,6 +74,7 @@ namespace GH_MCP.Commands
 
             // 2. 獲取組件詳細資訊
             RegisterCommand("get_component_details", ComponentCommandHandler_Enhanced.GetComponentDetails);
+            RegisterCommand("get_components_details", ComponentCommandHandler_Enhanced.GetComponentsDetails);
 
             // 3. Slider 控制
             RegisterCommand("set_slider_value", ComponentCommandHandler_Enhanced.SetSliderValue);
@@ -72,6 +82,8 @@ namespace GH_MCP.Commands
 
             // 4. 組件管理
             RegisterCommand("delete_component", ComponentCommandHandler_Enhanced.DeleteComponent);
+            RegisterCommand("delete_components", ComponentCommandHandler_Enhanced.DeleteComponents);
+            RegisterCommand("connect_many", ComponentCommandHandler_Enhanced.ConnectMany);
             RegisterCommand("find_components_by_type", ComponentCommandHandler_Enhanced.FindComponentsByType);
 
             // 5. UI 組件控制
@@ -82,7 +94,24 @@ namespace GH_MCP.Commands
             RegisterCommand("get_component_output_data", ComponentCommandHandler_Enhanced.GetComponentOutputData);
             RegisterCommand("get_all_connections", ComponentCommandHandler_Enhanced.GetAllConnections);
 
-            RhinoApp.WriteLine("GH_MCP Enhanced: Registered 10 enhanced component commands.");
+            // 7. 求解控制
+            RegisterCommand("begin_edit_session", ComponentCommandHandler_Enhanced.BeginEditSession);
+            RegisterCommand("commit_edit_session", ComponentCommandHandler_Enhanced.CommitEditSession);
+
+            // 8. 文檔狀態
+            RegisterCommand("get_document_revision", ComponentCommandHandler_Enhanced.GetDocumentRevision);
+            RegisterCommand("get_changes_since", ComponentCommandHandler_Enhanced.GetChangesSince);
+            RegisterCommand("export_document_graph", ComponentCommandHandler_Enhanced.ExportDocumentGraph);
+
+            RhinoApp.WriteLine("GH_MCP Enhanced: Registered 18 enhanced component commands.");
+        }
+
+        /// <summary>
+        /// 註冊批次命令
+        /// </summary>
+        private static void RegisterBatchCommands()
+        {
+            RegisterCommand("batch", ExecuteBatch);
         }
 
         /// <summary>
@@ -122,8 +151,19 @@ namespace GH_MCP.Commands
 
         /// <summary>
         /// 執行命令
+        /// 請求帶有 id 時，回應會帶回相同的 id，讓客戶端可以在同一條連接上管線化多個命令
         /// </summary>
         public static Response ExecuteCommand(Command command)
+        {
+            var response = ExecuteCommandCore(command);
+
+            if (command != null && !string.IsNullOrEmpty(command.Id))
+                response.Id = command.Id;
+
+            return response;
+        }
+
+        private static Response ExecuteCommandCore(Command command, bool inBatch = false)
         {
             if (command == null)
                 return Response.CreateError("Command is null");
@@ -131,7 +171,9 @@ namespace GH_MCP.Commands
             if (string.IsNullOrEmpty(command.Type))
                 return Response.CreateError("Command type is null or empty");
 
-            if (CommandHandlers.TryGetValue(command.Type, out var handler))
+            Func<Command, object> handler;
+            if ((inBatch && BatchHandlers.TryGetValue(command.Type, out handler)) ||
+                CommandHandlers.TryGetValue(command.Type, out handler))
             {
                 try
                 {
@@ -148,6 +190,183 @@ namespace GH_MCP.Commands
             return Response.CreateError($"No handler registered for command type '{command.Type}'");
         }
 
+        // 批次命令的等待期限（整批在一次 UI 執行緒呼叫中執行）
+        private static readonly TimeSpan BatchTimeout = TimeSpan.FromMinutes(5);
+
+        // 步驟結果引用，例如 "$0.id"、"$2.componentId"、"$1.position.x"
+        private static readonly Regex StepReference = new Regex(@"^\$(\d+)(?:\.([A-Za-z_][\w\.\[\]]*))?$", RegexOptions.Compiled);
+
+        /// <summary>
+        /// 批次執行多個已註冊命令
+        /// 命令: batch
+        /// 參數:
+        ///   commands: [{ "type": "...", "parameters": {...} }, ...]（依序執行）
+        ///   stopOnError: 任一步驟失敗時是否停止（預設 true）
+        /// 所有步驟在同一次 UI 執行緒呼叫中執行，期間暫停求解，結束時只計算一次
+        /// （connect_components 步驟改用 ConnectComponentsDeferred，不會各自求解）。
+        /// 參數值可以引用前面步驟的結果，例如 "$0.id" 代表第 0 步返回的組件 ID。
+        /// </summary>
+        private static object ExecuteBatch(Command command)
+        {
+            var steps = ToList(command.GetParameter<object>("commands"));
+            if (steps == null)
+                throw new ArgumentException("commands must be a list");
+
+            bool stopOnError = command.GetParameterOrDefault<bool>("stopOnError", true);
+
+            // 已在 UI 執行緒上時直接執行，因此各命令處理器在批次中不會再次排隊等待
+            var results = UiThreadDispatcher.Invoke("ExecuteBatch", () =>
+            {
+                var doc = Grasshopper.Instances.ActiveCanvas?.Document;
+                var stepResults = new List<Dictionary<string, object>>();
+                var stepData = new List<object>();
+
+                ComponentCommandHandler_Enhanced.BeginDeferSolution();
+                try
+                {
+                    for (int i = 0; i < steps.Count; i++)
+                    {
+                        var stepResult = ExecuteBatchStep(i, ToDictionary(steps[i]), stepData);
+                        stepResults.Add(stepResult);
+
+                        if (!(bool)stepResult["success"] && stopOnError)
+                            break;
+                    }
+                }
+                finally
+                {
+                    ComponentCommandHandler_Enhanced.EndDeferSolution(doc);
+                }
+
+                return stepResults;
+            }, BatchTimeout);
+
+            return new Dictionary<string, object>
+            {
+                ["completed"] = results.Count(r => (bool)r["success"]),
+                ["total"] = steps.Count,
+                ["results"] = results
+            };
+        }
+
+        private static Dictionary<string, object> ExecuteBatchStep(int index, Dictionary<string, object> step, List<object> stepData)
+        {
+            string type = step != null && step.TryGetValue("type", out var typeObj) ? typeObj as string : null;
+            Response response;
+
+            if (string.IsNullOrEmpty(type))
+            {
+                response = Response.CreateError("Batch step is missing 'type'");
+            }
+            else if (type == "batch")
+            {
+                response = Response.CreateError("Nested batch commands are not supported");
+            }
+            else
+            {
+                try
+                {
+                    object parametersObj = null;
+                    step.TryGetValue("parameters", out parametersObj);
+                    var parameters = ToDictionary(ResolveStepReferences(Normalize(parametersObj), stepData))
+                        ?? new Dictionary<string, object>();
+
+                    response = ExecuteCommandCore(new Command(type, parameters), inBatch: true);
+                }
+                catch (Exception ex)
+                {
+                    response = Response.CreateError($"Error executing command '{type}': {ex.Message}");
+                }
+            }
+
+            stepData.Add(response.Success ? response.Data : null);
+
+            return new Dictionary<string, object>
+            {
+                ["index"] = index,
+                ["type"] = type,
+                ["success"] = response.Success,
+                ["data"] = response.Data,
+                ["error"] = response.Error
+            };
+        }
+
+        /// <summary>
+        /// 將參數中的 "$N.path" 字串替換為第 N 步結果中對應的值
+        /// </summary>
+        private static object ResolveStepReferences(object value, List<object> stepData)
+        {
+            if (value is string text)
+            {
+                var match = StepReference.Match(text);
+                if (!match.Success)
+                    return value;
+
+                int stepIndex = int.Parse(match.Groups[1].Value);
+                if (stepIndex >= stepData.Count)
+                    throw new ArgumentException($"Reference '{text}' points to a step that has not run yet");
+                if (stepData[stepIndex] == null)
+                    throw new ArgumentException($"Reference '{text}' points to a failed step");
+
+                var token = JToken.FromObject(stepData[stepIndex]);
+                if (match.Groups[2].Success)
+                {
+                    string path = match.Groups[2].Value;
+                    var selected = token.SelectToken(path);
+
+                    // "$N.id" 也可以取得 componentId
+                    if (selected == null && path == "id")
+                        selected = token.SelectToken("componentId");
+
+                    if (selected == null)
+                        throw new ArgumentException($"Reference '{text}' not found in result of step {stepIndex}");
+                    token = selected;
+                }
+
+                return Normalize(token);
+            }
+
+            if (value is Dictionary<string, object> dict)
+                return dict.ToDictionary(kvp => kvp.Key, kvp => ResolveStepReferences(kvp.Value, stepData));
+
+            if (value is List<object> list)
+                return list.Select(item => ResolveStepReferences(item, stepData)).ToList();
+
+            return value;
+        }
+
+        /// <summary>
+        /// 將 JSON 反序列化的值（JObject/JArray/JValue）轉為 Dictionary/List/基本型別
+        /// </summary>
+        internal static object Normalize(object value)
+        {
+            switch (value)
+            {
+                case JObject obj:
+                    return obj.Properties().ToDictionary(p => p.Name, p => Normalize(p.Value));
+                case JArray array:
+                    return array.Select(item => Normalize(item)).ToList();
+                case JValue jValue:
+                    return jValue.Value;
+                case Dictionary<string, object> dict:
+                    return dict.ToDictionary(kvp => kvp.Key, kvp => Normalize(kvp.Value));
+                case IEnumerable<object> items when !(value is string):
+                    return items.Select(Normalize).ToList();
+                default:
+                    return value;
+            }
+        }
+
+        internal static Dictionary<string, object> ToDictionary(object value)
+        {
+            return Normalize(value) as Dictionary<string, object>;
+        }
+
+        internal static List<object> ToList(object value)
+        {
+            return Normalize(value) as List<object>;
+        }
+
         /// <summary>
         /// 獲取所有已註冊的命令類型
         /// </summary>
@@ -0,0 +1,98 @@
+using System;
+using System.Threading;
+using System.Threading.Tasks;
+using Rhino;
+
+namespace GrasshopperMCP.Commands
+{
+    /// <summary>
+    /// UI 執行緒調度器 - 把工作排到 Rhino UI 執行緒執行並等待完成
+    /// 以 TaskCompletionSource 在完成時立即喚醒呼叫端，取代 while + Thread.Sleep(10) 的輪詢
+    /// 已在 UI 執行緒上（例如批次命令中的各步驟）時直接執行
+    /// </summary>
+    public static class UiThreadDispatcher
+    {
+        /// <summary>
+        /// 預設等待期限；逾時後尚未開始的工作不會再執行
+        /// </summary>
+        public static TimeSpan DefaultTimeout { get; set; } = TimeSpan.FromSeconds(30);
+
+        /// <summary>
+        /// 在 UI 執行緒上執行並返回結果；工作中的例外原樣拋回呼叫端
+        /// </summary>
+        /// <param name="name">用於錯誤訊息的名稱（通常是處理器名稱）</param>
+        /// <param name="work">要在 UI 執行緒上執行的工作</param>
+        /// <param name="timeout">等待期限，null 使用 DefaultTimeout，Timeout.InfiniteTimeSpan 表示不限</param>
+        /// <param name="cancellationToken">取消等待；尚未開始的工作不會再執行</param>
+        public static T Invoke<T>(string name, Func<T> work, TimeSpan? timeout = null, CancellationToken cancellationToken = default(CancellationToken))
+        {
+            if (!RhinoApp.InvokeRequired)
+                return Run(name, work);
+
+            var completion = new TaskCompletionSource<T>(TaskCreationOptions.RunContinuationsAsynchronously);
+
+            RhinoApp.InvokeOnUiThread(new Action(() =>
+            {
+                // 呼叫端已逾時或取消
+                if (completion.Task.IsCompleted)
+                    return;
+
+                try
+                {
+                    completion.TrySetResult(Run(name, work));
+                }
+                catch (Exception ex)
+                {
+                    completion.TrySetException(ex);
+                }
+            }));
+
+            var limit = timeout ?? DefaultTimeout;
+            bool completed;
+            try
+            {
+                completed = completion.Task.Wait((int)limit.TotalMilliseconds, cancellationToken);
+            }
+            catch (AggregateException)
+            {
+                // 工作拋出例外，下面以 GetResult 拋出原始例外
+                completed = true;
+            }
+            catch (OperationCanceledException)
+            {
+                completion.TrySetCanceled();
+                throw;
+            }
+
+            if (!completed && completion.TrySetCanceled())
+                throw new TimeoutException($"{name} did not complete on the UI thread within {limit.TotalSeconds:0.#}s");
+
+            return completion.Task.GetAwaiter().GetResult();
+        }
+
+        /// <summary>
+        /// 在 UI 執行緒上執行（無返回值）
+        /// </summary>
+        public static void Invoke(string name, Action work, TimeSpan? timeout = null, CancellationToken cancellationToken = default(CancellationToken))
+        {
+            Invoke<object>(name, () =>
+            {
+                work();
+                return null;
+            }, timeout, cancellationToken);
+        }
+
+        private static T Run<T>(string name, Func<T> work)
+        {
+            try
+            {
+                return work();
+            }
+            catch (Exception ex)
+            {
+                RhinoApp.WriteLine($"Error in {name}: {ex.Message}");
+                throw;
+            }
+        }
+    }
+}
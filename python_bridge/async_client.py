@@ -0,0 +1,657 @@
+"""
+Grasshopper 非同步客戶端
+
+以 asyncio.open_connection 與插件通訊，讓 MCP 工具在等待 Grasshopper 運算時不會阻塞事件迴圈，
+多個請求可以同時進行（每個進行中的請求使用連接池中的一條連接）。
+
+- 每次呼叫可設定期限 (timeout)，逾時或被取消的請求其連接會被丟棄，避免讀到過期回應
+- 連接池：上限、閒置逾時、健康檢查、透明重連（connection_pool.ConnectionPool 是它的同步包裝）
+- pipeline() 在同一條連接上連續送出多個命令，再依請求 ID（或順序）對應回應
+- codec="msgpack" 時每條新連接先與插件協商 MessagePack 分框，插件不支援時保持 JSON（見 wire_codec.py）
+- compression 不是 "off" 時同一個握手也協商壓縮：大型回應以區塊邊讀邊解壓縮
+- 指定 metrics 時記錄每個命令各階段的延遲與資料量（見 metrics.py）
+- run_sync() 讓同步程式碼在背景事件迴圈上執行協程（沿用呼叫端的 contextvars，例如 HostPool 的工作階段）
+"""
+
+import asyncio
+import concurrent.futures
+import contextvars
+import itertools
+import logging
+import threading
+import time
+import weakref
+from collections import deque
+from typing import Any, Awaitable, Dict, List, Optional, Sequence, TypeVar
+
+from gh_protocol import (
+    JSON_CODEC,
+    MAX_LINE_BYTES,
+    RECONNECTABLE_ERRORS,
+    RECV_CHUNK_SIZE,
+    ConnectionClosedError,
+    format_endpoint,
+    unix_socket_path,
+)
+from bridge_logging import get_logger
+from metrics import PIPELINE, Metrics, RequestTrace
+from wire_codec import (
+    COMPRESSED_FRAME_HEADER,
+    DEFAULT_COMPRESS_THRESHOLD,
+    FLAG_COMPRESSED,
+    FRAME_HEADER,
+    LINE_FRAMING,
+    Codec,
+    Compression,
+    compression_offer,
+    encode_compressed_frame,
+    get_codec,
+    negotiated_compression,
+    negotiated_format,
+    negotiation_command,
+    wire_codec,
+)
+
+T = TypeVar("T")
+
+_log = get_logger("client")
+
+
+class _TimedStreamReader(asyncio.StreamReader):
+    """記錄每個回應的第一段資料到達的時間（區分 Grasshopper 處理時間與回應傳輸時間）"""
+
+    first_data_at: Optional[float] = None
+
+    def feed_data(self, data: bytes):
+        if self.first_data_at is None:
+            self.first_data_at = time.perf_counter()
+        super().feed_data(data)
+
+
+class AsyncGrasshopperConnection:
+    """單一條非同步連接（預設一行一個 JSON，協商後可以改用其他編碼）"""
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+        self.last_used = time.monotonic()
+        self.requests_sent = 0
+        self.codec: Codec = JSON_CODEC
+        self.compression: Optional[Compression] = None
+        self.compress_threshold = DEFAULT_COMPRESS_THRESHOLD
+        # 最近一個回應在線上的位元組數（壓縮時為壓縮後的大小）
+        self.last_message_bytes = 0
+
+    @classmethod
+    async def open(cls, host: str, port: int) -> "AsyncGrasshopperConnection":
+        """
+        建立連接（與 asyncio.open_connection 相同，但使用記錄資料到達時間的 reader）
+
+        host 為 "unix:<路徑>" 時使用 Unix domain socket。
+        """
+        loop = asyncio.get_running_loop()
+        reader = _TimedStreamReader(limit=MAX_LINE_BYTES)
+        protocol = asyncio.StreamReaderProtocol(reader)
+        path = unix_socket_path(host)
+        if path is None:
+            transport, _ = await loop.create_connection(lambda: protocol, host, port)
+        else:
+            try:
+                transport, _ = await loop.create_unix_connection(lambda: protocol, path)
+            except NotImplementedError:
+                raise OSError("Unix domain sockets are not supported by this event loop") from None
+        return cls(reader, asyncio.StreamWriter(transport, protocol, reader, loop))
+
+    @property
+    def closed(self) -> bool:
+        return self.writer.is_closing()
+
+    def close(self):
+        """關閉連接（不等待）"""
+        if not self.writer.is_closing():
+            self.writer.close()
+
+    def is_healthy(self) -> bool:
+        """閒置中的連接：對方未關閉、本端未關閉"""
+        return not self.writer.is_closing() and not self.reader.at_eof()
+
+    async def send_line(self, data: bytes):
+        """發送一行已編碼的命令"""
+        self.writer.write(data)
+        self.requests_sent += 1
+        await self.writer.drain()
+
+    async def read_line(self) -> bytes:
+        """讀取一行回應（不含換行符）"""
+        try:
+            line = await self.reader.readuntil(b"\n")
+            line = line[:-1]
+        except asyncio.IncompleteReadError as e:
+            # 對方關閉連接：原協定允許最後一行沒有換行符
+            self.close()
+            if not e.partial.strip():
+                raise ConnectionClosedError("Connection closed by Grasshopper before a response was received")
+            line = e.partial
+        self.last_used = time.monotonic()
+        return line
+
+    async def read_frame(self) -> bytes:
+        """讀取一個長度前綴分框的回應（不含標頭）"""
+        try:
+            header = await self.reader.readexactly(FRAME_HEADER.size)
+            (size,) = FRAME_HEADER.unpack(header)
+            if size > MAX_LINE_BYTES:
+                self.close()
+                raise ConnectionClosedError(f"Response frame of {size} bytes exceeds the {MAX_LINE_BYTES} byte limit")
+            payload = await self.reader.readexactly(size)
+        except asyncio.IncompleteReadError:
+            self.close()
+            raise ConnectionClosedError("Connection closed by Grasshopper before a response was received")
+        self.last_used = time.monotonic()
+        return payload
+
+    async def read_compressed_frame(self) -> bytearray:
+        """
+        讀取壓縮連接的一個分框（不含標頭）
+
+        壓縮的內容以區塊讀取並立即解壓縮，讀過的區塊隨即丟棄，
+        不會同時在記憶體中保留完整的壓縮內容與解壓縮結果。
+        """
+        try:
+            header = await self.reader.readexactly(COMPRESSED_FRAME_HEADER.size)
+            flags, size = COMPRESSED_FRAME_HEADER.unpack(header)
+            if size > MAX_LINE_BYTES:
+                self.close()
+                raise ConnectionClosedError(f"Response frame of {size} bytes exceeds the {MAX_LINE_BYTES} byte limit")
+            if not flags & FLAG_COMPRESSED:
+                payload = bytearray(await self.reader.readexactly(size))
+            else:
+                payload = bytearray()
+                decompressor = self.compression.decompressor()
+                remaining = size
+                while remaining:
+                    chunk = await self.reader.readexactly(min(remaining, RECV_CHUNK_SIZE))
+                    remaining -= len(chunk)
+                    payload += decompressor.decompress(chunk)
+                    if len(payload) > MAX_LINE_BYTES:
+                        self.close()
+                        raise ConnectionClosedError(f"Decompressed response exceeds the {MAX_LINE_BYTES} byte limit")
+                payload += decompressor.flush()
+        except asyncio.IncompleteReadError:
+            self.close()
+            raise ConnectionClosedError("Connection closed by Grasshopper before a response was received")
+        self.last_used = time.monotonic()
+        self.last_message_bytes = COMPRESSED_FRAME_HEADER.size + size
+        return payload
+
+    async def read_message(self) -> bytes:
+        """依目前的編碼（與壓縮）讀取一個回應，返回解壓縮後的內容"""
+        if self.compression is not None:
+            return await self.read_compressed_frame()
+        if self.codec.framing == LINE_FRAMING:
+            payload = await self.read_line()
+        else:
+            payload = await self.read_frame()
+        self.last_message_bytes = len(payload)
+        return payload
+
+    def encode_message(self, command: Dict[str, Any]) -> bytes:
+        """依目前的編碼（與壓縮）編碼並分框一個命令"""
+        if self.compression is None:
+            return self.codec.encode_message(command)
+        return encode_compressed_frame(self.codec.encode(command), self.compression, self.compress_threshold)
+
+    async def negotiate(
+        self,
+        formats: List[str],
+        compression: Sequence[str] = (),
+        threshold: int = DEFAULT_COMPRESS_THRESHOLD,
+    ) -> Optional[str]:
+        """
+        與插件協商線路編碼與壓縮（以 JSON 行送出握手命令）
+
+        Returns:
+            插件選擇的格式；插件不支援握手時返回 None，連接繼續使用 JSON 且不壓縮
+        """
+        # 握手不計入 requests_sent：協商後的連接仍視為新連接
+        self.writer.write(JSON_CODEC.encode_message(negotiation_command(formats, compression, threshold)))
+        await self.writer.drain()
+        response = JSON_CODEC.decode(await self.read_line())
+        name = negotiated_format(response, formats)
+        codec = wire_codec(name) if name is not None else None
+        if codec is None:
+            return None
+        self.codec = codec
+        agreed = negotiated_compression(response, compression)
+        if agreed is not None:
+            self.compression, self.compress_threshold = agreed
+        return name
+
+    async def request(self, command: Dict[str, Any], trace: Optional[RequestTrace] = None) -> Dict[str, Any]:
+        """發送命令並等待回應"""
+        data = self.encode_message(command)
+        self.reader.first_data_at = None
+        await self.send_line(data)
+        if trace is not None:
+            trace.mark("send")
+            trace.request_bytes = len(data)
+
+        payload = await self.read_message()
+        if _log.isEnabledFor(logging.DEBUG):
+            _log.debug("%s: sent %d bytes, received %d bytes (%d decoded)", command.get("type"), len(data),
+                       self.last_message_bytes, len(payload))
+        if trace is None:
+            return self.codec.decode(payload)
+
+        trace.mark("processing", self.reader.first_data_at)
+        trace.mark("receive")
+        trace.response_bytes = self.last_message_bytes
+        response = self.codec.decode(payload)
+        trace.mark("decode")
+        return response
+
+
+class _LoopState:
+    """每個事件迴圈各自的連接池狀態（asyncio 物件不能跨迴圈使用）"""
+
+    def __init__(self, max_size: int):
+        self.idle: List[AsyncGrasshopperConnection] = []
+        self.slots = asyncio.Semaphore(max_size)
+
+
+class AsyncGrasshopperClient:
+    """
+    非同步 Grasshopper 客戶端
+
+    Args:
+        host: 插件位址
+        port: 插件埠
+        max_size: 同時進行的請求（連接）上限
+        idle_timeout: 閒置連接保留秒數
+        timeout: 預設每次呼叫期限（秒），包含等待連接、傳送與接收
+        metrics: 記錄每個命令的延遲與資料量（None 不記錄）
+        codec: "auto" / "json" / "orjson" 一行一個 JSON（auto 在安裝 orjson 時使用 orjson）；
+            "msgpack" 在每條新連接上與插件協商 MessagePack，插件不支援時使用 JSON
+        compression: "off" / "auto" / "zlib" / "zstd"：在每條新連接上與插件協商壓縮（auto 提供本端支援的全部）
+        compress_threshold: 達到此大小（位元組）的訊息才壓縮
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        max_size: int = 4,
+        idle_timeout: float = 30.0,
+        timeout: float = 10.0,
+        metrics: Optional[Metrics] = None,
+        codec: str = "auto",
+        compression: str = "off",
+        compress_threshold: int = DEFAULT_COMPRESS_THRESHOLD,
+    ):
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1")
+        preferred = get_codec(codec)
+        offered_compression = compression_offer(compression)
+
+        self.host = host
+        self.port = port
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.timeout = timeout
+        self.metrics = metrics
+
+        self._states: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _LoopState]" = weakref.WeakKeyDictionary()
+
+        # 統計
+        self.connections_created = 0
+        self.connections_reused = 0
+        self.connections_discarded = 0
+        self.reconnects = 0
+        self.timeouts = 0
+        self.in_flight = 0
+
+        # 插件是否支援管線化（None: 尚未得知；False: 插件回應一次後即關閉連接）
+        self.pipelining_supported: Optional[bool] = None
+        self._request_ids = itertools.count(1)
+
+        # 連接建立時使用的 JSON 實作，以及需要協商的格式與壓縮（都不需要時不協商）
+        self.codec = preferred if preferred.framing == LINE_FRAMING else JSON_CODEC
+        self._formats = [preferred.name, "json"] if preferred.framing != LINE_FRAMING else ["json"]
+        self._compression = offered_compression
+        self.compress_threshold = compress_threshold
+        self._negotiate = preferred.framing != LINE_FRAMING or bool(offered_compression)
+        # 插件是否支援握手（None: 尚未得知；False: 之後的連接不再協商）
+        self.negotiation_supported: Optional[bool] = None
+        self.codecs_negotiated: Dict[str, int] = {}
+        self.compression_negotiated: Dict[str, int] = {}
+
+    def _state(self) -> _LoopState:
+        loop = asyncio.get_running_loop()
+        state = self._states.get(loop)
+        if state is None:
+            state = self._states[loop] = _LoopState(self.max_size)
+        return state
+
+    async def _new_connection(self) -> AsyncGrasshopperConnection:
+        conn = await self._open()
+        if not self._negotiate or self.negotiation_supported is False:
+            return conn
+
+        try:
+            name = await conn.negotiate(self._formats, self._compression, self.compress_threshold)
+        except BaseException:
+            conn.close()
+            raise
+        if name is None:
+            # 舊版插件：記住結果；回應了錯誤的連接可能已被插件關閉，改用一條新的 JSON 連接
+            self.negotiation_supported = False
+            _log.info("%s does not support codec negotiation, using uncompressed JSON",
+                      format_endpoint(self.host, self.port))
+            conn.close()
+            return await self._open()
+
+        self.negotiation_supported = True
+        self.codecs_negotiated[name] = self.codecs_negotiated.get(name, 0) + 1
+        if conn.compression is not None:
+            key = conn.compression.name
+            self.compression_negotiated[key] = self.compression_negotiated.get(key, 0) + 1
+        return conn
+
+    async def _open(self) -> AsyncGrasshopperConnection:
+        conn = await AsyncGrasshopperConnection.open(self.host, self.port)
+        conn.codec = self.codec
+        self.connections_created += 1
+        return conn
+
+    def _take_idle(self, state: _LoopState) -> Optional[AsyncGrasshopperConnection]:
+        """取出一條可重用的閒置連接，順便丟棄過期或已斷開的連接"""
+        now = time.monotonic()
+        while state.idle:
+            conn = state.idle.pop()
+            if now - conn.last_used <= self.idle_timeout and conn.is_healthy():
+                self.connections_reused += 1
+                return conn
+            conn.close()
+            self.connections_discarded += 1
+        return None
+
+    async def _connect(self, trace: Optional[RequestTrace]) -> AsyncGrasshopperConnection:
+        conn = await self._new_connection()
+        if trace is not None:
+            trace.mark("connect")
+        return conn
+
+    async def _request(self, command: Dict[str, Any], trace: Optional[RequestTrace] = None) -> Dict[str, Any]:
+        state = self._state()
+        async with state.slots:
+            if trace is not None:
+                trace.mark("queue")
+            conn = self._take_idle(state) or await self._connect(trace)
+            reused = conn.requests_sent > 0
+            try:
+                try:
+                    response = await conn.request(command, trace)
+                except RECONNECTABLE_ERRORS:
+                    conn.close()
+                    if not reused:
+                        raise
+                    self.reconnects += 1
+                    conn = await self._connect(trace)
+                    response = await conn.request(command, trace)
+            except BaseException:
+                # 包含逾時與取消：連接上可能還有未讀的回應，不能再重用
+                conn.close()
+                raise
+
+            if not conn.closed:
+                state.idle.append(conn)
+            return response
+
+    async def request(self, command: Dict[str, Any], timeout: Optional[float] = None) -> Dict[str, Any]:
+        """
+        發送命令並等待回應
+
+        Args:
+            command: 命令物件（見 gh_protocol.build_command）
+            timeout: 本次呼叫期限（秒），None 使用客戶端預設值
+
+        Raises:
+            asyncio.TimeoutError: 超過期限
+        """
+        deadline = self.timeout if timeout is None else timeout
+        trace = self.metrics.trace(command.get("type")) if self.metrics is not None else None
+        self.in_flight += 1
+        try:
+            response = await asyncio.wait_for(self._request(command, trace), deadline)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            if trace is not None:
+                self.metrics.record_failure(trace, "timeout")
+            raise
+        except BaseException as e:
+            if trace is not None:
+                self.metrics.record_failure(trace, type(e).__name__)
+            raise
+        finally:
+            self.in_flight -= 1
+
+        if trace is not None:
+            self.metrics.record(trace, bool(response.get("success")))
+        return response
+
+    async def pipeline(
+        self,
+        commands: List[Dict[str, Any]],
+        timeout: Optional[float] = None,
+        ordered: bool = True,
+    ) -> List[Dict[str, Any]]:
+        """
+        管線化發送多個命令：一次寫出所有命令，再依序讀取回應
+
+        回應帶有請求 ID 時依 ID 對應；插件沒有帶回 ID 時依順序對應（插件逐行依序處理）。
+        若插件回應一次後就關閉連接（不支援管線化），剩餘命令改用一般方式逐一發送。
+
+        Args:
+            commands: 命令物件列表，未指定 "id" 的命令會自動分配
+            timeout: 整批命令的期限（秒），None 使用客戶端預設值
+            ordered: 退回逐一發送時是否保持命令順序（False 則並行發送）
+
+        Returns:
+            與 commands 順序相同的回應列表
+        """
+        deadline = self.timeout if timeout is None else timeout
+        trace = self.metrics.trace(PIPELINE) if self.metrics is not None else None
+        self.in_flight += 1
+        try:
+            responses = await asyncio.wait_for(self._pipeline(commands, ordered), deadline)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            if trace is not None:
+                self.metrics.record_failure(trace, "timeout")
+            raise
+        except BaseException as e:
+            if trace is not None:
+                self.metrics.record_failure(trace, type(e).__name__)
+            raise
+        finally:
+            self.in_flight -= 1
+
+        if trace is not None:
+            self.metrics.record(trace, all(r.get("success") for r in responses))
+        return responses
+
+    async def _pipeline(self, commands: List[Dict[str, Any]], ordered: bool) -> List[Dict[str, Any]]:
+        commands = [
+            command if "id" in command else dict(command, id=str(next(self._request_ids)))
+            for command in commands
+        ]
+        results: List[Optional[Dict[str, Any]]] = [None] * len(commands)
+
+        if commands and self.pipelining_supported is not False:
+            state = self._state()
+            async with state.slots:
+                conn = self._take_idle(state) or await self._new_connection()
+                try:
+                    await self._pipeline_on(conn, commands, results)
+                except RECONNECTABLE_ERRORS:
+                    conn.close()
+                except BaseException:
+                    conn.close()
+                    raise
+                else:
+                    if not conn.closed:
+                        state.idle.append(conn)
+
+        # 退回原協定：未收到回應的命令逐一發送
+        remaining = [i for i, result in enumerate(results) if result is None]
+        if ordered:
+            for i in remaining:
+                results[i] = await self._fallback_request(commands[i])
+        elif remaining:
+            responses = await asyncio.gather(*[self._fallback_request(commands[i]) for i in remaining])
+            for i, response in zip(remaining, responses):
+                results[i] = response
+
+        return results
+
+    async def _fallback_request(self, command: Dict[str, Any]) -> Dict[str, Any]:
+        """管線化退回逐一發送時的單一命令（照常記錄統計）"""
+        trace = self.metrics.trace(command.get("type")) if self.metrics is not None else None
+        try:
+            response = await self._request(command, trace)
+        except BaseException as e:
+            if trace is not None:
+                self.metrics.record_failure(trace, type(e).__name__)
+            raise
+        if trace is not None:
+            self.metrics.record(trace, bool(response.get("success")))
+        return response
+
+    async def _pipeline_on(
+        self,
+        conn: AsyncGrasshopperConnection,
+        commands: List[Dict[str, Any]],
+        results: List[Optional[Dict[str, Any]]],
+    ):
+        """在單一連接上寫出所有命令並收集回應"""
+        index_by_id = {command["id"]: i for i, command in enumerate(commands)}
+        unanswered = deque(range(len(commands)))
+
+        encoded = [conn.encode_message(command) for command in commands]
+        conn.writer.write(b"".join(encoded))
+        conn.requests_sent += len(commands)
+        await conn.writer.drain()
+
+        received = 0
+        while unanswered:
+            try:
+                payload = await conn.read_message()
+            except ConnectionClosedError:
+                if received:
+                    # 插件回應後即關閉連接：記住結果，之後直接走一般路徑
+                    self.pipelining_supported = False
+                raise
+
+            response = conn.codec.decode(payload)
+            received += 1
+
+            index = index_by_id.get(response.get("id"))
+            if index is None or results[index] is not None:
+                # 插件沒有帶回 ID：依順序對應到最早尚未回應的命令
+                while results[unanswered[0]] is not None:
+                    unanswered.popleft()
+                index = unanswered[0]
+            results[index] = response
+            if self.metrics is not None:
+                self.metrics.record_pipelined(commands[index].get("type"), len(encoded[index]), conn.last_message_bytes,
+                                              bool(response.get("success")))
+
+            while unanswered and results[unanswered[0]] is not None:
+                unanswered.popleft()
+
+            if conn.closed and unanswered:
+                self.pipelining_supported = False
+                raise ConnectionClosedError("Grasshopper closed the connection during a pipelined batch")
+
+        self.pipelining_supported = True
+
+    async def check_connection(self, timeout: float = 2.0) -> bool:
+        """測試能否連接到插件（不送出命令）"""
+        try:
+            conn = await asyncio.wait_for(AsyncGrasshopperConnection.open(self.host, self.port), timeout)
+        except (OSError, asyncio.TimeoutError):
+            return False
+        conn.close()
+        return True
+
+    async def aclose(self):
+        """關閉目前事件迴圈上的所有閒置連接"""
+        state = self._state()
+        idle, state.idle = state.idle, []
+        for conn in idle:
+            conn.close()
+        for conn in idle:
+            try:
+                await conn.writer.wait_closed()
+            except OSError:
+                pass
+
+    def stats(self) -> Dict[str, Any]:
+        """客戶端統計資訊"""
+        return {
+            "host": self.host,
+            "port": self.port,
+            "max_size": self.max_size,
+            "in_flight": self.in_flight,
+            "idle": sum(len(state.idle) for state in list(self._states.values())),
+            "created": self.connections_created,
+            "reused": self.connections_reused,
+            "discarded": self.connections_discarded,
+            "reconnects": self.reconnects,
+            "timeouts": self.timeouts,
+            "codecs": dict(self.codecs_negotiated),
+            "compression": dict(self.compression_negotiated),
+        }
+
+
+# ============================================================================
+# 同步包裝：在背景事件迴圈上執行協程
+# ============================================================================
+_background_loop: Optional[asyncio.AbstractEventLoop] = None
+_background_lock = threading.Lock()
+
+
+def _get_background_loop() -> asyncio.AbstractEventLoop:
+    global _background_loop
+    with _background_lock:
+        if _background_loop is None or _background_loop.is_closed():
+            loop = asyncio.new_event_loop()
+            thread = threading.Thread(target=loop.run_forever, name="grasshopper-client-loop", daemon=True)
+            thread.start()
+            _background_loop = loop
+        return _background_loop
+
+
+def run_sync(coro: Awaitable[T]) -> T:
+    """在背景事件迴圈上執行協程並阻塞等待結果（不可在該背景迴圈內呼叫）"""
+    result: "concurrent.futures.Future[T]" = concurrent.futures.Future()
+
+    def relay(task: "asyncio.Future[T]") -> None:
+        if task.cancelled():
+            result.cancel()
+        elif task.exception() is not None:
+            result.set_exception(task.exception())
+        else:
+            result.set_result(task.result())
+
+    def start() -> None:
+        # 在呼叫端的 context 中建立工作，工作因此繼承呼叫端的 contextvars
+        try:
+            task = asyncio.ensure_future(coro)
+        except BaseException as e:
+            result.set_exception(e)
+            return
+        task.add_done_callback(relay)
+
+    _get_background_loop().call_soon_threadsafe(start, context=contextvars.copy_context())
+    return result.result()
@@ -1,17 +1,57 @@
-import socket
-import json
+import asyncio
+import contextlib
 import os
 import sys
-import traceback
 from typing import Dict, Any, Optional, List, Union
 
 # 使用 MCP 服務器
 from mcp.server.fastmcp import FastMCP
 
+from gh_protocol import build_command, error_response, format_endpoint
+from async_client import run_sync
+from document_model import DocumentGraph, DocumentModel
+from bridge_logging import CommandLogger, configure_logging, get_logger
+from host_pool import HostPool, parse_endpoints
+from metrics import Metrics
+from output_data import (
+    DEFAULT_PAGE_SIZE,
+    OutputValues,
+    iter_output_items_sync,
+    output_params,
+    read_output_array_sync,
+    read_output_values_sync,
+)
+
 # 設置 Grasshopper MCP 連接參數
 GRASSHOPPER_HOST = "localhost"
 GRASSHOPPER_PORT = 8080  # 默認端口，可以根據需要修改
 
+# 多個 Grasshopper 實例（"host:port,host:port"），未設定時只使用上面的單一實例
+# 同一台機器上的插件可以改用 Unix domain socket："unix:/tmp/grasshopper.sock"
+GRASSHOPPER_HOSTS = parse_endpoints(
+    os.environ.get("GRASSHOPPER_HOSTS", f"{GRASSHOPPER_HOST}:{GRASSHOPPER_PORT}"),
+    default_port=GRASSHOPPER_PORT,
+)
+
+# 連接池設定（可透過 .mcp.json 的 env 覆寫）
+POOL_MAX_SIZE = int(os.environ.get("GRASSHOPPER_POOL_SIZE", "4"))
+POOL_IDLE_TIMEOUT = float(os.environ.get("GRASSHOPPER_POOL_IDLE_TIMEOUT", "30"))
+REQUEST_TIMEOUT = float(os.environ.get("GRASSHOPPER_TIMEOUT", "10"))
+
+# 線路編碼：auto（有 orjson 時使用 orjson）/ json / orjson / msgpack（與插件協商，不支援時使用 JSON）
+WIRE_CODEC = os.environ.get("GRASSHOPPER_CODEC", "auto")
+
+# 回應壓縮：off / auto / zlib / zstd（與插件協商，不支援時不壓縮）；達到門檻（位元組）的訊息才壓縮
+WIRE_COMPRESSION = os.environ.get("GRASSHOPPER_COMPRESSION", "off")
+COMPRESS_THRESHOLD = int(os.environ.get("GRASSHOPPER_COMPRESS_THRESHOLD", "65536"))
+
+# 命令延遲與資料量統計（grasshopper://metrics）
+METRICS_ENABLED = os.environ.get("GRASSHOPPER_METRICS", "1") != "0"
+
+# 文檔模型快取設定（快取只對應一份文檔：多個實例時預設停用）
+DOCUMENT_CACHE_ENABLED = os.environ.get("GRASSHOPPER_DOCUMENT_CACHE", "1" if len(GRASSHOPPER_HOSTS) == 1 else "0") != "0"
+DOCUMENT_CACHE_REVALIDATE = float(os.environ.get("GRASSHOPPER_CACHE_REVALIDATE", "0.5"))
+
 # 創建 MCP 服務器
 server = FastMCP("Grasshopper Bridge Enhanced")
 
@@ -103,61 +143,124 @@ COMPONENT_TYPES = {
 # ============================================================================
 # 核心通訊函數
 # ============================================================================
-def send_to_grasshopper(command_type: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
-    """向 Grasshopper MCP 發送命令"""
-    if params is None:
-        params = {}
+# 所有命令的延遲與資料量統計
+metrics = Metrics() if METRICS_ENABLED else None
+
+# 所有工具共用的客戶端：每個實例一個長連接池，依工作階段與負載分配命令
+grasshopper_client = HostPool(
+    GRASSHOPPER_HOSTS,
+    max_size=POOL_MAX_SIZE,
+    idle_timeout=POOL_IDLE_TIMEOUT,
+    timeout=REQUEST_TIMEOUT,
+    metrics=metrics,
+    codec=WIRE_CODEC,
+    compression=WIRE_COMPRESSION,
+    compress_threshold=COMPRESS_THRESHOLD,
+)
+
+# 命令日誌（分級、內容摘要、高頻命令抽樣；見 bridge_logging.py）
+logger = get_logger()
+command_log = CommandLogger.from_env()
+
+# 個別命令的期限（秒），未列出的使用 REQUEST_TIMEOUT
+COMMAND_TIMEOUTS = {
+    "load_document": 60.0,
+    "save_document": 60.0,
+    "get_component_output_data": 30.0,
+    "batch": 60.0,
+}
+
+def mcp_session_key() -> Optional[str]:
+    """
+    目前 MCP 請求的工作階段：每個 MCP 連接一個，連接結束時解除綁定
 
+    不在 MCP 請求中（腳本）時返回 None，由 host_session() 或預設工作階段決定。
+    """
+    try:
+        context = server.get_context()
+        client_id = context.client_id
+        connection = context.session
+    except (AttributeError, LookupError, ValueError):
+        return None
+    try:
+        return grasshopper_client.session_for(connection, f"mcp:{client_id}" if client_id else "mcp")
+    except TypeError:
+        return None  # 無法建立弱引用的連接物件：使用預設工作階段
+
+async def send_to_grasshopper_async(command_type: str, params: Optional[Dict[str, Any]] = None, timeout: Optional[float] = None) -> Dict[str, Any]:
+    """向 Grasshopper MCP 發送命令（非同步，不阻塞事件迴圈）"""
     # 創建命令
-    command = {
-        "type": command_type,
-        "parameters": params
-    }
+    command = build_command(command_type, params)
+    if timeout is None:
+        timeout = COMMAND_TIMEOUTS.get(command_type, REQUEST_TIMEOUT)
 
     try:
-        print(f"Sending command to Grasshopper: {command_type} with params: {params}", file=sys.stderr)
-
-        # 連接到 Grasshopper MCP
-        client = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        client.settimeout(10.0)  # 設置超時
-        client.connect((GRASSHOPPER_HOST, GRASSHOPPER_PORT))
-
-        # 發送命令
-        command_json = json.dumps(command)
-        client.sendall((command_json + "\n").encode("utf-8"))
-        print(f"Command sent: {command_json}", file=sys.stderr)
-
-        # 接收響應
-        response_data = b""
-        while True:
-            chunk = client.recv(4096)
-            if not chunk:
-                break
-            response_data += chunk
-            if response_data.endswith(b"\n"):
-                break
-
-        # 處理可能的 BOM
-        response_str = response_data.decode("utf-8-sig").strip()
-        print(f"Response received: {response_str}", file=sys.stderr)
-
-        # 解析 JSON 響應
-        response = json.loads(response_str)
-        client.close()
+        started = command_log.start()
+
+        document_model.note_command(command_type)
+        try:
+            response = await grasshopper_client.request(command, timeout=timeout, session=mcp_session_key())
+        finally:
+            document_model.note_command(command_type)
+        command_log.received(command_type, command["parameters"], response, started)
         return response
+    except asyncio.TimeoutError:
+        command_log.timed_out(command_type, timeout)
+        return error_response(f"Timed out after {timeout}s waiting for Grasshopper to handle '{command_type}'")
     except Exception as e:
-        print(f"Error communicating with Grasshopper: {str(e)}", file=sys.stderr)
-        traceback.print_exc(file=sys.stderr)
-        return {
-            "success": False,
-            "error": f"Error communicating with Grasshopper: {str(e)}"
-        }
+        command_log.failed(command_type, e)
+        return error_response(f"Error communicating with Grasshopper: {str(e)}")
+
+def send_to_grasshopper(command_type: str, params: Optional[Dict[str, Any]] = None, timeout: Optional[float] = None) -> Dict[str, Any]:
+    """向 Grasshopper MCP 發送命令（同步版本，供腳本使用）"""
+    return run_sync(send_to_grasshopper_async(command_type, params, timeout))
+
+# 唯讀查詢的文檔模型快取（依插件的文檔修訂號失效）
+document_model = DocumentModel(
+    send_to_grasshopper_async,
+    revalidate_interval=DOCUMENT_CACHE_REVALIDATE,
+    enabled=DOCUMENT_CACHE_ENABLED,
+)
+
+async def send_many_to_grasshopper_async(commands: List[Dict[str, Any]], timeout: Optional[float] = None) -> List[Dict[str, Any]]:
+    """
+    管線化發送多個命令（同一條連接上連續寫出，依請求 ID 對應回應）
+
+    Args:
+        commands: [{"type": ..., "parameters": {...}}, ...]，依序執行
+        timeout: 整批命令的期限（秒），預設為 REQUEST_TIMEOUT
+    """
+    commands = [build_command(c["type"], c.get("parameters")) for c in commands]
+    if timeout is None:
+        timeout = REQUEST_TIMEOUT
+
+    try:
+        started = command_log.start()
+        for command in commands:
+            document_model.note_command(command["type"])
+        try:
+            responses = await grasshopper_client.pipeline(commands, timeout=timeout, session=mcp_session_key())
+        finally:
+            for command in commands:
+                document_model.note_command(command["type"])
+        command_log.pipeline_received(responses, started)
+        return responses
+    except asyncio.TimeoutError:
+        command_log.timed_out("pipeline", timeout)
+        return [error_response(f"Timed out after {timeout}s waiting for a pipelined batch") for _ in commands]
+    except Exception as e:
+        command_log.failed("pipeline", e)
+        return [error_response(f"Error communicating with Grasshopper: {str(e)}") for _ in commands]
+
+def send_many_to_grasshopper(commands: List[Dict[str, Any]], timeout: Optional[float] = None) -> List[Dict[str, Any]]:
+    """管線化發送多個命令（同步版本，供腳本使用）"""
+    return run_sync(send_many_to_grasshopper_async(commands, timeout))
 
 # ============================================================================
 # 基礎功能（保留原有）
 # ============================================================================
 @server.tool("add_component")
-def add_component(component_type: str, x: float, y: float):
+async def add_component(component_type: str, x: float, y: float):
     """
     Add a component to the Grasshopper canvas (basic version)
 
@@ -175,15 +278,15 @@ def add_component(component_type: str, x: float, y: float):
         "y": y
     }
 
-    return send_to_grasshopper("add_component", params)
+    return await send_to_grasshopper_async("add_component", params)
 
 @server.tool("clear_document")
-def clear_document():
+async def clear_document():
     """Clear the Grasshopper document"""
-    return send_to_grasshopper("clear_document")
+    return await send_to_grasshopper_async("clear_document")
 
 @server.tool("save_document")
-def save_document(path: str):
+async def save_document(path: str):
     """
     Save the Grasshopper document
 
@@ -197,10 +300,10 @@ def save_document(path: str):
         "path": path
     }
 
-    return send_to_grasshopper("save_document", params)
+    return await send_to_grasshopper_async("save_document", params)
 
 @server.tool("load_document")
-def load_document(path: str):
+async def load_document(path: str):
     """
     Load a Grasshopper document
 
@@ -214,15 +317,15 @@ def load_document(path: str):
         "path": path
     }
 
-    return send_to_grasshopper("load_document", params)
+    return await send_to_grasshopper_async("load_document", params)
 
 @server.tool("get_document_info")
-def get_document_info():
+async def get_document_info():
     """Get information about the Grasshopper document"""
-    return send_to_grasshopper("get_document_info")
+    return await document_model.query("get_document_info")
 
 @server.tool("connect_components")
-def connect_components(source_id: str, target_id: str, source_param: str = None, target_param: str = None, source_param_index: int = None, target_param_index: int = None):
+async def connect_components(source_id: str, target_id: str, source_param: str = None, target_param: str = None, source_param_index: int = None, target_param_index: int = None):
     """
     Connect two components in the Grasshopper canvas
 
@@ -252,10 +355,10 @@ def connect_components(source_id: str, target_id: str, source_param: str = None,
     elif target_param_index is not None:
         params["targetParamIndex"] = target_param_index
 
-    return send_to_grasshopper("connect_components", params)
+    return await send_to_grasshopper_async("connect_components", params)
 
 @server.tool("create_pattern")
-def create_pattern(description: str):
+async def create_pattern(description: str):
     """
     Create a pattern of components based on a high-level description
 
@@ -269,10 +372,10 @@ def create_pattern(description: str):
         "description": description
     }
 
-    return send_to_grasshopper("create_pattern", params)
+    return await send_to_grasshopper_async("create_pattern", params)
 
 @server.tool("get_available_patterns")
-def get_available_patterns(query: str):
+async def get_available_patterns(query: str):
     """
     Get a list of available patterns that match a query
 
@@ -286,21 +389,22 @@ def get_available_patterns(query: str):
         "query": query
     }
 
-    return send_to_grasshopper("get_available_patterns", params)
+    return await send_to_grasshopper_async("get_available_patterns", params)
 
 # ============================================================================
 # 新增：增強功能 (Step 1)
 # ============================================================================
 
 @server.tool("add_component_advanced")
-def add_component_advanced(
+async def add_component_advanced(
     component_type: str,
     x: float,
     y: float,
     initial_params: Optional[Dict[str, Any]] = None,
     name: Optional[str] = None,
     width: Optional[int] = None,
-    height: Optional[int] = None
+    height: Optional[int] = None,
+    recompute: bool = True
 ):
     """
     Add a component with advanced options (ENHANCED VERSION)
@@ -313,6 +417,8 @@ def add_component_advanced(
         name: Custom name for the component (optional)
         width: Component width in pixels (optional)
         height: Component height in pixels (optional)
+        recompute: Recompute the solution after adding (default: True).
+            Pass False to defer solving until a later command or commit_edit_session
 
     Returns:
         Result including component ID
@@ -338,11 +444,13 @@ def add_component_advanced(
         params["width"] = width
     if height:
         params["height"] = height
+    if not recompute:
+        params["recompute"] = False
 
-    return send_to_grasshopper("add_component_advanced", params)
+    return await send_to_grasshopper_async("add_component_advanced", params)
 
 @server.tool("get_component_details")
-def get_component_details(component_id: str):
+async def get_component_details(component_id: str):
     """
     Get detailed information about a specific component (ENHANCED VERSION)
 
@@ -368,16 +476,34 @@ def get_component_details(component_id: str):
         "componentId": component_id
     }
 
-    return send_to_grasshopper("get_component_details", params)
+    return await document_model.query("get_component_details", params)
+
+@server.tool("get_components_details")
+async def get_components_details(component_ids: List[str]):
+    """
+    Get detailed information about several components in one request
+
+    Args:
+        component_ids: IDs of the components to inspect
+
+    Returns:
+        {count, failed, results: [{componentId, success, data | error}, ...]} in the
+        order of component_ids; data has the same format as get_component_details
+
+    Example:
+        get_components_details(["slider_123", "circle_456"])
+    """
+    return await document_model.query_details(list(component_ids))
 
 @server.tool("set_slider_value")
-def set_slider_value(component_id: str, value: float):
+async def set_slider_value(component_id: str, value: float, recompute: bool = True):
     """
     Set the value of a Number Slider component (ENHANCED VERSION)
 
     Args:
         component_id: The ID of the slider component
         value: The new value to set
+        recompute: Recompute the solution after the change (default: True)
 
     Returns:
         Result of the operation
@@ -389,20 +515,23 @@ def set_slider_value(component_id: str, value: float):
         "componentId": component_id,
         "value": value
     }
+    if not recompute:
+        params["recompute"] = False
 
-    return send_to_grasshopper("set_slider_value", params)
+    return await send_to_grasshopper_async("set_slider_value", params)
 
 # ============================================================================
 # 新增：實用工具功能
 # ============================================================================
 
 @server.tool("delete_component")
-def delete_component(component_id: str):
+async def delete_component(component_id: str, recompute: bool = True):
     """
     Delete a component from the canvas
 
     Args:
         component_id: The ID of the component to delete
+        recompute: Recompute the solution after deleting (default: True)
 
     Returns:
         Result of the operation
@@ -410,21 +539,74 @@ def delete_component(component_id: str):
     params = {
         "componentId": component_id
     }
+    if not recompute:
+        params["recompute"] = False
+
+    return await send_to_grasshopper_async("delete_component", params)
 
-    return send_to_grasshopper("delete_component", params)
+@server.tool("delete_components")
+async def delete_components(component_ids: List[str], recompute: bool = True):
+    """
+    Delete several components in one request (the solution is recomputed at most once)
+
+    Args:
+        component_ids: IDs of the components to delete
+        recompute: Recompute the solution after deleting (default: True)
+
+    Returns:
+        {deleted, failed, results: [{componentId, success, error?}, ...]}
+
+    Example:
+        delete_components(["slider_123", "circle_456", "panel_789"])
+    """
+    params = {
+        "componentIds": list(component_ids)
+    }
+    if not recompute:
+        params["recompute"] = False
+
+    return await send_to_grasshopper_async("delete_components", params)
+
+@server.tool("connect_many")
+async def connect_many(connections: List[Dict[str, Any]], recompute: bool = True):
+    """
+    Create several connections in one request (the solution is recomputed at most once)
+
+    Args:
+        connections: List of connections, each with sourceId and targetId and optionally
+            sourceParam / sourceParamIndex and targetParam / targetParamIndex
+            (same keys as the connect_components command; index 0 is used by default)
+        recompute: Recompute the solution after connecting (default: True)
+
+    Returns:
+        {connected, failed, results: [{index, success, sourceParam, targetParam | error}, ...]}
+
+    Example:
+        connect_many([
+            {"sourceId": "slider_123", "targetId": "circle_456", "targetParam": "Radius"},
+            {"sourceId": "circle_456", "targetId": "extrude_789", "targetParamIndex": 0}
+        ])
+    """
+    params = {
+        "connections": list(connections)
+    }
+    if not recompute:
+        params["recompute"] = False
+
+    return await send_to_grasshopper_async("connect_many", params)
 
 @server.tool("get_all_connections")
-def get_all_connections():
+async def get_all_connections():
     """
     Get all component connections in the document
 
     Returns:
         List of all connections with source and target information
     """
-    return send_to_grasshopper("get_all_connections")
+    return await document_model.query("get_all_connections")
 
 @server.tool("find_components_by_type")
-def find_components_by_type(component_type: str):
+async def find_components_by_type(component_type: str):
     """
     Find all components of a specific type
 
@@ -445,15 +627,16 @@ def find_components_by_type(component_type: str):
         "componentType": mapped_type
     }
 
-    return send_to_grasshopper("find_components_by_type", params)
+    return await document_model.query("find_components_by_type", params)
 
 @server.tool("batch_set_sliders")
-def batch_set_sliders(slider_values: Dict[str, float]):
+async def batch_set_sliders(slider_values: Dict[str, float], recompute: bool = True):
     """
     Set multiple slider values at once
 
     Args:
         slider_values: Dictionary mapping component IDs to values
+        recompute: Recompute the solution after the change (default: True)
 
     Example:
         batch_set_sliders({
@@ -465,17 +648,20 @@ def batch_set_sliders(slider_values: Dict[str, float]):
     params = {
         "sliderValues": slider_values
     }
+    if not recompute:
+        params["recompute"] = False
 
-    return send_to_grasshopper("batch_set_sliders", params)
+    return await send_to_grasshopper_async("batch_set_sliders", params)
 
 @server.tool("set_panel_text")
-def set_panel_text(component_id: str, text: str):
+async def set_panel_text(component_id: str, text: str, recompute: bool = True):
     """
     Set the text content of a Panel component
 
     Args:
         component_id: The ID of the panel component
         text: The text to set
+        recompute: Recompute the solution after the change (default: True)
 
     Returns:
         Result of the operation
@@ -484,17 +670,20 @@ def set_panel_text(component_id: str, text: str):
         "componentId": component_id,
         "text": text
     }
+    if not recompute:
+        params["recompute"] = False
 
-    return send_to_grasshopper("set_panel_text", params)
+    return await send_to_grasshopper_async("set_panel_text", params)
 
 @server.tool("set_toggle_state")
-def set_toggle_state(component_id: str, state: bool):
+async def set_toggle_state(component_id: str, state: bool, recompute: bool = True):
     """
     Set the state of a Boolean Toggle component
 
     Args:
         component_id: The ID of the toggle component
         state: True or False
+        recompute: Recompute the solution after the change (default: True)
 
     Returns:
         Result of the operation
@@ -503,17 +692,31 @@ def set_toggle_state(component_id: str, state: bool):
         "componentId": component_id,
         "state": state
     }
+    if not recompute:
+        params["recompute"] = False
 
-    return send_to_grasshopper("set_toggle_state", params)
+    return await send_to_grasshopper_async("set_toggle_state", params)
 
 @server.tool("get_component_output_data")
-def get_component_output_data(component_id: str, output_index: int = 0):
+async def get_component_output_data(
+    component_id: str,
+    output_index: int = 0,
+    offset: int = 0,
+    limit: Optional[int] = None,
+    encoding: str = "text"
+):
     """
     Get the output data from a component
 
     Args:
         component_id: The ID of the component
         output_index: The index of the output parameter (default: 0)
+        offset: Index of the first item to return (default: 0)
+        limit: Maximum number of items to return (default: all).
+            Use with offset to page through large outputs; the response
+            includes totalCount and nextOffset (null when there are no more items)
+        encoding: "text" (default, one string per item) or "binary"
+            (points, vectors, planes and numbers packed as base64 little-endian float64)
 
     Returns:
         The output data from the component
@@ -521,28 +724,258 @@ def get_component_output_data(component_id: str, output_index: int = 0):
     Example:
         get_component_output_data("slider_123")  # Get slider value
         get_component_output_data("point_456", 0)  # Get point coordinates
+        get_component_output_data("point_456", 0, offset=1000, limit=1000)  # Second page
+    """
+    params = output_params(component_id, output_index, offset, limit, encoding if encoding != "text" else None)
+
+    return await send_to_grasshopper_async("get_component_output_data", params)
+
+def iter_component_output_data(component_id: str, output_index: int = 0, page_size: int = DEFAULT_PAGE_SIZE):
+    """
+    腳本用：分頁讀取大型輸出，逐項產生數據
+
+    Example:
+        for point in iter_component_output_data("point_456"):
+            ...
+    """
+    return iter_output_items_sync(
+        grasshopper_client, component_id, output_index, page_size,
+        timeout=COMMAND_TIMEOUTS["get_component_output_data"],
+    )
+
+def read_component_output_values(component_id: str, output_index: int = 0, page_size: int = DEFAULT_PAGE_SIZE) -> OutputValues:
+    """
+    腳本用：以二進位編碼讀取點 / 向量 / 平面 / 數值輸出
+
+    Example:
+        points = read_component_output_values("point_456")
+        xs = points.values[0::points.stride]
+    """
+    return read_output_values_sync(
+        grasshopper_client, component_id, output_index, page_size,
+        timeout=COMMAND_TIMEOUTS["get_component_output_data"],
+    )
+
+def read_component_output_array(component_id: str, output_index: int = 0, page_size: int = DEFAULT_PAGE_SIZE):
+    """
+    腳本用：以 NumPy 陣列讀取輸出（需要 NumPy）
+
+    Returns:
+        (data, path_index, paths)：點 / 向量為 (N, 3)，數值為 (N,)，平面為 (N, 3, 3)
+
+    Example:
+        points, path_index, paths = read_component_output_array("point_456")
+        extent = points.max(axis=0) - points.min(axis=0)
     """
+    return read_output_array_sync(
+        grasshopper_client, component_id, output_index, page_size,
+        timeout=COMMAND_TIMEOUTS["get_component_output_data"],
+    )
+
+# ============================================================================
+# 新增：文檔變更
+# ============================================================================
+
+@server.tool("get_changes_since")
+async def get_changes_since(revision: int, document_id: Optional[str] = None):
+    """
+    Get the document changes made after a revision (incremental polling)
+
+    Args:
+        revision: Revision returned by the previous call (use 0 the first time)
+        document_id: documentId returned by the previous call (optional)
+
+    Returns:
+        {documentId, revision, reset, changes: [{revision, change, id, type}, ...]}
+        change is "added", "removed", "changed" or "wired". When reset is true the
+        changes could not be reconstructed (different document or the journal was
+        trimmed) and the caller should reload the whole document.
+
+    Example:
+        state = get_changes_since(0)
+        ...
+        delta = get_changes_since(state["data"]["revision"], state["data"]["documentId"])
+    """
+    params = {"revision": revision}
+    if document_id:
+        params["documentId"] = document_id
+
+    return await send_to_grasshopper_async("get_changes_since", params)
+
+@server.tool("export_document_graph")
+async def export_document_graph(fields: Optional[List[str]] = None):
+    """
+    Export every component and wire in the document in one request
+
+    Replaces the get_document_info + get_component_details (once per component)
+    + get_all_connections pattern with a single traversal of the document.
+
+    Args:
+        fields: Fields to include for each component (default: all). Any of
+            "type", "name", "position", "parameters", "inputs", "outputs", "wires".
+            "id" is always included; "wires" adds the top-level wires list.
+
+    Returns:
+        {documentId, revision, fields, components: [{id, type, name, position,
+        parameters, inputs, outputs}, ...], wires: [{sourceId, sourceParam,
+        targetId, targetParam}, ...]}
+
+    Example:
+        export_document_graph()                           # Everything
+        export_document_graph(["type", "parameters"])     # Slider/panel values only
+    """
+    params = {}
+    if fields:
+        params["fields"] = list(fields)
+
+    return await document_model.query("export_document_graph", params)
+
+def load_document_graph(fields: Optional[List[str]] = None) -> DocumentGraph:
+    """
+    腳本用：以一次請求取得整個文檔並建立圖模型
+
+    Example:
+        graph = load_document_graph()
+        for slider in graph.of_type("GH_NumberSlider"):
+            print(slider["name"], slider["parameters"]["value"])
+    """
+    return DocumentGraph.from_response(run_sync(export_document_graph(fields)))
+
+# ============================================================================
+# 新增：求解控制
+# ============================================================================
+
+@server.tool("begin_edit_session")
+async def begin_edit_session():
+    """
+    Start an edit session: suppress solution recomputes until commit_edit_session
+
+    Use this around many parameter edits (e.g. a 50-slider sweep) so Grasshopper
+    solves once at the end instead of after every change.
+
+    Returns:
+        {active: true, alreadyActive: bool}
+    """
+    return await send_to_grasshopper_async("begin_edit_session")
+
+@server.tool("commit_edit_session")
+async def commit_edit_session():
+    """
+    End the edit session and recompute the solution once if anything changed
+
+    Also flushes edits made with recompute=False outside a session.
+
+    Returns:
+        {active: false, wasActive: bool, solved: bool}
+    """
+    return await send_to_grasshopper_async("commit_edit_session")
+
+@contextlib.contextmanager
+def edit_session():
+    """
+    腳本用：在 with 區塊內暫停求解，離開時計算一次
+
+    區塊內的命令與 commit 都送到 begin 時綁定的實例（多個實例時，編輯階段的狀態只在該實例中）。
+
+    Example:
+        with edit_session():
+            for slider_id, value in sweep.items():
+                send_to_grasshopper("set_slider_value", {"componentId": slider_id, "value": value})
+    """
+    with grasshopper_client.pinned():
+        send_to_grasshopper("begin_edit_session")
+        try:
+            yield
+        finally:
+            send_to_grasshopper("commit_edit_session")
+
+def host_session(key: str):
+    """
+    腳本用：with 區塊內的命令都送到同一個 Grasshopper 實例（設定 GRASSHOPPER_HOSTS 時）
+
+    不同工作階段分配到不同的實例，多份文檔可以在多個執行緒中平行處理。
+
+    Example:
+        with host_session("student_01"):
+            send_to_grasshopper("load_document", {"path": path})
+            graph = load_document_graph()
+    """
+    return grasshopper_client.session(key)
+
+# ============================================================================
+# 新增：批次執行
+# ============================================================================
+
+@server.tool("batch_execute")
+async def batch_execute(commands: List[Dict[str, Any]], stop_on_error: bool = True):
+    """
+    Run an ordered list of commands in a single round trip
+
+    All steps run in one Grasshopper UI-thread call and the solution is recomputed
+    only once at the end (connect_components steps use a connect that defers
+    solving instead of solving per wire). A parameter value of the form "$N.field" is replaced with
+    a field from the result of step N (e.g. "$0.id" is the ID of the component
+    created by step 0).
+
+    Args:
+        commands: List of {"type": <command name>, "parameters": {...}} in execution order
+        stop_on_error: Stop at the first failing step (default: True)
+
+    Returns:
+        Per-step results: {completed, total, results: [{index, type, success, data, error}, ...]}
+
+    Example:
+        batch_execute([
+            {"type": "add_component_advanced", "parameters": {"type": "slider", "x": 0, "y": 0,
+                "initialParams": {"min": 0, "max": 10, "value": 5}}},
+            {"type": "add_component_advanced", "parameters": {"type": "circle", "x": 200, "y": 0}},
+            {"type": "connect_components", "parameters": {"sourceId": "$0.id", "targetId": "$1.id",
+                "targetParam": "Radius"}}
+        ])
+    """
+    steps = []
+    for step in commands:
+        command_type = step["type"]
+        parameters = dict(step.get("parameters") or {})
+
+        # 與 add_component_advanced 工具相同的類型映射
+        if command_type == "add_component_advanced" and "type" in parameters:
+            parameters["type"] = COMPONENT_TYPES.get(parameters["type"], parameters["type"])
+
+        steps.append({"type": command_type, "parameters": parameters})
+
     params = {
-        "componentId": component_id,
-        "outputIndex": output_index
+        "commands": steps,
+        "stopOnError": stop_on_error
     }
 
-    return send_to_grasshopper("get_component_output_data", params)
+    return await send_to_grasshopper_async("batch", params)
 
 # ============================================================================
 # 資源 (Resources)
 # ============================================================================
 @server.resource("grasshopper://status")
-def get_grasshopper_status():
+async def get_grasshopper_status():
     """Get Grasshopper connection status"""
-    try:
-        client = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        client.settimeout(2.0)
-        client.connect((GRASSHOPPER_HOST, GRASSHOPPER_PORT))
-        client.close()
-        return {"status": "connected", "host": GRASSHOPPER_HOST, "port": GRASSHOPPER_PORT}
-    except:
-        return {"status": "disconnected", "host": GRASSHOPPER_HOST, "port": GRASSHOPPER_PORT}
+    connected = await grasshopper_client.check_connection(timeout=2.0)
+    return {
+        "status": "connected" if connected else "disconnected",
+        "hosts": [format_endpoint(host, port) for host, port in GRASSHOPPER_HOSTS],
+        "pool": grasshopper_client.stats(),
+        "document_cache": document_model.stats()
+    }
+
+@server.resource("grasshopper://metrics")
+def get_grasshopper_metrics():
+    """Get per-command counts, error rates, latency by phase and payload sizes"""
+    if metrics is None:
+        return {"enabled": False}
+    return dict(metrics.snapshot(), enabled=True)
+
+@server.resource("grasshopper://metrics/prometheus")
+def get_grasshopper_metrics_prometheus():
+    """Get the same metrics in Prometheus text exposition format"""
+    return metrics.prometheus() if metrics is not None else ""
 
 @server.resource("grasshopper://component_types")
 def get_component_types():
@@ -579,6 +1012,8 @@ def get_component_guide():
             "Component detail inspection",
             "Slider value control",
             "Batch operations",
+            "Generic batch execution with step references",
+            "Edit sessions that defer solution recompute",
             "Panel text control",
             "Toggle state control",
             "Component deletion",
@@ -619,9 +1054,13 @@ def get_component_guide():
         "tips": [
             "Use add_component_advanced for more control over component creation",
             "Use get_component_details to inspect component state",
+            "Use get_components_details, delete_components and connect_many instead of calling the single-item tools in a loop",
+            "Use export_document_graph to read the whole definition in one request instead of one get_component_details per component",
             "Use set_slider_value to control sliders programmatically",
             "Use find_components_by_type to locate specific component types",
-            "Use batch_set_sliders to update multiple sliders efficiently"
+            "Use batch_set_sliders to update multiple sliders efficiently",
+            "Use batch_execute to build a whole definition in one round trip",
+            "Wrap many parameter edits in begin_edit_session / commit_edit_session to solve only once"
         ]
     }
 
@@ -630,21 +1069,16 @@ def get_component_guide():
 # ============================================================================
 def main():
     """Main entry point for the Enhanced Grasshopper MCP Bridge Server"""
+    configure_logging()
     try:
-        print("=" * 70, file=sys.stderr)
-        print("Starting Grasshopper MCP Bridge Server (ENHANCED VERSION)", file=sys.stderr)
-        print("=" * 70, file=sys.stderr)
-        print(f"Version: 2.0", file=sys.stderr)
-        print(f"Host: {GRASSHOPPER_HOST}", file=sys.stderr)
-        print(f"Port: {GRASSHOPPER_PORT}", file=sys.stderr)
-        print(f"Supported Components: {len(COMPONENT_TYPES)} types", file=sys.stderr)
-        print("=" * 70, file=sys.stderr)
-        print("Please add this MCP server to Claude Desktop", file=sys.stderr)
-        print("=" * 70, file=sys.stderr)
+        logger.info("Starting Grasshopper MCP Bridge Server (ENHANCED VERSION) 2.0")
+        logger.info("Hosts: %s", ", ".join(format_endpoint(host, port) for host, port in GRASSHOPPER_HOSTS))
+        logger.info("Supported Components: %d types", len(COMPONENT_TYPES))
+        logger.info("Wire codec: %s, compression: %s (threshold %d bytes)", WIRE_CODEC, WIRE_COMPRESSION,
+                    COMPRESS_THRESHOLD)
         server.run()
-    except Exception as e:
-        print(f"Error starting MCP server: {str(e)}", file=sys.stderr)
-        traceback.print_exc(file=sys.stderr)
+    except Exception:
+        logger.exception("Error starting MCP server")
         sys.exit(1)
 
 if __name__ == "__main__":
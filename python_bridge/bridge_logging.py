@@ -0,0 +1,231 @@
+"""
+橋接的日誌：分級、內容摘要、高頻命令抽樣
+
+原本每個命令都把完整的參數與回應（json.dumps）印到 stderr；讀取大型輸出資料時，
+格式化與寫出本身就佔了大部分的呼叫時間。這裡改用 logging：
+
+- INFO：每個命令一行（類型、結果、耗時），高頻命令每 sample_every 次記錄一次
+- DEBUG：同一行加上參數與回應的摘要（只看前幾個鍵 / 項目，列表與字串只報長度），
+  摘要只有在真的要輸出時才計算，成本與資料大小無關
+- WARNING / ERROR：插件回報的錯誤、逾時與通訊錯誤，一律記錄（不抽樣）
+
+環境變數：
+    GRASSHOPPER_LOG_LEVEL          DEBUG / INFO / WARNING / ERROR（預設 INFO）
+    GRASSHOPPER_LOG_FORMAT         text 或 json（一行一個 JSON 物件）
+    GRASSHOPPER_LOG_SAMPLE         高頻命令每幾次記錄一次（預設 20）
+    GRASSHOPPER_LOG_PREVIEW_CHARS  摘要長度上限（預設 300）
+"""
+
+import itertools
+import json
+import logging
+import os
+import sys
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+LOGGER_NAME = "grasshopper_bridge"
+
+# 一次操作會大量呼叫的命令（滑桿掃描、分頁讀取、變更輪詢）
+HIGH_FREQUENCY_COMMANDS = frozenset({
+    "set_slider_value",
+    "get_component_output_data",
+    "get_changes_since",
+    "get_document_info",
+})
+
+DEFAULT_SAMPLE_EVERY = 20
+DEFAULT_PREVIEW_CHARS = 300
+
+# 摘要：每個容器最多顯示的項目數、最大深度、字串最多顯示的字元數
+_PREVIEW_ITEMS = 6
+_PREVIEW_DEPTH = 3
+_PREVIEW_STRING = 60
+
+# 日誌記錄中的結構化欄位（logger.info(..., extra={...})）
+_STRUCTURED_FIELDS = ("command", "status", "elapsed_ms", "count", "sampled_every")
+
+
+def get_logger(name: Optional[str] = None) -> logging.Logger:
+    """橋接的 logger（name 為子 logger 名稱，例如 "client"）"""
+    return logging.getLogger(f"{LOGGER_NAME}.{name}" if name else LOGGER_NAME)
+
+
+class JsonFormatter(logging.Formatter):
+    """一行一個 JSON 物件，包含結構化欄位"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry: Dict[str, Any] = {
+            "time": round(record.created, 3),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for field in _STRUCTURED_FIELDS:
+            value = getattr(record, field, None)
+            if value is not None:
+                entry[field] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+
+def configure_logging(level: Optional[str] = None, fmt: Optional[str] = None, stream=None) -> logging.Logger:
+    """
+    設定橋接的 logger（輸出到 stderr：MCP 以 stdout 傳送協定訊息）
+
+    參數未指定時使用環境變數；重複呼叫會取代先前的設定。
+    """
+    level = (level or os.environ.get("GRASSHOPPER_LOG_LEVEL", "INFO")).upper()
+    fmt = (fmt or os.environ.get("GRASSHOPPER_LOG_FORMAT", "text")).lower()
+
+    handler = logging.StreamHandler(stream or sys.stderr)
+    if fmt == "json":
+        handler.setFormatter(JsonFormatter())
+    else:
+        handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+
+    logger = get_logger()
+    for old in list(logger.handlers):
+        logger.removeHandler(old)
+    logger.addHandler(handler)
+    logger.setLevel(level)
+    logger.propagate = False
+    return logger
+
+
+def summarize(value: Any, max_chars: int = DEFAULT_PREVIEW_CHARS) -> str:
+    """
+    資料的簡短摘要：只看前幾個鍵 / 項目，列表與長字串報告長度
+
+    Example:
+        summarize({"points": [[0, 0, 0]] * 200000})
+        # "{points: [200000 items: [3 items: 0, 0, 0], [3 items: 0, 0, 0], ...]}"
+    """
+    text = _preview(value, 0)
+    if len(text) > max_chars:
+        text = text[:max_chars] + f"…(+{len(text) - max_chars} chars)"
+    return text
+
+
+def _preview(value: Any, depth: int) -> str:
+    if isinstance(value, dict):
+        if depth >= _PREVIEW_DEPTH:
+            return f"{{{len(value)} keys}}"
+        parts = [f"{key}: {_preview(item, depth + 1)}" for key, item in itertools.islice(value.items(), _PREVIEW_ITEMS)]
+        if len(value) > _PREVIEW_ITEMS:
+            parts.append(f"…+{len(value) - _PREVIEW_ITEMS} keys")
+        return "{" + ", ".join(parts) + "}"
+    if isinstance(value, (list, tuple)):
+        if depth >= _PREVIEW_DEPTH or not value:
+            return f"[{len(value)} items]"
+        parts = [_preview(item, depth + 1) for item in value[:_PREVIEW_ITEMS]]
+        if len(value) > _PREVIEW_ITEMS:
+            parts.append("...")
+        return f"[{len(value)} items: " + ", ".join(parts) + "]"
+    if isinstance(value, str):
+        if len(value) > _PREVIEW_STRING:
+            return repr(value[:_PREVIEW_STRING]) + f"…({len(value)} chars)"
+        return repr(value)
+    if isinstance(value, (bytes, bytearray)):
+        return f"<{len(value)} bytes>"
+    return repr(value)
+
+
+class _Summary:
+    """延遲計算的摘要：只有日誌真的輸出時才呼叫 summarize"""
+
+    __slots__ = ("value", "max_chars")
+
+    def __init__(self, value: Any, max_chars: int):
+        self.value = value
+        self.max_chars = max_chars
+
+    def __str__(self) -> str:
+        return summarize(self.value, self.max_chars)
+
+
+class CommandLogger:
+    """
+    每個命令的日誌
+
+    Args:
+        logger: 輸出的 logger
+        sample_every: 高頻命令每幾次記錄一次（1 代表全部記錄）；錯誤一律記錄
+        high_frequency: 要抽樣的命令類型
+        preview_chars: DEBUG 摘要的長度上限
+    """
+
+    def __init__(
+        self,
+        logger: Optional[logging.Logger] = None,
+        sample_every: int = DEFAULT_SAMPLE_EVERY,
+        high_frequency: Iterable[str] = HIGH_FREQUENCY_COMMANDS,
+        preview_chars: int = DEFAULT_PREVIEW_CHARS,
+    ):
+        self.logger = logger or get_logger("commands")
+        self.sample_every = max(1, sample_every)
+        self.high_frequency = frozenset(high_frequency)
+        self.preview_chars = preview_chars
+        self._counts: Dict[str, int] = {}
+
+    @classmethod
+    def from_env(cls, logger: Optional[logging.Logger] = None) -> "CommandLogger":
+        return cls(
+            logger,
+            sample_every=int(os.environ.get("GRASSHOPPER_LOG_SAMPLE", str(DEFAULT_SAMPLE_EVERY))),
+            preview_chars=int(os.environ.get("GRASSHOPPER_LOG_PREVIEW_CHARS", str(DEFAULT_PREVIEW_CHARS))),
+        )
+
+    def sampled(self, command_type: str) -> bool:
+        """這次呼叫是否記錄（非高頻命令一律記錄）"""
+        if self.sample_every == 1 or command_type not in self.high_frequency:
+            return True
+        count = self._counts.get(command_type, 0)
+        self._counts[command_type] = count + 1
+        return count % self.sample_every == 0
+
+    def start(self) -> float:
+        """命令送出前呼叫；返回開始時間（交給 received）"""
+        return time.perf_counter()
+
+    def received(self, command_type: str, params: Any, response: Dict[str, Any], started: float) -> None:
+        """收到回應後呼叫：錯誤一律記錄，成功的命令依抽樣記錄一行（DEBUG 時附上參數與回應的摘要）"""
+        elapsed_ms = round((time.perf_counter() - started) * 1000, 2)
+        if not response.get("success"):
+            self.logger.warning("← %s failed in %.1f ms: %s", command_type, elapsed_ms, response.get("error"),
+                                extra={"command": command_type, "status": "error", "elapsed_ms": elapsed_ms})
+            return
+
+        if not self.logger.isEnabledFor(logging.INFO) or not self.sampled(command_type):
+            return
+        extra = {"command": command_type, "status": "ok", "elapsed_ms": elapsed_ms}
+        if command_type in self.high_frequency and self.sample_every > 1:
+            extra["sampled_every"] = self.sample_every
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug("← %s ok in %.1f ms: %s → %s", command_type, elapsed_ms,
+                              _Summary(params, self.preview_chars),
+                              _Summary(response.get("data"), self.preview_chars), extra=extra)
+        else:
+            self.logger.info("← %s ok in %.1f ms", command_type, elapsed_ms, extra=extra)
+
+    def pipeline_received(self, responses: List[Dict[str, Any]], started: float) -> None:
+        """管線化批次的回應全部收到後呼叫"""
+        elapsed_ms = round((time.perf_counter() - started) * 1000, 2)
+        errors = [r.get("error") for r in responses if not r.get("success")]
+        extra = {"command": "pipeline", "count": len(responses), "elapsed_ms": elapsed_ms}
+        if errors:
+            self.logger.warning("← pipeline of %d commands: %d failed in %.1f ms, first error: %s",
+                                len(responses), len(errors), elapsed_ms, errors[0], extra=dict(extra, status="error"))
+        else:
+            self.logger.info("← pipeline of %d commands ok in %.1f ms", len(responses), elapsed_ms,
+                             extra=dict(extra, status="ok"))
+
+    def timed_out(self, command_type: str, timeout: float) -> None:
+        self.logger.error("Timed out waiting for Grasshopper: %s (%ss)", command_type, timeout,
+                          extra={"command": command_type, "status": "timeout"})
+
+    def failed(self, command_type: str, error: BaseException) -> None:
+        """通訊錯誤（附上 traceback）"""
+        self.logger.error("Error communicating with Grasshopper: %s: %s", command_type, error,
+                          exc_info=error, extra={"command": command_type, "status": "failed"})
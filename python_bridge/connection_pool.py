@@ -0,0 +1,37 @@
+"""
+Grasshopper 連接池（同步介面）
+
+AsyncGrasshopperClient 的同步包裝，給沒有事件迴圈的呼叫端（測試、效能測試、腳本）使用。
+連接重用、上限 (max_size)、閒置逾時 (idle_timeout)、健康檢查與透明重連都由非同步客戶端處理，
+每次呼叫經由 run_sync 在背景事件迴圈上執行，因此同一個 ConnectionPool 可以在多個執行緒間共用。
+"""
+
+from typing import Dict, Any
+
+from async_client import AsyncGrasshopperClient, run_sync
+
+
+class ConnectionPool:
+    """Grasshopper 連接池（執行緒安全）"""
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        max_size: int = 4,
+        idle_timeout: float = 30.0,
+        timeout: float = 10.0,
+    ):
+        self.client = AsyncGrasshopperClient(host, port, max_size=max_size, idle_timeout=idle_timeout, timeout=timeout)
+
+    def request(self, command: Dict[str, Any]) -> Dict[str, Any]:
+        """經由連接池發送命令並等待回應"""
+        return run_sync(self.client.request(command))
+
+    def close(self):
+        """關閉所有閒置連接"""
+        run_sync(self.client.aclose())
+
+    def stats(self) -> Dict[str, Any]:
+        """連接池統計資訊"""
+        return self.client.stats()
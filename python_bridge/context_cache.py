@@ -0,0 +1,133 @@
+"""
+作業資訊的磁碟快取（依內容定址）
+
+以作業檔內容的 SHA-256 加上提取器版本為鍵，保存提取出的作業資訊（JSON）。
+調整評分標準後重新評分時，內容沒有改變的作業不需要再提取，
+只重新準備提示與評分；提取邏輯改變時提高版本號，舊的項目自然不再命中。
+
+快取目錄有大小上限，超過時依最近使用時間（檔案 mtime，命中時更新）淘汰最舊的項目。
+寫入使用暫存檔 + os.replace，多個行程可以同時使用同一個快取目錄。
+
+Example:
+    cache = ContextCache(".grading_cache", version="ghx-1")
+    context = cache.get_or_compute("student_01.ghx", extract_ghx_context)
+"""
+
+import contextlib
+import hashlib
+import json
+import os
+import tempfile
+from typing import Any, Callable, Dict, Optional
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+# 每寫入這麼多個項目檢查一次大小上限
+EVICT_EVERY = 64
+
+_CHUNK = 1024 * 1024
+
+
+def file_digest(path: str) -> str:
+    """檔案內容的 SHA-256（逐塊讀取）"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(_CHUNK), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ContextCache:
+    """
+    依內容定址的作業資訊快取
+
+    Args:
+        directory: 快取目錄（不存在時建立）
+        version: 提取器版本；不同版本的項目互不命中
+        max_bytes: 快取目錄的大小上限
+    """
+
+    def __init__(self, directory: str, version: str, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.version = version
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._writes = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def key(self, path: str) -> str:
+        """作業檔的快取鍵：內容雜湊與提取器版本"""
+        return hashlib.sha256(f"{self.version}\0{file_digest(path)}".encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """讀取項目並更新其使用時間；不存在或已損壞時返回 None"""
+        entry = self._entry_path(key)
+        try:
+            with open(entry, encoding="utf-8") as f:
+                value = json.load(f)
+            os.utime(entry)
+        except (OSError, ValueError):
+            return None
+        return value
+
+    def put(self, key: str, value: Dict[str, Any]) -> None:
+        """寫入項目（原子地取代同鍵的舊項目）"""
+        entry = self._entry_path(key)
+        os.makedirs(os.path.dirname(entry), exist_ok=True)
+        fd, temp = tempfile.mkstemp(dir=os.path.dirname(entry), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(value, f, ensure_ascii=False)
+            os.replace(temp, entry)
+        except BaseException:
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(temp)
+            raise
+
+        self._writes += 1
+        if self._writes % EVICT_EVERY == 0:
+            self.evict()
+
+    def get_or_compute(self, path: str, compute: Callable[[str], Dict[str, Any]]) -> Dict[str, Any]:
+        """命中時返回快取的作業資訊，否則以 compute(path) 提取並寫入"""
+        key = self.key(path)
+        value = self.get(key)
+        if value is not None:
+            self.hits += 1
+            return value
+
+        self.misses += 1
+        value = compute(path)
+        self.put(key, value)
+        return value
+
+    def evict(self) -> int:
+        """超過大小上限時刪除最久未使用的項目；返回刪除的項目數"""
+        entries = []
+        total = 0
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if not name.endswith(".json"):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+                total += stat.st_size
+
+        removed = 0
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(path)
+                removed += 1
+            total -= size
+        return removed
+
+    def _entry_path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], key + ".json")
+
@@ -0,0 +1,482 @@
+"""
+文檔模型快取
+
+唯讀查詢（get_document_info、get_component_details、get_all_connections、
+find_components_by_type）的結果保存在橋接端的文檔模型中，依組件 GUID 索引，
+之後的相同查詢直接在本地回答，不必再讓插件在 UI 執行緒上掃描整個文檔。
+
+失效方式：
+  - 經由橋接發出的修改命令（note_command）立即清除模型
+  - 其他修改（使用者在畫布上操作）以插件的文檔修訂號偵測：
+    距離上次確認超過 revalidate_interval 秒時，以 get_changes_since
+    取得這段期間的變更（增量），只清除受影響的部分；
+    插件沒有變更紀錄時改用 get_document_revision，修訂號改變就清除整個模型
+插件兩者都不支援時快取自動停用，所有查詢直接轉送。
+
+export_document_graph 一次返回所有組件與連線；結果同樣由模型保存，
+並順便填入連線列表與依類型的搜尋結果。DocumentGraph 把匯出結果整理成
+可以依 GUID、類型與連線查詢的圖，取代逐一呼叫 get_component_details。
+
+DocumentSubscriber 定期輪詢變更並通知回呼（例如課堂即時回饋），
+每次輪詢的成本與變更數量成正比，而不是與文檔大小成正比。
+"""
+
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+# 由模型回答的唯讀查詢
+READ_ONLY_COMMANDS = frozenset({
+    "get_document_info",
+    "get_component_details",
+    "get_all_connections",
+    "find_components_by_type",
+    "export_document_graph",
+})
+
+# 不會改變文檔結構或參數的命令（不需要讓模型失效）
+NON_MUTATING_COMMANDS = READ_ONLY_COMMANDS | frozenset({
+    "get_document_revision",
+    "get_changes_since",
+    "get_components_details",
+    "get_component_info",
+    "get_component_output_data",
+    "save_document",
+    "begin_edit_session",
+})
+
+# send(command_type, params) -> response，通常是 bridge 的 send_to_grasshopper_async
+SendFunction = Callable[[str, Optional[Dict[str, Any]]], Awaitable[Dict[str, Any]]]
+
+
+class DocumentModel:
+    """
+    橋接端的文檔鏡像（唯讀查詢快取）
+
+    Args:
+        send: 發送命令的協程函數
+        revalidate_interval: 兩次修訂號確認之間的最短間隔（秒）；
+            0 表示每次查詢都確認（仍只是一次 O(1) 往返）
+        enabled: False 時所有查詢直接轉送
+    """
+
+    def __init__(self, send: SendFunction, revalidate_interval: float = 0.5, enabled: bool = True):
+        self.send = send
+        self.revalidate_interval = revalidate_interval
+        self.enabled = enabled
+
+        # None：尚未確認插件是否支援 get_document_revision / get_changes_since
+        self.supported: Optional[bool] = None
+        self.journal_supported: Optional[bool] = None
+        self.document_id: Optional[str] = None
+        self.revision: Optional[int] = None
+        self._checked_at = 0.0
+
+        # 每次失效遞增；查詢期間若遞增過，結果不寫入模型
+        self._generation = 0
+
+        self.info: Optional[Dict[str, Any]] = None
+        self.components: Dict[str, Dict[str, Any]] = {}
+        self.connections: Optional[Dict[str, Any]] = None
+        self.by_type: Dict[str, Dict[str, Any]] = {}
+        # export_document_graph 的結果，依欄位組合索引
+        self.graphs: Dict[Tuple[str, ...], Dict[str, Any]] = {}
+
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+        self.invalidations = 0
+        self.changes_applied = 0
+
+    # ------------------------------------------------------------------
+    # 查詢
+    # ------------------------------------------------------------------
+
+    async def query(self, command_type: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """回答唯讀查詢：模型中有有效結果時直接返回，否則轉送並記錄"""
+        if not self.enabled or command_type not in READ_ONLY_COMMANDS:
+            return await self.send(command_type, params)
+
+        if not await self._revalidate():
+            return await self.send(command_type, params)
+
+        cached = self._lookup(command_type, params or {})
+        if cached is not None:
+            self.hits += 1
+            return cached
+
+        self.misses += 1
+        generation = self._generation
+        response = await self.send(command_type, params)
+        if response.get("success") and generation == self._generation:
+            self._store(command_type, params or {}, response)
+        return response
+
+    async def query_details(self, component_ids: List[str]) -> Dict[str, Any]:
+        """
+        回答 get_components_details：模型中已有的組件直接使用，其餘以一次請求取得並記錄
+
+        Returns:
+            與插件相同格式的回應：{"count", "failed", "results": [{"componentId", "success", "data" | "error"}]}
+        """
+        if not self.enabled or not await self._revalidate():
+            return await self.send("get_components_details", {"componentIds": list(component_ids)})
+
+        results: Dict[str, Dict[str, Any]] = {}
+        missing: List[str] = []
+        for component_id in component_ids:
+            cached = self.components.get(component_id)
+            if cached is not None:
+                self.hits += 1
+                results[component_id] = {"componentId": component_id, "success": True, "data": cached.get("data")}
+            elif component_id not in missing:
+                self.misses += 1
+                missing.append(component_id)
+
+        if missing:
+            generation = self._generation
+            response = await self.send("get_components_details", {"componentIds": missing})
+            if not response.get("success"):
+                return response
+            for item in response["data"].get("results") or []:
+                results[item["componentId"]] = item
+                if item.get("success") and generation == self._generation:
+                    self.components[item["componentId"]] = {"success": True, "data": item.get("data"), "error": None}
+
+        ordered = [results.get(component_id) or {"componentId": component_id, "success": False, "error": "No result"}
+                   for component_id in component_ids]
+        return {
+            "success": True,
+            "data": {
+                "count": len(ordered),
+                "failed": sum(1 for item in ordered if not item.get("success")),
+                "results": ordered,
+            },
+            "error": None,
+        }
+
+    def note_command(self, command_type: str) -> None:
+        """橋接發出命令前後呼叫：修改命令讓模型失效，下一次查詢重新確認修訂號"""
+        if command_type not in NON_MUTATING_COMMANDS:
+            self.invalidate()
+            self.revision = None
+
+    def invalidate(self) -> None:
+        """清除模型（下一次查詢重新向插件取得）"""
+        self._generation += 1
+        self.invalidations += 1
+        self.info = None
+        self.components.clear()
+        self.connections = None
+        self.by_type.clear()
+        self.graphs.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """快取統計資訊"""
+        return {
+            "enabled": self.enabled and self.supported is not False,
+            "document_id": self.document_id,
+            "revision": self.revision,
+            "components": len(self.components),
+            "hits": self.hits,
+            "misses": self.misses,
+            "revalidations": self.revalidations,
+            "invalidations": self.invalidations,
+            "changes_applied": self.changes_applied,
+        }
+
+    async def poll_changes(self) -> Optional[List[Dict[str, Any]]]:
+        """
+        向插件取得上次確認之後的變更並套用到模型
+
+        Returns:
+            變更列表（可能為空）；模型被整個清除（文檔切換、紀錄不足、插件不支援）時返回 None
+        """
+        if self.revision is None or self.journal_supported is False:
+            return [] if await self._check_revision() is False else None
+
+        generation = self._generation
+        response = await self.send("get_changes_since", {"revision": self.revision, "documentId": self.document_id})
+        if not response.get("success"):
+            if self.journal_supported is None:
+                self.journal_supported = False
+                return [] if await self._check_revision() is False else None
+            else:
+                self.invalidate()
+                self.revision = None
+            return None
+
+        self.journal_supported = True
+        self.supported = True
+        self._checked_at = time.monotonic()
+        if generation != self._generation:
+            # 查詢期間經由橋接修改過：模型已清除，只更新修訂號
+            self.document_id, self.revision = response["data"]["documentId"], response["data"]["revision"]
+            return None
+        return self.apply_changes(response["data"])
+
+    def apply_changes(self, data: Dict[str, Any]) -> Optional[List[Dict[str, Any]]]:
+        """
+        套用 get_changes_since 的結果；只清除受影響的部分
+
+        added / removed：文檔資訊與依類型的搜尋結果、被刪除組件的詳細資訊與相關連線
+        wired：連線列表與組件詳細資訊（來源端的 recipients 也會改變）
+        changed：該組件的詳細資訊；無法判斷是哪個組件時清除所有詳細資訊
+        """
+        if data.get("reset") or data.get("documentId") != self.document_id:
+            self.invalidate()
+            self.document_id, self.revision = data.get("documentId"), data.get("revision")
+            return None
+
+        changes = data.get("changes") or []
+        for change in changes:
+            kind = change.get("change")
+            component_id = change.get("id")
+            self.info = None
+            self.graphs.clear()
+
+            if kind in ("added", "removed"):
+                self.by_type.pop(change.get("type"), None)
+                if kind == "removed":
+                    self.components.pop(component_id, None)
+                    self._drop_connections_of(component_id)
+            elif kind == "wired":
+                self.connections = None
+                self.components.clear()
+            elif component_id is None:
+                self.components.clear()
+            else:
+                self.components.pop(component_id, None)
+
+        self.changes_applied += len(changes)
+        self.revision = data.get("revision")
+        return changes
+
+    # ------------------------------------------------------------------
+    # 內部
+    # ------------------------------------------------------------------
+
+    async def _revalidate(self) -> bool:
+        """確認模型仍對應目前的文檔；返回 False 表示這次不使用快取"""
+        if self.supported is False:
+            return False
+
+        now = time.monotonic()
+        if self.revision is not None and now - self._checked_at < self.revalidate_interval:
+            return True
+
+        self.revalidations += 1
+        await self.poll_changes()
+        return self.supported is True and self.revision is not None
+
+    async def _check_revision(self) -> Optional[bool]:
+        """以 get_document_revision 確認修訂號，改變時清除整個模型；返回是否改變（失敗時為 None）"""
+        generation = self._generation
+        response = await self.send("get_document_revision", None)
+        if not response.get("success"):
+            if self.supported is None:
+                # 原版插件：停用快取
+                self.supported = False
+            else:
+                self.invalidate()
+                self.revision = None
+            return None
+
+        self.supported = True
+        data = response["data"]
+        current: Tuple[Optional[str], Optional[int]] = (data.get("documentId"), data.get("revision"))
+        changed = current != (self.document_id, self.revision) or generation != self._generation
+        if changed:
+            self.invalidate()
+            self.document_id, self.revision = current
+        self._checked_at = time.monotonic()
+        return changed
+
+    def _drop_connections_of(self, component_id: Optional[str]) -> None:
+        """從連線列表中移除與被刪除組件相關的連線"""
+        if self.connections is None:
+            return
+        wires = self.connections.get("data")
+        if not isinstance(wires, list):
+            self.connections = None
+            return
+        remaining = [w for w in wires if component_id not in (w.get("sourceId"), w.get("targetId"))]
+        self.connections = dict(self.connections, data=remaining)
+
+    def _lookup(self, command_type: str, params: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        if command_type == "get_document_info":
+            return self.info
+        if command_type == "get_component_details":
+            return self.components.get(params.get("componentId"))
+        if command_type == "get_all_connections":
+            return self.connections
+        if command_type == "find_components_by_type":
+            return self.by_type.get(params.get("componentType"))
+        if command_type == "export_document_graph":
+            return self.graphs.get(_graph_key(params))
+        return None
+
+    def _store(self, command_type: str, params: Dict[str, Any], response: Dict[str, Any]) -> None:
+        if command_type == "get_document_info":
+            self.info = response
+        elif command_type == "get_component_details":
+            self.components[params.get("componentId")] = response
+        elif command_type == "get_all_connections":
+            self.connections = response
+        elif command_type == "find_components_by_type":
+            self.by_type[params.get("componentType")] = response
+        elif command_type == "export_document_graph":
+            self.graphs[_graph_key(params)] = response
+            self._prime_from_graph(response.get("data") or {})
+
+    def _prime_from_graph(self, data: Dict[str, Any]) -> None:
+        """以完整匯出的結果填入連線列表與依類型的搜尋結果（格式與對應命令相同）"""
+        fields = data.get("fields") or []
+        components = data.get("components") or []
+
+        # get_all_connections 只回報連到組件輸入的連線：以 inputs 欄位辨認組件（獨立參數沒有 inputs）
+        if "wires" in fields and "inputs" in fields and self.connections is None:
+            targets = {component.get("id") for component in components if "inputs" in component}
+            wires = [wire for wire in data.get("wires") or [] if wire.get("targetId") in targets]
+            self.connections = {"success": True, "data": wires, "error": None}
+
+        if "type" in fields:
+            ids_by_type: Dict[str, List[str]] = {}
+            for component in components:
+                ids_by_type.setdefault(component.get("type"), []).append(component.get("id"))
+            for type_name, ids in ids_by_type.items():
+                self.by_type.setdefault(type_name, {"success": True, "data": ids, "error": None})
+
+
+def _graph_key(params: Dict[str, Any]) -> Tuple[str, ...]:
+    """export_document_graph 的快取索引；省略 fields 時為空 tuple（全部欄位）"""
+    fields = params.get("fields")
+    if isinstance(fields, str):
+        fields = fields.split(",")
+    return tuple(sorted(f.strip() for f in fields or ()))
+
+
+class DocumentGraph:
+    """
+    export_document_graph 結果的圖模型：依 GUID 與類型查詢組件，依連線查詢上下游
+
+    Example:
+        graph = DocumentGraph.from_response(await model.query("export_document_graph"))
+        for slider in graph.of_type("GH_NumberSlider"):
+            print(slider["name"], slider["parameters"]["value"])
+        upstream = graph.upstream(result_id)
+    """
+
+    def __init__(self, data: Dict[str, Any]):
+        self.document_id: Optional[str] = data.get("documentId")
+        self.revision: Optional[int] = data.get("revision")
+        self.fields: List[str] = list(data.get("fields") or [])
+        self.components: Dict[str, Dict[str, Any]] = {c["id"]: c for c in data.get("components") or []}
+        self.wires: List[Dict[str, Any]] = list(data.get("wires") or [])
+
+        self._by_type: Dict[Optional[str], List[str]] = {}
+        for component_id, component in self.components.items():
+            self._by_type.setdefault(component.get("type"), []).append(component_id)
+
+        self._incoming: Dict[str, List[Dict[str, Any]]] = {}
+        self._outgoing: Dict[str, List[Dict[str, Any]]] = {}
+        for wire in self.wires:
+            self._incoming.setdefault(wire["targetId"], []).append(wire)
+            self._outgoing.setdefault(wire["sourceId"], []).append(wire)
+
+    @classmethod
+    def from_response(cls, response: Dict[str, Any]) -> "DocumentGraph":
+        """由 export_document_graph 的回應建立；失敗的回應拋出 RuntimeError"""
+        if not response.get("success"):
+            raise RuntimeError(response.get("error") or "export_document_graph failed")
+        return cls(response["data"])
+
+    def __len__(self) -> int:
+        return len(self.components)
+
+    def __contains__(self, component_id: str) -> bool:
+        return component_id in self.components
+
+    def __getitem__(self, component_id: str) -> Dict[str, Any]:
+        return self.components[component_id]
+
+    def of_type(self, type_name: str) -> List[Dict[str, Any]]:
+        """指定類型（例如 GH_NumberSlider）的所有組件；匯出時需包含 type 欄位"""
+        return [self.components[i] for i in self._by_type.get(type_name, [])]
+
+    def sources(self, component_id: str) -> List[Dict[str, Any]]:
+        """連入組件的連線"""
+        return list(self._incoming.get(component_id, []))
+
+    def recipients(self, component_id: str) -> List[Dict[str, Any]]:
+        """從組件連出的連線"""
+        return list(self._outgoing.get(component_id, []))
+
+    def upstream(self, component_id: str) -> List[str]:
+        """所有直接或間接連入組件的上游組件 ID（由近到遠）"""
+        return self._walk(component_id, self._incoming, "sourceId")
+
+    def downstream(self, component_id: str) -> List[str]:
+        """所有直接或間接受組件影響的下游組件 ID（由近到遠）"""
+        return self._walk(component_id, self._outgoing, "targetId")
+
+    @staticmethod
+    def _walk(start: str, edges: Dict[str, List[Dict[str, Any]]], key: str) -> List[str]:
+        seen = {start}
+        order: List[str] = []
+        frontier = [start]
+        while frontier:
+            following = []
+            for current in frontier:
+                for wire in edges.get(current, []):
+                    neighbour = wire[key]
+                    if neighbour not in seen:
+                        seen.add(neighbour)
+                        order.append(neighbour)
+                        following.append(neighbour)
+            frontier = following
+        return order
+
+
+ChangeCallback = Callable[[List[Dict[str, Any]]], Any]
+
+
+class DocumentSubscriber:
+    """
+    定期輪詢文檔變更，套用到 DocumentModel 並通知回呼
+
+    回呼收到變更列表；文檔被整個重新載入（切換文檔、紀錄不足）時收到 None。
+    回呼可以是一般函數或協程函數。
+
+    Example:
+        subscriber = DocumentSubscriber(document_model, interval=2.0)
+        await subscriber.run(lambda changes: print(changes))
+    """
+
+    def __init__(self, model: DocumentModel, interval: float = 2.0):
+        self.model = model
+        self.interval = interval
+
+    async def poll(self) -> Optional[List[Dict[str, Any]]]:
+        """輪詢一次"""
+        return await self.model.poll_changes()
+
+    async def run(self, callback: ChangeCallback, stop: Optional[asyncio.Event] = None) -> None:
+        """持續輪詢直到 stop 被設定（或工作被取消）；沒有變更時不呼叫回呼"""
+        await self.model.poll_changes()
+        while stop is None or not stop.is_set():
+            if stop is None:
+                await asyncio.sleep(self.interval)
+            else:
+                try:
+                    await asyncio.wait_for(stop.wait(), self.interval)
+                    return
+                except asyncio.TimeoutError:
+                    pass
+
+            changes = await self.model.poll_changes()
+            if changes == []:
+                continue
+            result = callback(changes)
+            if asyncio.iscoroutine(result):
+                await result
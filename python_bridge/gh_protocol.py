@@ -0,0 +1,103 @@
+"""
+Grasshopper MCP 通訊協定
+
+插件端使用「一行一個 JSON」的文字協定：
+    請求: {"type": "<command>", "parameters": {...}} + "\\n"
+    回應: {"success": true/false, "data": ..., "error": ...} + "\\n"
+
+請求可以帶選用的 "id" 欄位；支援的插件會在回應中原樣帶回，
+讓客戶端在同一條連接上連續送出多個命令後依 ID 對應回應（管線化）。
+
+傳輸層為 TCP，或在同一台機器上使用 Unix domain socket（主機名稱寫成 "unix:<路徑>"，埠不使用），
+兩者傳送的內容完全相同。
+
+JSON 的編碼與解析使用 wire_codec（安裝 orjson 時自動使用 orjson）；
+連接建立後也可以協商改用 MessagePack（見 wire_codec.py）。
+"""
+
+import socket
+from typing import Dict, Any, Optional
+
+from wire_codec import DELIMITER, json_codec
+
+# 一行一個 JSON 的預設編碼
+JSON_CODEC = json_codec()
+
+# 每次 recv 的最大位元組數
+RECV_CHUNK_SIZE = 65536
+
+# 單行回應的大小上限（asyncio StreamReader 預設只有 64 KiB）
+MAX_LINE_BYTES = 512 * 1024 * 1024
+
+
+# Unix domain socket 端點的主機名稱前綴，例如 "unix:/tmp/grasshopper.sock"
+UNIX_PREFIX = "unix:"
+
+
+class ConnectionClosedError(ConnectionError):
+    """對方在回應完成前關閉了連接"""
+
+
+# 重用連接時可以安全重送的錯誤（請求尚未被處理）
+RECONNECTABLE_ERRORS = (BrokenPipeError, ConnectionResetError, ConnectionAbortedError, ConnectionClosedError)
+
+
+def unix_socket_path(host: str) -> Optional[str]:
+    """host 為 "unix:<路徑>" 時返回路徑，否則返回 None"""
+    if host.startswith(UNIX_PREFIX):
+        return host[len(UNIX_PREFIX):]
+    return None
+
+
+def format_endpoint(host: str, port: int) -> str:
+    """端點的顯示名稱：host:port，或 Unix domain socket 的 unix:<路徑>"""
+    return host if unix_socket_path(host) is not None else f"{host}:{port}"
+
+
+def open_socket(host: str, port: int, timeout: Optional[float] = None) -> socket.socket:
+    """建立到插件的連接：TCP（關閉 Nagle）或 Unix domain socket"""
+    path = unix_socket_path(host)
+    if path is None:
+        sock = socket.create_connection((host, port), timeout=timeout)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        return sock
+
+    if not hasattr(socket, "AF_UNIX"):
+        raise OSError("Unix domain sockets are not supported on this platform")
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(timeout)
+    try:
+        sock.connect(path)
+    except OSError:
+        sock.close()
+        raise
+    return sock
+
+
+def build_command(command_type: str, params: Optional[Dict[str, Any]] = None, request_id: Optional[str] = None) -> Dict[str, Any]:
+    """建立命令物件"""
+    command = {
+        "type": command_type,
+        "parameters": params if params is not None else {}
+    }
+    if request_id is not None:
+        command["id"] = request_id
+    return command
+
+
+def encode_command(command: Dict[str, Any]) -> bytes:
+    """將命令編碼為一行 UTF-8 JSON"""
+    return JSON_CODEC.encode(command) + DELIMITER
+
+
+def decode_response(line: bytes) -> Dict[str, Any]:
+    """解析一行回應（處理可能的 BOM）"""
+    return JSON_CODEC.decode(line)
+
+
+def error_response(message: str) -> Dict[str, Any]:
+    """建立與插件相同格式的錯誤回應"""
+    return {
+        "success": False,
+        "error": message
+    }
@@ -0,0 +1,250 @@
+"""
+離線讀取 .ghx（XML 格式的 Grasshopper 定義）
+
+不需要 Rhino：以 iterparse 逐段解析，每個組件解析完後立即釋放對應的 XML 節點，
+記憶體用量與組件數量成正比，而不是與檔案大小成正比。
+
+返回的結構與插件的 export_document_graph 相同（可以直接交給 DocumentGraph）：
+    {"documentId", "revision": None, "name", "fields",
+     "components": [{"id", "type", "typeGuid", "name", "position", "parameters", "inputs", "outputs"}],
+     "wires": [{"sourceId", "sourceParam", "targetId", "targetParam"}]}
+
+差異：.ghx 只記錄組件的顯示名稱與類型 GUID，沒有 .NET 類別名稱。
+type 先以類型 GUID、再以顯示名稱對應到插件回報的類型名稱（GetType().Name，例如 "Addition" → "OperatorAdd"），
+兩條路徑的評分資訊因此相同；對應表中沒有的組件 type 為顯示名稱。inputs / outputs 沒有 type。
+只讀取頂層物件；Cluster 內部的定義不展開。二進位的 .gh 檔需先另存為 .ghx。
+"""
+
+import os
+import xml.etree.ElementTree as ET
+from typing import Any, Dict, List, Optional, Tuple
+
+# 類型 GUID（ComponentGuid）→ 插件回報的類型名稱（GetType().Name）；顯示名稱可能被翻譯或與其他組件重複
+TYPE_GUIDS = {
+    "57da07bd-ecab-415d-9d86-af36d7073abc": "GH_NumberSlider",
+    "59e0b89a-e487-49f8-bab8-b5bab16be14c": "GH_Panel",
+    "2e78987b-9dfb-42a2-8b76-3923ac8bd91a": "GH_BooleanToggle",
+    "00027467-0d24-4fa7-b178-8dc0ac5f42ec": "GH_ValueList",
+    "a8b97322-2d53-47cd-905e-b932c3ccd74e": "GH_ButtonObject",
+    "c552a431-af5b-46a9-a8a4-0fcbc27ef596": "GH_Group",
+    "3e8ca6be-fda8-4aaf-b5c0-3c54c8bb7312": "Param_Number",
+    "fbac3e32-f100-4292-8692-77240a42fd1a": "Param_Point",
+    "d5967b9f-e8ee-436b-a8ad-29fdcecf32d5": "Param_Curve",
+    "a0d62394-a118-422d-abb3-6af115c75b25": "OperatorAdd",
+    "e64c5fb1-845c-4ab1-8911-5f338516ba67": "Component_Series",
+    "807b86e3-be8d-4970-92b5-f8cdcb45b06b": "Component_Circle",
+    "4c4e56eb-2f04-43f9-95a3-cc46a14f495a": "Component_Line",
+}
+
+# 顯示名稱 → 插件回報的類型名稱（類型 GUID 不在上表時使用）
+KNOWN_TYPES = {
+    "Number Slider": "GH_NumberSlider",
+    "Panel": "GH_Panel",
+    "Boolean Toggle": "GH_BooleanToggle",
+    "Value List": "GH_ValueList",
+    "Button": "GH_ButtonObject",
+    "Group": "GH_Group",
+    "Scribble": "GH_Scribble",
+    "Markup": "GH_Markup",
+    "Relay": "GH_Relay",
+    "Number": "Param_Number",
+    "Point": "Param_Point",
+    "Curve": "Param_Curve",
+    "Surface": "Param_Surface",
+    "Vector": "Param_Vector",
+    "Geometry": "Param_Geometry",
+    "Addition": "OperatorAdd",
+    "Subtraction": "OperatorSubtract",
+    "Multiplication": "OperatorMultiply",
+    "Division": "OperatorDivide",
+    "Series": "Component_Series",
+    "Range": "Component_Range",
+    "Circle": "Component_Circle",
+    "Line": "Component_Line",
+    "Move": "Component_Move",
+    "Extrude": "Component_Extrude",
+    "Unit Z": "Component_UnitVectorZ",
+    "Deconstruct Point": "Component_DeconstructPoint",
+}
+
+# 讀取結果的格式改變時遞增（作業資訊快取以此區分版本）
+READER_VERSION = 2
+
+FIELDS = ["type", "name", "position", "parameters", "inputs", "outputs", "wires"]
+
+# 頂層物件的 chunk 路徑
+_OBJECT_PATH = ("Definition", "DefinitionObjects", "Object")
+
+
+class GhxError(ValueError):
+    """檔案不是可讀取的 .ghx 定義"""
+
+
+def read_ghx(path: str) -> Dict[str, Any]:
+    """
+    讀取 .ghx 檔案
+
+    Example:
+        graph = DocumentGraph(read_ghx("submissions/student_01.ghx"))
+        print(len(graph), [s["parameters"] for s in graph.of_type("GH_NumberSlider")])
+    """
+    with open(path, "rb") as source:
+        head = source.read(64).lstrip()
+        if not head.startswith(b"<"):
+            raise GhxError(f"{os.path.basename(path)} is not an XML .ghx file (save binary .gh files as .ghx)")
+        source.seek(0)
+        return _Reader().read(source)
+
+
+class _Reader:
+    """iterparse 狀態：目前的 chunk 路徑與正在解析的物件"""
+
+    def __init__(self):
+        self.document_id: Optional[str] = None
+        self.name: Optional[str] = None
+        self.components: List[Dict[str, Any]] = []
+        # 參數 InstanceGuid → (頂層物件 ID, 參數名稱)；獨立參數就是物件本身
+        self.params: Dict[str, Tuple[str, Optional[str]]] = {}
+        # (來源參數 GUID, 接收端物件 ID, 接收端參數名稱)，全部讀完後才能解析來源
+        self.sources: List[Tuple[str, str, Optional[str]]] = []
+
+        self.current: Optional[Dict[str, Any]] = None
+        self.current_sources: List[str] = []
+        self.port: Optional[Dict[str, Any]] = None
+        self.port_sources: List[str] = []
+
+    def read(self, source) -> Dict[str, Any]:
+        path: List[str] = []
+        elements: List[ET.Element] = []
+
+        try:
+            for event, element in ET.iterparse(source, events=("start", "end")):
+                if event == "start":
+                    if element.tag == "chunk":
+                        path.append(element.get("name"))
+                        self._enter(tuple(path))
+                    elements.append(element)
+                    continue
+
+                elements.pop()
+                if element.tag == "item":
+                    self._item(tuple(path), element)
+                elif element.tag == "chunk":
+                    self._leave(tuple(path))
+                    path.pop()
+                else:
+                    continue
+
+                # 處理完的節點從父節點移除，記憶體不隨檔案大小成長
+                if elements:
+                    elements[-1].remove(element)
+        except ET.ParseError as e:
+            raise GhxError(f"Invalid .ghx file: {e}") from None
+
+        wires = []
+        for source_param, target_id, target_param in self.sources:
+            owner = self.params.get(source_param)
+            if owner is None:
+                continue
+            wires.append({"sourceId": owner[0], "sourceParam": owner[1],
+                          "targetId": target_id, "targetParam": target_param})
+
+        return {
+            "documentId": self.document_id,
+            "revision": None,
+            "name": self.name,
+            "fields": list(FIELDS),
+            "components": self.components,
+            "wires": wires,
+        }
+
+    # ------------------------------------------------------------------
+
+    def _enter(self, path: Tuple[str, ...]) -> None:
+        if path == _OBJECT_PATH:
+            self.current = {"id": None, "type": None, "typeGuid": None, "name": None}
+            self.current_sources = []
+        elif self._in_container(path) and len(path) == 5 and path[4] in ("param_input", "param_output"):
+            self.port = {"kind": path[4], "id": None, "name": None, "nickname": None}
+            self.port_sources = []
+
+    def _leave(self, path: Tuple[str, ...]) -> None:
+        if path == _OBJECT_PATH and self.current is not None:
+            component = self.current
+            if component["id"] is not None:
+                self.params[component["id"]] = (component["id"], component.get("paramName"))
+                for source_param in self.current_sources:
+                    self.sources.append((source_param, component["id"], component.get("paramName")))
+                component.pop("paramName", None)
+                self.components.append(component)
+            self.current = None
+        elif self.port is not None and len(path) == 5 and path[4] == self.port["kind"]:
+            self._finish_port()
+
+    def _finish_port(self) -> None:
+        port, component = self.port, self.current
+        self.port = None
+        if component is None or component["id"] is None:
+            return
+
+        key = "inputs" if port["kind"] == "param_input" else "outputs"
+        component.setdefault(key, []).append({"name": port["name"], "nickname": port["nickname"]})
+        if port["id"] is not None:
+            self.params[port["id"]] = (component["id"], port["name"])
+        for source_param in self.port_sources:
+            self.sources.append((source_param, component["id"], port["name"]))
+
+    @staticmethod
+    def _in_container(path: Tuple[str, ...]) -> bool:
+        return path[:3] == _OBJECT_PATH and len(path) >= 4 and path[3] == "Container"
+
+    def _item(self, path: Tuple[str, ...], item: ET.Element) -> None:
+        name = item.get("name")
+
+        if path == ("Definition", "DocumentHeader") and name == "DocumentID":
+            self.document_id = item.text
+        elif path == ("Definition", "DefinitionProperties") and name == "Name":
+            self.name = item.text
+        elif self.current is None:
+            return
+        elif path == _OBJECT_PATH:
+            if name == "GUID":
+                self.current["typeGuid"] = item.text
+                self.current["type"] = TYPE_GUIDS.get((item.text or "").lower(), self.current["type"])
+            elif name == "Name" and (self.current["typeGuid"] or "").lower() not in TYPE_GUIDS:
+                self.current["type"] = KNOWN_TYPES.get(item.text, item.text)
+        elif path == _OBJECT_PATH + ("Container",):
+            self._container_item(name, item)
+        elif path == _OBJECT_PATH + ("Container", "Attributes") and name == "Pivot":
+            self.current["position"] = {"x": _float(item.findtext("X")), "y": _float(item.findtext("Y"))}
+        elif path == _OBJECT_PATH + ("Container", "Slider") and name in ("Min", "Max", "Value"):
+            self.current.setdefault("parameters", {})[name.lower()] = _float(item.text)
+        elif self.port is not None and len(path) == 5 and path[4] == self.port["kind"]:
+            if name == "InstanceGuid":
+                self.port["id"] = item.text
+            elif name in ("Name", "NickName"):
+                self.port[name.lower()] = item.text
+            elif name == "Source":
+                self.port_sources.append(item.text)
+
+    def _container_item(self, name: str, item: ET.Element) -> None:
+        component = self.current
+        if name == "InstanceGuid":
+            component["id"] = item.text
+        elif name == "NickName":
+            component["name"] = item.text
+        elif name == "Name":
+            component["paramName"] = item.text
+        elif name == "Source":
+            self.current_sources.append(item.text)
+        elif name == "UserText" and component["type"] == "GH_Panel":
+            component["parameters"] = {"text": item.text or ""}
+        elif name == "ToggleValue" and component["type"] == "GH_BooleanToggle":
+            component["parameters"] = {"value": (item.text or "").strip().lower() == "true"}
+
+
+def _float(text: Optional[str]) -> Optional[float]:
+    try:
+        return float(text)
+    except (TypeError, ValueError):
+        return None
@@ -0,0 +1,298 @@
+"""
+多個 Grasshopper 實例的負載平衡
+
+同一台機器上可以開多個 Rhino，各自在不同的埠上執行 MCP 組件。HostPool 把命令分配到這些實例，
+介面與 AsyncGrasshopperClient 相同（request / pipeline / check_connection / aclose / stats），
+bridge 與 output_data 不需要知道後面有幾個實例。
+
+- 工作階段（session）黏著：文檔狀態存在某一個實例中，load_document 之後的讀取必須送到同一個實例。
+  每個命令屬於一個工作階段（未指定時為預設工作階段），工作階段第一次使用時綁定到一個實例，
+  之後的命令（包含 load_document、clear_document）都送到該實例：共用同一個工作階段的呼叫端
+  可能還在讀取該實例上的文檔，改綁會讓它們的後續請求落到另一份文檔上。
+- 最少進行中請求：新的工作階段綁定到目前進行中請求最少的實例。
+  負載平衡只發生在綁定時：同一個工作階段的命令都送到同一個實例。MCP 橋接的每個 MCP 連接是一個工作階段，
+  因此只有一個 MCP 客戶端時所有命令都在一個實例上；多個實例只在多個客戶端或腳本以 host_session()
+  分開工作階段時分擔負載。
+- 健康檢查：無法連接的實例、或連續失敗（斷線、逾時）達到 eject_after 次的實例暫時移出 eject_seconds 秒，
+  綁定在上面的工作階段改綁到其他實例（該實例上的文檔狀態已無法使用）。
+  無法連接（請求未送出）且工作階段尚無狀態時，改送到其他實例重試一次。
+
+Example:
+    pool = HostPool([("127.0.0.1", 8080), ("127.0.0.1", 8081)])
+    with pool.session("student_01"):
+        await pool.request(build_command("load_document", {"path": path}))
+        await pool.request(build_command("export_document_graph"))
+"""
+
+import asyncio
+import contextlib
+import contextvars
+import itertools
+import time
+import weakref
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from async_client import AsyncGrasshopperClient
+from gh_protocol import RECONNECTABLE_ERRORS, UNIX_PREFIX, format_endpoint
+from metrics import Metrics
+from wire_codec import DEFAULT_COMPRESS_THRESHOLD
+
+# 未指定工作階段的命令使用的預設工作階段
+DEFAULT_SESSION = "default"
+
+# 算作實例失敗的錯誤（插件回報的錯誤回應不算）
+HOST_ERRORS = RECONNECTABLE_ERRORS + (OSError, asyncio.TimeoutError)
+
+_current_session: "contextvars.ContextVar[Optional[str]]" = contextvars.ContextVar("grasshopper_session", default=None)
+
+
+def parse_endpoints(value: str, default_port: int = 8080) -> List[Tuple[str, int]]:
+    """解析 "host:port,host:port"（省略埠時使用 default_port；"unix:<路徑>" 為 Unix domain socket，埠為 0）"""
+    endpoints = []
+    for item in value.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        if item.startswith(UNIX_PREFIX):
+            endpoints.append((item, 0))
+            continue
+        host, _, port = item.rpartition(":")
+        if not host:
+            host, port = port, ""
+        endpoints.append((host, int(port) if port else default_port))
+    if not endpoints:
+        raise ValueError("No Grasshopper endpoints given")
+    return endpoints
+
+
+class _Host:
+    """一個實例：客戶端與健康狀態"""
+
+    def __init__(self, client: AsyncGrasshopperClient):
+        self.client = client
+        self.failures = 0
+        self.ejected_until = 0.0
+        self.ejections = 0
+        self.requests = 0
+
+    @property
+    def name(self) -> str:
+        return format_endpoint(self.client.host, self.client.port)
+
+    def healthy(self, now: float) -> bool:
+        return now >= self.ejected_until
+
+
+class HostPool:
+    """
+    多個 Grasshopper 實例的客戶端
+
+    Args:
+        endpoints: [(host, port), ...]
+        max_size / idle_timeout / timeout / metrics / codec / compression / compress_threshold:
+            傳給每個實例的 AsyncGrasshopperClient（統計由所有實例共用）
+        eject_after: 連續失敗幾次後移出
+        eject_seconds: 移出的秒數，之後重新參與分配
+    """
+
+    def __init__(
+        self,
+        endpoints: Sequence[Tuple[str, int]],
+        max_size: int = 4,
+        idle_timeout: float = 30.0,
+        timeout: float = 10.0,
+        eject_after: int = 3,
+        eject_seconds: float = 10.0,
+        metrics: Optional[Metrics] = None,
+        codec: str = "auto",
+        compression: str = "off",
+        compress_threshold: int = DEFAULT_COMPRESS_THRESHOLD,
+    ):
+        if not endpoints:
+            raise ValueError("HostPool needs at least one endpoint")
+
+        self.hosts = [_Host(AsyncGrasshopperClient(host, port, max_size, idle_timeout, timeout, metrics, codec,
+                                                   compression, compress_threshold))
+                      for host, port in endpoints]
+        self.metrics = metrics
+        self.timeout = timeout
+        self.eject_after = eject_after
+        self.eject_seconds = eject_seconds
+
+        self._sessions: Dict[str, _Host] = {}
+        self._pinned: Dict[str, _Host] = {}
+        self._owners: "weakref.WeakKeyDictionary[Any, str]" = weakref.WeakKeyDictionary()
+        self._owner_ids = itertools.count(1)
+        self._rotation = itertools.count()
+        self.retries = 0
+
+    # ------------------------------------------------------------------
+    # 工作階段
+    # ------------------------------------------------------------------
+
+    @contextlib.contextmanager
+    def session(self, key: str) -> Iterator[str]:
+        """在 with 區塊內（包含其中建立的 asyncio 工作）的命令都屬於 key 工作階段；結束時解除綁定"""
+        token = _current_session.set(key)
+        try:
+            yield key
+        finally:
+            _current_session.reset(token)
+            self.release(key)
+
+    @contextlib.contextmanager
+    def pinned(self, session: Optional[str] = None) -> Iterator[str]:
+        """
+        with 區塊內工作階段固定在目前綁定的實例（尚未綁定時先綁定），返回 "host:port"
+
+        實例被移出時也不改綁、錯誤直接回報：例如編輯階段的 begin / commit 必須送到同一個實例。
+        """
+        key, host, _ = self._route(session)
+        previous = self._pinned.get(key)
+        self._pinned[key] = host
+        try:
+            yield host.name
+        finally:
+            if previous is None:
+                self._pinned.pop(key, None)
+            else:
+                self._pinned[key] = previous
+
+    def session_for(self, owner: Any, label: str = "session") -> str:
+        """
+        owner（例如 MCP 連接）專屬的工作階段名稱；owner 被回收時自動解除綁定
+
+        名稱以遞增序號區分，不會沿用已結束的 owner 的綁定。
+        """
+        key = self._owners.get(owner)
+        if key is None:
+            key = f"{label}:{next(self._owner_ids)}"
+            self._owners[owner] = key
+            weakref.finalize(owner, self.release, key)
+        return key
+
+    def release(self, key: str) -> None:
+        """解除工作階段的綁定"""
+        self._sessions.pop(key, None)
+
+    def host_for(self, session: Optional[str] = None) -> Optional[str]:
+        """工作階段目前綁定的實例（"host:port"），尚未綁定時為 None"""
+        host = self._sessions.get(session or _current_session.get() or DEFAULT_SESSION)
+        return host.name if host else None
+
+    # ------------------------------------------------------------------
+    # 與 AsyncGrasshopperClient 相同的介面
+    # ------------------------------------------------------------------
+
+    async def request(self, command: Dict[str, Any], timeout: Optional[float] = None, session: Optional[str] = None) -> Dict[str, Any]:
+        """發送命令到工作階段綁定的實例並等待回應"""
+        key, host, fresh = self._route(session)
+        try:
+            return await self._call(host, host.client.request(command, timeout=timeout))
+        except ConnectionRefusedError:
+            if not fresh:
+                raise
+            # 請求未送出、工作階段也還沒有狀態：改用其他實例
+            key, host, _ = self._route(key, rebind=True)
+            self.retries += 1
+            return await self._call(host, host.client.request(command, timeout=timeout))
+
+    async def pipeline(
+        self,
+        commands: List[Dict[str, Any]],
+        timeout: Optional[float] = None,
+        ordered: bool = True,
+        session: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """管線化發送多個命令；整批送到工作階段綁定的實例"""
+        _, host, _ = self._route(session)
+        return await self._call(host, host.client.pipeline(commands, timeout=timeout, ordered=ordered))
+
+    async def check_connection(self, timeout: float = 2.0) -> bool:
+        """至少一個實例可以連接"""
+        results = await asyncio.gather(*[h.client.check_connection(timeout) for h in self.hosts])
+        return any(results)
+
+    async def aclose(self):
+        """關閉所有實例的閒置連接"""
+        for host in self.hosts:
+            await host.client.aclose()
+
+    @property
+    def in_flight(self) -> int:
+        return sum(h.client.in_flight for h in self.hosts)
+
+    def stats(self) -> Dict[str, Any]:
+        """各實例的統計資訊與健康狀態"""
+        now = time.monotonic()
+        sessions: Dict[str, int] = {}
+        for host in self._sessions.values():
+            sessions[host.name] = sessions.get(host.name, 0) + 1
+        return {
+            "hosts": [
+                dict(host.client.stats(),
+                     healthy=host.healthy(now),
+                     requests=host.requests,
+                     consecutive_failures=host.failures,
+                     ejections=host.ejections,
+                     sessions=sessions.get(host.name, 0))
+                for host in self.hosts
+            ],
+            "sessions": len(self._sessions),
+            "retries": self.retries,
+        }
+
+    # ------------------------------------------------------------------
+    # 內部
+    # ------------------------------------------------------------------
+
+    def _route(self, session: Optional[str], rebind: bool = False) -> Tuple[str, _Host, bool]:
+        """決定命令送到哪個實例；返回 (工作階段, 實例, 是否剛綁定)"""
+        key = session or _current_session.get() or DEFAULT_SESSION
+        pinned = self._pinned.get(key)
+        if pinned is not None:
+            self._sessions[key] = pinned
+            return key, pinned, False
+
+        now = time.monotonic()
+        host = self._sessions.get(key)
+
+        # 只在第一次使用、或實例被移出時綁定；已綁定的工作階段不因命令種類改綁
+        if rebind or host is None or not host.healthy(now):
+            exclude = host if rebind else None
+            host = self._least_loaded(now, exclude)
+            self._sessions[key] = host
+            return key, host, True
+        return key, host, False
+
+    def _least_loaded(self, now: float, exclude: Optional[_Host] = None) -> _Host:
+        """進行中請求最少的健康實例（相同時輪流）；全部被移出時選最快恢復的"""
+        candidates = [h for h in self.hosts if h.healthy(now) and h is not exclude]
+        if not candidates:
+            candidates = [h for h in self.hosts if h is not exclude] or self.hosts
+            return min(candidates, key=lambda h: h.ejected_until)
+
+        offset = next(self._rotation)
+        count = len(self.hosts)
+        return min(candidates, key=lambda h: (h.client.in_flight, (self.hosts.index(h) - offset) % count))
+
+    async def _call(self, host: _Host, call):
+        host.requests += 1
+        try:
+            result = await call
+        except ConnectionRefusedError:
+            # 沒有實例在該埠上執行：立即移出
+            self._eject(host)
+            raise
+        except HOST_ERRORS:
+            host.failures += 1
+            if host.failures >= self.eject_after:
+                self._eject(host)
+            raise
+        host.failures = 0
+        return result
+
+    def _eject(self, host: _Host) -> None:
+        host.failures = 0
+        host.ejections += 1
+        host.ejected_until = time.monotonic() + self.eject_seconds
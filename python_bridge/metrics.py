@@ -0,0 +1,268 @@
+"""
+命令延遲與資料量統計
+
+每個命令類型記錄：次數、錯誤（插件回應 success: false）、失敗（逾時、斷線等例外）、
+各階段的延遲直方圖與請求 / 回應的位元組數。直方圖使用固定的桶，記錄一次只需要一次二分搜尋與幾次加法，
+不保存個別樣本；百分位數以所在桶的上限估計。
+
+階段：
+    queue       等待連接池中的空位
+    connect     建立新連接（重用連接時不記錄）
+    send        編碼並寫出命令
+    processing  命令寫出後到收到回應的第一個位元組（Grasshopper 處理時間 + 網路往返）
+    receive     第一個位元組到整行回應收完（大型回應的傳輸時間）
+    decode      解析回應 JSON
+    total       整個呼叫（包含以上全部）
+
+管線化的批次整批記錄在 "pipeline" 之下（只有 total），其中每個命令只記錄次數、錯誤與位元組數。
+
+Example:
+    metrics = Metrics()
+    client = AsyncGrasshopperClient("localhost", 8080, metrics=metrics)
+    ...
+    print(metrics.snapshot()["commands"]["get_document_info"]["latency"]["total"]["p95"])
+    print(metrics.prometheus())
+"""
+
+import contextlib
+import os
+import tempfile
+import threading
+import time
+from bisect import bisect_left
+from typing import Any, Dict, List, Optional, Sequence
+
+PHASES = ("queue", "connect", "send", "processing", "receive", "decode", "total")
+
+# 延遲的桶上限（秒）
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# 資料量的桶上限（位元組）
+SIZE_BUCKETS = (128, 512, 2048, 8192, 32768, 131072, 524288, 2097152, 8388608, 33554432)
+
+# 管線化批次的統計名稱
+PIPELINE = "pipeline"
+
+
+class Histogram:
+    """固定桶的直方圖（counts[i] 為落在 (bounds[i-1], bounds[i]] 的次數，最後一格為超過最大上限）"""
+
+    __slots__ = ("bounds", "counts", "sum", "count", "max")
+
+    def __init__(self, bounds: Sequence[float]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+        if value > self.max:
+            self.max = value
+
+    def quantile(self, q: float) -> Optional[float]:
+        """估計 q 分位數（所在桶的上限，不超過觀察到的最大值）"""
+        if not self.count:
+            return None
+        rank = q * self.count
+        running = 0
+        for bound, count in zip(self.bounds, self.counts):
+            running += count
+            if running >= rank:
+                return min(bound, self.max)
+        return self.max
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "mean": self.sum / self.count if self.count else None,
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "p99": self.quantile(0.99),
+            "max": self.max if self.count else None,
+        }
+
+
+class CommandStats:
+    """單一命令類型的統計"""
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.failures: Dict[str, int] = {}
+        self.latency = {phase: Histogram(LATENCY_BUCKETS) for phase in PHASES}
+        self.request_bytes = Histogram(SIZE_BUCKETS)
+        self.response_bytes = Histogram(SIZE_BUCKETS)
+
+    def summary(self) -> Dict[str, Any]:
+        failed = sum(self.failures.values())
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "failures": dict(self.failures),
+            "error_rate": (self.errors + failed) / self.count if self.count else 0.0,
+            "latency": {phase: h.summary() for phase, h in self.latency.items() if h.count},
+            "request_bytes": self.request_bytes.summary(),
+            "response_bytes": self.response_bytes.summary(),
+        }
+
+
+class RequestTrace:
+    """一次請求的計時：依序標記每個階段結束的時間"""
+
+    __slots__ = ("command", "started", "last", "phases", "request_bytes", "response_bytes")
+
+    def __init__(self, command: str):
+        self.command = command
+        self.started = self.last = time.perf_counter()
+        self.phases: Dict[str, float] = {}
+        self.request_bytes = 0
+        self.response_bytes = 0
+
+    def mark(self, phase: str, at: Optional[float] = None) -> None:
+        """目前的階段在 at（預設為現在）結束；重連時同一階段的時間累加"""
+        now = time.perf_counter() if at is None else min(max(at, self.last), time.perf_counter())
+        self.phases[phase] = self.phases.get(phase, 0.0) + now - self.last
+        self.last = now
+
+
+class Metrics:
+    """所有命令的統計（可在多個事件迴圈 / 執行緒間共用）"""
+
+    def __init__(self):
+        self.started = time.time()
+        self._commands: Dict[str, CommandStats] = {}
+        self._lock = threading.Lock()
+
+    def trace(self, command: Optional[str]) -> RequestTrace:
+        """開始記錄一次請求"""
+        return RequestTrace(command or "unknown")
+
+    def record(self, trace: RequestTrace, success: bool) -> None:
+        """請求完成（收到回應；success 為回應的 success 欄位）"""
+        total = time.perf_counter() - trace.started
+        with self._lock:
+            stats = self._stats(trace.command)
+            stats.count += 1
+            if not success:
+                stats.errors += 1
+            for phase, seconds in trace.phases.items():
+                stats.latency[phase].observe(seconds)
+            stats.latency["total"].observe(total)
+            if trace.request_bytes:
+                stats.request_bytes.observe(trace.request_bytes)
+            if trace.response_bytes:
+                stats.response_bytes.observe(trace.response_bytes)
+
+    def record_failure(self, trace: RequestTrace, reason: str) -> None:
+        """請求沒有得到回應（逾時、斷線、取消等）"""
+        total = time.perf_counter() - trace.started
+        with self._lock:
+            stats = self._stats(trace.command)
+            stats.count += 1
+            stats.failures[reason] = stats.failures.get(reason, 0) + 1
+            stats.latency["total"].observe(total)
+            if trace.request_bytes:
+                stats.request_bytes.observe(trace.request_bytes)
+
+    def record_pipelined(self, command: Optional[str], request_bytes: int, response_bytes: int, success: bool) -> None:
+        """管線化批次中的一個命令（延遲記錄在整個批次上）"""
+        with self._lock:
+            stats = self._stats(command or "unknown")
+            stats.count += 1
+            if not success:
+                stats.errors += 1
+            stats.request_bytes.observe(request_bytes)
+            stats.response_bytes.observe(response_bytes)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._commands.clear()
+            self.started = time.time()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """所有命令的統計摘要（grasshopper://metrics）"""
+        with self._lock:
+            commands = {name: stats.summary() for name, stats in sorted(self._commands.items())}
+        return {
+            "uptime_seconds": time.time() - self.started,
+            "phases": list(PHASES),
+            "commands": commands,
+        }
+
+    def prometheus(self, prefix: str = "grasshopper") -> str:
+        """Prometheus 文字格式"""
+        lines: List[str] = [
+            f"# HELP {prefix}_commands_total Commands sent to Grasshopper.",
+            f"# TYPE {prefix}_commands_total counter",
+        ]
+        with self._lock:
+            commands = sorted(self._commands.items())
+            for name, stats in commands:
+                lines.append(f'{prefix}_commands_total{{command="{_label(name)}"}} {stats.count}')
+
+            lines += [f"# HELP {prefix}_command_errors_total Commands answered with success=false.",
+                      f"# TYPE {prefix}_command_errors_total counter"]
+            for name, stats in commands:
+                lines.append(f'{prefix}_command_errors_total{{command="{_label(name)}"}} {stats.errors}')
+
+            lines += [f"# HELP {prefix}_command_failures_total Commands without a response (timeout, connection errors).",
+                      f"# TYPE {prefix}_command_failures_total counter"]
+            for name, stats in commands:
+                for reason, count in sorted(stats.failures.items()):
+                    lines.append(f'{prefix}_command_failures_total{{command="{_label(name)}",reason="{_label(reason)}"}} {count}')
+
+            lines += [f"# HELP {prefix}_command_seconds Command latency by phase.",
+                      f"# TYPE {prefix}_command_seconds histogram"]
+            for name, stats in commands:
+                for phase, histogram in stats.latency.items():
+                    if histogram.count:
+                        lines += _histogram_lines(f"{prefix}_command_seconds", f'command="{_label(name)}",phase="{phase}"', histogram)
+
+            for direction in ("request", "response"):
+                metric = f"{prefix}_command_{direction}_bytes"
+                lines += [f"# HELP {metric} Encoded {direction} size.", f"# TYPE {metric} histogram"]
+                for name, stats in commands:
+                    histogram = getattr(stats, f"{direction}_bytes")
+                    if histogram.count:
+                        lines += _histogram_lines(metric, f'command="{_label(name)}"', histogram)
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: str, prefix: str = "grasshopper") -> None:
+        """以 Prometheus 文字格式寫入檔案（原子地取代，可供 node_exporter 的 textfile collector 讀取）"""
+        directory = os.path.dirname(os.path.abspath(path))
+        fd, temp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(self.prometheus(prefix))
+            os.replace(temp, path)
+        except BaseException:
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(temp)
+            raise
+
+    def _stats(self, command: str) -> CommandStats:
+        stats = self._commands.get(command)
+        if stats is None:
+            stats = self._commands[command] = CommandStats()
+        return stats
+
+
+def _histogram_lines(metric: str, labels: str, histogram: Histogram) -> List[str]:
+    lines = []
+    running = 0
+    for bound, count in zip(histogram.bounds, histogram.counts):
+        running += count
+        lines.append(f'{metric}_bucket{{{labels},le="{bound:g}"}} {running}')
+    lines.append(f'{metric}_bucket{{{labels},le="+Inf"}} {histogram.count}')
+    lines.append(f"{metric}_sum{{{labels}}} {histogram.sum:.9g}")
+    lines.append(f"{metric}_count{{{labels}}} {histogram.count}")
+    return lines
+
+
+def _label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
@@ -0,0 +1,335 @@
+"""
+組件輸出數據的分頁讀取
+
+get_component_output_data 接受 offset / limit，回應中帶有
+totalCount 與 nextOffset（讀完時為 null）。大型輸出（數十萬個點）
+以固定大小的頁面取回，每頁解析後立即交給呼叫端，
+不需要在記憶體中同時保存整個輸出的 JSON 字串與解析結果。
+
+encoding = "binary" 時，點 / 向量 / 平面 / 數值以 little-endian float64
+陣列（base64）傳送，直接解碼為 array.array，不需要逐項解析 "{x, y, z}" 字串：
+    {"encoding": "binary", "kind": "point", "stride": 3, "values": "<base64>",
+     "branches": [{"path": "{0;0}", "count": 120}, ...], ...}
+無法以數值表示的類型（曲線、文字等）插件會退回文字編碼。
+每頁的 encoding 標示格式："text"（ToString 文字）、"json"（數值本身，例如 Slider）、"binary"；
+原版插件的回應沒有 encoding，依內容判斷。
+
+NumPy（選用）：OutputValues.as_array() / path_index() 以零複製方式
+取得 N×3 點陣列、1-D 數值陣列與 DataTree 分支索引。
+"""
+
+import array
+import base64
+import re
+import sys
+from typing import Any, AsyncIterator, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from async_client import AsyncGrasshopperClient, run_sync
+from gh_protocol import build_command
+
+# 每頁預設項目數
+DEFAULT_PAGE_SIZE = 10000
+
+# 每個項目的數值個數：平面為原點、X 軸、Y 軸
+STRIDES = {"number": 1, "point": 3, "vector": 3, "plane": 9}
+
+# 文字編碼中的數字（"{1.5, -2, 3e-05}"）
+_NUMBER = re.compile(r"[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?")
+
+
+class OutputDataError(RuntimeError):
+    """插件回報錯誤，或分頁期間輸出發生變化"""
+
+
+class OutputValues:
+    """
+    解碼後的數值輸出
+
+    values 為扁平的 float64 陣列，每個項目佔 stride 個數值；
+    branches 為 [{"path": "{0;0}", "count": n}, ...]，依序對應項目（原版插件為 None）
+    """
+
+    __slots__ = ("kind", "stride", "values", "branches")
+
+    def __init__(self, kind: str, stride: int, values: Optional[array.array] = None, branches: Optional[List[Dict[str, Any]]] = None):
+        self.kind = kind
+        self.stride = stride
+        self.values = values if values is not None else array.array("d")
+        self.branches = branches
+
+    def __len__(self) -> int:
+        return len(self.values) // self.stride
+
+    @property
+    def paths(self) -> List[str]:
+        """分支路徑（依序）；原版插件沒有路徑資訊時視為單一分支 {0}"""
+        if self.branches is None:
+            return ["{0}"] if len(self) else []
+        return [branch["path"] for branch in self.branches]
+
+    def as_array(self):
+        """
+        NumPy 陣列（與 values 共用記憶體）
+
+        number 為 shape (N,)，point / vector 為 (N, 3)，plane 為 (N, 3, 3)（原點、X 軸、Y 軸）
+        """
+        np = _numpy()
+        data = np.frombuffer(self.values, dtype=np.float64)
+        if self.kind == "number":
+            return data
+        if self.kind == "plane":
+            return data.reshape(-1, 3, 3)
+        return data.reshape(-1, self.stride)
+
+    def path_index(self):
+        """每個項目所屬分支在 paths 中的索引，shape (N,)"""
+        np = _numpy()
+        if self.branches is None:
+            return np.zeros(len(self), dtype=np.intp)
+        counts = np.fromiter((branch["count"] for branch in self.branches), dtype=np.intp, count=len(self.branches))
+        return np.repeat(np.arange(len(counts), dtype=np.intp), counts)
+
+    def items(self) -> Iterator[Any]:
+        """逐項產生數值（number 為 float，其他為 tuple）"""
+        values, stride = self.values, self.stride
+        if stride == 1:
+            return iter(values)
+        return (tuple(values[i:i + stride]) for i in range(0, len(values), stride))
+
+    def extend(self, other: "OutputValues") -> None:
+        """接上下一頁（相同路徑的分支合併）"""
+        if other.kind != self.kind and len(other):
+            if len(self):
+                raise OutputDataError(f"Output kind changed while paging ({self.kind} -> {other.kind})")
+            self.kind, self.stride = other.kind, other.stride
+        self.values.extend(other.values)
+
+        if self.branches is None or other.branches is None:
+            self.branches = None
+            return
+        for branch in other.branches:
+            if self.branches and self.branches[-1]["path"] == branch["path"]:
+                self.branches[-1] = {"path": branch["path"], "count": self.branches[-1]["count"] + branch["count"]}
+            else:
+                self.branches.append(dict(branch))
+
+
+def _numpy():
+    """延遲載入 NumPy（選用依賴）"""
+    try:
+        import numpy
+    except ImportError as e:
+        raise ImportError("NumPy is required for array access: pip install numpy") from e
+    return numpy
+
+
+def output_params(
+    component_id: str,
+    output_index: int = 0,
+    offset: int = 0,
+    limit: Optional[int] = None,
+    encoding: Optional[str] = None,
+) -> Dict[str, Any]:
+    """建立 get_component_output_data 的參數"""
+    params: Dict[str, Any] = {
+        "componentId": component_id,
+        "outputIndex": output_index,
+    }
+    if offset:
+        params["offset"] = offset
+    if limit is not None:
+        params["limit"] = limit
+    if encoding is not None:
+        params["encoding"] = encoding
+    return params
+
+
+def pack_values(values: Iterable[float]) -> str:
+    """將數值編碼為 little-endian float64 的 base64 字串（與插件相同格式）"""
+    packed = array.array("d", values)
+    if sys.byteorder == "big":
+        packed.byteswap()
+    return base64.b64encode(packed.tobytes()).decode("ascii")
+
+
+def unpack_values(encoded: str) -> array.array:
+    """解碼 pack_values / 插件產生的 base64 float64 陣列"""
+    values = array.array("d")
+    values.frombytes(base64.b64decode(encoded))
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values
+
+
+def _parse_text_page(page: Dict[str, Any]) -> OutputValues:
+    """原版插件或不支援的類型：從 ToString 文字解析數值（較慢）"""
+    values = array.array("d")
+    stride = None
+    for item in page["data"]:
+        if isinstance(item, (int, float)):
+            numbers = [item]
+        else:
+            numbers = [float(n) for n in _NUMBER.findall(str(item))]
+        if stride is None:
+            stride = len(numbers)
+        if len(numbers) != stride or stride not in (1, 3):
+            raise OutputDataError(f"Output item is not numeric: {item!r}")
+        values.extend(numbers)
+
+    if stride == 3:
+        kind = "vector" if "vector" in str(page.get("outputType", "")).lower() else "point"
+    else:
+        kind = "number"
+    return OutputValues(kind, STRIDES[kind], values, None)
+
+
+def _json_page(page: Dict[str, Any]) -> OutputValues:
+    """encoding = "json"：data 是數值本身"""
+    try:
+        values = array.array("d", page["data"])
+    except TypeError:
+        raise OutputDataError("JSON output page contains non-numeric items") from None
+    return OutputValues("number", STRIDES["number"], values, None)
+
+
+def decode_page(page: Dict[str, Any]) -> OutputValues:
+    """將一頁輸出解碼為 OutputValues（依 encoding 選擇格式）"""
+    encoding = page.get("encoding")
+    if encoding == "json":
+        return _json_page(page)
+    if encoding != "binary":
+        return _parse_text_page(page)
+    values = unpack_values(page["values"])
+    stride = page["stride"]
+    if len(values) != page["count"] * stride:
+        raise OutputDataError(f"Binary output has {len(values)} values, expected {page['count']} x {stride}")
+    return OutputValues(page["kind"], stride, values, list(page.get("branches") or []))
+
+
+async def iter_output_pages(
+    client: AsyncGrasshopperClient,
+    component_id: str,
+    output_index: int = 0,
+    page_size: int = DEFAULT_PAGE_SIZE,
+    timeout: Optional[float] = None,
+    encoding: Optional[str] = None,
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    逐頁讀取組件輸出（async generator），每次產生一頁的 data
+
+    原版插件不支援分頁時，第一頁即包含全部數據。
+    若分頁期間重新計算導致總數改變，拋出 OutputDataError。
+    """
+    if page_size <= 0:
+        raise ValueError("page_size must be positive")
+
+    offset = 0
+    total = None
+    while True:
+        command = build_command("get_component_output_data", output_params(component_id, output_index, offset, page_size, encoding))
+        response = await client.request(command, timeout=timeout)
+        if not response.get("success"):
+            raise OutputDataError(response.get("error") or "get_component_output_data failed")
+
+        page = response["data"]
+        if "nextOffset" not in page:
+            yield page
+            return
+
+        if total is None:
+            total = page["totalCount"]
+        elif page["totalCount"] != total:
+            raise OutputDataError(
+                f"Output of {component_id} changed while paging ({total} -> {page['totalCount']} items)"
+            )
+
+        yield page
+        offset = page["nextOffset"]
+        if offset is None:
+            return
+
+
+async def iter_output_items(
+    client: AsyncGrasshopperClient,
+    component_id: str,
+    output_index: int = 0,
+    page_size: int = DEFAULT_PAGE_SIZE,
+    timeout: Optional[float] = None,
+) -> AsyncIterator[Any]:
+    """逐項讀取組件輸出（async generator）"""
+    async for page in iter_output_pages(client, component_id, output_index, page_size, timeout):
+        for item in page["data"]:
+            yield item
+
+
+async def _next_page(pages: AsyncIterator[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    try:
+        return await pages.__anext__()
+    except StopAsyncIteration:
+        return None
+
+
+def iter_output_items_sync(
+    client: AsyncGrasshopperClient,
+    component_id: str,
+    output_index: int = 0,
+    page_size: int = DEFAULT_PAGE_SIZE,
+    timeout: Optional[float] = None,
+) -> Iterator[Any]:
+    """逐項讀取組件輸出（同步 generator，供腳本使用）；只在需要時才請求下一頁"""
+    pages = iter_output_pages(client, component_id, output_index, page_size, timeout)
+    try:
+        while True:
+            page = run_sync(_next_page(pages))
+            if page is None:
+                return
+            yield from page["data"]
+    finally:
+        run_sync(pages.aclose())
+
+
+async def read_output_values(
+    client: AsyncGrasshopperClient,
+    component_id: str,
+    output_index: int = 0,
+    page_size: int = DEFAULT_PAGE_SIZE,
+    timeout: Optional[float] = None,
+) -> OutputValues:
+    """以二進位編碼分頁讀取數值輸出，合併為一個 OutputValues"""
+    result = None
+    async for page in iter_output_pages(client, component_id, output_index, page_size, timeout, encoding="binary"):
+        decoded = decode_page(page)
+        if result is None:
+            result = decoded
+        else:
+            result.extend(decoded)
+    return result if result is not None else OutputValues("number", 1, branches=[])
+
+
+def read_output_values_sync(
+    client: AsyncGrasshopperClient,
+    component_id: str,
+    output_index: int = 0,
+    page_size: int = DEFAULT_PAGE_SIZE,
+    timeout: Optional[float] = None,
+) -> OutputValues:
+    """read_output_values 的同步版本（供腳本使用）"""
+    return run_sync(read_output_values(client, component_id, output_index, page_size, timeout))
+
+
+def read_output_array_sync(
+    client: AsyncGrasshopperClient,
+    component_id: str,
+    output_index: int = 0,
+    page_size: int = DEFAULT_PAGE_SIZE,
+    timeout: Optional[float] = None,
+) -> Tuple[Any, Any, List[str]]:
+    """
+    以 NumPy 陣列讀取數值輸出（需要 NumPy）
+
+    Returns:
+        (data, path_index, paths)：data 見 OutputValues.as_array，
+        path_index[i] 為第 i 個項目所在分支 paths[path_index[i]]
+    """
+    values = read_output_values_sync(client, component_id, output_index, page_size, timeout)
+    return values.as_array(), values.path_index(), values.paths
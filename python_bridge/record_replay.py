@@ -0,0 +1,371 @@
+"""
+命令流量的錄製與重播
+
+錄製：RecordingProxy 是一個夾在橋接與插件之間的 TCP 代理，逐行轉送命令與回應，
+同時把每一組 (命令, 回應) 寫入 JSONL 檔案：
+
+    {"t": 距離開始錄製的秒數, "command": {...}, "response": {...}, "elapsed": 插件回應時間}
+
+重播：replay() 依照錄製時的時間間隔（除以 rate）把命令送到任何相容的伺服器——通常是
+simulator.GrasshopperSimulator——並以 metrics.Metrics 統計延遲。錄製中由插件產生的組件 ID
+會在重播時對應到新伺服器產生的 ID，讓 add_component_advanced 之後的 set_slider_value 等命令可以重播到新文檔上。
+
+用法:
+    # 橋接連到 8081，代理轉送到插件的 8080
+    python record_replay.py record --listen 8081 --upstream localhost:8080 --output session.jsonl
+    # 以兩倍速度重播到模擬器
+    python record_replay.py replay session.jsonl --port 8080 --rate 2
+"""
+
+import argparse
+import asyncio
+import json
+import re
+import socket
+import socketserver
+import sys
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from async_client import AsyncGrasshopperClient
+from gh_protocol import MAX_LINE_BYTES, encode_command, error_response, format_endpoint, open_socket
+from host_pool import parse_endpoints
+from metrics import Metrics
+from wire_codec import NEGOTIATE_COMMAND
+
+# 插件產生的 ID（組件與參數的 InstanceGuid）
+_GUID = re.compile(r"^[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}$")
+
+
+# ============================================================================
+# 錄製
+# ============================================================================
+
+class _RecordingHandler(socketserver.StreamRequestHandler):
+    """一個橋接連接：每個命令轉送到插件，回應轉回橋接並寫入錄製檔"""
+
+    def setup(self):
+        super().setup()
+        self.upstream: Optional[Tuple[socket.socket, Any]] = None
+
+    def finish(self):
+        self._close_upstream()
+        super().finish()
+
+    def _close_upstream(self):
+        if self.upstream is not None:
+            sock, reader = self.upstream
+            reader.close()
+            sock.close()
+            self.upstream = None
+
+    def _forward(self, line: bytes) -> bytes:
+        """送出一行命令並讀回一行回應；原版插件回應後即關閉連接，因此連接斷開時重新連接一次"""
+        proxy = self.server.proxy
+        for attempt in (1, 2):
+            if self.upstream is None:
+                sock = open_socket(*proxy.upstream, timeout=proxy.timeout)
+                self.upstream = (sock, sock.makefile("rb"))
+            sock, reader = self.upstream
+            try:
+                sock.sendall(line)
+                response = reader.readline(MAX_LINE_BYTES + 1)
+            except OSError:
+                response = b""
+            if response.endswith(b"\n"):
+                return response
+            self._close_upstream()
+        raise ConnectionError(f"Grasshopper at {format_endpoint(*proxy.upstream)} closed the connection")
+
+    def handle(self):
+        proxy = self.server.proxy
+        while True:
+            line = self.rfile.readline(MAX_LINE_BYTES + 1)
+            if not line:
+                return
+            if not line.strip():
+                continue
+            if NEGOTIATE_COMMAND.encode() in line and _is_negotiation(line):
+                # 代理逐行轉送並錄製 JSON：拒絕編碼協商，橋接與插件之間保持 JSON
+                try:
+                    self.wfile.write(encode_command(error_response("Codec negotiation is not supported by the recording proxy")))
+                except OSError:
+                    return
+                continue
+
+            sent = time.perf_counter()
+            try:
+                response = self._forward(line)
+            except OSError as e:
+                response = encode_command(error_response(f"Error communicating with Grasshopper: {e}"))
+            elapsed = time.perf_counter() - sent
+
+            try:
+                self.wfile.write(response)
+            except OSError:
+                return
+            proxy._record(line, response, sent, elapsed)
+
+
+def _is_negotiation(line: bytes) -> bool:
+    try:
+        command = json.loads(line.decode("utf-8-sig"))
+    except ValueError:
+        return False
+    return isinstance(command, dict) and command.get("type") == NEGOTIATE_COMMAND
+
+
+class _ThreadingTCPServer(socketserver.ThreadingMixIn, socketserver.TCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class RecordingProxy:
+    """
+    錄製代理：橋接連到 host:port，命令轉送到 upstream 並錄製到 path
+
+    每個橋接連接使用自己的插件連接，命令依序轉送（管線化的命令在代理中逐一等待回應，
+    錄製的 elapsed 因此是單一命令的處理時間）。
+
+    Example:
+        with RecordingProxy(("localhost", 8080), "session.jsonl", port=8081):
+            ...  # GRASSHOPPER_PORT=8081 的橋接
+    """
+
+    def __init__(self, upstream: Tuple[str, int], path: str, host: str = "127.0.0.1", port: int = 0,
+                 timeout: float = 60.0):
+        self.upstream = upstream
+        self.path = path
+        self.timeout = timeout
+        self.recorded = 0
+
+        self._file = open(path, "a", encoding="utf-8")
+        self._lock = threading.Lock()
+        self._started = time.perf_counter()
+        self._server = _ThreadingTCPServer((host, port), _RecordingHandler)
+        self._server.proxy = self
+        self.host, self.port = self._server.server_address[:2]
+        self._thread: Optional[threading.Thread] = None
+
+    def _record(self, line: bytes, response: bytes, sent: float, elapsed: float) -> None:
+        try:
+            entry = {
+                "t": round(sent - self._started, 6),
+                "command": json.loads(line.decode("utf-8-sig")),
+                "response": json.loads(response.decode("utf-8-sig")),
+                "elapsed": round(elapsed, 6),
+            }
+        except ValueError:
+            return  # 無法解析的內容照常轉送，但不錄製
+        text = json.dumps(entry, ensure_ascii=False) + "\n"
+        with self._lock:
+            self._file.write(text)
+            self._file.flush()
+            self.recorded += 1
+
+    def serve_forever(self) -> None:
+        self._server.serve_forever(poll_interval=0.05)
+
+    def start(self) -> "RecordingProxy":
+        """在背景執行緒中啟動代理"""
+        self._thread = threading.Thread(target=self.serve_forever, name="recording-proxy", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+        with self._lock:
+            self._file.close()
+
+    def __enter__(self) -> "RecordingProxy":
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+def load_recording(path: str) -> List[Dict[str, Any]]:
+    """讀取錄製檔（略過空行），依時間排序"""
+    with open(path, encoding="utf-8") as f:
+        records = [json.loads(line) for line in f if line.strip()]
+    records.sort(key=lambda r: r.get("t", 0.0))
+    return records
+
+
+# ============================================================================
+# 重播
+# ============================================================================
+
+def _collect_ids(recorded: Any, replayed: Any, mapping: Dict[str, str]) -> None:
+    """比較同一命令在錄製與重播時的回應，記下位置相同但值不同的 GUID"""
+    if isinstance(recorded, dict) and isinstance(replayed, dict):
+        for key, value in recorded.items():
+            if key in replayed:
+                _collect_ids(value, replayed[key], mapping)
+    elif isinstance(recorded, list) and isinstance(replayed, list):
+        for old, new in zip(recorded, replayed):
+            _collect_ids(old, new, mapping)
+    elif isinstance(recorded, str) and isinstance(replayed, str) and recorded != replayed and _GUID.match(recorded):
+        mapping[recorded] = replayed
+
+
+def _rewrite_ids(value: Any, mapping: Dict[str, str]) -> Any:
+    """把命令中錄製時的 ID 換成重播伺服器的 ID（包括 sliderValues 等以 ID 為鍵的字典）"""
+    if not mapping:
+        return value
+    if isinstance(value, dict):
+        return {mapping.get(k, k): _rewrite_ids(v, mapping) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_rewrite_ids(v, mapping) for v in value]
+    if isinstance(value, str):
+        return mapping.get(value, value)
+    return value
+
+
+def _schedule(records: List[Dict[str, Any]], rate: float) -> Iterator[Tuple[float, Dict[str, Any]]]:
+    """(相對開始時間的送出時間, 錄製項目)；rate <= 0 代表不等待"""
+    if not records:
+        return
+    first = records[0].get("t", 0.0)
+    for record in records:
+        yield ((record.get("t", 0.0) - first) / rate if rate > 0 else 0.0), record
+
+
+async def replay_async(
+    records: List[Dict[str, Any]],
+    host: str,
+    port: int,
+    rate: float = 1.0,
+    concurrency: int = 4,
+    timeout: float = 30.0,
+    metrics: Optional[Metrics] = None,
+) -> Dict[str, Any]:
+    """
+    重播錄製的命令
+
+    Args:
+        records: load_recording() 的結果
+        host, port: 目標伺服器（插件或模擬器）
+        rate: 速度倍率（1 依原本的時間間隔，2 為兩倍速，0 為盡快送出）
+        concurrency: 同時進行的命令上限
+        timeout: 每個命令的期限（秒）
+        metrics: 記錄延遲的 Metrics（None 時建立新的）
+
+    Returns:
+        {"commands", "errors", "mismatches", "elapsed", "throughput", "lag", "metrics"}：
+        errors 為逾時與通訊錯誤，mismatches 為 success 與錄製時不同的命令，
+        lag 為實際送出時間落後排程的最大秒數（伺服器跟不上 rate 時增加）
+    """
+    metrics = metrics if metrics is not None else Metrics()
+    client = AsyncGrasshopperClient(host, port, max_size=max(1, concurrency), timeout=timeout, metrics=metrics)
+    slots = asyncio.Semaphore(max(1, concurrency))
+    mapping: Dict[str, str] = {}
+    outcome = {"errors": 0, "mismatches": 0, "lag": 0.0}
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+
+    async def send(record: Dict[str, Any]) -> None:
+        try:
+            command = _rewrite_ids(record["command"], mapping)
+            response = await client.request(command)
+        except (asyncio.TimeoutError, OSError):
+            outcome["errors"] += 1
+            return
+        finally:
+            slots.release()
+        expected = record.get("response") or {}
+        if bool(response.get("success")) != bool(expected.get("success")):
+            outcome["mismatches"] += 1
+        _collect_ids(expected.get("data"), response.get("data"), mapping)
+
+    tasks = []
+    try:
+        for at, record in _schedule(records, rate):
+            delay = start + at - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            await slots.acquire()
+            outcome["lag"] = max(outcome["lag"], loop.time() - start - at)
+            tasks.append(asyncio.ensure_future(send(record)))
+        await asyncio.gather(*tasks)
+    finally:
+        await client.aclose()
+
+    elapsed = loop.time() - start
+    return {
+        "commands": len(records),
+        "errors": outcome["errors"],
+        "mismatches": outcome["mismatches"],
+        "elapsed": elapsed,
+        "throughput": len(records) / elapsed if elapsed > 0 else None,
+        "lag": outcome["lag"],
+        "metrics": metrics.snapshot(),
+    }
+
+
+def replay(path: str, host: str = "127.0.0.1", port: int = 8080, **kwargs: Any) -> Dict[str, Any]:
+    """同步版本：讀取錄製檔並重播（參數見 replay_async）"""
+    return asyncio.run(replay_async(load_recording(path), host, port, **kwargs))
+
+
+def _print_report(report: Dict[str, Any]) -> None:
+    print(f"{report['commands']} commands in {report['elapsed']:.2f} s "
+          f"({report['throughput'] or 0:.1f}/s), max lag {report['lag'] * 1000:.1f} ms, "
+          f"{report['errors']} errors, {report['mismatches']} mismatches")
+    print(f"{'command':<28} {'count':>7} {'p50 ms':>9} {'p95 ms':>9} {'max ms':>9}")
+    for name, stats in report["metrics"]["commands"].items():
+        total = stats["latency"].get("total")
+        if not total:
+            continue
+        print(f"{name:<28} {stats['count']:>7} {total['p50'] * 1000:>9.2f} {total['p95'] * 1000:>9.2f} "
+              f"{total['max'] * 1000:>9.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Record and replay Grasshopper command traffic")
+    commands = parser.add_subparsers(dest="mode", required=True)
+
+    record = commands.add_parser("record", help="Proxy bridge traffic to the plugin and record it")
+    record.add_argument("--listen", type=int, default=8081, help="Port the bridge connects to")
+    record.add_argument("--host", default="127.0.0.1")
+    record.add_argument("--upstream", type=lambda value: parse_endpoints(value)[0], default=("127.0.0.1", 8080),
+                        help="Plugin host:port or unix:<path>")
+    record.add_argument("--output", required=True, help="JSONL file (appended)")
+
+    play = commands.add_parser("replay", help="Replay a recording against a plugin or simulator")
+    play.add_argument("recording")
+    play.add_argument("--host", default="127.0.0.1")
+    play.add_argument("--port", type=int, default=8080)
+    play.add_argument("--rate", type=float, default=1.0, help="Speed multiplier (0 = as fast as possible)")
+    play.add_argument("--concurrency", type=int, default=4)
+    play.add_argument("--timeout", type=float, default=30.0)
+    play.add_argument("--json", action="store_true", help="Print the full report as JSON")
+    args = parser.parse_args()
+
+    if args.mode == "record":
+        proxy = RecordingProxy(args.upstream, args.output, args.host, args.listen)
+        print(f"Recording {proxy.host}:{proxy.port} → {format_endpoint(*args.upstream)} into {args.output}",
+              file=sys.stderr)
+        try:
+            proxy.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            proxy._server.server_close()
+            print(f"Recorded {proxy.recorded} commands", file=sys.stderr)
+        return
+
+    report = replay(args.recording, args.host, args.port, rate=args.rate, concurrency=args.concurrency,
+                    timeout=args.timeout)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        _print_report(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,1198 @@
+"""
+Grasshopper 模擬器：在記憶體中的文檔上實作插件註冊的所有命令
+
+StandinServer 只把命令原樣回傳；GrasshopperSimulator 則維護一份模擬的文檔（組件、參數、連線、
+修訂號與變更紀錄、編輯階段），回應格式與 ComponentCommandHandler_Enhanced.cs 等處理器相同，
+讓橋接（bridge_enhanced.py、document_model、output_data）可以在沒有 Rhino 的 Linux 上執行與負載測試。
+
+- 命令在單一模擬 UI 執行緒上依序執行（與插件相同）
+- 每次求解花費 solve_latency + component_latency × 組件數 秒；
+  recompute=False、編輯階段與 batch 中的修改延後到最後求解一次
+- 組件輸出在讀取時依連線計算：數學、Series、Range、Circle 等常用組件有實際的計算，
+  其他類型以一個輸入、一個輸出（原樣傳遞）的通用組件表示
+- load_document 讀取 .ghx（ghx_reader）或 save_document 存下的 JSON 快照
+
+用法:
+    with GrasshopperSimulator(solve_latency=0.05) as sim:
+        ...  # 連接到 sim.host, sim.port
+
+    python simulator.py --port 8080 --solve-latency 0.05 --load definition.ghx
+"""
+
+import argparse
+import contextlib
+import json
+import math
+import os
+import sys
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+from gh_protocol import format_endpoint
+from ghx_reader import read_ghx
+from output_data import pack_values
+from standin_server import Handler, StandinServer
+
+# 與 DocumentChangeTracker.JournalCapacity 相同
+JOURNAL_CAPACITY = 10000
+
+# 與 ComponentCommandHandler_Enhanced.GraphFields 相同
+GRAPH_FIELDS = ("type", "name", "position", "parameters", "inputs", "outputs", "wires")
+
+SNAPSHOT_FORMAT = "grasshopper-simulator/1"
+
+
+# ============================================================================
+# 幾何值（輸出資料的文字格式與 Grasshopper 的 ToString 相同）
+# ============================================================================
+
+class Point(NamedTuple):
+    x: float
+    y: float
+    z: float
+
+    def __str__(self):
+        return "{" + ", ".join(_number(v) for v in self) + "}"
+
+
+class Vector(Point):
+    pass
+
+
+def _number(value: float) -> str:
+    return f"{value:.15g}"
+
+
+def _text(value: Any) -> str:
+    if isinstance(value, bool):
+        return "True" if value else "False"
+    if isinstance(value, float):
+        return _number(value)
+    return str(value)
+
+
+def _binary_kind(value: Any) -> Optional[str]:
+    if isinstance(value, Vector):
+        return "vector"
+    if isinstance(value, Point):
+        return "point"
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return "number"
+    return None
+
+
+def _as_float(value: Any) -> float:
+    if isinstance(value, str):
+        return float(value.strip())
+    return float(value)
+
+
+# ============================================================================
+# 組件目錄
+# ============================================================================
+
+class ParamSpec(NamedTuple):
+    name: str
+    nickname: str
+    type_name: str
+    optional: bool = False
+    default: Tuple[Any, ...] = ()
+
+
+class ComponentSpec(NamedTuple):
+    """組件類型：kind 為 component（有輸入輸出）或 slider / panel / toggle / param（獨立參數）"""
+    kind: str
+    name: str
+    nickname: str
+    description: str
+    inputs: Tuple[ParamSpec, ...] = ()
+    outputs: Tuple[ParamSpec, ...] = ()
+    compute: Optional[Callable[[Dict[str, List[Any]]], Dict[str, List[Any]]]] = None
+    type_name: str = "Generic Data"
+
+
+def _longest(*lists: List[Any]) -> List[Tuple[Any, ...]]:
+    """Grasshopper 的最長列表配對；任何一個輸入為空時沒有輸出"""
+    if any(not values for values in lists):
+        return []
+    count = max(len(values) for values in lists)
+    return [tuple(values[min(i, len(values) - 1)] for values in lists) for i in range(count)]
+
+
+def _binary(operation: Callable[[float, float], float]) -> Callable[[Dict[str, List[Any]]], Dict[str, List[Any]]]:
+    def compute(data):
+        results = []
+        for a, b in _longest(data["A"], data["B"]):
+            try:
+                results.append(operation(_as_float(a), _as_float(b)))
+            except (ValueError, ZeroDivisionError):
+                results.append(None)
+        return {"Result": results}
+    return compute
+
+
+def _series(data):
+    results = []
+    for start, step, count in _longest(data["Start"], data["Step"], data["Count"]):
+        results.extend(_as_float(start) + i * _as_float(step) for i in range(max(0, int(_as_float(count)))))
+    return {"Series": results}
+
+
+def _range(data):
+    results = []
+    for end, steps in _longest(data["Domain"], data["Steps"]):
+        end, steps = _as_float(end), max(1, int(_as_float(steps)))
+        results.extend(end * i / steps for i in range(steps + 1))
+    return {"Range": results}
+
+
+def _circle(data):
+    circles = [f"Circle (R:{_number(_as_float(r))})" for _, r in _longest(data["Plane"], data["Radius"])]
+    return {"Circle": circles}
+
+
+def _line(data):
+    return {"Line": [f"Line (L:{_number(_distance(a, b))})" for a, b in _longest(data["Start Point"], data["End Point"])]}
+
+
+def _distance(a: Any, b: Any) -> float:
+    return math.dist(tuple(a), tuple(b)) if isinstance(a, Point) and isinstance(b, Point) else 0.0
+
+
+def _move(data):
+    pairs = _longest(data["Geometry"], data["Motion"])
+    return {"Geometry": [g for g, _ in pairs], "Transform": ["Transform (Translation)" for _ in pairs]}
+
+
+def _extrude(data):
+    return {"Extrusion": [f"Extrusion ({base})" for base, _ in _longest(data["Base"], data["Direction"])]}
+
+
+def _unit_z(data):
+    return {"Unit vector": [Vector(0.0, 0.0, _as_float(f)) for f in data["Factor"]]}
+
+
+def _deconstruct_point(data):
+    points = [p for p in data["Point"] if isinstance(p, Point)]
+    return {"X component": [p.x for p in points], "Y component": [p.y for p in points], "Z component": [p.z for p in points]}
+
+
+def _pass_through(data):
+    return {"Result": list(data["Data"])}
+
+
+_NUMBER_A = ParamSpec("A", "A", "Generic Data")
+_NUMBER_B = ParamSpec("B", "B", "Generic Data")
+_RESULT = ParamSpec("Result", "R", "Generic Data")
+
+CATALOG: Dict[str, ComponentSpec] = {
+    # 獨立參數
+    "GH_NumberSlider": ComponentSpec("slider", "Number Slider", "Slider", "Numeric slider for single values", type_name="Number"),
+    "GH_Panel": ComponentSpec("panel", "Panel", "Panel", "A panel for custom notes and text values", type_name="Text"),
+    "GH_BooleanToggle": ComponentSpec("toggle", "Boolean Toggle", "Toggle", "Boolean (true/false) toggle", type_name="Boolean"),
+    "GH_ButtonObject": ComponentSpec("toggle", "Button", "Button", "Button object with two values", type_name="Boolean"),
+    "GH_ValueList": ComponentSpec("param", "Value List", "List", "Provides a list of preset values to choose from"),
+    "GH_Relay": ComponentSpec("param", "Relay", "Relay", "A wire relay object"),
+    "Param_Number": ComponentSpec("param", "Number", "Num", "Contains a collection of floating point numbers", type_name="Number"),
+    "Param_Point": ComponentSpec("param", "Point", "Pt", "Contains a collection of three-dimensional points", type_name="Point"),
+    "Param_Curve": ComponentSpec("param", "Curve", "Crv", "Contains a collection of generic curves", type_name="Curve"),
+    "Param_Surface": ComponentSpec("param", "Surface", "Srf", "Contains a collection of generic surfaces", type_name="Surface"),
+    "Param_Vector": ComponentSpec("param", "Vector", "Vec", "Contains a collection of three-dimensional vectors", type_name="Vector"),
+    "Param_Geometry": ComponentSpec("param", "Geometry", "Geo", "Contains a collection of generic geometry", type_name="Geometry"),
+
+    # 數學
+    "OperatorAdd": ComponentSpec("component", "Addition", "A+B", "Mathematical addition",
+                                 (_NUMBER_A, _NUMBER_B), (_RESULT,), _binary(lambda a, b: a + b)),
+    "OperatorSubtract": ComponentSpec("component", "Subtraction", "A-B", "Mathematical subtraction",
+                                      (_NUMBER_A, _NUMBER_B), (_RESULT,), _binary(lambda a, b: a - b)),
+    "OperatorMultiply": ComponentSpec("component", "Multiplication", "A×B", "Mathematical multiplication",
+                                      (_NUMBER_A, _NUMBER_B), (_RESULT,), _binary(lambda a, b: a * b)),
+    "OperatorDivide": ComponentSpec("component", "Division", "A/B", "Mathematical division",
+                                    (_NUMBER_A, _NUMBER_B), (_RESULT,), _binary(lambda a, b: a / b)),
+    "Component_Series": ComponentSpec("component", "Series", "Series", "Create a series of numbers",
+                                      (ParamSpec("Start", "S", "Number", True, (0.0,)),
+                                       ParamSpec("Step", "N", "Number", True, (1.0,)),
+                                       ParamSpec("Count", "C", "Integer", True, (10,))),
+                                      (ParamSpec("Series", "S", "Number"),), _series),
+    "Component_Range": ComponentSpec("component", "Range", "Range", "Create a range of numbers",
+                                     (ParamSpec("Domain", "D", "Domain", True, (1.0,)),
+                                      ParamSpec("Steps", "N", "Integer", True, (10,))),
+                                     (ParamSpec("Range", "R", "Number"),), _range),
+
+    # 幾何
+    "Component_Circle": ComponentSpec("component", "Circle", "Cir", "Create a circle defined by base plane and radius",
+                                      (ParamSpec("Plane", "P", "Plane", False, ("XY",)),
+                                       ParamSpec("Radius", "R", "Number", False, (1.0,))),
+                                      (ParamSpec("Circle", "C", "Circle"),), _circle),
+    "Component_Line": ComponentSpec("component", "Line", "Ln", "Create a line between two points",
+                                    (ParamSpec("Start Point", "A", "Point", False, (Point(0.0, 0.0, 0.0),)),
+                                     ParamSpec("End Point", "B", "Point", False, (Point(0.0, 0.0, 1.0),))),
+                                    (ParamSpec("Line", "L", "Line"),), _line),
+    "Component_Move": ComponentSpec("component", "Move", "Move", "Translate (move) an object along a vector",
+                                    (ParamSpec("Geometry", "G", "Geometry"),
+                                     ParamSpec("Motion", "T", "Vector", False, (Vector(0.0, 0.0, 10.0),))),
+                                    (ParamSpec("Geometry", "G", "Geometry"), ParamSpec("Transform", "X", "Transform")), _move),
+    "Component_Extrude": ComponentSpec("component", "Extrude", "Extr", "Extrude curves and surfaces along a vector",
+                                       (ParamSpec("Base", "B", "Geometry"),
+                                        ParamSpec("Direction", "D", "Vector", False, (Vector(0.0, 0.0, 1.0),))),
+                                       (ParamSpec("Extrusion", "E", "Geometry"),), _extrude),
+    "Component_UnitVectorZ": ComponentSpec("component", "Unit Z", "Z", "Unit vector parallel to the world {z} axis",
+                                           (ParamSpec("Factor", "F", "Number", True, (1.0,)),),
+                                           (ParamSpec("Unit vector", "V", "Vector"),), _unit_z),
+    "Component_DeconstructPoint": ComponentSpec("component", "Deconstruct Point", "pDecon", "Deconstruct a point into its component parts",
+                                                (ParamSpec("Point", "P", "Point"),),
+                                                (ParamSpec("X component", "X", "Number"), ParamSpec("Y component", "Y", "Number"),
+                                                 ParamSpec("Z component", "Z", "Number")), _deconstruct_point),
+}
+
+# 未列在目錄中的組件類型
+_GENERIC_INPUTS = (ParamSpec("Data", "D", "Generic Data"),)
+_GENERIC_OUTPUTS = (_RESULT,)
+
+# add_component / add_component_advanced 接受的簡稱（與插件的 CreateComponentByType 相同）
+ALIASES = {
+    "slider": "GH_NumberSlider", "numberslider": "GH_NumberSlider",
+    "panel": "GH_Panel",
+    "toggle": "GH_BooleanToggle", "booleantoggle": "GH_BooleanToggle",
+    "button": "GH_ButtonObject",
+    "point": "Param_Point", "curve": "Param_Curve", "number": "Param_Number",
+    "circle": "Component_Circle", "line": "Component_Line",
+}
+
+# 顯示名稱 → 類型名稱（讀取 .ghx 時未對應到類型名稱的組件）
+_BY_DISPLAY_NAME = {spec.name.lower(): type_name for type_name, spec in CATALOG.items()}
+
+
+def resolve_type(name: str) -> str:
+    """組件類型名稱：類型名稱、顯示名稱或簡稱（不分大小寫）"""
+    if not name:
+        raise ValueError("Component type is required")
+    lowered = name.lower()
+    for type_name in CATALOG:
+        if type_name.lower() == lowered:
+            return type_name
+    return ALIASES.get(lowered) or _BY_DISPLAY_NAME.get(lowered) or name
+
+
+# ============================================================================
+# 文檔模型
+# ============================================================================
+
+class SimParam:
+    """組件的輸入 / 輸出參數，或獨立參數本身（id 與組件相同）"""
+
+    __slots__ = ("id", "owner", "spec", "sources")
+
+    def __init__(self, owner: "SimComponent", spec: ParamSpec, param_id: Optional[str] = None):
+        self.id = param_id or str(uuid.uuid4())
+        self.owner = owner
+        self.spec = spec
+        self.sources: List["SimParam"] = []
+
+    @property
+    def name(self) -> str:
+        return self.spec.name
+
+
+class SimComponent:
+    """畫布上的一個頂層物件"""
+
+    def __init__(self, type_name: str, x: float, y: float, component_id: Optional[str] = None):
+        self.id = component_id or str(uuid.uuid4())
+        self.type = type_name
+        self.spec = CATALOG.get(type_name) or ComponentSpec(
+            "component", type_name, type_name, f"Simulated {type_name}", _GENERIC_INPUTS, _GENERIC_OUTPUTS, _pass_through)
+        self.name = self.spec.nickname
+        self.x, self.y = float(x), float(y)
+
+        self.value: Any = None
+        if self.kind == "slider":
+            self.minimum, self.maximum, self.value = 0.0, 1.0, 0.5
+        elif self.kind == "panel":
+            self.value = ""
+        elif self.kind == "toggle":
+            self.value = False
+
+        if self.is_param:
+            self.param: Optional[SimParam] = SimParam(self, ParamSpec(self.spec.name, self.spec.nickname, self.spec.type_name), self.id)
+            self.inputs: List[SimParam] = []
+            self.outputs: List[SimParam] = []
+        else:
+            self.param = None
+            self.inputs = [SimParam(self, spec) for spec in self.spec.inputs]
+            self.outputs = [SimParam(self, spec) for spec in self.spec.outputs]
+
+    @property
+    def kind(self) -> str:
+        return self.spec.kind
+
+    @property
+    def is_param(self) -> bool:
+        return self.kind != "component"
+
+    @property
+    def targets(self) -> List[SimParam]:
+        """可以接收連線的參數"""
+        return [self.param] if self.param is not None else self.inputs
+
+    def parameters(self) -> Optional[Dict[str, Any]]:
+        """與 DescribeParameters 相同：Slider / Panel / Toggle 的數值，其他組件為 None"""
+        if self.kind == "slider":
+            return {"min": self.minimum, "max": self.maximum, "value": self.value}
+        if self.kind == "panel":
+            return {"text": self.value}
+        if self.kind == "toggle" and self.type == "GH_BooleanToggle":
+            return {"value": self.value}
+        return None
+
+    def set_slider(self, value: float) -> float:
+        self.value = min(max(float(value), self.minimum), self.maximum)
+        return self.value
+
+
+class SimulatedDocument:
+    """
+    模擬的 Grasshopper 文檔：組件、連線、修訂號與變更紀錄、求解控制
+
+    所有方法都假設在模擬 UI 執行緒上呼叫（GrasshopperSimulator 保證依序執行）。
+
+    Args:
+        solve_latency: 每次求解的固定時間（秒）
+        component_latency: 每次求解中每個組件的時間（秒）
+    """
+
+    def __init__(self, solve_latency: float = 0.0, component_latency: float = 0.0):
+        self.solve_latency = solve_latency
+        self.component_latency = component_latency
+
+        self.document_id = str(uuid.uuid4())
+        self.name = "unnamed"
+        self.path: Optional[str] = None
+        self.components: Dict[str, SimComponent] = {}
+        self.geometry: Dict[str, Dict[str, Any]] = {}
+
+        self.revision = 1
+        self.journal: List[Dict[str, Any]] = []
+        self.journal_start = 1
+
+        self.solutions = 0
+        self._defer_depth = 0
+        self._edit_session = False
+        self._solution_pending = False
+        self._values: Dict[str, List[Any]] = {}
+
+    # ------------------------------------------------------------------
+    # 變更紀錄與求解
+    # ------------------------------------------------------------------
+
+    def record(self, change: str, component: Optional[SimComponent]) -> None:
+        """與 DocumentChangeTracker.Record 相同"""
+        self.revision += 1
+        self._values.clear()
+        self.journal.append({
+            "revision": self.revision,
+            "change": change,
+            "id": component.id if component else None,
+            "type": component.type if component else None,
+        })
+        if len(self.journal) > JOURNAL_CAPACITY:
+            drop = len(self.journal) - JOURNAL_CAPACITY // 2
+            self.journal_start = self.journal[drop - 1]["revision"]
+            del self.journal[:drop]
+
+    @property
+    def solution_deferred(self) -> bool:
+        return self._defer_depth > 0 or self._edit_session
+
+    def request_solution(self, changed: Optional[SimComponent] = None, recompute: bool = True) -> None:
+        """與 RequestSolution 相同：暫停求解或 recompute=False 時只記下待計算"""
+        if changed is not None:
+            self.record("changed", changed)
+        if self.solution_deferred or not recompute:
+            self._solution_pending = True
+            return
+        self._solution_pending = False
+        self.solve()
+
+    def solve(self) -> None:
+        """模擬一次求解的時間"""
+        self.solutions += 1
+        seconds = self.solve_latency + self.component_latency * len(self.components)
+        if seconds > 0:
+            time.sleep(seconds)
+
+    def begin_defer(self) -> None:
+        self._defer_depth += 1
+
+    def end_defer(self) -> bool:
+        if self._defer_depth == 0:
+            return False
+        self._defer_depth -= 1
+        return self.flush_solution()
+
+    def flush_solution(self) -> bool:
+        """與 FlushSolution 相同：不在暫停求解中且有待計算的修改時求解一次"""
+        if self.solution_deferred or not self._solution_pending:
+            return False
+        self._solution_pending = False
+        self.solve()
+        return True
+
+    def user_edit(self, component_id: Optional[str] = None, **parameters: Any) -> None:
+        """模擬使用者直接在畫布上的修改（不經過命令）：改變數值並留下變更紀錄"""
+        component = self.find(component_id) if component_id else None
+        if component is not None:
+            if "value" in parameters:
+                component.value = component.set_slider(parameters["value"]) if component.kind == "slider" else parameters["value"]
+            if "name" in parameters:
+                component.name = parameters["name"]
+        self.record("changed", component)
+
+    # ------------------------------------------------------------------
+    # 組件與連線
+    # ------------------------------------------------------------------
+
+    def find(self, component_id: Any) -> SimComponent:
+        """與 FindComponent 相同：格式錯誤或找不到時拋出 ValueError"""
+        try:
+            key = str(uuid.UUID(str(component_id)))
+        except ValueError:
+            raise ValueError("Invalid component ID format") from None
+        component = self.components.get(key)
+        if component is None:
+            raise ValueError(f"Component {component_id} not found")
+        return component
+
+    def add(self, type_name: str, x: float, y: float, name: Optional[str] = None,
+            initial: Optional[Dict[str, Any]] = None, component_id: Optional[str] = None) -> SimComponent:
+        component = SimComponent(resolve_type(type_name), x, y, component_id)
+        if name:
+            component.name = name
+        if initial:
+            self._set_initial(component, initial)
+        self.components[component.id] = component
+        self.record("added", component)
+        return component
+
+    @staticmethod
+    def _set_initial(component: SimComponent, initial: Dict[str, Any]) -> None:
+        """與 SetInitialParameters 相同"""
+        if component.kind == "slider":
+            if all(key in initial for key in ("min", "max", "value")):
+                component.minimum, component.maximum = float(initial["min"]), float(initial["max"])
+                component.set_slider(initial["value"])
+            if "name" in initial:
+                component.name = str(initial["name"])
+        elif component.kind == "panel" and "text" in initial:
+            component.value = str(initial["text"])
+        elif component.kind == "toggle" and "value" in initial:
+            component.value = bool(initial["value"])
+
+    def remove(self, components: Sequence[SimComponent]) -> None:
+        removed = {c.id for c in components}
+        for component in self.components.values():
+            for param in component.targets:
+                param.sources = [s for s in param.sources if s.owner.id not in removed]
+        for component in components:
+            del self.components[component.id]
+            self.record("removed", component)
+
+    def resolve_param(self, connection: Dict[str, Any], end: str, output: bool) -> SimParam:
+        """與 ResolveParam 相同：依 {end}Param（名稱或暱稱）或 {end}ParamIndex 選擇參數"""
+        component_id = connection.get(end + "Id")
+        if component_id is None:
+            raise ValueError(f"Missing {end}Id")
+        component = self.find(component_id)
+        if component.param is not None:
+            return component.param
+
+        candidates = component.outputs if output else component.inputs
+        label = "Output" if output else "Input"
+        name = connection.get(end + "Param")
+        if name is not None:
+            name = str(name).lower()
+            for param in candidates:
+                if param.spec.name.lower() == name or param.spec.nickname.lower() == name:
+                    return param
+            raise ValueError(f"{label} '{connection.get(end + 'Param')}' not found on {component.name}")
+
+        index = connection.get(end + "ParamIndex")
+        index = 0 if index is None else int(index)
+        if index < 0 or index >= len(candidates):
+            raise ValueError(f"{label} index {index} out of range on {component.name}")
+        return candidates[index]
+
+    def connect(self, connection: Dict[str, Any]) -> Tuple[SimParam, SimParam, bool]:
+        """建立一條連線；返回 (來源參數, 接收參數, 是否新增)"""
+        source = self.resolve_param(connection, "source", output=True)
+        target = self.resolve_param(connection, "target", output=False)
+        if source in target.sources:
+            return source, target, False
+        target.sources.append(source)
+        self.record("wired", target.owner)
+        return source, target, True
+
+    def wires(self) -> List[Dict[str, Any]]:
+        return [wire for component in self.components.values() for wire in self._wires_into(component)]
+
+    @staticmethod
+    def _wires_into(component: SimComponent) -> List[Dict[str, Any]]:
+        return [{"sourceId": source.owner.id, "sourceParam": source.name, "targetId": component.id, "targetParam": param.name}
+                for param in component.targets for source in param.sources]
+
+    # ------------------------------------------------------------------
+    # 描述（與 DescribeComponent 等相同）
+    # ------------------------------------------------------------------
+
+    def describe(self, component: SimComponent) -> Dict[str, Any]:
+        details: Dict[str, Any] = {
+            "id": component.id,
+            "type": component.type,
+            "name": component.name,
+            "description": component.spec.description,
+            "position": {"x": component.x, "y": component.y},
+            "size": {"width": 50.0 if component.is_param else 100.0, "height": 20.0 if component.is_param else 60.0},
+        }
+        parameters = component.parameters()
+        if parameters is not None:
+            details["parameters"] = parameters
+        if not component.is_param:
+            details["inputs"] = self._describe_inputs(component)
+            details["outputs"] = self._describe_outputs(component)
+
+        connections: Dict[str, Any] = {}
+        if component.param is not None:
+            connections["sources"] = [source.id for source in component.param.sources]
+            connections["recipients"] = [param.owner.id if param.owner.is_param else param.id
+                                         for other in self.components.values() for param in other.targets
+                                         if component.param in param.sources]
+        details["connections"] = connections
+        return details
+
+    @staticmethod
+    def _describe_inputs(component: SimComponent) -> List[Dict[str, Any]]:
+        return [{"name": p.spec.name, "nickname": p.spec.nickname, "type": p.spec.type_name, "optional": p.spec.optional}
+                for p in component.inputs]
+
+    @staticmethod
+    def _describe_outputs(component: SimComponent) -> List[Dict[str, Any]]:
+        return [{"name": p.spec.name, "nickname": p.spec.nickname, "type": p.spec.type_name} for p in component.outputs]
+
+    def export_graph(self, fields: Sequence[str] = GRAPH_FIELDS) -> Dict[str, Any]:
+        components = []
+        for component in self.components.values():
+            entry: Dict[str, Any] = {"id": component.id}
+            if "type" in fields:
+                entry["type"] = component.type
+            if "name" in fields:
+                entry["name"] = component.name
+            if "position" in fields:
+                entry["position"] = {"x": component.x, "y": component.y}
+            if "parameters" in fields and component.parameters() is not None:
+                entry["parameters"] = component.parameters()
+            if not component.is_param and "inputs" in fields:
+                entry["inputs"] = self._describe_inputs(component)
+            if not component.is_param and "outputs" in fields:
+                entry["outputs"] = self._describe_outputs(component)
+            components.append(entry)
+
+        graph = {
+            "documentId": self.document_id,
+            "revision": self.revision,
+            "fields": [f for f in GRAPH_FIELDS if f in fields],
+            "components": components,
+        }
+        if "wires" in fields:
+            graph["wires"] = self.wires()
+        return graph
+
+    # ------------------------------------------------------------------
+    # 輸出計算
+    # ------------------------------------------------------------------
+
+    def values(self, param: SimParam, visiting: Optional[set] = None) -> List[Any]:
+        """參數目前的資料（依連線計算，同一修訂號內快取）"""
+        cached = self._values.get(param.id)
+        if cached is not None:
+            return cached
+
+        visiting = visiting if visiting is not None else set()
+        if param.id in visiting:
+            raise ValueError(f"Recursive data stream through {param.owner.name}")
+        visiting.add(param.id)
+
+        owner = param.owner
+        if param.sources:
+            result = [item for source in param.sources for item in self.values(source, visiting)]
+        elif owner.kind in ("slider", "toggle"):
+            result = [owner.value]
+        elif owner.kind == "panel":
+            result = [owner.value] if owner.value else []
+        elif param is owner.param:
+            result = []
+        elif param in owner.inputs:
+            result = list(param.spec.default)
+        else:
+            inputs = {p.spec.name: self.values(p, visiting) for p in owner.inputs}
+            outputs = owner.spec.compute(inputs) if owner.spec.compute else {}
+            for output in owner.outputs:
+                self._values[output.id] = [v for v in outputs.get(output.spec.name, []) if v is not None]
+            result = self._values[param.id]
+
+        visiting.discard(param.id)
+        self._values[param.id] = result
+        return result
+
+    def output_data(self, component: SimComponent, output_index: int, offset: int, limit: int, binary: bool) -> Dict[str, Any]:
+        """與 GetComponentOutputData 相同的分頁與編碼"""
+        if component.kind == "slider":
+            values = [component.value] if offset == 0 and limit != 0 else []
+            if binary:
+                return self._encode_binary("Number", "double", values, offset, 1)
+            return {"outputName": "Number", "outputType": "double", "encoding": "json", "data": values, "offset": offset,
+                    "count": len(values), "totalCount": 1, "nextOffset": None}
+
+        if component.is_param:
+            raise ValueError("Component does not have outputs")
+        if output_index < 0 or output_index >= len(component.outputs):
+            raise ValueError("Invalid output index")
+
+        output = component.outputs[output_index]
+        items = self.values(output)
+        total = len(items)
+        page = items[offset:] if limit < 0 else items[offset:offset + limit]
+
+        if binary:
+            encoded = self._encode_binary(output.spec.name, output.spec.type_name, page, offset, total)
+            if encoded is not None:
+                return encoded
+
+        end = offset + len(page)
+        return {"outputName": output.spec.name, "outputType": output.spec.type_name, "encoding": "text",
+                "data": [_text(v) for v in page], "offset": offset, "count": len(page), "totalCount": total,
+                "nextOffset": end if end < total else None}
+
+    @staticmethod
+    def _encode_binary(name: str, type_name: str, items: List[Any], offset: int, total: int) -> Optional[Dict[str, Any]]:
+        kind = _binary_kind(items[0]) if items else "number"
+        if kind is None or any(_binary_kind(item) != kind for item in items):
+            return None
+        stride = 1 if kind == "number" else 3
+        flat = [float(v) for item in items for v in ((item,) if stride == 1 else item)]
+        end = offset + len(items)
+        return {"outputName": name, "outputType": type_name, "encoding": "binary", "kind": kind, "stride": stride,
+                "values": pack_values(flat), "branches": [{"path": "{0}", "count": len(items)}] if items else [],
+                "offset": offset, "count": len(items), "totalCount": total, "nextOffset": end if end < total else None}
+
+    # ------------------------------------------------------------------
+    # 文檔的載入與儲存
+    # ------------------------------------------------------------------
+
+    def reset(self, name: str = "unnamed", path: Optional[str] = None) -> None:
+        """換成一份新的空白文檔（與切換文檔相同：新的 documentId，變更紀錄重新開始）"""
+        self.document_id = str(uuid.uuid4())
+        self.name, self.path = name, path
+        self.components.clear()
+        self._values.clear()
+        self.revision += 1
+        self.journal.clear()
+        self.journal_start = self.revision
+
+    def snapshot(self) -> Dict[str, Any]:
+        """save_document 寫出的 JSON 快照"""
+        graph = self.export_graph()
+        for entry, component in zip(graph["components"], self.components.values()):
+            if component.is_param and component.kind != "component":
+                entry["value"] = component.value
+        return {"format": SNAPSHOT_FORMAT, "name": self.name, "graph": graph}
+
+    def load(self, path: str) -> None:
+        """讀取 .ghx 或 JSON 快照"""
+        if not os.path.exists(path):
+            raise ValueError(f"File not found: {path}")
+        if path.lower().endswith(".json"):
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("format") != SNAPSHOT_FORMAT:
+                raise ValueError(f"{path} is not a simulator snapshot")
+            name, graph = data.get("name") or os.path.basename(path), data["graph"]
+        else:
+            graph = read_ghx(path)
+            name = graph.get("name") or os.path.basename(path)
+
+        self.reset(name, path)
+        if graph.get("documentId"):
+            self.document_id = graph["documentId"]
+        for entry in graph.get("components") or []:
+            position = entry.get("position") or {}
+            component = SimComponent(resolve_type(entry.get("type") or ""), position.get("x") or 0.0,
+                                     position.get("y") or 0.0, entry["id"])
+            if entry.get("name"):
+                component.name = entry["name"]
+            self._set_initial(component, dict(entry.get("parameters") or {}, **({"name": entry["name"]} if entry.get("name") else {})))
+            if "value" in entry:
+                component.value = entry["value"]
+            self.components[component.id] = component
+
+        for wire in graph.get("wires") or []:
+            try:
+                self.connect({"sourceId": wire["sourceId"], "sourceParam": wire.get("sourceParam"),
+                              "targetId": wire["targetId"], "targetParam": wire.get("targetParam")})
+            except ValueError:
+                continue  # 模擬器沒有對應參數的組件（例如未列在目錄中的類型）
+        self.journal.clear()
+        self.journal_start = self.revision
+
+
+# ============================================================================
+# 命令處理器
+# ============================================================================
+
+# create_pattern 可以建立的組合：[(類型, 初始參數)]，[(來源序號, 來源參數, 接收序號, 接收參數)]
+PATTERNS: Dict[str, Tuple[str, List[Tuple[str, Optional[Dict[str, Any]]]], List[Tuple[int, Optional[str], int, Optional[str]]]]] = {
+    "circle": ("Circle driven by a radius slider",
+               [("GH_NumberSlider", {"min": 0, "max": 10, "value": 5, "name": "Radius"}), ("Component_Circle", None)],
+               [(0, None, 1, "Radius")]),
+    "series": ("Series of numbers with start, step and count sliders",
+               [("GH_NumberSlider", {"min": 0, "max": 10, "value": 0, "name": "Start"}),
+                ("GH_NumberSlider", {"min": 0, "max": 10, "value": 1, "name": "Step"}),
+                ("GH_NumberSlider", {"min": 1, "max": 100, "value": 10, "name": "Count"}),
+                ("Component_Series", None), ("GH_Panel", None)],
+               [(0, None, 3, "Start"), (1, None, 3, "Step"), (2, None, 3, "Count"), (3, "Series", 4, None)]),
+    "addition": ("Two sliders added together, result shown in a panel",
+                 [("GH_NumberSlider", {"min": 0, "max": 10, "value": 2, "name": "A"}),
+                  ("GH_NumberSlider", {"min": 0, "max": 10, "value": 3, "name": "B"}),
+                  ("OperatorAdd", None), ("GH_Panel", None)],
+                 [(0, None, 2, "A"), (1, None, 2, "B"), (2, "Result", 3, None)]),
+    "extrusion": ("Circle extruded along the Z axis",
+                  [("GH_NumberSlider", {"min": 0, "max": 10, "value": 5, "name": "Radius"}), ("Component_Circle", None),
+                   ("GH_NumberSlider", {"min": 0, "max": 50, "value": 10, "name": "Height"}), ("Component_UnitVectorZ", None),
+                   ("Component_Extrude", None)],
+                  [(0, None, 1, "Radius"), (2, None, 3, "Factor"), (1, "Circle", 4, "Base"), (3, "Unit vector", 4, "Direction")]),
+}
+
+
+def _params(command: Dict[str, Any]) -> Dict[str, Any]:
+    return command.get("parameters") or {}
+
+
+def _require(params: Dict[str, Any], key: str) -> Any:
+    if key not in params or params[key] is None:
+        raise ValueError(f"Missing parameter: {key}")
+    return params[key]
+
+
+def _id_list(value: Any) -> List[str]:
+    if not isinstance(value, list):
+        raise ValueError("componentIds must be a list of component IDs")
+    return [None if item is None else str(item) for item in value]
+
+
+def _item_error(component_id: Any, error: Exception) -> Dict[str, Any]:
+    return {"componentId": component_id, "success": False, "error": str(error)}
+
+
+def _graph_fields(value: Any) -> List[str]:
+    if value is None:
+        return list(GRAPH_FIELDS)
+    names = [f.strip() for f in value.split(",") if f.strip()] if isinstance(value, str) else [str(f) for f in value]
+    for name in names:
+        if name not in GRAPH_FIELDS:
+            raise ValueError(f"Unknown field: {name}. Valid fields: {', '.join(GRAPH_FIELDS)}")
+    return names
+
+
+def simulator_handlers(document: SimulatedDocument) -> Dict[str, Handler]:
+    """插件註冊的所有命令（batch 由 StandinServer 處理）→ 在 document 上執行的處理函數"""
+    doc = document
+
+    # ---- 幾何（Rhino 文檔，不在 Grasshopper 畫布上） ----
+
+    def create_point(command):
+        p = _params(command)
+        point = {"id": str(uuid.uuid4()), "x": float(p.get("x", 0)), "y": float(p.get("y", 0)), "z": float(p.get("z", 0))}
+        doc.geometry[point["id"]] = point
+        return point
+
+    def create_curve(command):
+        points = _require(_params(command), "points")
+        if not isinstance(points, list) or len(points) < 2:
+            raise ValueError("A curve needs at least two points")
+        curve = {"id": str(uuid.uuid4()), "pointCount": len(points)}
+        doc.geometry[curve["id"]] = curve
+        return curve
+
+    def create_circle(command):
+        p = _params(command)
+        center = p.get("center") or {}
+        radius = float(_require(p, "radius"))
+        if radius <= 0:
+            raise ValueError("Radius must be positive")
+        circle = {"id": str(uuid.uuid4()), "center": {k: float(center.get(k, 0)) for k in ("x", "y", "z")}, "radius": radius}
+        doc.geometry[circle["id"]] = circle
+        return circle
+
+    # ---- 原版組件命令 ----
+
+    def add_component(command):
+        p = _params(command)
+        component = doc.add(_require(p, "type"), float(p.get("x", 0)), float(p.get("y", 0)))
+        doc.request_solution()
+        return {"id": component.id, "type": component.type, "name": component.name, "x": component.x, "y": component.y}
+
+    def connect_components(command):
+        source, target, _ = doc.connect(_params(command))
+        doc.request_solution()
+        return {"sourceId": source.owner.id, "targetId": target.owner.id,
+                "sourceParam": source.name, "targetParam": target.name, "isConnected": True}
+
+    def set_component_value(command):
+        p = _params(command)
+        component = doc.find(_require(p, "id"))
+        value = _require(p, "value")
+        if component.kind == "slider":
+            component.set_slider(_as_float(value))
+        elif component.kind == "panel":
+            component.value = str(value)
+        elif component.kind == "toggle":
+            component.value = value if isinstance(value, bool) else str(value).strip().lower() == "true"
+        else:
+            raise ValueError(f"Component type {component.type} is not supported")
+        doc.request_solution(component)
+        return {"id": component.id, "type": component.type, "value": component.value}
+
+    def get_component_info(command):
+        p = _params(command)
+        return doc.describe(doc.find(p.get("id") or _require(p, "componentId")))
+
+    # ---- 增強版組件命令 ----
+
+    def add_component_advanced(command):
+        p = _params(command)
+        component = doc.add(_require(p, "type"), float(_require(p, "x")), float(_require(p, "y")),
+                            p.get("name"), p.get("initialParams"))
+        doc.request_solution(recompute=p.get("recompute", True))
+        return {"componentId": component.id, "type": component.type, "name": component.name,
+                "position": {"x": component.x, "y": component.y}}
+
+    def get_component_details(command):
+        return doc.describe(doc.find(_require(_params(command), "componentId")))
+
+    def get_components_details(command):
+        results = []
+        for component_id in _id_list(_require(_params(command), "componentIds")):
+            try:
+                results.append({"componentId": component_id, "success": True, "data": doc.describe(doc.find(component_id))})
+            except ValueError as e:
+                results.append(_item_error(component_id, e))
+        return {"count": len(results), "failed": sum(not r["success"] for r in results), "results": results}
+
+    def set_slider_value(command):
+        p = _params(command)
+        component = doc.find(_require(p, "componentId"))
+        if component.kind != "slider":
+            raise ValueError("Component is not a Number Slider")
+        component.set_slider(float(_require(p, "value")))
+        doc.request_solution(component, p.get("recompute", True))
+        return {"componentId": component.id, "value": component.value}
+
+    def batch_set_sliders(command):
+        p = _params(command)
+        values = _require(p, "sliderValues")
+        if not isinstance(values, dict):
+            raise ValueError("sliderValues must be a dictionary")
+        results = []
+        for component_id, value in values.items():
+            try:
+                component = doc.find(component_id)
+            except ValueError:
+                continue
+            if component.kind == "slider":
+                component.set_slider(float(value))
+                doc.request_solution(component, recompute=False)
+                results.append({"componentId": component_id, "value": float(value), "success": True})
+        if p.get("recompute", True):
+            doc.flush_solution()
+        return results
+
+    def delete_component(command):
+        p = _params(command)
+        component_id = _require(p, "componentId")
+        doc.remove([doc.find(component_id)])
+        doc.request_solution(recompute=p.get("recompute", True))
+        return {"success": True, "componentId": component_id}
+
+    def delete_components(command):
+        p = _params(command)
+        results, to_remove = [], {}
+        for component_id in _id_list(_require(p, "componentIds")):
+            try:
+                component = doc.find(component_id)
+                to_remove.setdefault(component.id, component)
+                results.append({"componentId": component_id, "success": True})
+            except ValueError as e:
+                results.append(_item_error(component_id, e))
+        if to_remove:
+            doc.remove(list(to_remove.values()))
+            doc.request_solution(recompute=p.get("recompute", True))
+        return {"deleted": len(to_remove), "failed": sum(not r["success"] for r in results), "results": results}
+
+    def connect_many(command):
+        p = _params(command)
+        connections = _require(p, "connections")
+        if not isinstance(connections, list):
+            raise ValueError("connections must be a list")
+        results, connected = [], 0
+        for index, connection in enumerate(connections):
+            try:
+                if not isinstance(connection, dict):
+                    raise ValueError(f"Connection {index} must be an object")
+                source, target, added = doc.connect(connection)
+                connected += added
+                results.append({"index": index, "success": True, "sourceParam": source.name, "targetParam": target.name})
+            except ValueError as e:
+                results.append({"index": index, "success": False, "error": str(e)})
+        if connected:
+            doc.request_solution(recompute=p.get("recompute", True))
+        return {"connected": connected, "failed": sum(not r["success"] for r in results), "results": results}
+
+    def find_components_by_type(command):
+        type_name = _require(_params(command), "componentType")
+        return [c.id for c in doc.components.values() if c.type == type_name]
+
+    def set_panel_text(command):
+        p = _params(command)
+        component = doc.find(_require(p, "componentId"))
+        if component.kind != "panel":
+            raise ValueError("Component is not a Panel")
+        component.value = str(_require(p, "text"))
+        doc.request_solution(component, p.get("recompute", True))
+        return {"componentId": p["componentId"], "text": component.value}
+
+    def set_toggle_state(command):
+        p = _params(command)
+        component = doc.find(_require(p, "componentId"))
+        if component.type != "GH_BooleanToggle":
+            raise ValueError("Component is not a Boolean Toggle")
+        component.value = bool(_require(p, "state"))
+        doc.request_solution(component, p.get("recompute", True))
+        return {"componentId": p["componentId"], "state": component.value}
+
+    def get_component_output_data(command):
+        p = _params(command)
+        component = doc.find(_require(p, "componentId"))
+        binary = str(p.get("encoding", "text")).lower() == "binary"
+        return doc.output_data(component, int(p.get("outputIndex", 0)), max(0, int(p.get("offset", 0))),
+                               int(p.get("limit", -1)), binary)
+
+    def get_all_connections(command):
+        # 只有連到組件輸入的連線（export_document_graph 的 wires 另外包含連到獨立參數的連線）
+        return [wire for c in doc.components.values() if not c.is_param for wire in doc._wires_into(c)]
+
+    def export_document_graph(command):
+        return doc.export_graph(_graph_fields(_params(command).get("fields")))
+
+    # ---- 求解控制 ----
+
+    def begin_edit_session(command):
+        already = doc._edit_session
+        doc._edit_session = True
+        return {"active": True, "alreadyActive": already}
+
+    def commit_edit_session(command):
+        was_active = doc._edit_session
+        doc._edit_session = False
+        solved = False
+        if doc._defer_depth == 0 and doc._solution_pending:
+            doc._solution_pending = False
+            doc.solve()
+            solved = True
+        return {"active": False, "wasActive": was_active, "solved": solved}
+
+    # ---- 文檔狀態 ----
+
+    def get_document_revision(command):
+        return {"documentId": doc.document_id, "revision": doc.revision}
+
+    def get_changes_since(command):
+        p = _params(command)
+        since = int(p.get("revision", 0))
+        document_id = p.get("documentId")
+        changes = None
+        if (not document_id or document_id == doc.document_id) and doc.journal_start <= since <= doc.revision:
+            changes = [c for c in doc.journal if c["revision"] > since]
+        return {"documentId": doc.document_id, "revision": doc.revision, "reset": changes is None, "changes": changes or []}
+
+    # ---- 文檔 ----
+
+    def get_document_info(command):
+        return {
+            "name": doc.name,
+            "path": doc.path,
+            "componentCount": len(doc.components),
+            "components": [{"id": c.id, "type": c.type, "name": c.name, "description": c.spec.description}
+                           for c in doc.components.values()],
+        }
+
+    def clear_document(command):
+        count = len(doc.components)
+        doc.remove(list(doc.components.values()))
+        doc.request_solution()
+        return {"removed": count}
+
+    def save_document(command):
+        path = _require(_params(command), "path")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(doc.snapshot(), f, ensure_ascii=False)
+        doc.path = path
+        return {"path": path, "componentCount": len(doc.components)}
+
+    def load_document(command):
+        path = _require(_params(command), "path")
+        doc.load(path)
+        doc.solve()
+        return {"path": path, "name": doc.name, "componentCount": len(doc.components)}
+
+    # ---- 意圖 ----
+
+    def create_pattern(command):
+        description = str(_require(_params(command), "description")).lower()
+        key = next((k for k in PATTERNS if k in description), None)
+        if key is None:
+            raise ValueError(f"No pattern matches '{description}'. Available: {', '.join(PATTERNS)}")
+        _, steps, wires = PATTERNS[key]
+        doc.begin_defer()
+        try:
+            created = [doc.add(type_name, 100.0 + 150.0 * i, 100.0, initial=initial) for i, (type_name, initial) in enumerate(steps)]
+            for source, source_param, target, target_param in wires:
+                doc.connect({"sourceId": created[source].id, "sourceParam": source_param,
+                             "targetId": created[target].id, "targetParam": target_param})
+            doc.request_solution()
+        finally:
+            doc.end_defer()
+        return {"pattern": key, "components": [{"id": c.id, "type": c.type, "name": c.name} for c in created],
+                "connections": len(wires)}
+
+    def get_available_patterns(command):
+        query = str(_params(command).get("query") or "").lower()
+        return [{"name": name, "description": description} for name, (description, _, _) in PATTERNS.items()
+                if not query or query in name or query in description.lower()]
+
+    return {
+        "create_point": create_point,
+        "create_curve": create_curve,
+        "create_circle": create_circle,
+        "add_component": add_component,
+        "connect_components": connect_components,
+        "set_component_value": set_component_value,
+        "get_component_info": get_component_info,
+        "add_component_advanced": add_component_advanced,
+        "get_component_details": get_component_details,
+        "get_components_details": get_components_details,
+        "set_slider_value": set_slider_value,
+        "batch_set_sliders": batch_set_sliders,
+        "delete_component": delete_component,
+        "delete_components": delete_components,
+        "connect_many": connect_many,
+        "find_components_by_type": find_components_by_type,
+        "set_panel_text": set_panel_text,
+        "set_toggle_state": set_toggle_state,
+        "get_component_output_data": get_component_output_data,
+        "get_all_connections": get_all_connections,
+        "begin_edit_session": begin_edit_session,
+        "commit_edit_session": commit_edit_session,
+        "get_document_revision": get_document_revision,
+        "get_changes_since": get_changes_since,
+        "export_document_graph": export_document_graph,
+        "get_document_info": get_document_info,
+        "clear_document": clear_document,
+        "save_document": save_document,
+        "load_document": load_document,
+        "create_pattern": create_pattern,
+        "get_available_patterns": get_available_patterns,
+    }
+
+
+# ============================================================================
+# 伺服器
+# ============================================================================
+
+class GrasshopperSimulator(StandinServer):
+    """
+    在模擬文檔上執行命令的替身伺服器
+
+    Args:
+        solve_latency: 每次求解的時間（秒）
+        component_latency: 每次求解中每個組件的時間（秒）
+        document: 使用既有的模擬文檔（預設建立新的空白文檔）
+        其餘參數與 StandinServer 相同；ui_handoff 預設為 "signaled"（命令在單一 UI 執行緒上依序執行）
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        solve_latency: float = 0.0,
+        component_latency: float = 0.0,
+        document: Optional[SimulatedDocument] = None,
+        ui_handoff: Optional[str] = "signaled",
+        **kwargs: Any,
+    ):
+        self.document = document or SimulatedDocument(solve_latency, component_latency)
+        self._document_lock = threading.RLock()
+        super().__init__(host, port, handlers=simulator_handlers(self.document), fallback=None,
+                         ui_handoff=ui_handoff, **kwargs)
+
+    @contextlib.contextmanager
+    def editing(self) -> Iterator[SimulatedDocument]:
+        """在命令之外直接修改文檔（例如建立大型測試文檔），與命令依序執行"""
+        with self._document_lock:
+            yield self.document
+
+    def _execute(self, command: Dict[str, Any]) -> Dict[str, Any]:
+        # ui_handoff=None 時命令在各連接的執行緒上執行：以鎖保持依序
+        with self._document_lock:
+            return super()._execute(command)
+
+    def _batch(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """與插件相同：批次中的修改延後，結束時最多求解一次"""
+        self.document.begin_defer()
+        try:
+            return super()._batch(params)
+        finally:
+            self.document.end_defer()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="In-memory Grasshopper simulator (all plugin commands)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--solve-latency", type=float, default=0.0, help="Simulated time per solution (seconds)")
+    parser.add_argument("--component-latency", type=float, default=0.0, help="Additional solve time per component (seconds)")
+    parser.add_argument("--latency", type=float, default=0.0, help="Simulated processing time per command (seconds)")
+    parser.add_argument("--load", help="Start with this .ghx definition or simulator snapshot")
+    parser.add_argument("--unix", metavar="PATH", help="Listen on a Unix domain socket instead of TCP")
+    parser.add_argument("--codecs", nargs="+", default=[], metavar="CODEC",
+                        help="Wire formats accepted in the negotiate_codec handshake, e.g. msgpack json")
+    parser.add_argument("--compression", nargs="+", default=[], metavar="ALGORITHM",
+                        help="Compression accepted in the negotiate_codec handshake, e.g. zstd zlib")
+    args = parser.parse_args()
+
+    server = GrasshopperSimulator(args.host, args.port, args.solve_latency, args.component_latency, latency=args.latency,
+                                  unix_path=args.unix, codecs=args.codecs, compression=args.compression)
+    if args.load:
+        server.document.load(args.load)
+    print(f"Grasshopper simulator listening on {format_endpoint(server.host, server.port)} "
+          f"({len(server.document.components)} components)", file=sys.stderr)
+    try:
+        server._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server._server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,549 @@
+"""
+本地 Grasshopper 替身伺服器
+
+在沒有 Rhino/Grasshopper 的環境（測試、CI、效能測試）中模擬插件的 TCP 監聽端，
+使用相同的「一行一個 JSON」協定。指定 unix_path 時改為在 Unix domain socket 上監聽
+（server.host 為 "unix:<路徑>"，可以直接交給客戶端與 GRASSHOPPER_HOSTS）。
+指定 codecs / compression 時支援 negotiate_codec 握手，協商後該連接改用 MessagePack 等編碼，
+並壓縮達到門檻的回應（見 wire_codec.py）。
+
+用法:
+    server = StandinServer().start()
+    ...  # 連接到 server.host, server.port
+    server.stop()
+
+    python standin_server.py --port 8080
+    python standin_server.py --unix /tmp/grasshopper.sock
+    python standin_server.py --codecs msgpack json
+    python standin_server.py --compression zstd zlib
+"""
+
+import argparse
+import os
+import queue
+import re
+import socket
+import socketserver
+import stat
+import sys
+import threading
+import time
+from typing import Callable, Dict, Any, List, NamedTuple, Optional, Sequence, Tuple
+
+from gh_protocol import JSON_CODEC, RECV_CHUNK_SIZE, UNIX_PREFIX, error_response, format_endpoint
+from wire_codec import (
+    COMPRESSED_FRAME_HEADER,
+    DEFAULT_COMPRESS_THRESHOLD,
+    FLAG_COMPRESSED,
+    FRAME_HEADER,
+    LINE_FRAMING,
+    NEGOTIATE_COMMAND,
+    Codec,
+    Compression,
+    compression_for,
+    encode_compressed_frame,
+    select_compression,
+    select_format,
+    wire_codec,
+)
+
+Handler = Callable[[Dict[str, Any]], Any]
+
+# 批次步驟結果引用，例如 "$0.id"、"$1.position.x"、"$0.outputs[0].id"（與插件的 batch 命令相同）
+STEP_REFERENCE = re.compile(r"^\$(\d+)(?:\.([A-Za-z_][\w.\[\]]*))?$")
+
+# 引用路徑的一段：".名稱"（第一段沒有點）或 "[索引]"
+_PATH_SEGMENT = re.compile(r"\.?([^.\[\]]+)|\[(\d+)\]")
+
+# _select_token 找不到路徑時的返回值（結果本身可能是 None）
+_MISSING = object()
+
+
+def _select_token(target: Any, path: str) -> Any:
+    """與 JSON.NET 的 SelectToken 相同：名稱只對物件、[索引] 只對陣列；找不到時返回 _MISSING"""
+    position = 0
+    while position < len(path):
+        match = _PATH_SEGMENT.match(path, position)
+        # 第一段以外的名稱前面必須有點
+        if not match or (match.group(1) is not None and position > 0 and path[position] != "."):
+            raise ValueError(f"Invalid reference path '{path}'")
+        position = match.end()
+        name, index = match.groups()
+        if name is not None:
+            if not isinstance(target, dict) or name not in target:
+                return _MISSING
+            target = target[name]
+        else:
+            if not isinstance(target, list) or int(index) >= len(target):
+                return _MISSING
+            target = target[int(index)]
+    return target
+
+
+def resolve_step_references(value: Any, step_data: List[Any]) -> Any:
+    """將參數中的 "$N.path" 字串替換為第 N 步結果中對應的值"""
+    if isinstance(value, str):
+        match = STEP_REFERENCE.match(value)
+        if not match:
+            return value
+
+        index = int(match.group(1))
+        if index >= len(step_data):
+            raise ValueError(f"Reference '{value}' points to a step that has not run yet")
+        if step_data[index] is None:
+            raise ValueError(f"Reference '{value}' points to a failed step")
+
+        target = step_data[index]
+        path = match.group(2)
+        if path:
+            selected = _select_token(target, path)
+            # "$N.id" 也可以取得 componentId
+            if selected is _MISSING and path == "id":
+                selected = _select_token(target, "componentId")
+            if selected is _MISSING:
+                raise ValueError(f"Reference '{value}' not found in result of step {index}")
+            target = selected
+        return target
+
+    if isinstance(value, dict):
+        return {k: resolve_step_references(v, step_data) for k, v in value.items()}
+    if isinstance(value, list):
+        return [resolve_step_references(v, step_data) for v in value]
+    return value
+
+
+# 舊版插件等待 UI 執行緒完成時的輪詢間隔（while ... Thread.Sleep(10)）
+UI_POLL_INTERVAL = 0.010
+
+# UI 執行緒交接方式
+UI_HANDOFF_MODES = ("signaled", "polling")
+
+
+class _UiThread:
+    """
+    模擬 Rhino 的 UI 執行緒：所有命令排隊在單一執行緒上執行
+
+    signaled：工作完成時立即喚醒等待的連接執行緒（UiThreadDispatcher）
+    polling：連接執行緒每 10 ms 檢查一次是否完成（舊版處理器的忙碌等待）
+    """
+
+    def __init__(self):
+        self._queue: "queue.Queue" = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="standin-ui-thread", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            work, holder, done = item
+            try:
+                holder["result"] = work()
+            except BaseException as e:
+                holder["error"] = e
+            done.set()
+
+    def invoke(self, work: Callable[[], Any], mode: str) -> Any:
+        holder: Dict[str, Any] = {}
+        done = threading.Event()
+        self._queue.put((work, holder, done))
+        if mode == "polling":
+            while not done.is_set():
+                time.sleep(UI_POLL_INTERVAL)
+        else:
+            done.wait()
+        if "error" in holder:
+            raise holder["error"]
+        return holder["result"]
+
+    def stop(self):
+        self._queue.put(None)
+
+
+def default_handler(command: Dict[str, Any]) -> Any:
+    """預設處理器：回傳命令本身，方便檢查請求內容"""
+    return {"echo": command.get("type"), "parameters": command.get("parameters", {})}
+
+
+class _Wire(NamedTuple):
+    """一條連接目前的訊息格式"""
+
+    codec: Codec
+    compression: Optional[Compression] = None
+    threshold: int = DEFAULT_COMPRESS_THRESHOLD
+
+    def encode(self, response: Dict[str, Any]) -> Tuple[bytes, bool]:
+        """編碼並分框一個回應；返回 (資料, 是否壓縮)"""
+        if self.compression is None:
+            return self.codec.encode_message(response), False
+        data = encode_compressed_frame(self.codec.encode(response), self.compression, self.threshold)
+        return data, bool(data[0] & FLAG_COMPRESSED)
+
+
+class _StandinRequestHandler(socketserver.BaseRequestHandler):
+    """處理單一客戶端連接：逐行（或協商後逐框）讀取命令並回應"""
+
+    def setup(self):
+        if self.request.family in (socket.AF_INET, socket.AF_INET6):
+            self.request.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.server.standin._on_connect(self.request)
+
+    def finish(self):
+        self.server.standin._on_disconnect(self.request)
+
+    def _next_message(self, buffer: bytearray, wire: _Wire) -> Optional[bytes]:
+        """從緩衝區取出一個完整的訊息（一行、長度前綴或壓縮分框）；資料不足時返回 None"""
+        if wire.compression is not None:
+            if len(buffer) < COMPRESSED_FRAME_HEADER.size:
+                return None
+            flags, size = COMPRESSED_FRAME_HEADER.unpack_from(buffer)
+            end = COMPRESSED_FRAME_HEADER.size + size
+            if len(buffer) < end:
+                return None
+            message = bytes(buffer[COMPRESSED_FRAME_HEADER.size:end])
+            del buffer[:end]
+            return wire.compression.decompress(message) if flags & FLAG_COMPRESSED else message
+
+        if wire.codec.framing == LINE_FRAMING:
+            index = buffer.find(b"\n")
+            if index < 0:
+                return None
+            message = bytes(buffer[:index])
+            del buffer[:index + 1]
+            return message
+
+        if len(buffer) < FRAME_HEADER.size:
+            return None
+        (size,) = FRAME_HEADER.unpack_from(buffer)
+        end = FRAME_HEADER.size + size
+        if len(buffer) < end:
+            return None
+        message = bytes(buffer[FRAME_HEADER.size:end])
+        del buffer[:end]
+        return message
+
+    def handle(self):
+        standin = self.server.standin
+        buffer = bytearray()
+        wire = _Wire(JSON_CODEC)
+        while not standin._stopping.is_set():
+            message = self._next_message(buffer, wire)
+            if message is None:
+                try:
+                    chunk = self.request.recv(RECV_CHUNK_SIZE)
+                except OSError:
+                    return
+                if not chunk:
+                    return
+                if standin.network_delay:
+                    # 模擬網路延遲：每批到達的資料延遲一次，而不是每個命令
+                    time.sleep(standin.network_delay)
+                buffer += chunk
+                continue
+
+            if wire.codec.framing == LINE_FRAMING and wire.compression is None and not message.strip():
+                continue
+
+            negotiated = None
+            if (standin.codecs or standin.compression) and message.startswith(b"{") \
+                    and NEGOTIATE_COMMAND.encode() in message:
+                response, negotiated = standin.negotiate(message, wire.codec)
+            else:
+                response = standin.dispatch(message, wire.codec)
+            data, compressed = wire.encode(response)
+            if compressed:
+                with standin._lock:
+                    standin.responses_compressed += 1
+            try:
+                self.request.sendall(data)
+            except OSError:
+                return
+            if negotiated is not None:
+                # 握手回應以原本的格式送出，之後的訊息才改用協商的格式
+                wire = negotiated
+
+            if not standin.keep_alive:
+                # 模擬原版插件：回應後即關閉連接
+                return
+
+
+class _ThreadingTCPServer(socketserver.ThreadingMixIn, socketserver.TCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+    request_queue_size = 128
+
+
+if hasattr(socketserver, "UnixStreamServer"):
+    class _ThreadingUnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+        daemon_threads = True
+        request_queue_size = 128
+
+
+class StandinServer:
+    """
+    Grasshopper 插件替身
+
+    Args:
+        host: 監聽位址
+        port: 監聽埠（0 代表自動分配）
+        handlers: 命令類型 → 處理函數，處理函數返回的值會放在回應的 data 欄位
+        keep_alive: 回應後是否保持連接（False 模擬原版插件每次回應後關閉）
+        latency: 每個命令的模擬處理時間（秒）
+        fallback: 未註冊命令的處理函數（None 代表回傳「未註冊」錯誤，與插件相同）
+        echo_ids: 是否在回應中帶回請求的 "id"（False 模擬尚未支援管線化 ID 的插件）
+        network_delay: 每次收到資料時的模擬網路延遲（秒）
+        ui_handoff: None 在連接執行緒上直接處理；"signaled" / "polling" 模擬插件把命令
+            排到單一 UI 執行緒執行，並以完成通知或 10 ms 輪詢等待結果
+        unix_path: 在此路徑的 Unix domain socket 上監聽（取代 host / port）
+        codecs: negotiate_codec 握手時接受的線上格式（例如 ("msgpack", "json")）
+        compression: 握手時接受的壓縮（例如 ("zstd", "zlib")）；codecs 與 compression 都是空的代表
+            不支援握手，與目前的插件相同（只指定 compression 時格式為 JSON）
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        handlers: Optional[Dict[str, Handler]] = None,
+        keep_alive: bool = True,
+        latency: float = 0.0,
+        fallback: Optional[Handler] = default_handler,
+        echo_ids: bool = True,
+        network_delay: float = 0.0,
+        ui_handoff: Optional[str] = None,
+        unix_path: Optional[str] = None,
+        codecs: Sequence[str] = (),
+        compression: Sequence[str] = (),
+    ):
+        if ui_handoff is not None and ui_handoff not in UI_HANDOFF_MODES:
+            raise ValueError(f"ui_handoff must be one of {UI_HANDOFF_MODES}")
+        self.handlers: Dict[str, Handler] = dict(handlers or {})
+        self.fallback = fallback
+        self.echo_ids = echo_ids
+        self.network_delay = network_delay
+        self.keep_alive = keep_alive
+        self.latency = latency
+        self.ui_handoff = ui_handoff
+        self.codecs = tuple(codecs)
+        self.compression = tuple(compression)
+        self._ui_thread = _UiThread() if ui_handoff else None
+
+        self.connections_accepted = 0
+        self.commands_handled = 0
+        self.responses_compressed = 0
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._clients = set()
+        self._thread: Optional[threading.Thread] = None
+
+        self.unix_path = unix_path
+        if unix_path is None:
+            self._server = _ThreadingTCPServer((host, port), _StandinRequestHandler, bind_and_activate=True)
+            self.host, self.port = self._server.server_address[:2]
+        else:
+            if not hasattr(socketserver, "UnixStreamServer"):
+                raise ValueError("Unix domain sockets are not supported on this platform")
+            _remove_stale_socket(unix_path)
+            self._server = _ThreadingUnixServer(unix_path, _StandinRequestHandler, bind_and_activate=True)
+            self.host, self.port = UNIX_PREFIX + unix_path, 0
+        self._server.standin = self
+
+    def register(self, command_type: str, handler: Handler):
+        """註冊命令處理函數"""
+        self.handlers[command_type] = handler
+
+    def _on_connect(self, sock: socket.socket):
+        with self._lock:
+            self.connections_accepted += 1
+            self._clients.add(sock)
+
+    def _on_disconnect(self, sock: socket.socket):
+        with self._lock:
+            self._clients.discard(sock)
+
+    def dispatch(self, message: bytes, codec: Codec = JSON_CODEC) -> Dict[str, Any]:
+        """解析一個命令（預設為一行 JSON）並產生回應"""
+        try:
+            command = codec.decode(message)
+        except ValueError as e:
+            return error_response(f"Invalid command {codec.name.upper()}: {e}")
+
+        with self._lock:
+            self.commands_handled += 1
+
+        if self._ui_thread is not None:
+            response = self._ui_thread.invoke(lambda: self._process(command), self.ui_handoff)
+        else:
+            response = self._process(command)
+        if self.echo_ids and "id" in command:
+            response["id"] = command["id"]
+        return response
+
+    def negotiate(self, message: bytes, codec: Codec) -> Tuple[Dict[str, Any], Optional[_Wire]]:
+        """
+        處理 negotiate_codec 握手（在連接層處理，不經過命令處理函數與 UI 執行緒）
+
+        Returns:
+            (回應, 之後使用的格式)；不是握手命令時照一般命令處理，格式為 None
+        """
+        try:
+            command = codec.decode(message)
+        except ValueError:
+            command = None
+        if not isinstance(command, dict) or command.get("type") != NEGOTIATE_COMMAND:
+            return self.dispatch(message, codec), None
+
+        params = command.get("parameters") or {}
+        offered = params.get("codecs") or []
+        name = select_format(offered, self.codecs or ("json",))
+        if name is None:
+            return error_response(f"None of the offered codecs are supported: {offered}"), None
+        data: Dict[str, Any] = {"codec": name}
+        wire = _Wire(wire_codec(name))
+
+        compression = select_compression(params.get("compression") or [], self.compression)
+        if compression is not None:
+            threshold = int(params.get("compressThreshold") or DEFAULT_COMPRESS_THRESHOLD)
+            data.update(compression=compression, compressThreshold=threshold)
+            wire = _Wire(wire.codec, compression_for(compression), threshold)
+
+        response: Dict[str, Any] = {"success": True, "data": data}
+        if self.echo_ids and "id" in command:
+            response["id"] = command["id"]
+        return response, wire
+
+    def _process(self, command: Dict[str, Any]) -> Dict[str, Any]:
+        if self.latency:
+            time.sleep(self.latency)
+        return self._execute(command)
+
+    def _execute(self, command: Dict[str, Any]) -> Dict[str, Any]:
+        command_type = command.get("type")
+        if command_type == "batch" and "batch" not in self.handlers:
+            return {"success": True, "data": self._batch(command.get("parameters", {}))}
+
+        handler = self.handlers.get(command_type, self.fallback)
+        if handler is None:
+            return error_response(f"No handler registered for command type '{command_type}'")
+
+        try:
+            return {"success": True, "data": handler(command)}
+        except Exception as e:
+            return error_response(f"Error executing command '{command_type}': {e}")
+
+    def drop_connections(self):
+        """從伺服器端切斷所有現有連接（模擬插件重啟或網路中斷）"""
+        with self._lock:
+            clients = list(self._clients)
+        for sock in clients:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+    def _batch(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """與插件的 batch 命令相同：依序執行，支援 "$N.path" 引用前面步驟的結果"""
+        steps = params.get("commands") or []
+        stop_on_error = params.get("stopOnError", True)
+        results = []
+        step_data: List[Any] = []
+
+        for index, step in enumerate(steps):
+            step_type = step.get("type")
+            if not step_type:
+                response = error_response("Batch step is missing 'type'")
+            elif step_type == "batch":
+                response = error_response("Nested batch commands are not supported")
+            else:
+                try:
+                    parameters = resolve_step_references(step.get("parameters") or {}, step_data)
+                    response = self._execute({"type": step_type, "parameters": parameters})
+                except ValueError as e:
+                    response = error_response(f"Error executing command '{step_type}': {e}")
+
+            step_data.append(response.get("data") if response["success"] else None)
+            results.append({
+                "index": index,
+                "type": step_type,
+                "success": response["success"],
+                "data": response.get("data"),
+                "error": response.get("error"),
+            })
+            if not response["success"] and stop_on_error:
+                break
+
+        return {
+            "completed": sum(1 for r in results if r["success"]),
+            "total": len(steps),
+            "results": results,
+        }
+
+    def start(self) -> "StandinServer":
+        """在背景執行緒中啟動伺服器"""
+        self._thread = threading.Thread(
+            target=self._server.serve_forever,
+            kwargs={"poll_interval": 0.05},
+            name="standin-server",
+            daemon=True,
+        )
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """停止伺服器"""
+        self._stopping.set()
+        self._server.shutdown()
+        self._server.server_close()
+        if self.unix_path is not None:
+            _remove_stale_socket(self.unix_path)
+        self.drop_connections()
+        if self._ui_thread is not None:
+            self._ui_thread.stop()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    def __enter__(self) -> "StandinServer":
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+def _remove_stale_socket(path: str):
+    """移除先前留下的 socket 檔（不是 socket 的檔案保持不動，bind 時會報錯）"""
+    try:
+        if stat.S_ISSOCK(os.stat(path).st_mode):
+            os.unlink(path)
+    except FileNotFoundError:
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in for the Grasshopper MCP plugin")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--latency", type=float, default=0.0, help="Simulated processing time per command (seconds)")
+    parser.add_argument("--close-after-response", action="store_true", help="Close each connection after one response, like the original plugin")
+    parser.add_argument("--ui-handoff", choices=UI_HANDOFF_MODES, help="Run commands on a simulated UI thread")
+    parser.add_argument("--unix", metavar="PATH", help="Listen on a Unix domain socket instead of TCP")
+    parser.add_argument("--codecs", nargs="+", default=[], metavar="CODEC",
+                        help="Wire formats accepted in the negotiate_codec handshake, e.g. msgpack json")
+    parser.add_argument("--compression", nargs="+", default=[], metavar="ALGORITHM",
+                        help="Compression accepted in the negotiate_codec handshake, e.g. zstd zlib")
+    args = parser.parse_args()
+
+    server = StandinServer(args.host, args.port, keep_alive=not args.close_after_response, latency=args.latency,
+                           ui_handoff=args.ui_handoff, unix_path=args.unix, codecs=args.codecs,
+                           compression=args.compression)
+    print(f"Stand-in Grasshopper server listening on {format_endpoint(server.host, server.port)}", file=sys.stderr)
+    try:
+        server._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server._server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,347 @@
+"""
+線路編碼（codec）
+
+原協定的每個訊息都是 json.dumps / json.loads 加上 BOM 處理；讀取數 MB 的輸出資料或文件圖時，
+編碼與解析本身就佔掉明顯的時間。這裡把訊息的編碼抽成可替換的一層：
+
+- json：一行一個 JSON（原協定）。安裝 orjson 時改用 orjson 編碼與解析，線上內容仍是 JSON，
+  插件不需要任何改變，因此不需要協商
+- msgpack：MessagePack 二進位格式，以 4 位元組（big-endian）長度前綴分框（二進位內容可能含有換行符）。
+  需要插件支援：連接建立後以 negotiate_codec 握手命令協商，插件不認得時該連接繼續使用 JSON
+
+握手以一般的 JSON 行送出:
+    請求: {"type": "negotiate_codec", "parameters": {"codecs": ["msgpack", "json"]}}
+    回應: {"success": true, "data": {"codec": "msgpack"}}
+插件從清單中選出第一個支援的格式；回應之後兩端在這條連接上都改用該格式。
+舊版插件回傳「未註冊命令」錯誤（或沒有 codec 欄位的資料），連接保持 JSON。
+
+握手也可以協商壓縮（zlib，或安裝 zstandard 時的 zstd）:
+    請求參數: {"codecs": [...], "compression": ["zstd", "zlib"], "compressThreshold": 65536}
+    回應資料: {"codec": "json", "compression": "zlib", "compressThreshold": 65536}
+協商出壓縮的連接不論編碼都改用「旗標 + 長度」分框（1 + 4 位元組）：內容達到門檻且壓縮後較小時才壓縮並設定旗標，
+小型訊息照常傳送。GUID、型別與參數名稱重複出現的大型回應通常可以縮小數倍。
+"""
+
+import json
+import struct
+import zlib
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+try:
+    import orjson
+except ImportError:  # 選用：pip install orjson
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # 選用：pip install msgpack
+    msgpack = None
+
+try:
+    import zstandard
+except ImportError:  # 選用：pip install zstandard
+    zstandard = None
+
+# 行分隔的訊息結尾
+DELIMITER = b"\n"
+
+# 長度前綴分框的標頭（訊息位元組數，big-endian uint32）
+FRAME_HEADER = struct.Struct(">I")
+
+# 壓縮連接的分框標頭（旗標、訊息位元組數）
+COMPRESSED_FRAME_HEADER = struct.Struct(">BI")
+FLAG_COMPRESSED = 0x01
+
+# 預設壓縮門檻（位元組）：較小的訊息壓縮省下的時間不如壓縮本身
+DEFAULT_COMPRESS_THRESHOLD = 64 * 1024
+
+# 插件可能在 JSON 前面加上 UTF-8 BOM
+_BOM = b"\xef\xbb\xbf"
+
+# 協商線路編碼的握手命令
+NEGOTIATE_COMMAND = "negotiate_codec"
+
+# 分框方式
+LINE_FRAMING = "line"
+LENGTH_FRAMING = "length"
+
+
+class Codec(ABC):
+    """
+    單一訊息的編碼方式
+
+    name 是線上格式的名稱（握手時使用）；同一個格式可以有不同的實作（例如 json 與 orjson）。
+    """
+
+    name = ""
+    library = ""
+    framing = LINE_FRAMING
+
+    @abstractmethod
+    def encode(self, obj: Any) -> bytes:
+        """編碼一個訊息（不含分框）"""
+
+    @abstractmethod
+    def decode(self, data: bytes) -> Any:
+        """解析一個訊息（不含分框）"""
+
+    def frame(self, payload: bytes) -> bytes:
+        """加上分框：行結尾或長度前綴"""
+        if self.framing == LINE_FRAMING:
+            return payload + DELIMITER
+        return FRAME_HEADER.pack(len(payload)) + payload
+
+    def encode_message(self, obj: Any) -> bytes:
+        """編碼並分框，可以直接寫到連接上"""
+        return self.frame(self.encode(obj))
+
+    def __repr__(self) -> str:
+        return f"<{type(self).__name__} {self.name} ({self.library})>"
+
+
+class JsonCodec(Codec):
+    """標準函式庫 json（與原協定完全相同）"""
+
+    name = "json"
+    library = "json"
+
+    def encode(self, obj: Any) -> bytes:
+        return json.dumps(obj).encode("utf-8")
+
+    def decode(self, data: bytes) -> Any:
+        return json.loads(bytes(data).decode("utf-8-sig").strip())
+
+
+class OrjsonCodec(JsonCodec):
+    """orjson：同樣的 JSON 文字，編碼與解析快數倍"""
+
+    library = "orjson"
+
+    def __init__(self):
+        if orjson is None:
+            raise ValueError("The orjson codec requires the orjson package: pip install orjson")
+
+    def encode(self, obj: Any) -> bytes:
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+        except TypeError:
+            # orjson 不支援的值（例如超過 64 位元的整數）交給標準函式庫
+            return super().encode(obj)
+
+    def decode(self, data: bytes) -> Any:
+        if data[:3] == _BOM:
+            data = memoryview(data)[3:]
+        return orjson.loads(data)
+
+
+class MsgpackCodec(Codec):
+    """MessagePack（長度前綴分框，需要與插件協商）"""
+
+    name = "msgpack"
+    library = "msgpack"
+    framing = LENGTH_FRAMING
+
+    def __init__(self):
+        if msgpack is None:
+            raise ValueError("The msgpack codec requires the msgpack package: pip install msgpack")
+
+    def encode(self, obj: Any) -> bytes:
+        return msgpack.packb(obj, use_bin_type=True)
+
+    def decode(self, data: bytes) -> Any:
+        return msgpack.unpackb(data, raw=False)
+
+
+# GRASSHOPPER_CODEC 的選項
+CODEC_CHOICES = ("auto", "json", "orjson", "msgpack")
+
+
+def json_codec() -> Codec:
+    """最快的可用 JSON 實作（有 orjson 時使用 orjson）"""
+    return OrjsonCodec() if orjson is not None else JsonCodec()
+
+
+def get_codec(name: str) -> Codec:
+    """
+    依名稱建立編碼
+
+    "auto" 與 "json" 以外的名稱需要對應的套件；"auto" 等於 json_codec()。
+
+    Raises:
+        ValueError: 未知的名稱，或需要的套件沒有安裝
+    """
+    if name == "auto":
+        return json_codec()
+    if name == "json":
+        return JsonCodec()
+    if name == "orjson":
+        return OrjsonCodec()
+    if name == "msgpack":
+        return MsgpackCodec()
+    raise ValueError(f"Unknown codec '{name}', expected one of {CODEC_CHOICES}")
+
+
+def wire_codec(name: str) -> Optional[Codec]:
+    """線上格式名稱 → 本端的最快實作；本端不支援時返回 None"""
+    if name == "json":
+        return json_codec()
+    if name == "msgpack" and msgpack is not None:
+        return MsgpackCodec()
+    return None
+
+
+def available_formats() -> List[str]:
+    """本端可以使用的線上格式（偏好順序）"""
+    return [name for name in ("msgpack", "json") if wire_codec(name) is not None]
+
+
+def negotiation_command(
+    formats: Sequence[str],
+    compression: Sequence[str] = (),
+    threshold: int = DEFAULT_COMPRESS_THRESHOLD,
+) -> Dict[str, Any]:
+    """建立握手命令（formats 與 compression 依偏好順序）"""
+    parameters: Dict[str, Any] = {"codecs": list(formats)}
+    if compression:
+        parameters["compression"] = list(compression)
+        parameters["compressThreshold"] = threshold
+    return {"type": NEGOTIATE_COMMAND, "parameters": parameters}
+
+
+def negotiated_format(response: Dict[str, Any], offered: Sequence[str]) -> Optional[str]:
+    """從握手回應取得插件選擇的格式；插件不支援握手（或選了沒有提供的格式）時返回 None"""
+    if not response.get("success"):
+        return None
+    data = response.get("data")
+    name = data.get("codec") if isinstance(data, dict) else None
+    return name if name in offered else None
+
+
+def select_format(offered: Sequence[str], supported: Sequence[str]) -> Optional[str]:
+    """插件端：從客戶端提供的清單中選出第一個本端支援的格式"""
+    for name in offered:
+        if name in supported and wire_codec(name) is not None:
+            return name
+    return None
+
+
+# ============================================================================
+# 壓縮
+# ============================================================================
+
+class Compression(ABC):
+    """一種壓縮演算法（name 是握手時使用的名稱）"""
+
+    name = ""
+
+    @abstractmethod
+    def compress(self, data: bytes) -> bytes:
+        """壓縮一個訊息"""
+
+    @abstractmethod
+    def decompressor(self) -> Any:
+        """逐段解壓縮的物件：decompress(chunk) 返回目前可以取得的內容，flush() 返回剩餘內容"""
+
+    def decompress(self, data: bytes) -> bytes:
+        decompressor = self.decompressor()
+        return decompressor.decompress(data) + decompressor.flush()
+
+    def __repr__(self) -> str:
+        return f"<{type(self).__name__} {self.name}>"
+
+
+class ZlibCompression(Compression):
+    """zlib（標準函式庫）；預設等級 1，大型 JSON 已經可以縮小數倍"""
+
+    name = "zlib"
+
+    def __init__(self, level: int = 1):
+        self.level = level
+
+    def compress(self, data: bytes) -> bytes:
+        return zlib.compress(data, self.level)
+
+    def decompressor(self) -> Any:
+        return zlib.decompressobj()
+
+
+class ZstdCompression(Compression):
+    """zstd：壓縮率與速度都優於 zlib"""
+
+    name = "zstd"
+
+    def __init__(self, level: int = 3):
+        if zstandard is None:
+            raise ValueError("zstd compression requires the zstandard package: pip install zstandard")
+        self.level = level
+
+    def compress(self, data: bytes) -> bytes:
+        # 寫入內容大小，讓一次解壓縮的一方可以預先配置
+        return zstandard.ZstdCompressor(level=self.level, write_content_size=True).compress(data)
+
+    def decompressor(self) -> Any:
+        return zstandard.ZstdDecompressor().decompressobj()
+
+
+# GRASSHOPPER_COMPRESSION 的選項
+COMPRESSION_CHOICES = ("off", "auto", "zlib", "zstd")
+
+
+def compression_for(name: str) -> Optional[Compression]:
+    """壓縮名稱 → 本端實作；本端不支援時返回 None"""
+    if name == "zlib":
+        return ZlibCompression()
+    if name == "zstd" and zstandard is not None:
+        return ZstdCompression()
+    return None
+
+
+def compression_offer(name: str) -> List[str]:
+    """
+    依設定建立握手時提供的壓縮清單（偏好順序）
+
+    "off" 不提供；"auto" 提供本端支援的全部（zstd 優先）。
+
+    Raises:
+        ValueError: 未知的名稱，或需要的套件沒有安裝
+    """
+    if name == "off":
+        return []
+    if name == "auto":
+        return [n for n in ("zstd", "zlib") if compression_for(n) is not None]
+    if name not in COMPRESSION_CHOICES:
+        raise ValueError(f"Unknown compression '{name}', expected one of {COMPRESSION_CHOICES}")
+    if compression_for(name) is None:
+        raise ValueError(f"{name} compression requires the zstandard package: pip install zstandard")
+    return [name]
+
+
+def negotiated_compression(response: Dict[str, Any], offered: Sequence[str]) -> Optional[Tuple[Compression, int]]:
+    """從握手回應取得插件選擇的壓縮與門檻；未協商壓縮時返回 None"""
+    data = response.get("data") if response.get("success") else None
+    name = data.get("compression") if isinstance(data, dict) else None
+    if name not in offered:
+        return None
+    compression = compression_for(name)
+    if compression is None:
+        return None
+    return compression, int(data.get("compressThreshold") or DEFAULT_COMPRESS_THRESHOLD)
+
+
+def select_compression(offered: Sequence[str], supported: Sequence[str]) -> Optional[str]:
+    """插件端：從客戶端提供的清單中選出第一個本端支援的壓縮"""
+    for name in offered:
+        if name in supported and compression_for(name) is not None:
+            return name
+    return None
+
+
+def encode_compressed_frame(payload: bytes, compression: Compression, threshold: int) -> bytes:
+    """壓縮連接的分框：達到門檻且壓縮後較小時才壓縮"""
+    flags = 0
+    if len(payload) >= threshold:
+        compressed = compression.compress(payload)
+        if len(compressed) < len(payload):
+            payload, flags = compressed, FLAG_COMPRESSED
+    return COMPRESSED_FRAME_HEADER.pack(flags, len(payload)) + payload
@@ -6,14 +6,28 @@ AI 協作評分系統 Demo
 注意：這是架構示範，實際使用時可以：
 1. 使用 Claude Code 的 MCP 功能直接呼叫
 2. 或使用 Anthropic API（需要 pip install anthropic）
+
+離線評分（不需要 Rhino）：
+    python3 tests/ai_grading_demo.py submissions/student_01.ghx
 """
 
+import os
 import socket
 import json
+import sys
+from collections import Counter
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "python_bridge"))
+
+from ghx_reader import READER_VERSION, read_ghx  # noqa: E402
 
 GRASSHOPPER_HOST = "localhost"
 GRASSHOPPER_PORT = 8080
 
+# 作業資訊的格式（build_grading_context）改變時遞增；與讀取器版本一起作為快取的版本
+CONTEXT_VERSION = 1
+EXTRACTOR_VERSION = f"ghx-{READER_VERSION}/context-{CONTEXT_VERSION}"
+
 def send_command(command_type, params=None):
     """發送命令到 Grasshopper"""
     command = {
@@ -45,12 +59,51 @@ def send_command(command_type, params=None):
     except Exception as e:
         return {"success": False, "error": str(e)}
 
-def extract_grasshopper_context():
-    """從 Grasshopper 提取完整作業資訊"""
+def build_grading_context(document_name, graph):
+    """
+    由 export_document_graph 的結果（或 read_ghx 的結果）建立評分用的作業資訊
+
+    線上（插件）與離線（.ghx）兩條路徑都產生相同的結構
+    """
+    components = graph.get("components", [])
+    return {
+        "document_name": document_name,
+        "total_components": len(components),
+        "component_types": dict(Counter(c.get("type") for c in components)),
+        "parameters": [
+            {"id": c["id"], "type": c.get("type"), "name": c.get("name"), **c["parameters"]}
+            for c in components if c.get("parameters")
+        ],
+        "wires": graph.get("wires", []),
+    }
+
+def extract_ghx_context(path):
+    """從 .ghx 檔案提取作業資訊（離線，不需要 Rhino）"""
+    graph = read_ghx(path)
+    name = graph.get("name") or os.path.splitext(os.path.basename(path))[0]
+    return build_grading_context(name, graph)
+
+def extract_grasshopper_context(ghx_path=None):
+    """從 Grasshopper 提取完整作業資訊；指定 ghx_path 時直接讀取檔案"""
+
+    if ghx_path:
+        print(f"📊 正在讀取 {ghx_path} ...")
+        context = extract_ghx_context(ghx_path)
+        print(f"✅ 讀取到 {context['total_components']} 個組件")
+        return context
 
     print("📊 正在提取 Grasshopper 作業資訊...")
 
     try:
+        # 一次取得所有組件與連線（增強版插件）
+        graph = send_command("export_document_graph", {"fields": ["type", "name", "parameters", "wires"]})
+        if graph.get("success"):
+            doc_info = send_command("get_document_info")
+            name = doc_info.get("data", {}).get("name", "未命名") if doc_info.get("success") else "未命名"
+            context = build_grading_context(name, graph["data"])
+            print(f"✅ 成功連接 - 讀取到 {context['total_components']} 個組件")
+            return context
+
         # 1. 文檔基本資訊
         doc_info = send_command("get_document_info")
 
@@ -135,6 +188,15 @@ def prepare_grading_prompt(context, assignment_requirements):
     for comp_type, count in context['component_types'].items():
         prompt += f"- {comp_type}: {count} 個\n"
 
+    if context.get('parameters'):
+        prompt += "\n參數設定:\n"
+        for param in context['parameters']:
+            values = ", ".join(f"{k}={v}" for k, v in param.items() if k not in ("id", "type", "name"))
+            prompt += f"- {param['name']} ({param['type']}): {values}\n"
+
+    if 'wires' in context:
+        prompt += f"\n連線數量: {len(context['wires'])}\n"
+
     prompt += """
 ## 請評分並給出詳細反饋
 
@@ -249,8 +311,8 @@ def main():
     print("AI 協作評分系統")
     print("=" * 70)
 
-    # 1. 從 Grasshopper 提取作業資訊
-    context = extract_grasshopper_context()
+    # 1. 從 Grasshopper（或指定的 .ghx 檔案）提取作業資訊
+    context = extract_grasshopper_context(sys.argv[1] if len(sys.argv) > 1 else None)
 
     # 2. 定義作業要求
     assignment_requirements = """
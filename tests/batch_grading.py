@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+批量評分：一次處理整個班級的作業（.ghx）
+
+提取作業資訊與準備評分提示分散到多個行程平行執行（不需要 Rhino），
+每完成一份就寫入 JSONL 結果檔的一行。結果檔同時是檢查點：
+中斷後以相同命令重新執行，已成功的作業會略過，失敗的作業會重試。
+
+指定 --cache-dir 時，提取出的作業資訊依檔案內容保存在磁碟上；
+調整評分要求後以新的結果檔重新執行，內容沒變的作業不再提取，只重新準備提示。
+
+    python3 tests/batch_grading.py submissions/ --requirements requirements.txt \\
+        --output results.jsonl --workers 8 --cache-dir .grading_cache
+
+結果檔每一行：
+    {"submission": "student_01.ghx", "status": "ok", "context": {...}, "prompt": "..."}
+    {"submission": "student_02.ghx", "status": "error", "error": "..."}
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from ai_grading_demo import EXTRACTOR_VERSION, extract_ghx_context, prepare_grading_prompt
+from context_cache import DEFAULT_MAX_BYTES, ContextCache
+
+DEFAULT_PATTERN = ".ghx"
+
+
+def find_submissions(directory, suffix=DEFAULT_PATTERN):
+    """目錄（含子目錄）中的所有作業，依相對路徑排序"""
+    found = []
+    for root, _, files in os.walk(directory):
+        for name in files:
+            if name.lower().endswith(suffix):
+                found.append(os.path.relpath(os.path.join(root, name), directory))
+    return sorted(found)
+
+
+def prepare_submission(directory, submission, requirements, cache_dir=None, cache_bytes=DEFAULT_MAX_BYTES):
+    """在工作行程中執行：提取作業資訊（或從快取取得）並準備評分提示；錯誤記錄在結果中而不是拋出"""
+    try:
+        path = os.path.join(directory, submission)
+        if cache_dir:
+            cache = ContextCache(cache_dir, EXTRACTOR_VERSION, cache_bytes)
+            context = cache.get_or_compute(path, extract_ghx_context)
+            cached = cache.hits > 0
+        else:
+            context, cached = extract_ghx_context(path), False
+        return {
+            "submission": submission,
+            "status": "ok",
+            "cached": cached,
+            "context": context,
+            "prompt": prepare_grading_prompt(context, requirements),
+        }
+    except Exception as e:
+        return {"submission": submission, "status": "error", "error": f"{type(e).__name__}: {e}"}
+
+
+def load_checkpoint(output):
+    """
+    讀取既有的結果檔，返回已成功的作業
+
+    中斷時最後一行可能只寫了一半：截斷到最後一個完整的行，之後的結果接在後面
+    """
+    done = set()
+    if not os.path.exists(output):
+        return done
+
+    with open(output, "rb+") as f:
+        data = f.read()
+        end = data.rfind(b"\n") + 1
+        if end != len(data):
+            f.truncate(end)
+
+    for line in data[:end].splitlines():
+        try:
+            record = json.loads(line)
+        except ValueError:
+            continue
+        if record.get("status") == "ok":
+            done.add(record["submission"])
+        else:
+            done.discard(record.get("submission"))
+    return done
+
+
+def run_batch(directory, requirements, output, workers=None, suffix=DEFAULT_PATTERN, progress=True,
+              cache_dir=None, cache_bytes=DEFAULT_MAX_BYTES):
+    """
+    處理目錄中尚未完成的作業
+
+    Returns:
+        {"total", "skipped", "processed", "cached", "failed", "seconds"}
+    """
+    submissions = find_submissions(directory, suffix)
+    done = load_checkpoint(output)
+    pending = [s for s in submissions if s not in done]
+
+    started = time.perf_counter()
+    failed = cached = 0
+    with open(output, "a", encoding="utf-8") as out, ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(prepare_submission, directory, s, requirements, cache_dir, cache_bytes)
+                   for s in pending]
+        for count, future in enumerate(as_completed(futures), 1):
+            record = future.result()
+            out.write(json.dumps(record, ensure_ascii=False) + "\n")
+            out.flush()
+
+            if record["status"] != "ok":
+                failed += 1
+            elif record["cached"]:
+                cached += 1
+            if progress:
+                mark = f"❌ {record['error']}" if record["status"] != "ok" else "✅（快取）" if record["cached"] else "✅"
+                print(f"[{count}/{len(pending)}] {record['submission']} {mark}", file=sys.stderr)
+
+    if cache_dir:
+        ContextCache(cache_dir, EXTRACTOR_VERSION, cache_bytes).evict()
+
+    return {
+        "total": len(submissions),
+        "skipped": len(submissions) - len(pending),
+        "processed": len(pending),
+        "cached": cached,
+        "failed": failed,
+        "seconds": time.perf_counter() - started,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("directory", help="作業目錄")
+    parser.add_argument("--requirements", required=True, help="作業要求（文字檔）")
+    parser.add_argument("--output", default="grading_results.jsonl", help="結果檔（JSONL，同時是檢查點）")
+    parser.add_argument("--workers", type=int, default=None, help="工作行程數（預設為 CPU 數）")
+    parser.add_argument("--suffix", default=DEFAULT_PATTERN, help="作業檔的副檔名")
+    parser.add_argument("--cache-dir", default=None, help="作業資訊快取目錄（省略時不使用快取）")
+    parser.add_argument("--cache-size-mb", type=int, default=DEFAULT_MAX_BYTES // (1024 * 1024), help="快取大小上限（MB）")
+    args = parser.parse_args(argv)
+
+    with open(args.requirements, encoding="utf-8") as f:
+        requirements = f.read()
+
+    print("=" * 70)
+    print("批量評分")
+    print("=" * 70)
+
+    summary = run_batch(args.directory, requirements, args.output, args.workers, args.suffix,
+                        cache_dir=args.cache_dir, cache_bytes=args.cache_size_mb * 1024 * 1024)
+
+    print("-" * 70)
+    print(f"共 {summary['total']} 份，略過 {summary['skipped']} 份（已完成），"
+          f"處理 {summary['processed']} 份（快取 {summary['cached']} 份，失敗 {summary['failed']} 份），"
+          f"{summary['seconds']:.1f} 秒")
+    print(f"結果: {args.output}")
+    return summary
+
+
+if __name__ == "__main__":
+    main()
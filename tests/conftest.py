@@ -0,0 +1,108 @@
+"""
+pytest 共用設定
+
+python_bridge 以腳本方式執行（非套件），測試時將其加入 sys.path 以便匯入各模組。
+"""
+
+import os
+import sys
+
+import pytest
+
+BRIDGE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "python_bridge")
+if BRIDGE_DIR not in sys.path:
+    sys.path.insert(0, BRIDGE_DIR)
+
+from standin_server import StandinServer  # noqa: E402
+
+
+@pytest.fixture
+def standin():
+    """保持連接的替身伺服器"""
+    server = StandinServer().start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def oneshot_standin():
+    """模擬原版插件：每次回應後關閉連接"""
+    server = StandinServer(keep_alive=False).start()
+    yield server
+    server.stop()
+
+
+# ----------------------------------------------------------------------
+# .ghx 測試檔
+# ----------------------------------------------------------------------
+
+def _item(name, type_name, text):
+    return f'<item name="{name}" type_name="{type_name}">{text}</item>'
+
+
+def _ghx_object(obj):
+    """一個頂層物件的 XML（格式與 Grasshopper 存檔相同，只包含讀取器用到的欄位）"""
+    container = [
+        _item("InstanceGuid", "gh_guid", obj["id"]),
+        _item("Name", "gh_string", obj["display"]),
+        _item("NickName", "gh_string", obj.get("name", obj["display"])),
+    ]
+    container += [_item("Source", "gh_guid", s).replace("<item ", f'<item index="{i}" ', 1)
+                  for i, s in enumerate(obj.get("sources", []))]
+    if "text" in obj:
+        container.append(_item("UserText", "gh_string", obj["text"]))
+    if "toggle" in obj:
+        container.append(_item("ToggleValue", "gh_bool", str(obj["toggle"]).lower()))
+
+    chunks = ['<chunk name="Attributes"><items>'
+              f'<item name="Pivot" type_name="gh_drawing_pointf"><X>{obj.get("x", 0)}</X><Y>{obj.get("y", 0)}</Y></item>'
+              '</items></chunk>']
+    if "slider" in obj:
+        low, high, value = obj["slider"]
+        chunks.append('<chunk name="Slider"><items>' + _item("Digits", "gh_int32", 2)
+                      + _item("Max", "gh_double", high) + _item("Min", "gh_double", low)
+                      + _item("Value", "gh_double", value) + '</items></chunk>')
+    for kind, ports in (("param_input", obj.get("inputs", [])), ("param_output", obj.get("outputs", []))):
+        for index, port in enumerate(ports):
+            items = [_item("InstanceGuid", "gh_guid", port["id"]), _item("Name", "gh_string", port["name"]),
+                     _item("NickName", "gh_string", port["name"][0])]
+            items += [_item("Source", "gh_guid", s) for s in port.get("sources", [])]
+            chunks.append(f'<chunk name="{kind}" index="{index}"><items>{"".join(items)}</items></chunk>')
+
+    return ('<chunk name="Object"><items>' + _item("GUID", "gh_guid", obj.get("type_guid", "00000000-0000-0000-0000-000000000000"))
+            + _item("Name", "gh_string", obj["display"]) + '</items><chunks>'
+            + '<chunk name="Container"><items>' + "".join(container) + '</items><chunks>' + "".join(chunks)
+            + '</chunks></chunk></chunks></chunk>')
+
+
+def build_ghx(objects, name="sample.ghx", document_id="d0c00000-0000-0000-0000-000000000001"):
+    """產生 .ghx 內容（字串）"""
+    return ('<?xml version="1.0" encoding="utf-8" standalone="yes"?>\n<Archive name="Root"><chunks count="1">'
+            '<chunk name="Definition"><chunks>'
+            '<chunk name="DocumentHeader"><items>' + _item("DocumentID", "gh_guid", document_id) + '</items></chunk>'
+            '<chunk name="DefinitionProperties"><items>' + _item("Name", "gh_string", name) + '</items></chunk>'
+            f'<chunk name="DefinitionObjects"><items>{_item("ObjectCount", "gh_int32", len(objects))}</items>'
+            f'<chunks count="{len(objects)}">' + "".join(_ghx_object(o) for o in objects)
+            + '</chunks></chunk></chunks></chunk></chunks></Archive>')
+
+
+# Slider A、B → Addition → Panel；另有一個未連接的 Toggle
+SAMPLE_OBJECTS = [
+    {"id": "a1000000-0000-0000-0000-000000000001", "display": "Number Slider", "name": "A", "slider": (0, 10, 3), "x": 10, "y": 20},
+    {"id": "a1000000-0000-0000-0000-000000000002", "display": "Number Slider", "name": "B", "slider": (0, 10, 4), "x": 10, "y": 60},
+    {"id": "a1000000-0000-0000-0000-000000000003", "display": "Addition", "name": "A+B", "x": 200, "y": 40,
+     "inputs": [{"id": "b1000000-0000-0000-0000-000000000001", "name": "A", "sources": ["a1000000-0000-0000-0000-000000000001"]},
+                {"id": "b1000000-0000-0000-0000-000000000002", "name": "B", "sources": ["a1000000-0000-0000-0000-000000000002"]}],
+     "outputs": [{"id": "b1000000-0000-0000-0000-000000000003", "name": "Result"}]},
+    {"id": "a1000000-0000-0000-0000-000000000004", "display": "Panel", "name": "Sum", "text": "7", "x": 400, "y": 40,
+     "sources": ["b1000000-0000-0000-0000-000000000003"]},
+    {"id": "a1000000-0000-0000-0000-000000000005", "display": "Boolean Toggle", "name": "Show", "toggle": True},
+]
+
+
+@pytest.fixture
+def sample_ghx(tmp_path):
+    """範例 .ghx 檔的路徑"""
+    path = tmp_path / "sample.ghx"
+    path.write_text(build_ghx(SAMPLE_OBJECTS), encoding="utf-8")
+    return str(path)
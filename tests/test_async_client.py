@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+測試非同步 Grasshopper 客戶端（使用本地替身伺服器，不需要 Rhino）
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from async_client import AsyncGrasshopperClient, run_sync
+from gh_protocol import build_command
+from standin_server import StandinServer
+
+
+def test_concurrent_requests_do_not_block_each_other(standin):
+    """測試 1: 多個請求同時進行，總時間接近單一請求的處理時間"""
+    standin.latency = 0.2
+
+    async def scenario():
+        client = AsyncGrasshopperClient(standin.host, standin.port, max_size=8)
+        start = time.perf_counter()
+        responses = await asyncio.gather(*[
+            client.request(build_command("get_component_output_data", {"i": i}))
+            for i in range(8)
+        ])
+        elapsed = time.perf_counter() - start
+        await client.aclose()
+        return responses, elapsed
+
+    responses, elapsed = asyncio.run(scenario())
+    assert [r["data"]["parameters"]["i"] for r in responses] == list(range(8))
+    assert elapsed < 0.2 * 4
+
+
+def test_connections_are_reused(standin):
+    """測試 2: 依序請求重用同一條連接"""
+    async def scenario():
+        client = AsyncGrasshopperClient(standin.host, standin.port)
+        for i in range(10):
+            response = await client.request(build_command("ping", {"i": i}))
+            assert response["data"]["parameters"] == {"i": i}
+        await client.aclose()
+        return client.stats()
+
+    stats = asyncio.run(scenario())
+    assert stats["created"] == 1
+    assert stats["reused"] == 9
+    assert standin.connections_accepted == 1
+
+
+def test_deadline_discards_connection(standin):
+    """測試 3: 超過期限拋出 TimeoutError，該連接不會被重用"""
+    async def scenario():
+        client = AsyncGrasshopperClient(standin.host, standin.port)
+        standin.latency = 0.3
+        with pytest.raises(asyncio.TimeoutError):
+            await client.request(build_command("slow"), timeout=0.05)
+
+        standin.latency = 0
+        response = await client.request(build_command("fast", {"after": "timeout"}))
+        await client.aclose()
+        return response, client.stats()
+
+    response, stats = asyncio.run(scenario())
+    # 新連接上收到的是新命令的回應，而不是逾時命令的過期回應
+    assert response["data"]["echo"] == "fast"
+    assert stats["timeouts"] == 1
+    assert stats["created"] == 2
+
+
+def test_cancellation_releases_slot(standin):
+    """測試 4: 取消進行中的請求會釋放連接名額"""
+    standin.latency = 0.3
+
+    async def scenario():
+        client = AsyncGrasshopperClient(standin.host, standin.port, max_size=1)
+        task = asyncio.ensure_future(client.request(build_command("slow")))
+        await asyncio.sleep(0.05)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+        standin.latency = 0
+        response = await client.request(build_command("fast"), timeout=1.0)
+        await client.aclose()
+        return response
+
+    assert asyncio.run(scenario())["data"]["echo"] == "fast"
+
+
+def test_fallback_when_plugin_closes_after_response(oneshot_standin):
+    """測試 5: 原版插件回應後關閉連接，客戶端自動改用新連接"""
+    async def scenario():
+        client = AsyncGrasshopperClient(oneshot_standin.host, oneshot_standin.port)
+        for i in range(5):
+            response = await client.request(build_command("ping", {"i": i}))
+            assert response["data"]["parameters"] == {"i": i}
+        await client.aclose()
+
+    asyncio.run(scenario())
+    assert oneshot_standin.commands_handled == 5
+
+
+def test_run_sync_wrapper(standin):
+    """測試 6: 同步包裝在背景事件迴圈上執行"""
+    client = AsyncGrasshopperClient(standin.host, standin.port)
+    for i in range(3):
+        response = run_sync(client.request(build_command("ping", {"i": i})))
+        assert response["data"]["parameters"] == {"i": i}
+    assert client.stats()["created"] == 1
+
+
+def _pipeline(server, commands, **kwargs):
+    async def scenario():
+        client = AsyncGrasshopperClient(server.host, server.port)
+        responses = await client.pipeline(commands, **kwargs)
+        await client.aclose()
+        return responses, client
+
+    return asyncio.run(scenario())
+
+
+def test_pipeline_matches_responses_by_id(standin):
+    """測試 7: 管線化命令共用一條連接，回應依請求 ID 對應"""
+    commands = [build_command("ping", {"i": i}) for i in range(50)]
+    responses, client = _pipeline(standin, commands)
+
+    assert [r["data"]["parameters"]["i"] for r in responses] == list(range(50))
+    assert len({r["id"] for r in responses}) == 50
+    assert standin.connections_accepted == 1
+    assert client.pipelining_supported is True
+
+
+def test_pipeline_without_echoed_ids_uses_order():
+    """測試 8: 插件沒有帶回 ID 時依順序對應"""
+    with StandinServer(echo_ids=False) as server:
+        commands = [build_command("ping", {"i": i}) for i in range(20)]
+        responses, _ = _pipeline(server, commands)
+
+    assert all("id" not in r for r in responses)
+    assert [r["data"]["parameters"]["i"] for r in responses] == list(range(20))
+
+
+def test_pipeline_falls_back_when_plugin_closes_after_response(oneshot_standin):
+    """測試 9: 原版插件回應一次即關閉連接，剩餘命令改為逐一發送"""
+    commands = [build_command("ping", {"i": i}) for i in range(5)]
+    responses, client = _pipeline(oneshot_standin, commands)
+
+    assert [r["data"]["parameters"]["i"] for r in responses] == list(range(5))
+    assert oneshot_standin.commands_handled == 5
+    assert client.pipelining_supported is False
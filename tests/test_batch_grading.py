@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+測試批量評分（平行提取、JSONL 結果、中斷後續跑），不需要 Rhino
+"""
+
+import json
+
+from batch_grading import load_checkpoint, run_batch
+from conftest import SAMPLE_OBJECTS, build_ghx
+
+REQUIREMENTS = "使用 Slider 控制參數"
+
+
+def _submissions(directory, count):
+    for i in range(count):
+        folder = directory / ("A" if i % 2 else "B")
+        folder.mkdir(exist_ok=True)
+        (folder / f"student_{i:02d}.ghx").write_text(build_ghx(SAMPLE_OBJECTS, name=f"student_{i:02d}"), encoding="utf-8")
+
+
+def _records(output):
+    return [json.loads(line) for line in output.read_text(encoding="utf-8").splitlines()]
+
+
+def test_batch_processes_every_submission(tmp_path):
+    """測試 1: 每份作業一行結果；壞檔記錄為錯誤而不中斷整批"""
+    submissions = tmp_path / "submissions"
+    submissions.mkdir()
+    _submissions(submissions, 5)
+    (submissions / "broken.ghx").write_text("<Archive><chunk", encoding="utf-8")
+    output = tmp_path / "results.jsonl"
+
+    summary = run_batch(str(submissions), REQUIREMENTS, str(output), workers=2, progress=False)
+
+    records = {r["submission"]: r for r in _records(output)}
+    assert summary["processed"] == 6 and summary["failed"] == 1
+    assert records["broken.ghx"]["status"] == "error"
+    ok = records["A/student_01.ghx"]
+    assert ok["context"]["document_name"] == "student_01"
+    assert ok["context"]["component_types"]["GH_NumberSlider"] == 2
+    assert REQUIREMENTS in ok["prompt"]
+
+
+def test_batch_resumes_from_checkpoint(tmp_path):
+    """測試 2: 中斷後續跑只處理未完成與失敗的作業；半行的結果被截斷"""
+    submissions = tmp_path / "submissions"
+    submissions.mkdir()
+    _submissions(submissions, 4)
+    output = tmp_path / "results.jsonl"
+    output.write_text(
+        json.dumps({"submission": "B/student_00.ghx", "status": "ok", "context": {}, "prompt": ""}) + "\n"
+        + json.dumps({"submission": "A/student_01.ghx", "status": "error", "error": "timeout"}) + "\n"
+        + '{"submission": "B/student_02.ghx", "sta',
+        encoding="utf-8",
+    )
+
+    summary = run_batch(str(submissions), REQUIREMENTS, str(output), workers=2, progress=False)
+
+    assert summary["skipped"] == 1 and summary["processed"] == 3
+    records = _records(output)
+    assert len(records) == 5
+    assert load_checkpoint(str(output)) == {
+        "B/student_00.ghx", "A/student_01.ghx", "B/student_02.ghx", "A/student_03.ghx"}
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+測試橋接的日誌：內容摘要、分級、高頻命令抽樣、JSON 格式（不需要 Rhino）
+"""
+
+import io
+import json
+import logging
+
+import pytest
+
+from bridge_logging import CommandLogger, configure_logging, get_logger, summarize
+
+
+@pytest.fixture
+def log_output():
+    """把橋接的 logger 導向 StringIO，結束時還原"""
+    stream = io.StringIO()
+    logger = get_logger()
+    saved = (list(logger.handlers), logger.level, logger.propagate)
+    yield stream
+    logger.handlers[:] = saved[0]
+    logger.setLevel(saved[1])
+    logger.propagate = saved[2]
+
+
+class _Counted:
+    """記錄被轉成字串的次數"""
+    calls = 0
+
+    def __repr__(self):
+        _Counted.calls += 1
+        return "<counted>"
+
+
+def test_summarize_is_bounded():
+    """測試 1: 摘要只報告長度與前幾個項目，大小與資料量無關"""
+    payload = {"success": True, "data": {"points": [[i, i, 0] for i in range(200000)], "text": "x" * 100000}}
+    text = summarize(payload)
+    assert "200000 items" in text
+    assert "100000 chars" in text
+    assert len(text) < 400
+    assert summarize({"k": list(range(10))}, max_chars=20).startswith("{k: [10 items: 0, 1,")
+
+
+def test_sampling_and_levels(log_output):
+    """測試 2: INFO 每個命令一行，高頻命令抽樣；錯誤一律記錄；INFO 不計算摘要"""
+    configure_logging("INFO", stream=log_output)
+    log = CommandLogger(sample_every=10)
+    _Counted.calls = 0
+
+    for i in range(25):
+        log.received("set_slider_value", {"value": _Counted()}, {"success": True, "data": {}}, log.start())
+    log.received("set_slider_value", {}, {"success": False, "error": "Slider not found"}, log.start())
+    log.received("add_component", {}, {"success": True, "data": {"id": "a"}}, log.start())
+
+    lines = log_output.getvalue().splitlines()
+    assert sum("set_slider_value ok" in line for line in lines) == 3
+    assert sum("Slider not found" in line and "WARNING" in line for line in lines) == 1
+    assert sum("add_component ok" in line for line in lines) == 1
+    assert _Counted.calls == 0
+
+
+def test_debug_shows_summaries(log_output):
+    """測試 3: DEBUG 附上參數與回應的摘要，不輸出完整內容"""
+    configure_logging("DEBUG", stream=log_output)
+    log = CommandLogger(sample_every=1)
+    response = {"success": True, "data": {"values": list(range(100000))}}
+    log.received("get_component_output_data", {"componentId": "c1"}, response, log.start())
+
+    output = log_output.getvalue()
+    assert "componentId: 'c1'" in output
+    assert "100000 items" in output
+    assert len(output) < 500
+
+
+def test_json_format(log_output):
+    """測試 4: JSON 格式一行一個物件，包含結構化欄位與例外"""
+    configure_logging("INFO", fmt="json", stream=log_output)
+    log = CommandLogger()
+    log.received("get_all_connections", {}, {"success": True, "data": []}, log.start())
+    try:
+        raise ConnectionResetError("peer closed")
+    except ConnectionResetError as e:
+        log.failed("get_document_info", e)
+
+    ok, failed = [json.loads(line) for line in log_output.getvalue().splitlines()]
+    assert ok["command"] == "get_all_connections" and ok["status"] == "ok" and ok["level"] == "INFO"
+    assert isinstance(ok["elapsed_ms"], float)
+    assert failed["status"] == "failed" and "ConnectionResetError" in failed["exception"]
+    assert get_logger().level == logging.INFO
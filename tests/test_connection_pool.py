@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+測試 Grasshopper 連接池（使用本地替身伺服器，不需要 Rhino）
+"""
+
+import threading
+import time
+
+import pytest
+
+from async_client import AsyncGrasshopperConnection
+from connection_pool import ConnectionPool
+from gh_protocol import build_command
+
+
+def test_connection_reused_across_commands(standin):
+    """測試 1: 多個命令共用同一條連接"""
+    pool = ConnectionPool(standin.host, standin.port, max_size=2)
+    try:
+        for i in range(20):
+            response = pool.request(build_command("get_document_info", {"i": i}))
+            assert response["success"]
+            assert response["data"]["parameters"] == {"i": i}
+
+        assert standin.connections_accepted == 1
+        assert pool.stats()["created"] == 1
+        assert pool.stats()["reused"] == 19
+    finally:
+        pool.close()
+
+
+def test_fallback_when_plugin_closes_after_response(oneshot_standin):
+    """測試 2: 原版插件回應後即關閉連接，連接池透過健康檢查自動改用新連接"""
+    pool = ConnectionPool(oneshot_standin.host, oneshot_standin.port)
+    try:
+        for i in range(5):
+            # 等待伺服器端關閉，讓健康檢查可以發現
+            time.sleep(0.02)
+            response = pool.request(build_command("get_document_info", {"i": i}))
+            assert response["success"]
+            assert response["data"]["parameters"] == {"i": i}
+
+        assert oneshot_standin.connections_accepted == 5
+        assert oneshot_standin.commands_handled == 5
+    finally:
+        pool.close()
+
+
+def test_transparent_reconnect_on_dead_connection(standin, monkeypatch):
+    """測試 3: 閒置連接在健康檢查後才斷開時，自動重連並重送"""
+    pool = ConnectionPool(standin.host, standin.port)
+    try:
+        assert pool.request(build_command("ping"))["success"]
+
+        # 模擬健康檢查通過後連接才斷開
+        monkeypatch.setattr(AsyncGrasshopperConnection, "is_healthy", lambda self: True)
+        standin.drop_connections()
+        time.sleep(0.02)
+
+        response = pool.request(build_command("ping", {"after": "reconnect"}))
+        assert response["success"]
+        assert response["data"]["parameters"] == {"after": "reconnect"}
+        assert pool.stats()["reconnects"] == 1
+    finally:
+        pool.close()
+
+
+def test_idle_timeout_discards_connection(standin):
+    """測試 4: 超過閒置時間的連接不會被重用"""
+    pool = ConnectionPool(standin.host, standin.port, idle_timeout=0.05)
+    try:
+        pool.request(build_command("ping"))
+        time.sleep(0.1)
+        pool.request(build_command("ping"))
+
+        stats = pool.stats()
+        assert stats["created"] == 2
+        assert stats["discarded"] == 1
+        assert standin.connections_accepted == 2
+    finally:
+        pool.close()
+
+
+def test_pool_size_limits_concurrent_connections(standin):
+    """測試 5: 並行請求不會超過連接池上限"""
+    standin.latency = 0.02
+    pool = ConnectionPool(standin.host, standin.port, max_size=3)
+    errors = []
+
+    def worker():
+        try:
+            for _ in range(5):
+                assert pool.request(build_command("ping"))["success"]
+        except Exception as e:  # pragma: no cover - 失敗時回報
+            errors.append(e)
+
+    try:
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert not errors
+        assert standin.commands_handled == 40
+        assert pool.stats()["created"] <= 3
+    finally:
+        pool.close()
+
+
+def test_unreachable_host_raises():
+    """測試 6: 無法連接時拋出錯誤，且不佔用連接池名額"""
+    pool = ConnectionPool("127.0.0.1", 1, max_size=1, timeout=1.0)
+    for _ in range(2):
+        with pytest.raises(OSError):
+            pool.request(build_command("ping"))
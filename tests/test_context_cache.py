@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+測試作業資訊的磁碟快取（依內容定址、版本區分、LRU 淘汰）
+"""
+
+import os
+import time
+
+from batch_grading import run_batch
+from conftest import SAMPLE_OBJECTS, build_ghx
+from context_cache import ContextCache
+
+
+def _extractor(calls):
+    def extract(path):
+        calls.append(path)
+        with open(path, encoding="utf-8") as f:
+            return {"text": f.read()}
+    return extract
+
+
+def test_hits_depend_on_content_and_version(tmp_path):
+    """測試 1: 內容相同即命中（與檔名無關）；內容或版本改變時重新提取"""
+    first, copy = tmp_path / "a.ghx", tmp_path / "b.ghx"
+    first.write_text("one", encoding="utf-8")
+    copy.write_text("one", encoding="utf-8")
+    calls = []
+    cache = ContextCache(str(tmp_path / "cache"), version="1")
+
+    assert cache.get_or_compute(str(first), _extractor(calls)) == {"text": "one"}
+    assert cache.get_or_compute(str(copy), _extractor(calls)) == {"text": "one"}
+    first.write_text("two", encoding="utf-8")
+    assert cache.get_or_compute(str(first), _extractor(calls)) == {"text": "two"}
+    ContextCache(str(tmp_path / "cache"), version="2").get_or_compute(str(copy), _extractor(calls))
+
+    assert calls == [str(first), str(first), str(copy)]
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+def test_eviction_removes_least_recently_used(tmp_path):
+    """測試 2: 超過大小上限時淘汰最久未使用的項目"""
+    cache = ContextCache(str(tmp_path / "cache"), version="1", max_bytes=10 ** 6)
+    for i, key in enumerate(["old", "used", "new"]):
+        cache.put(key, {"blob": "x" * 1000})
+        stamp = time.time() - 100 + i
+        os.utime(cache._entry_path(key), (stamp, stamp))
+    assert cache.get("used") is not None
+
+    cache.max_bytes = 2500
+    assert cache.evict() == 1
+    assert cache.get("old") is None
+    assert cache.get("used") is not None and cache.get("new") is not None
+
+
+def test_batch_rerun_skips_extraction(tmp_path):
+    """測試 3: 調整評分要求後重新評分，內容沒變的作業直接使用快取"""
+    submissions = tmp_path / "submissions"
+    submissions.mkdir()
+    for i in range(3):
+        (submissions / f"s{i}.ghx").write_text(build_ghx(SAMPLE_OBJECTS, name=f"s{i}"), encoding="utf-8")
+    cache_dir = str(tmp_path / "cache")
+
+    first = run_batch(str(submissions), "v1", str(tmp_path / "v1.jsonl"), workers=2, progress=False, cache_dir=cache_dir)
+    second = run_batch(str(submissions), "v2", str(tmp_path / "v2.jsonl"), workers=2, progress=False, cache_dir=cache_dir)
+
+    assert first["cached"] == 0
+    assert second["processed"] == 3 and second["cached"] == 3
+    assert "v2" in (tmp_path / "v2.jsonl").read_text(encoding="utf-8")
@@ -0,0 +1,339 @@
+#!/usr/bin/env python3
+"""
+測試橋接端的文檔模型快取（使用本地替身伺服器，不需要 Rhino）
+"""
+
+import asyncio
+
+from async_client import AsyncGrasshopperClient
+from document_model import DocumentGraph, DocumentModel, DocumentSubscriber
+from gh_protocol import build_command
+from simulator import GrasshopperSimulator
+from standin_server import StandinServer
+
+
+class _Document:
+    """替身文檔：修訂號與被掃描的次數"""
+
+    def __init__(self):
+        self.revision = 1
+        self.scans = 0
+
+    def handlers(self, with_revision=True):
+        def details(command):
+            self.scans += 1
+            return {"id": command["parameters"]["componentId"], "revision": self.revision}
+
+        def connections(command):
+            self.scans += 1
+            return [{"sourceId": "a", "targetId": "b"}]
+
+        handlers = {"get_component_details": details, "get_all_connections": connections}
+        if with_revision:
+            handlers["get_document_revision"] = lambda command: {"documentId": "doc-1", "revision": self.revision}
+        return handlers
+
+
+def _run(server, scenario, **kwargs):
+    async def main():
+        client = AsyncGrasshopperClient(server.host, server.port)
+
+        async def send(command_type, params=None):
+            return await client.request(build_command(command_type, params))
+
+        model = DocumentModel(send, **kwargs)
+        result = await scenario(model)
+        await client.aclose()
+        return result, model
+
+    return asyncio.run(main())
+
+
+def test_repeated_queries_are_answered_locally():
+    """測試 1: 同一修訂號內重複查詢不再掃描文檔"""
+    document = _Document()
+    with StandinServer(handlers=document.handlers(), fallback=None) as server:
+        async def scenario(model):
+            for _ in range(20):
+                await model.query("get_component_details", {"componentId": "c1"})
+                await model.query("get_all_connections")
+            return await model.query("get_component_details", {"componentId": "c2"})
+
+        response, model = _run(server, scenario, revalidate_interval=60)
+
+    assert response["data"]["id"] == "c2"
+    assert document.scans == 3
+    assert model.hits == 38
+    assert model.revalidations == 1
+
+
+def test_revision_change_invalidates_model():
+    """測試 2: 使用者在畫布上修改（修訂號改變）後重新取得"""
+    document = _Document()
+    with StandinServer(handlers=document.handlers(), fallback=None) as server:
+        async def scenario(model):
+            first = await model.query("get_component_details", {"componentId": "c1"})
+            await model.query("get_component_details", {"componentId": "c1"})
+            document.revision += 1
+            second = await model.query("get_component_details", {"componentId": "c1"})
+            return first, second
+
+        (first, second), model = _run(server, scenario, revalidate_interval=0)
+
+    assert first["data"]["revision"] == 1
+    assert second["data"]["revision"] == 2
+    assert document.scans == 2
+    assert model.revision == 2
+
+
+def test_bridge_mutations_invalidate_immediately():
+    """測試 3: 經由橋接的修改命令立即讓模型失效，唯讀命令不會"""
+    document = _Document()
+    with StandinServer(handlers=document.handlers(), fallback=None) as server:
+        async def scenario(model):
+            await model.query("get_all_connections")
+            model.note_command("get_component_output_data")
+            await model.query("get_all_connections")
+            model.note_command("connect_components")
+            await model.query("get_all_connections")
+
+        _, model = _run(server, scenario, revalidate_interval=60)
+
+    assert document.scans == 2
+    assert model.hits == 1
+
+
+def test_plugin_without_revisions_disables_cache():
+    """測試 4: 原版插件不支援 get_document_revision 時直接轉送"""
+    document = _Document()
+    with StandinServer(handlers=document.handlers(with_revision=False), fallback=None) as server:
+        async def scenario(model):
+            for _ in range(3):
+                await model.query("get_all_connections")
+
+        _, model = _run(server, scenario)
+
+    assert document.scans == 3
+    assert model.supported is False
+    assert model.revalidations == 1
+
+
+class _JournaledDocument(_Document):
+    """替身文檔：附帶變更紀錄（與插件的 get_changes_since 相同格式）"""
+
+    def __init__(self):
+        super().__init__()
+        self.journal = []
+        self.journal_start = 1
+        self.wires = [{"sourceId": "a", "targetId": "b"}, {"sourceId": "b", "targetId": "c"}]
+
+    def record(self, change, component_id=None, component_type=None):
+        self.revision += 1
+        self.journal.append({"revision": self.revision, "change": change, "id": component_id, "type": component_type})
+
+    def handlers(self, with_revision=True):
+        handlers = super().handlers(with_revision)
+
+        def connections(command):
+            self.scans += 1
+            return list(self.wires)
+
+        def changes_since(command):
+            since = command["parameters"]["revision"]
+            reset = since < self.journal_start
+            return {"documentId": "doc-1", "revision": self.revision, "reset": reset,
+                    "changes": [] if reset else [c for c in self.journal if c["revision"] > since]}
+
+        handlers["get_all_connections"] = connections
+        handlers["get_changes_since"] = changes_since
+        return handlers
+
+
+def test_changes_invalidate_only_affected_components():
+    """測試 5: 增量只讓受影響的組件失效；刪除組件時在本地移除相關連線"""
+    document = _JournaledDocument()
+    with StandinServer(handlers=document.handlers(), fallback=None) as server:
+        async def scenario(model):
+            for component_id in ("a", "b", "c"):
+                await model.query("get_component_details", {"componentId": component_id})
+            await model.query("get_all_connections")
+
+            document.record("changed", "b", "GH_NumberSlider")
+            document.record("removed", "c", "GH_Panel")
+            for component_id in ("a", "b"):
+                await model.query("get_component_details", {"componentId": component_id})
+            return await model.query("get_all_connections")
+
+        connections, model = _run(server, scenario, revalidate_interval=0)
+
+    # a、b、c、連線各一次，之後只有 b 重新取得
+    assert document.scans == 5
+    assert connections["data"] == [{"sourceId": "a", "targetId": "b"}]
+    assert model.changes_applied == 2
+    assert model.journal_supported is True
+
+
+def test_trimmed_journal_resets_model():
+    """測試 6: 紀錄不足（reset）時清除整個模型"""
+    document = _JournaledDocument()
+    with StandinServer(handlers=document.handlers(), fallback=None) as server:
+        async def scenario(model):
+            await model.query("get_component_details", {"componentId": "a"})
+            document.record("changed", "b")
+            document.journal_start = document.revision
+            await model.query("get_component_details", {"componentId": "a"})
+
+        _, model = _run(server, scenario, revalidate_interval=0)
+
+    assert document.scans == 2
+    assert model.revision == document.revision
+
+
+def test_subscriber_reports_changes():
+    """測試 7: 訂閱者定期輪詢，只在有變更時通知"""
+    document = _JournaledDocument()
+    with StandinServer(handlers=document.handlers(), fallback=None) as server:
+        async def scenario(model):
+            received = []
+            stop = asyncio.Event()
+
+            def on_changes(changes):
+                received.extend(changes)
+                if len(received) >= 2:
+                    stop.set()
+
+            subscriber = DocumentSubscriber(model, interval=0.01)
+            task = asyncio.ensure_future(subscriber.run(on_changes, stop))
+            await asyncio.sleep(0.05)
+            document.record("added", "d", "GH_Panel")
+            document.record("wired", "d", "GH_Panel")
+            await asyncio.wait_for(task, 2.0)
+            return received
+
+        received, _ = _run(server, scenario)
+
+    assert [(c["change"], c["id"]) for c in received] == [("added", "d"), ("wired", "d")]
+
+
+def _graph_export(revision):
+    """替身匯出結果：slider -> addition -> panel（與插件的 export_document_graph 相同格式）"""
+    return {
+        "documentId": "doc-1",
+        "revision": revision,
+        "fields": ["type", "name", "parameters", "inputs", "wires"],
+        "components": [
+            {"id": "s1", "type": "GH_NumberSlider", "name": "A", "parameters": {"min": 0, "max": 10, "value": 3}},
+            {"id": "s2", "type": "GH_NumberSlider", "name": "B", "parameters": {"min": 0, "max": 10, "value": 4}},
+            {"id": "add", "type": "Component_Addition", "name": "A+B", "inputs": [{"name": "A"}, {"name": "B"}]},
+            {"id": "out", "type": "GH_Panel", "name": "Result", "parameters": {"text": ""}},
+        ],
+        "wires": [
+            {"sourceId": "s1", "sourceParam": "Number", "targetId": "add", "targetParam": "A"},
+            {"sourceId": "s2", "sourceParam": "Number", "targetId": "add", "targetParam": "B"},
+            {"sourceId": "add", "sourceParam": "Result", "targetId": "out", "targetParam": "Panel"},
+        ],
+    }
+
+
+def test_document_graph_queries():
+    """測試 8: 由匯出結果建立圖，依類型與連線查詢"""
+    graph = DocumentGraph(_graph_export(7))
+
+    assert len(graph) == 4
+    assert graph.revision == 7
+    assert [c["name"] for c in graph.of_type("GH_NumberSlider")] == ["A", "B"]
+    assert [w["sourceId"] for w in graph.sources("add")] == ["s1", "s2"]
+    assert graph.upstream("out") == ["add", "s1", "s2"]
+    assert graph.downstream("s1") == ["add", "out"]
+    assert graph["s2"]["parameters"]["value"] == 4
+
+
+def test_graph_export_primes_model():
+    """測試 9: 一次匯出後，連線與依類型搜尋直接在本地回答；變更讓匯出結果失效"""
+    document = _JournaledDocument()
+    exports = []
+
+    def export(command):
+        exports.append(command["parameters"].get("fields"))
+        return _graph_export(document.revision)
+
+    handlers = document.handlers()
+    handlers["export_document_graph"] = export
+    with StandinServer(handlers=handlers, fallback=None) as server:
+        async def scenario(model):
+            graph = DocumentGraph.from_response(await model.query("export_document_graph", {}))
+            await model.query("export_document_graph", {})
+            connections = await model.query("get_all_connections")
+            sliders = await model.query("find_components_by_type", {"componentType": "GH_NumberSlider"})
+
+            document.record("changed", "s1", "GH_NumberSlider")
+            await model.query("export_document_graph", {})
+            await model.query("export_document_graph", {"fields": ["type"]})
+            return graph, connections, sliders
+
+        (graph, connections, sliders), model = _run(server, scenario, revalidate_interval=0)
+
+    assert len(graph.wires) == 3
+    # 連到 Panel 的連線只出現在匯出結果中（與 get_all_connections 相同）
+    assert connections["data"] == graph.wires[:2]
+    assert sliders["data"] == ["s1", "s2"]
+    assert document.scans == 0
+    assert exports == [None, None, ["type"]]
+
+
+def test_primed_connections_match_live_answer():
+    """測試 10: 匯出填入的連線列表與插件直接回答的 get_all_connections 相同（不包含連到 Panel 的連線）"""
+    with GrasshopperSimulator() as sim:
+        with sim.editing() as document:
+            slider = document.add("GH_NumberSlider", 0, 0)
+            addition = document.add("OperatorAdd", 200, 0)
+            panel = document.add("GH_Panel", 400, 0)
+            document.connect({"sourceId": slider.id, "targetId": addition.id, "targetParam": "A"})
+            document.connect({"sourceId": addition.id, "targetId": panel.id})
+
+        async def primed(model):
+            await model.query("export_document_graph", {})
+            return await model.query("get_all_connections")
+
+        async def live(model):
+            return await model.query("get_all_connections")
+
+        primed_answer, primed_model = _run(sim, primed, revalidate_interval=60)
+        live_answer, live_model = _run(sim, live, revalidate_interval=60)
+
+    assert primed_model.stats()["hits"] >= 1 and live_model.stats()["misses"] == 1
+    wire_set = lambda response: sorted(tuple(sorted(w.items())) for w in response["data"])  # noqa: E731
+    assert wire_set(primed_answer) == wire_set(live_answer)
+    assert [w["targetId"] for w in live_answer["data"]] == [addition.id]
+
+
+def test_query_details_fetches_only_missing_components():
+    """測試 11: 多個組件的詳細資訊以一次請求取得，已在模型中的組件不再取得"""
+    document = _Document()
+    requests = []
+
+    def details_many(command):
+        ids = command["parameters"]["componentIds"]
+        requests.append(ids)
+        return {"count": len(ids), "failed": 1 if "gone" in ids else 0, "results": [
+            {"componentId": i, "success": False, "error": f"Component {i} not found"} if i == "gone"
+            else {"componentId": i, "success": True, "data": {"id": i, "revision": document.revision}}
+            for i in ids
+        ]}
+
+    handlers = document.handlers()
+    handlers["get_components_details"] = details_many
+    with StandinServer(handlers=handlers, fallback=None) as server:
+        async def scenario(model):
+            await model.query("get_component_details", {"componentId": "a"})
+            first = await model.query_details(["a", "b", "gone", "c"])
+            second = await model.query_details(["c", "b"])
+            return first, second
+
+        (first, second), model = _run(server, scenario, revalidate_interval=60)
+
+    assert requests == [["b", "gone", "c"]]
+    assert [r["componentId"] for r in first["data"]["results"]] == ["a", "b", "gone", "c"]
+    assert first["data"]["failed"] == 1
+    assert second["data"]["results"][0]["data"] == {"id": "c", "revision": 1}
+    assert document.scans == 1
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+測試離線 .ghx 讀取（不需要 Rhino）
+"""
+
+import pytest
+
+import ai_grading_demo
+from conftest import SAMPLE_OBJECTS, build_ghx
+from document_model import DocumentGraph
+from ghx_reader import GhxError, read_ghx
+from simulator import GrasshopperSimulator
+from standin_server import StandinServer
+
+SLIDER_A, SLIDER_B, ADDITION, PANEL, TOGGLE = (o["id"] for o in SAMPLE_OBJECTS)
+
+
+def test_reads_components_and_parameters(sample_ghx):
+    """測試 1: 組件類型、名稱、位置與 Slider / Panel / Toggle 參數"""
+    graph = read_ghx(sample_ghx)
+
+    assert graph["name"] == "sample.ghx"
+    assert graph["documentId"] == "d0c00000-0000-0000-0000-000000000001"
+    components = {c["id"]: c for c in graph["components"]}
+    assert [c["type"] for c in graph["components"]] == [
+        "GH_NumberSlider", "GH_NumberSlider", "OperatorAdd", "GH_Panel", "GH_BooleanToggle"]
+    assert components[SLIDER_A]["parameters"] == {"min": 0.0, "max": 10.0, "value": 3.0}
+    assert components[SLIDER_A]["position"] == {"x": 10.0, "y": 20.0}
+    assert components[PANEL]["parameters"] == {"text": "7"}
+    assert components[TOGGLE]["parameters"] == {"value": True}
+    assert [p["name"] for p in components[ADDITION]["inputs"]] == ["A", "B"]
+
+
+def test_resolves_wires_to_top_level_objects(sample_ghx):
+    """測試 2: 連線以頂層物件表示（格式與 get_all_connections 相同）"""
+    graph = DocumentGraph(read_ghx(sample_ghx))
+
+    assert graph.sources(ADDITION) == [
+        {"sourceId": SLIDER_A, "sourceParam": "Number Slider", "targetId": ADDITION, "targetParam": "A"},
+        {"sourceId": SLIDER_B, "sourceParam": "Number Slider", "targetId": ADDITION, "targetParam": "B"},
+    ]
+    assert graph.sources(PANEL)[0]["sourceParam"] == "Result"
+    assert graph.upstream(PANEL) == [ADDITION, SLIDER_A, SLIDER_B]
+
+
+def test_context_matches_live_structure(sample_ghx, monkeypatch):
+    """測試 3: 離線路徑產生與線上路徑（export_document_graph）相同的評分資訊"""
+    exported = read_ghx(sample_ghx)
+    handlers = {
+        "export_document_graph": lambda command: exported,
+        "get_document_info": lambda command: {"name": "sample.ghx"},
+    }
+    with StandinServer(handlers=handlers, fallback=None) as server:
+        monkeypatch.setattr(ai_grading_demo, "GRASSHOPPER_PORT", server.port)
+        live = ai_grading_demo.extract_grasshopper_context()
+
+    offline = ai_grading_demo.extract_grasshopper_context(sample_ghx)
+    assert offline == live
+    assert offline["component_types"] == {"GH_NumberSlider": 2, "OperatorAdd": 1, "GH_Panel": 1, "GH_BooleanToggle": 1}
+    assert len(offline["wires"]) == 3
+    assert [p["name"] for p in offline["parameters"]] == ["A", "B", "Sum", "Show"]
+
+
+def test_large_file_streams(tmp_path):
+    """測試 4: 大型檔案逐段解析"""
+    objects = [{"id": f"c0000000-0000-0000-0000-{i:012d}", "display": "Number Slider", "slider": (0, 1, i % 2)}
+               for i in range(5000)]
+    path = tmp_path / "large.ghx"
+    path.write_text(build_ghx(objects), encoding="utf-8")
+
+    graph = read_ghx(str(path))
+    assert len(graph["components"]) == 5000
+
+
+def test_binary_gh_is_rejected(tmp_path):
+    """測試 5: 二進位 .gh 檔給出明確錯誤"""
+    path = tmp_path / "binary.gh"
+    path.write_bytes(b"\x78\x9c\x01\x02\x03")
+
+    with pytest.raises(GhxError):
+        read_ghx(str(path))
+
+
+def test_offline_types_match_simulator(sample_ghx, tmp_path, monkeypatch):
+    """測試 6: 同一份定義經由模擬器讀取（線上路徑）與離線讀取，組件類型與評分資訊相同"""
+    with GrasshopperSimulator() as sim:
+        sim.document.load(sample_ghx)
+        monkeypatch.setattr(ai_grading_demo, "GRASSHOPPER_PORT", sim.port)
+        live = ai_grading_demo.extract_grasshopper_context()
+
+    offline = ai_grading_demo.extract_grasshopper_context(sample_ghx)
+    assert offline == live
+    assert offline["component_types"] == {"GH_NumberSlider": 2, "OperatorAdd": 1, "GH_Panel": 1, "GH_BooleanToggle": 1}
+
+    # 類型 GUID 優先於顯示名稱（例如翻譯過的介面）
+    objects = [dict(o) for o in SAMPLE_OBJECTS]
+    objects[2].update(display="加法", type_guid="a0d62394-a118-422d-abb3-6af115c75b25")
+    path = tmp_path / "translated.ghx"
+    path.write_text(build_ghx(objects), encoding="utf-8")
+    assert read_ghx(str(path))["components"][2]["type"] == "OperatorAdd"
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+測試多個 Grasshopper 實例的負載平衡（使用多個本地替身伺服器，不需要 Rhino）
+"""
+
+import asyncio
+import gc
+import socket
+
+import pytest
+
+from async_client import run_sync
+from gh_protocol import build_command, format_endpoint
+from host_pool import HostPool, parse_endpoints
+from standin_server import StandinServer
+
+
+@pytest.fixture
+def standins():
+    servers = [StandinServer().start() for _ in range(2)]
+    yield servers
+    for server in servers:
+        server.stop()
+
+
+def _closed_port():
+    """一個沒有程式在監聽的埠"""
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def test_parse_endpoints():
+    """測試 1: 解析 GRASSHOPPER_HOSTS"""
+    assert parse_endpoints("localhost:8080, 10.0.0.2:8081") == [("localhost", 8080), ("10.0.0.2", 8081)]
+    assert parse_endpoints("localhost", default_port=9000) == [("localhost", 9000)]
+    with pytest.raises(ValueError):
+        parse_endpoints(" , ")
+
+
+def test_sessions_spread_over_hosts(standins):
+    """測試 2: 同時進行的工作階段分配到進行中請求最少的實例，並黏著在該實例"""
+    for server in standins:
+        server.latency = 0.2
+
+    async def scenario():
+        pool = HostPool([(s.host, s.port) for s in standins])
+
+        async def student(key):
+            with pool.session(key):
+                await pool.request(build_command("load_document", {"path": key}))
+                host = pool.host_for()
+                for _ in range(2):
+                    await pool.request(build_command("get_document_info"))
+                    assert pool.host_for() == host
+
+        await asyncio.gather(*[student(f"s{i}") for i in range(4)])
+        await pool.aclose()
+        return pool.stats()
+
+    stats = asyncio.run(scenario())
+    assert [s.commands_handled for s in standins] == [6, 6]
+    assert stats["sessions"] == 0
+    assert all(h["healthy"] for h in stats["hosts"])
+
+
+def test_load_document_keeps_session_binding(standins):
+    """測試 3: 工作階段只在第一次使用時綁定；同一工作階段的另一個呼叫端 load_document 不會改綁"""
+    for server in standins:
+        server.latency = 0.05
+
+    async def scenario():
+        pool = HostPool([(s.host, s.port) for s in standins])
+        # 另一個工作階段有請求在進行中：改綁的話 load_document 會選到較空閒的實例
+        busy = asyncio.ensure_future(pool.request(build_command("solve"), session="busy"))
+        await asyncio.sleep(0.01)
+
+        async def reader():
+            hosts = []
+            for _ in range(4):
+                await pool.request(build_command("get_document_info"))
+                hosts.append(pool.host_for())
+            return hosts
+
+        async def loader():
+            await asyncio.sleep(0.02)
+            await pool.request(build_command("load_document", {"path": "b.ghx"}))
+            return pool.host_for()
+
+        hosts, loaded = await asyncio.gather(reader(), loader())
+        await busy
+        await pool.aclose()
+        return hosts, loaded, pool.host_for("busy")
+
+    hosts, loaded, busy = asyncio.run(scenario())
+    assert set(hosts) == {loaded}
+    assert loaded != busy
+    assert sorted(s.commands_handled for s in standins) == [1, 5]
+
+
+def test_unreachable_host_is_ejected_and_retried(standin):
+    """測試 4: 無法連接的實例被移出，新工作階段的請求改送到其他實例"""
+    async def scenario():
+        pool = HostPool([("127.0.0.1", _closed_port()), (standin.host, standin.port)], eject_seconds=60)
+        responses = []
+        for i in range(4):
+            responses.append(await pool.request(build_command("ping", {"i": i}), session=f"s{i}"))
+        await pool.aclose()
+        return responses, pool.stats()
+
+    responses, stats = asyncio.run(scenario())
+    assert [r["data"]["parameters"]["i"] for r in responses] == [0, 1, 2, 3]
+    dead, alive = stats["hosts"]
+    assert not dead["healthy"] and dead["ejections"] == 1
+    assert alive["healthy"] and alive["sessions"] == 4
+    assert stats["retries"] == 1
+
+
+def test_session_applies_to_sync_helpers(standins):
+    """測試 5: run_sync 沿用呼叫端的工作階段"""
+    pool = HostPool([(s.host, s.port) for s in standins])
+    with pool.session("student_01"):
+        run_sync(pool.request(build_command("ping")))
+        assert pool.host_for("student_01") is not None
+    assert pool.host_for("default") is None
+    assert pool.host_for("student_01") is None
+    run_sync(pool.aclose())
+
+
+def test_pinned_session_survives_ejection(standins):
+    """測試 6: 固定的工作階段（編輯階段）在實例被移出時仍送到同一個實例，結束後才改綁"""
+    async def scenario():
+        pool = HostPool([(s.host, s.port) for s in standins], eject_after=1, eject_seconds=60)
+        with pool.pinned() as pinned:
+            await pool.request(build_command("begin_edit_session"))
+            # 逾時算作實例失敗：該實例被移出
+            slow = next(s for s in standins if format_endpoint(s.host, s.port) == pinned)
+            slow.latency = 0.3
+            with pytest.raises(asyncio.TimeoutError):
+                await pool.request(build_command("set_slider_value"), timeout=0.05)
+            slow.latency = 0
+            await pool.request(build_command("commit_edit_session"))
+            inside = pool.host_for()
+        await pool.request(build_command("get_document_info"))
+        after = pool.host_for()
+        await pool.aclose()
+        return pinned, inside, after, pool.stats()
+
+    pinned, inside, after, stats = asyncio.run(scenario())
+    assert inside == pinned
+    assert after != pinned
+    assert sum(not h["healthy"] for h in stats["hosts"]) == 1
+
+
+def test_owner_sessions_are_released_when_collected(standins):
+    """測試 7: 連接物件專屬的工作階段在物件被回收時解除綁定，新的連接不會沿用舊的綁定"""
+    class Connection:
+        pass
+
+    pool = HostPool([(s.host, s.port) for s in standins])
+    first = Connection()
+    key = pool.session_for(first, "mcp")
+    assert pool.session_for(first, "mcp") == key
+
+    run_sync(pool.request(build_command("ping"), session=key))
+    assert pool.host_for(key) is not None
+
+    del first
+    gc.collect()
+    assert pool.host_for(key) is None
+    assert pool.stats()["sessions"] == 0
+    assert pool.session_for(Connection(), "mcp") != key
+    run_sync(pool.aclose())
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+測試命令延遲與資料量統計（使用本地替身伺服器，不需要 Rhino）
+"""
+
+import asyncio
+
+import pytest
+
+from async_client import AsyncGrasshopperClient
+from gh_protocol import build_command
+from metrics import LATENCY_BUCKETS, Histogram, Metrics
+
+
+def test_histogram_quantiles():
+    """測試 1: 分位數以所在桶的上限估計，不超過最大值"""
+    histogram = Histogram(LATENCY_BUCKETS)
+    for value in [0.002] * 90 + [0.2] * 9 + [3.0]:
+        histogram.observe(value)
+
+    summary = histogram.summary()
+    assert summary["count"] == 100
+    assert summary["p50"] == 0.0025
+    assert summary["p95"] == 0.25
+    assert summary["p99"] == 0.25
+    assert summary["max"] == 3.0
+    assert Histogram(LATENCY_BUCKETS).quantile(0.5) is None
+
+
+def test_client_records_phases_bytes_and_errors(standin):
+    """測試 2: 每個命令記錄次數、錯誤、各階段延遲與位元組數；處理時間與傳輸時間分開"""
+    standin.register("slow", lambda command: {"points": [[i, i, 0] for i in range(2000)]})
+    standin.fallback = None
+
+    async def scenario():
+        metrics = Metrics()
+        client = AsyncGrasshopperClient(standin.host, standin.port, metrics=metrics)
+        standin.latency = 0.1
+        for _ in range(3):
+            await client.request(build_command("slow"))
+        standin.latency = 0
+        await client.request(build_command("missing"))
+        await client.aclose()
+        return metrics.snapshot()
+
+    snapshot = asyncio.run(scenario())
+    slow = snapshot["commands"]["slow"]
+    assert slow["count"] == 3 and slow["errors"] == 0 and slow["error_rate"] == 0.0
+    assert set(slow["latency"]) == {"queue", "connect", "send", "processing", "receive", "decode", "total"}
+    assert slow["latency"]["connect"]["count"] == 1
+    assert slow["latency"]["processing"]["p50"] >= 0.1
+    assert slow["latency"]["receive"]["max"] < 0.1
+    assert slow["response_bytes"]["max"] > 20000
+
+    missing = snapshot["commands"]["missing"]
+    assert missing["count"] == 1 and missing["errors"] == 1 and missing["error_rate"] == 1.0
+
+
+def test_timeouts_and_pipelines(standin):
+    """測試 3: 逾時記錄為失敗；管線化記錄整批延遲與每個命令的次數"""
+    async def scenario():
+        metrics = Metrics()
+        client = AsyncGrasshopperClient(standin.host, standin.port, metrics=metrics)
+        standin.latency = 0.3
+        with pytest.raises(asyncio.TimeoutError):
+            await client.request(build_command("solve"), timeout=0.05)
+        standin.latency = 0
+        await client.pipeline([build_command("ping", {"i": i}) for i in range(5)])
+        await client.aclose()
+        return metrics.snapshot()
+
+    commands = asyncio.run(scenario())["commands"]
+    assert commands["solve"]["failures"] == {"timeout": 1}
+    assert commands["solve"]["error_rate"] == 1.0
+    assert commands["ping"]["count"] == 5 and commands["ping"]["request_bytes"]["count"] == 5
+    assert commands["pipeline"]["count"] == 1
+    assert list(commands["pipeline"]["latency"]) == ["total"]
+
+
+def test_prometheus_format(standin, tmp_path):
+    """測試 4: Prometheus 文字格式：累積的桶、_count 與次數一致"""
+    async def scenario():
+        metrics = Metrics()
+        client = AsyncGrasshopperClient(standin.host, standin.port, metrics=metrics)
+        for i in range(4):
+            await client.request(build_command("ping", {"i": i}))
+        await client.aclose()
+        return metrics
+
+    metrics = asyncio.run(scenario())
+    text = metrics.prometheus()
+    assert 'grasshopper_commands_total{command="ping"} 4' in text
+    assert 'grasshopper_command_seconds_count{command="ping",phase="total"} 4' in text
+    assert 'grasshopper_command_seconds_bucket{command="ping",phase="total",le="+Inf"} 4' in text
+
+    buckets = [int(line.rsplit(" ", 1)[1]) for line in text.splitlines()
+               if line.startswith('grasshopper_command_seconds_bucket{command="ping",phase="total"')]
+    assert buckets == sorted(buckets)
+
+    path = tmp_path / "grasshopper.prom"
+    metrics.write_prometheus(str(path))
+    assert path.read_text(encoding="utf-8") == text
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+測試組件輸出數據的分頁讀取（使用本地替身伺服器，不需要 Rhino）
+"""
+
+import asyncio
+import base64
+import struct
+
+import pytest
+
+from async_client import AsyncGrasshopperClient
+from output_data import (
+    STRIDES,
+    OutputDataError,
+    decode_page,
+    iter_output_items,
+    iter_output_items_sync,
+    iter_output_pages,
+    pack_values,
+    read_output_array_sync,
+    read_output_values_sync,
+)
+from standin_server import StandinServer
+
+
+def _paged_output(items):
+    """與插件相同的 offset / limit 語意"""
+    def handler(command):
+        params = command["parameters"]
+        offset = params.get("offset", 0)
+        limit = params.get("limit", -1)
+        page = items[offset:] if limit < 0 else items[offset:offset + limit]
+        end = offset + len(page)
+        return {"outputName": "Points", "outputType": "Point", "data": page, "offset": offset,
+                "count": len(page), "totalCount": len(items), "nextOffset": end if end < len(items) else None}
+    return handler
+
+
+def test_items_are_read_page_by_page():
+    """測試 1: 依頁面大小分多次請求，依序產生所有項目"""
+    items = [f"{{{i}, 0, 0}}" for i in range(2500)]
+    with StandinServer(handlers={"get_component_output_data": _paged_output(items)}) as server:
+        async def scenario():
+            client = AsyncGrasshopperClient(server.host, server.port)
+            pages = [page async for page in iter_output_pages(client, "points", page_size=1000)]
+            streamed = [item async for item in iter_output_items(client, "points", page_size=1000)]
+            await client.aclose()
+            return pages, streamed
+
+        pages, streamed = asyncio.run(scenario())
+        assert [page["count"] for page in pages] == [1000, 1000, 500]
+        assert streamed == items
+        assert server.commands_handled == 6
+
+
+def test_sync_iterator_requests_pages_lazily():
+    """測試 2: 同步 generator 只在需要時請求下一頁"""
+    items = list(range(100))
+    with StandinServer(handlers={"get_component_output_data": _paged_output(items)}) as server:
+        client = AsyncGrasshopperClient(server.host, server.port)
+        iterator = iter_output_items_sync(client, "numbers", page_size=30)
+        assert [next(iterator) for _ in range(31)] == items[:31]
+        assert server.commands_handled == 2
+
+        iterator.close()
+        assert list(iter_output_items_sync(client, "numbers", page_size=30)) == items
+
+
+def test_unpaged_plugin_returns_everything_at_once():
+    """測試 3: 原版插件忽略 offset / limit 時，第一頁即為全部數據"""
+    def legacy(command):
+        return {"outputName": "Number", "outputType": "double", "data": [1.0, 2.0, 3.0]}
+
+    with StandinServer(handlers={"get_component_output_data": legacy}) as server:
+        client = AsyncGrasshopperClient(server.host, server.port)
+        assert list(iter_output_items_sync(client, "numbers", page_size=1)) == [1.0, 2.0, 3.0]
+        assert server.commands_handled == 1
+
+
+def test_output_change_while_paging_is_reported():
+    """測試 4: 分頁期間輸出總數改變（重新計算）時拋出錯誤"""
+    items = list(range(10))
+    paged = _paged_output(items)
+
+    def recomputing(command):
+        page = paged(command)
+        items.append(len(items))
+        return page
+
+    with StandinServer(handlers={"get_component_output_data": recomputing}) as server:
+        client = AsyncGrasshopperClient(server.host, server.port)
+        with pytest.raises(OutputDataError, match="changed while paging"):
+            list(iter_output_items_sync(client, "numbers", page_size=4))
+
+
+def _binary_output(kind, values, branches):
+    """與插件相同的二進位編碼（含分頁與分支）"""
+    stride = STRIDES[kind]
+    paths = [branch["path"] for branch in branches for _ in range(branch["count"])]
+
+    def handler(command):
+        params = command["parameters"]
+        offset = params.get("offset", 0)
+        limit = params.get("limit", -1)
+        total = len(values) // stride
+        end = total if limit < 0 else min(total, offset + limit)
+        page_branches = []
+        for path in paths[offset:end]:
+            if page_branches and page_branches[-1]["path"] == path:
+                page_branches[-1]["count"] += 1
+            else:
+                page_branches.append({"path": path, "count": 1})
+        return {"outputName": "P", "outputType": kind.title(), "encoding": params.get("encoding"), "kind": kind,
+                "stride": stride, "values": pack_values(values[offset * stride:end * stride]),
+                "branches": page_branches, "offset": offset, "count": end - offset, "totalCount": total,
+                "nextOffset": end if end < total else None}
+    return handler
+
+
+def test_binary_points_are_decoded_across_pages():
+    """測試 5: 二進位點資料分頁解碼並合併，分支跨頁時合併計數"""
+    values = [float(v) for v in range(3 * 250)]
+    branches = [{"path": "{0;0}", "count": 100}, {"path": "{0;1}", "count": 150}]
+    with StandinServer(handlers={"get_component_output_data": _binary_output("point", values, branches)}) as server:
+        client = AsyncGrasshopperClient(server.host, server.port)
+        points = read_output_values_sync(client, "points", page_size=64)
+
+    assert points.kind == "point"
+    assert len(points) == 250
+    assert list(points.values) == values
+    assert points.branches == branches
+    assert next(points.items()) == (0.0, 1.0, 2.0)
+
+
+def test_text_output_falls_back_to_parsing():
+    """測試 6: 原版插件返回 ToString 文字時退回解析"""
+    def legacy(command):
+        return {"outputName": "V", "outputType": "Vector", "data": ["{1, 2, 3}", "{-0.5, 1e-3, 4.25}"]}
+
+    with StandinServer(handlers={"get_component_output_data": legacy}) as server:
+        client = AsyncGrasshopperClient(server.host, server.port)
+        vectors = read_output_values_sync(client, "vectors")
+
+    assert vectors.kind == "vector"
+    assert list(vectors.items()) == [(1.0, 2.0, 3.0), (-0.5, 0.001, 4.25)]
+    assert vectors.branches is None
+
+
+def test_pack_and_decode_roundtrip():
+    """測試 7: 編碼格式與插件一致（little-endian float64），依 encoding 選擇解碼方式"""
+    page = {"encoding": "binary", "kind": "plane", "stride": 9, "count": 1,
+            "values": pack_values(range(9)), "branches": [{"path": "{0}", "count": 1}]}
+    assert base64.b64decode(page["values"])[:16] == struct.pack("<2d", 0.0, 1.0)
+    assert list(decode_page(page).values) == [float(v) for v in range(9)]
+
+    # Slider 的輸出是數值本身（encoding = "json"）
+    slider = decode_page({"encoding": "json", "data": [2.5], "count": 1})
+    assert (slider.kind, list(slider.values)) == ("number", [2.5])
+    with pytest.raises(OutputDataError):
+        decode_page({"encoding": "json", "data": ["{1, 2, 3}"], "count": 1})
+
+
+def test_numpy_arrays_and_path_index():
+    """測試 8: NumPy 陣列與值共用記憶體，分支索引對應每個項目"""
+    np = pytest.importorskip("numpy")
+    values = [float(v) for v in range(3 * 5)]
+    branches = [{"path": "{0;0}", "count": 2}, {"path": "{0;1}", "count": 3}]
+    with StandinServer(handlers={"get_component_output_data": _binary_output("point", values, branches)}) as server:
+        client = AsyncGrasshopperClient(server.host, server.port)
+        data, path_index, paths = read_output_array_sync(client, "points", page_size=2)
+
+    assert data.shape == (5, 3)
+    assert data[4].tolist() == [12.0, 13.0, 14.0]
+    assert path_index.tolist() == [0, 0, 1, 1, 1]
+    assert paths == ["{0;0}", "{0;1}"]
+    assert np.allclose(data[path_index == 1].mean(axis=0), [9.0, 10.0, 11.0])
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+測試命令流量的錄製與重播（錄製代理 → 模擬器，重播到另一個模擬器）
+"""
+
+import time
+
+from connection_pool import ConnectionPool
+from gh_protocol import build_command
+from record_replay import RecordingProxy, load_recording, replay
+from simulator import GrasshopperSimulator
+from standin_server import StandinServer
+
+
+def _session(pool):
+    """一段典型的操作：建立滑桿與 Series、連接、掃描滑桿、讀取輸出"""
+    add = lambda t: pool.request(build_command("add_component_advanced", {"type": t, "x": 0, "y": 0}))  # noqa: E731
+    slider = add("GH_NumberSlider")["data"]["componentId"]
+    series = add("Component_Series")["data"]["componentId"]
+    pool.request(build_command("connect_components", {"sourceId": slider, "targetId": series, "targetParam": "Count"}))
+    for value in (0.2, 0.4, 0.6):
+        pool.request(build_command("set_slider_value", {"componentId": slider, "value": value}))
+        time.sleep(0.02)
+    pool.request(build_command("get_component_output_data", {"componentId": series}))
+    pool.request(build_command("get_component_details", {"componentId": "00000000-0000-0000-0000-000000000000"}))
+
+
+def test_record_then_replay_on_fresh_simulator(tmp_path):
+    """測試 1: 錄製的組件 ID 在重播時對應到新模擬器產生的 ID，回應的成功與否相同"""
+    path = str(tmp_path / "session.jsonl")
+    with GrasshopperSimulator() as upstream, RecordingProxy((upstream.host, upstream.port), path) as proxy:
+        pool = ConnectionPool(proxy.host, proxy.port)
+        _session(pool)
+        pool.close()
+
+    records = load_recording(path)
+    assert [r["command"]["type"] for r in records][:3] == ["add_component_advanced", "add_component_advanced", "connect_components"]
+    assert records[-1]["response"]["success"] is False
+    assert all(r["t"] >= 0 and r["elapsed"] >= 0 for r in records)
+
+    with GrasshopperSimulator() as target:
+        report = replay(path, target.host, target.port, rate=0, concurrency=1)
+        assert len(target.document.components) == 2
+
+    assert report["commands"] == len(records) == 8
+    assert report["errors"] == 0 and report["mismatches"] == 0
+    assert report["metrics"]["commands"]["set_slider_value"]["count"] == 3
+
+
+def test_replay_keeps_recorded_pacing(tmp_path):
+    """測試 2: rate=1 依錄製的時間間隔送出，rate=4 快四倍"""
+    path = tmp_path / "paced.jsonl"
+    lines = ['{"t": %.2f, "command": {"type": "ping", "parameters": {}}, "response": {"success": true}, "elapsed": 0}' % (i * 0.1)
+             for i in range(5)]
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+    with StandinServer() as server:
+        normal = replay(str(path), server.host, server.port, rate=1)
+        fast = replay(str(path), server.host, server.port, rate=4)
+
+    assert normal["elapsed"] >= 0.4
+    assert fast["elapsed"] < normal["elapsed"] / 2
+    assert normal["mismatches"] == fast["mismatches"] == 0
+
+
+def test_proxy_reconnects_to_oneshot_plugin(oneshot_standin, tmp_path):
+    """測試 3: 原版插件回應後即關閉連接，代理重新連接，橋接端的連接保持不變"""
+    path = str(tmp_path / "oneshot.jsonl")
+    with RecordingProxy((oneshot_standin.host, oneshot_standin.port), path) as proxy:
+        pool = ConnectionPool(proxy.host, proxy.port)
+        responses = [pool.request(build_command("ping", {"i": i})) for i in range(3)]
+        stats = pool.stats()
+        pool.close()
+
+    assert [r["data"]["parameters"]["i"] for r in responses] == [0, 1, 2]
+    assert stats["created"] == 1 and stats["reconnects"] == 0
+    assert len(load_recording(path)) == 3
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+測試記憶體中的 Grasshopper 模擬器（命令語意與插件相同，不需要 Rhino）
+"""
+
+import os
+import re
+import time
+
+import pytest
+
+from connection_pool import ConnectionPool
+from document_model import DocumentGraph
+from gh_protocol import build_command
+from output_data import unpack_values
+from simulator import GrasshopperSimulator
+
+REGISTRY = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                        "csharp_source", "GrasshopperCommandRegistry_Enhanced.cs")
+
+
+@pytest.fixture
+def sim():
+    server = GrasshopperSimulator().start()
+    pool = ConnectionPool(server.host, server.port)
+
+    def call(command_type, **params):
+        return pool.request(build_command(command_type, params))
+
+    server.call = call
+    yield server
+    pool.close()
+    server.stop()
+
+
+def _add(sim, type_name, **params):
+    response = sim.call("add_component_advanced", type=type_name, x=0, y=0, **params)
+    assert response["success"], response
+    return response["data"]["componentId"]
+
+
+def test_handles_every_registered_command(sim):
+    """測試 1: 插件註冊的每個命令都有處理器（不會回應「未註冊」）"""
+    with open(REGISTRY, encoding="utf-8") as f:
+        registered = set(re.findall(r'RegisterCommand\("(\w+)"', f.read()))
+    assert {"add_component_advanced", "get_changes_since", "batch"} <= registered
+
+    for command_type in sorted(registered):
+        response = sim.call(command_type)
+        assert "No handler registered" not in (response.get("error") or ""), command_type
+
+
+def test_outputs_follow_wires(sim):
+    """測試 2: 輸出依連線計算；分頁、二進位編碼與錯誤訊息與插件相同"""
+    count = _add(sim, "GH_NumberSlider", initialParams={"min": 0, "max": 100, "value": 5})
+    series = _add(sim, "Component_Series")
+    response = sim.call("connect_many", connections=[{"sourceId": count, "targetId": series, "targetParam": "C"},
+                                                      {"sourceId": count, "targetId": series, "targetParam": "X"}])
+    assert response["data"]["connected"] == 1
+    assert response["data"]["results"][1]["error"] == "Input 'X' not found on Series"
+
+    page = sim.call("get_component_output_data", componentId=series, limit=3)["data"]
+    assert page["data"] == ["0", "1", "2"] and page["totalCount"] == 5 and page["nextOffset"] == 3
+
+    sim.call("set_slider_value", componentId=count, value=1000)  # 限制在滑桿範圍內
+    binary = sim.call("get_component_output_data", componentId=series, encoding="binary")["data"]
+    assert binary["kind"] == "number" and binary["totalCount"] == 100
+    assert unpack_values(binary["values"])[-1] == 99.0
+
+    assert sim.call("get_component_details", componentId="nope")["error"].endswith("Invalid component ID format")
+    assert sim.call("set_slider_value", componentId=series, value=1)["error"].endswith("Component is not a Number Slider")
+
+
+def test_revisions_and_changes(sim):
+    """測試 3: 修訂號與變更紀錄與 DocumentChangeTracker 相同；使用者在畫布上的修改也會出現"""
+    start = sim.call("get_document_revision")["data"]
+    slider = _add(sim, "GH_NumberSlider")
+    sim.call("set_slider_value", componentId=slider, value=0.25)
+    sim.document.user_edit(slider, value=0.75)
+    sim.call("delete_components", componentIds=[slider])
+
+    changes = sim.call("get_changes_since", revision=start["revision"], documentId=start["documentId"])["data"]
+    assert not changes["reset"]
+    assert [c["change"] for c in changes["changes"]] == ["added", "changed", "changed", "removed"]
+    assert changes["revision"] == start["revision"] + 4
+    assert sim.call("get_changes_since", revision=start["revision"], documentId="other")["data"]["reset"]
+
+
+def test_solves_are_deferred_in_batches_and_sessions():
+    """測試 4: 每次修改求解一次；batch、編輯階段與 recompute=False 延後到最後求解一次"""
+    with GrasshopperSimulator(solve_latency=0.02) as server:
+        pool = ConnectionPool(server.host, server.port)
+        slider = pool.request(build_command("add_component_advanced", {"type": "slider", "x": 0, "y": 0}))["data"]["componentId"]
+        doc = server.document
+        solutions = doc.solutions
+
+        start = time.perf_counter()
+        for value in (0.1, 0.2, 0.3):
+            pool.request(build_command("set_slider_value", {"componentId": slider, "value": value}))
+        assert doc.solutions == solutions + 3
+        assert time.perf_counter() - start >= 0.06
+
+        steps = [{"type": "set_slider_value", "parameters": {"componentId": slider, "value": v}} for v in (0.4, 0.5, 0.6)]
+        pool.request(build_command("batch", {"commands": steps}))
+        assert doc.solutions == solutions + 4
+
+        # 批次中的 connect_components 也只在最後求解一次
+        wiring = [{"type": "add_component_advanced", "parameters": {"type": "Component_Circle", "x": 200, "y": 0}},
+                  {"type": "connect_components", "parameters": {"sourceId": slider, "targetId": "$0.id", "targetParam": "Radius"}}]
+        assert pool.request(build_command("batch", {"commands": wiring}))["data"]["completed"] == 2
+        assert doc.solutions == solutions + 5
+
+        pool.request(build_command("begin_edit_session"))
+        for value in (0.7, 0.8):
+            pool.request(build_command("set_slider_value", {"componentId": slider, "value": value}))
+        assert doc.solutions == solutions + 5
+        assert pool.request(build_command("commit_edit_session"))["data"] == {"active": False, "wasActive": True, "solved": True}
+        assert doc.solutions == solutions + 6
+
+        # batch_set_sliders：每個滑桿只標記過期，recompute=False 不求解，之後的呼叫一併計算
+        other = pool.request(build_command("add_component_advanced", {"type": "slider", "x": 0, "y": 40}))["data"]["componentId"]
+        revision = doc.revision
+        solutions = doc.solutions
+        pool.request(build_command("batch_set_sliders", {"sliderValues": {slider: 0.1, other: 0.2}, "recompute": False}))
+        assert doc.solutions == solutions and doc.revision == revision + 2
+        pool.request(build_command("batch_set_sliders", {"sliderValues": {slider: 0.3, other: 0.4}}))
+        assert doc.solutions == solutions + 1
+        pool.close()
+
+
+def test_save_and_load_round_trip(tmp_path, sample_ghx):
+    """測試 5: 讀取 .ghx 後計算輸出；save_document 的快照可以再讀回相同的文檔"""
+    with GrasshopperSimulator() as server:
+        pool = ConnectionPool(server.host, server.port)
+        call = lambda t, **p: pool.request(build_command(t, p))  # noqa: E731
+
+        loaded = call("load_document", path=sample_ghx)["data"]
+        assert loaded["componentCount"] == 5
+        addition = "a1000000-0000-0000-0000-000000000003"
+        assert call("get_component_output_data", componentId=addition)["data"]["data"] == ["7"]
+
+        call("set_slider_value", componentId="a1000000-0000-0000-0000-000000000001", value=6)
+        before = DocumentGraph(call("export_document_graph")["data"])
+        snapshot = str(tmp_path / "saved.json")
+        call("save_document", path=snapshot)
+        call("clear_document")
+        assert call("get_document_info")["data"]["componentCount"] == 0
+
+        call("load_document", path=snapshot)
+        after = DocumentGraph(call("export_document_graph")["data"])
+        assert call("get_component_output_data", componentId=addition)["data"]["data"] == ["10"]
+        pool.close()
+
+    assert {tuple(sorted(w.items())) for w in after.wires} == {tuple(sorted(w.items())) for w in before.wires}
+    assert after[addition]["name"] == "A+B"
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+測試本地替身伺服器的命令語意（與插件端的行為保持一致）
+"""
+
+import itertools
+import threading
+
+from connection_pool import ConnectionPool
+from gh_protocol import build_command
+from standin_server import StandinServer
+
+
+def _component_server():
+    """提供 add_component_advanced / connect_components 的替身"""
+    ids = itertools.count()
+    wires = []
+
+    def add_component(command):
+        params = command["parameters"]
+        return {"componentId": f"component-{next(ids)}", "type": params["type"],
+                "position": {"x": params["x"], "y": params["y"]}}
+
+    def connect(command):
+        params = command["parameters"]
+        wires.append((params["sourceId"], params["targetId"]))
+        return {"sourceId": params["sourceId"], "targetId": params["targetId"]}
+
+    def fail(command):
+        raise ValueError("boom")
+
+    server = StandinServer(
+        handlers={"add_component_advanced": add_component, "connect_components": connect, "fail": fail},
+        fallback=None,
+    )
+    return server, wires
+
+
+def test_batch_resolves_step_references():
+    """測試 1: batch 依序執行，"$N.id" 引用前面步驟建立的組件"""
+    server, wires = _component_server()
+    with server:
+        pool = ConnectionPool(server.host, server.port)
+        response = pool.request(build_command("batch", {"commands": [
+            {"type": "add_component_advanced", "parameters": {"type": "GH_NumberSlider", "x": 0, "y": 0}},
+            {"type": "add_component_advanced", "parameters": {"type": "Component_Circle", "x": 200, "y": 0}},
+            {"type": "connect_components", "parameters": {"sourceId": "$0.id", "targetId": "$1.componentId"}},
+            {"type": "add_component_advanced", "parameters": {"type": "GH_Panel", "x": "$1.position.x", "y": 100}},
+        ]}))
+        pool.close()
+
+    data = response["data"]
+    assert data["completed"] == data["total"] == 4
+    assert [r["index"] for r in data["results"]] == [0, 1, 2, 3]
+    assert wires == [("component-0", "component-1")]
+    assert data["results"][3]["data"]["position"] == {"x": 200, "y": 100}
+
+
+def test_batch_stops_on_error():
+    """測試 2: 預設在第一個失敗的步驟停止，並回報每一步的結果"""
+    server, _ = _component_server()
+    with server:
+        pool = ConnectionPool(server.host, server.port)
+        stopped = pool.request(build_command("batch", {"commands": [
+            {"type": "add_component_advanced", "parameters": {"type": "GH_Panel", "x": 0, "y": 0}},
+            {"type": "fail"},
+            {"type": "add_component_advanced", "parameters": {"type": "GH_Panel", "x": 0, "y": 0}},
+        ]}))["data"]
+        continued = pool.request(build_command("batch", {"stopOnError": False, "commands": [
+            {"type": "fail"},
+            {"type": "connect_components", "parameters": {"sourceId": "$0.id", "targetId": "x"}},
+            {"type": "unknown_command"},
+            {"type": "add_component_advanced", "parameters": {"type": "GH_Panel", "x": 0, "y": 0}},
+        ]}))["data"]
+        pool.close()
+
+    assert stopped["completed"] == 1
+    assert len(stopped["results"]) == 2
+    assert "boom" in stopped["results"][1]["error"]
+
+    assert [r["success"] for r in continued["results"]] == [False, False, False, True]
+    assert "failed step" in continued["results"][1]["error"]
+    assert "No handler registered" in continued["results"][2]["error"]
+
+
+def test_ui_handoff_runs_commands_on_one_thread():
+    """測試 3: 模擬 UI 執行緒：命令在同一個執行緒上依序執行，兩種交接方式結果相同"""
+    for mode in ("signaled", "polling"):
+        threads = set()
+
+        def record(command):
+            threads.add(threading.current_thread().name)
+            return command["parameters"]
+
+        server = StandinServer(handlers={"record": record}, fallback=None, ui_handoff=mode)
+        with server:
+            pools = [ConnectionPool(server.host, server.port) for _ in range(3)]
+            responses = [pool.request(build_command("record", {"i": i})) for i, pool in enumerate(pools)]
+            failed = pools[0].request(build_command("unknown"))
+            for pool in pools:
+                pool.close()
+
+        assert [r["data"] for r in responses] == [{"i": 0}, {"i": 1}, {"i": 2}]
+        assert threads == {"standin-ui-thread"}
+        assert "No handler registered" in failed["error"]
+
+
+def test_batch_resolves_indexed_references():
+    """測試 4: 引用路徑可以包含陣列索引（與插件的 SelectToken 相同），例如 $0.outputs[0].id"""
+    def describe(command):
+        return {"componentId": command["parameters"]["componentId"],
+                "outputs": [{"id": "out-0", "name": "Result"}, {"id": "out-1", "name": "Extra"}]}
+
+    server = StandinServer(handlers={"describe": describe, "echo": lambda command: command["parameters"]},
+                           fallback=None)
+    with server:
+        pool = ConnectionPool(server.host, server.port)
+        response = pool.request(build_command("batch", {"stopOnError": False, "commands": [
+            {"type": "describe", "parameters": {"componentId": "component-0"}},
+            {"type": "echo", "parameters": {"first": "$0.outputs[0].id", "name": "$0.outputs[1].name"}},
+            {"type": "echo", "parameters": {"missing": "$0.outputs[2].id"}},
+            {"type": "echo", "parameters": {"property": "$0.outputs.0.id"}},
+        ]}))
+        pool.close()
+
+    results = response["data"]["results"]
+    assert results[1]["data"] == {"first": "out-0", "name": "Extra"}
+    assert [r["success"] for r in results] == [True, True, False, False]
+    assert "not found" in results[2]["error"]
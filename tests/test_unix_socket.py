@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+測試 Unix domain socket 傳輸（替身伺服器在 socket 檔上監聽，不需要 Rhino）
+"""
+
+import asyncio
+import os
+import socket
+
+import pytest
+
+from async_client import AsyncGrasshopperClient
+from connection_pool import ConnectionPool
+from gh_protocol import build_command, format_endpoint
+from host_pool import HostPool, parse_endpoints
+from standin_server import StandinServer
+
+pytestmark = pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="Unix domain sockets are not available")
+
+
+@pytest.fixture
+def unix_standin(tmp_path):
+    server = StandinServer(unix_path=str(tmp_path / "grasshopper.sock")).start()
+    yield server
+    server.stop()
+
+
+def test_endpoint_syntax():
+    """測試 1: GRASSHOPPER_HOSTS 中的 "unix:<路徑>" 與 TCP 端點可以混用"""
+    endpoints = parse_endpoints("unix:/tmp/gh.sock, localhost:8081")
+    assert endpoints == [("unix:/tmp/gh.sock", 0), ("localhost", 8081)]
+    assert [format_endpoint(*e) for e in endpoints] == ["unix:/tmp/gh.sock", "localhost:8081"]
+
+
+def test_sync_and_async_clients(unix_standin):
+    """測試 2: 同步連接池、非同步客戶端（含管線化）與 HostPool 都可以使用 socket 檔"""
+    assert unix_standin.host.startswith("unix:") and unix_standin.port == 0
+
+    pool = ConnectionPool(unix_standin.host, unix_standin.port)
+    responses = [pool.request(build_command("ping", {"i": i})) for i in range(3)]
+    assert [r["data"]["parameters"]["i"] for r in responses] == [0, 1, 2]
+    assert pool.stats()["created"] == 1
+    pool.close()
+
+    async def scenario():
+        client = AsyncGrasshopperClient(unix_standin.host, unix_standin.port)
+        assert await client.check_connection()
+        piped = await client.pipeline([build_command("ping", {"i": i}) for i in range(5)])
+        await client.aclose()
+
+        hosts = HostPool(parse_endpoints(unix_standin.host))
+        response = await hosts.request(build_command("get_document_info"))
+        await hosts.aclose()
+        return piped, response, hosts.stats()
+
+    piped, response, stats = asyncio.run(scenario())
+    assert [r["data"]["parameters"]["i"] for r in piped] == list(range(5))
+    assert response["success"]
+    assert stats["hosts"][0]["host"] == unix_standin.host
+
+
+def test_socket_file_lifecycle(tmp_path):
+    """測試 3: 啟動時取代先前留下的 socket 檔，停止時移除；一般檔案不會被覆蓋"""
+    path = str(tmp_path / "stale.sock")
+    stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    stale.bind(path)
+    stale.close()
+
+    server = StandinServer(unix_path=path).start()
+    assert ConnectionPool(server.host, server.port).request(build_command("ping"))["success"]
+    server.stop()
+    assert not os.path.exists(path)
+
+    regular = tmp_path / "notes.txt"
+    regular.write_text("keep me")
+    with pytest.raises(OSError):
+        StandinServer(unix_path=str(regular))
+    assert regular.read_text() == "keep me"
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+測試線路編碼：JSON 實作（json / orjson）、MessagePack 與壓縮的協商、退回 JSON
+"""
+
+import asyncio
+import random
+import uuid
+
+import pytest
+
+from async_client import AsyncGrasshopperClient
+from gh_protocol import build_command
+from metrics import Metrics
+from record_replay import RecordingProxy
+from simulator import GrasshopperSimulator
+from standin_server import StandinServer
+from wire_codec import Codec, Compression, JsonCodec, get_codec, json_codec
+
+
+def _connections_payload(n):
+    """與 get_all_connections 相同形狀的資料（含非 ASCII 的暱稱）"""
+    return {"connections": [{"sourceId": f"{i:08x}-0000-0000-0000-000000000000", "sourceParam": "結果",
+                             "targetId": f"{i + 1:08x}-0000-0000-0000-000000000000", "targetParam": "A"}
+                            for i in range(n)],
+            "count": n}
+
+
+def test_json_implementations_are_interchangeable():
+    """測試 1: orjson 與標準函式庫產生的 JSON 可以互相解析，BOM 與 CRLF 照常處理"""
+    payload = _connections_payload(50)
+    stdlib, fast = JsonCodec(), json_codec()
+    assert fast.name == "json"
+    assert stdlib.decode(fast.encode(payload)) == payload
+    assert fast.decode(stdlib.encode(payload)) == payload
+    assert fast.decode(b"\xef\xbb\xbf" + stdlib.encode(payload) + b"\r") == payload
+    assert fast.decode(fast.encode({"big": 2 ** 70}))["big"] == 2 ** 70
+
+    with pytest.raises(ValueError):
+        fast.decode(b"{not json")
+    with pytest.raises(ValueError):
+        get_codec("xml")
+    with pytest.raises(TypeError):
+        Codec()
+    with pytest.raises(TypeError):
+        Compression()
+
+
+def _roundtrip(server, codec):
+    async def scenario():
+        client = AsyncGrasshopperClient(server.host, server.port, codec=codec)
+        single = await client.request(build_command("echo_payload", {"n": 1}))
+        piped = await client.pipeline([build_command("echo_payload", {"n": i}) for i in range(4)])
+        await client.aclose()
+        return client, single, piped
+
+    return asyncio.run(scenario())
+
+
+def test_legacy_plugin_falls_back_to_json(oneshot_standin):
+    """測試 2: 不認得握手的插件（回應後即關閉連接）：協商一次後記住結果，命令照常使用 JSON"""
+    pytest.importorskip("msgpack")
+    oneshot_standin.fallback = None
+    oneshot_standin.register("echo_payload", lambda command: command["parameters"])
+
+    client, single, piped = _roundtrip(oneshot_standin, "msgpack")
+    assert single == {"success": True, "data": {"n": 1}}
+    assert [r["data"]["n"] for r in piped] == [0, 1, 2, 3]
+    assert client.negotiation_supported is False
+    assert client.stats()["codecs"] == {}
+
+
+def test_msgpack_negotiated_with_simulator():
+    """測試 3: 支援握手的模擬器改用 MessagePack 分框；二進位資料中的換行符不影響分框"""
+    pytest.importorskip("msgpack")
+    payload = _connections_payload(50)
+    handlers = {"echo_payload": lambda command: dict(payload, n=command["parameters"]["n"], blob=b"\n\x00\n")}
+
+    with StandinServer(handlers=handlers, codecs=("msgpack", "json")) as server:
+        client, single, piped = _roundtrip(server, "msgpack")
+    assert single["data"]["connections"] == payload["connections"]
+    assert single["data"]["blob"] == b"\n\x00\n"
+    assert [r["data"]["n"] for r in piped] == [0, 1, 2, 3]
+    assert client.stats()["codecs"] == {"msgpack": client.stats()["created"]}
+
+    with GrasshopperSimulator(codecs=("msgpack",)) as sim:
+        async def scenario():
+            client = AsyncGrasshopperClient(sim.host, sim.port, codec="msgpack")
+            added = await client.request(build_command("add_component_advanced", {"type": "GH_NumberSlider", "x": 0, "y": 0}))
+            info = await client.request(build_command("get_document_info"))
+            await client.aclose()
+            return added, info, client.stats()
+
+        added, info, stats = asyncio.run(scenario())
+    assert added["success"] and info["success"]
+    assert stats["codecs"] == {"msgpack": 1}
+
+
+def test_recording_proxy_keeps_json(tmp_path):
+    """測試 4: 錄製代理拒絕握手，即使插件支援 MessagePack，錄製檔仍是 JSON"""
+    pytest.importorskip("msgpack")
+    with StandinServer(codecs=("msgpack", "json")) as upstream, \
+            RecordingProxy((upstream.host, upstream.port), str(tmp_path / "session.jsonl")) as proxy:
+        client, single, piped = _roundtrip(proxy, "msgpack")
+        assert proxy.recorded == 5
+    assert single["success"] and len(piped) == 4
+    assert client.negotiation_supported is False
+
+
+def _guid_payload(n):
+    """大型回應：不重複的 GUID 加上重複的型別與參數名稱（壓縮後仍大於一個讀取區塊）"""
+    return [{"id": str(uuid.UUID(int=random.Random(i).getrandbits(128))), "type": "Component_Series",
+             "outputs": ["Series"]} for i in range(n)]
+
+
+@pytest.mark.parametrize("algorithm", ["zlib", "zstd"])
+def test_large_responses_are_compressed(algorithm):
+    """測試 5: 協商壓縮後只有達到門檻的回應被壓縮，大型回應以區塊解壓縮並與原始資料相同"""
+    if algorithm == "zstd":
+        pytest.importorskip("zstandard")
+    large = _guid_payload(20000)
+    handlers = {"large": lambda command: large, "small": lambda command: {"ok": True}}
+    metrics = Metrics()
+
+    async def scenario(server):
+        client = AsyncGrasshopperClient(server.host, server.port, metrics=metrics, compression=algorithm,
+                                        compress_threshold=1024)
+        big = await client.request(build_command("large"))
+        small = await client.request(build_command("small"))
+        piped = await client.pipeline([build_command(name) for name in ("small", "large", "small")])
+        await client.aclose()
+        return client.stats(), big, small, piped
+
+    with StandinServer(handlers=handlers, compression=("zstd", "zlib")) as server:
+        stats, big, small, piped = asyncio.run(scenario(server))
+        assert server.responses_compressed == 2
+
+    assert big["data"] == large and small["data"] == {"ok": True}
+    assert [r["data"] == large for r in piped] == [False, True, False]
+    assert stats["compression"] == {algorithm: 1} and stats["codecs"] == {"json": 1}
+    received = metrics.snapshot()["commands"]["large"]["response_bytes"]
+    assert received["max"] < len(json_codec().encode(big)) / 2
+
+
+def test_compression_falls_back_without_plugin_support(standin):
+    """測試 6: 插件不支援握手時不壓縮；未知的壓縮名稱在建立客戶端時報錯"""
+    standin.fallback = None
+    standin.register("large", lambda command: _guid_payload(2000))
+
+    async def scenario():
+        client = AsyncGrasshopperClient(standin.host, standin.port, compression="auto", compress_threshold=0)
+        response = await client.request(build_command("large"))
+        await client.aclose()
+        return client, response
+
+    client, response = asyncio.run(scenario())
+    assert len(response["data"]) == 2000
+    assert client.negotiation_supported is False and client.stats()["compression"] == {}
+    assert standin.responses_compressed == 0
+
+    with pytest.raises(ValueError):
+        AsyncGrasshopperClient(standin.host, standin.port, compression="lz4")